@@ -2,12 +2,13 @@
 Real AI-powered resume analysis using Perplexity API
 """
 
-import requests
 import json
 import logging
 from typing import Dict, Any, List, Optional
 import re
 
+from resume_matcher_ai.http_client import get_http_client
+
 logger = logging.getLogger(__name__)
 
 class PerplexityAnalyzer:
@@ -126,7 +127,7 @@ Provide specific, actionable feedback based on the actual content.
         }
         
         try:
-            response = requests.post(
+            response = get_http_client().post(
                 self.base_url,
                 headers=self.headers,
                 json=payload,
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Bulk Analysis Engine
+Bounded-concurrency analysis of many resumes against one job description
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BulkItemResult:
+    """Outcome of analyzing one resume in a bulk run"""
+    index: int
+    name: str
+    result: Any = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.result is not None and self.error is None
+
+class BulkAnalysisEngine:
+    """Runs extraction and AI analysis for many resumes on a bounded worker pool"""
+
+    def __init__(self, extract_fn: Callable[[Any], Optional[str]],
+                 analyze_fn: Callable[[str, str], Any],
+                 max_workers: int = 4, rate_limiter=None):
+        """
+        Args:
+            extract_fn: Turns an uploaded file into resume text (None if unreadable)
+            analyze_fn: Analyzes resume text against the job description
+            max_workers: Maximum number of resumes in flight at once
+            rate_limiter: Optional TokenBucket gating calls to analyze_fn
+        """
+        self.extract_fn = extract_fn
+        self.analyze_fn = analyze_fn
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = rate_limiter
+
+    def run(self, files: List[Tuple[str, Any]], jd_text: str,
+            progress_callback: Optional[Callable[[int, int, BulkItemResult], None]] = None) -> List[BulkItemResult]:
+        """
+        Analyze every file against jd_text
+
+        Args:
+            files: (name, file) pairs in display order
+            jd_text: Job description all resumes are compared to
+            progress_callback: Called on the calling thread as each item completes
+                with (completed_count, total, item_result)
+
+        Returns:
+            One BulkItemResult per input file, in input order
+        """
+        total = len(files)
+        results: List[Optional[BulkItemResult]] = [None] * total
+        if total == 0:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total),
+                                thread_name_prefix='bulk-analysis') as executor:
+            futures = {
+                executor.submit(self._process, index, name, file_obj, jd_text): index
+                for index, (name, file_obj) in enumerate(files)
+            }
+
+            for completed, future in enumerate(as_completed(futures), 1):
+                item = future.result()
+                results[item.index] = item
+
+                if progress_callback:
+                    try:
+                        progress_callback(completed, total, item)
+                    except Exception as e:
+                        logger.error(f"Bulk progress callback failed: {e}")
+
+        return results
+
+    def _process(self, index: int, name: str, file_obj: Any, jd_text: str) -> BulkItemResult:
+        """Extract and analyze a single resume; never raises"""
+        start_time = time.time()
+        item = BulkItemResult(index=index, name=name)
+
+        try:
+            resume_text = self.extract_fn(file_obj)
+            if not resume_text:
+                item.error = "Could not extract text from PDF file"
+                return item
+
+            # Only the API call is rate limited so extraction keeps overlapping
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+
+            item.result = self.analyze_fn(resume_text, jd_text)
+            if item.result is None:
+                item.error = "Analysis returned no result"
+
+        except Exception as e:
+            logger.error(f"Bulk analysis failed for {name}: {e}")
+            item.error = str(e)
+        finally:
+            item.elapsed_seconds = time.time() - start_time
+
+        return item
@@ -4,7 +4,6 @@ Enhanced Analysis Service
 Comprehensive analysis storage and retrieval system
 """
 
-import os
 import json
 import uuid
 import logging
@@ -12,6 +11,9 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 
+from database.connection import DatabaseManager
+from database.repositories import AnalysisSessionRepository, Page
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -42,79 +44,51 @@ class AnalysisResult:
 class EnhancedAnalysisService:
     """Enhanced service for comprehensive analysis storage and retrieval"""
     
-    def __init__(self):
-        self.database_url = self._get_database_url()
+    # Columns stored as JSON text
+    JSON_FIELDS = ['strengths', 'weaknesses', 'recommendations',
+                   'keywords_matched', 'keywords_missing', 'sections_analysis']
     
-    def _get_database_url(self):
-        """Get DATABASE_URL from environment or Streamlit secrets"""
-        database_url = os.getenv('DATABASE_URL')
-        if database_url:
-            return database_url
-        
-        try:
-            import streamlit as st
-            database_url = st.secrets.get('DATABASE_URL')
-            if database_url:
-                os.environ['DATABASE_URL'] = database_url
-                return database_url
-        except:
-            pass
-        
-        return None
+    # Columns listed in history; get_analysis_by_id loads the rest
+    SUMMARY_COLUMNS = ['id', 'resume_filename', 'analysis_type', 'match_score', 'status', 'created_at']
     
-    def _get_connection(self):
-        """Get database connection"""
-        import psycopg2
-        from psycopg2.extras import RealDictCursor
-        return psycopg2.connect(self.database_url, cursor_factory=RealDictCursor)
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self.sessions = AnalysisSessionRepository(db)
     
     def save_analysis(self, analysis_result: AnalysisResult) -> bool:
         """Save complete analysis result to database"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Prepare data for insertion
-                current_time = datetime.now()
-                analysis_result.created_at = analysis_result.created_at or current_time
-                analysis_result.updated_at = current_time
-                
-                # Convert lists and dicts to JSON strings
-                strengths_json = json.dumps(analysis_result.strengths)
-                weaknesses_json = json.dumps(analysis_result.weaknesses)
-                recommendations_json = json.dumps(analysis_result.recommendations)
-                keywords_matched_json = json.dumps(analysis_result.keywords_matched)
-                keywords_missing_json = json.dumps(analysis_result.keywords_missing)
-                sections_analysis_json = json.dumps(analysis_result.sections_analysis)
-                
-                # Insert comprehensive analysis data
-                insert_query = """
-                    INSERT INTO analysis_sessions (
-                        id, user_id, resume_filename, job_description, resume_content,
-                        analysis_type, match_score, strengths, weaknesses, recommendations,
-                        keywords_matched, keywords_missing, sections_analysis,
-                        pdf_report_path, processing_time_seconds, api_cost_usd, tokens_used,
-                        status, error_message, created_at, updated_at
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                    )
-                """
-                
-                cursor.execute(insert_query, (
-                    analysis_result.id, analysis_result.user_id, analysis_result.resume_filename,
-                    analysis_result.job_description, analysis_result.resume_content,
-                    analysis_result.analysis_type, analysis_result.match_score,
-                    strengths_json, weaknesses_json, recommendations_json,
-                    keywords_matched_json, keywords_missing_json, sections_analysis_json,
-                    analysis_result.pdf_report_path, analysis_result.processing_time_seconds,
-                    analysis_result.api_cost_usd, analysis_result.tokens_used,
-                    analysis_result.status, analysis_result.error_message,
-                    analysis_result.created_at, analysis_result.updated_at
-                ))
-                
-                conn.commit()
-                logger.info(f"✅ Analysis saved successfully: {analysis_result.id}")
-                return True
+            # Prepare data for insertion
+            current_time = datetime.now()
+            analysis_result.created_at = analysis_result.created_at or current_time
+            analysis_result.updated_at = current_time
+            
+            # Insert comprehensive analysis data, with lists and dicts as JSON strings
+            self.sessions.insert({
+                'id': analysis_result.id,
+                'user_id': analysis_result.user_id,
+                'resume_filename': analysis_result.resume_filename,
+                'job_description': analysis_result.job_description,
+                'resume_content': analysis_result.resume_content,
+                'analysis_type': analysis_result.analysis_type,
+                'match_score': analysis_result.match_score,
+                'strengths': json.dumps(analysis_result.strengths),
+                'weaknesses': json.dumps(analysis_result.weaknesses),
+                'recommendations': json.dumps(analysis_result.recommendations),
+                'keywords_matched': json.dumps(analysis_result.keywords_matched),
+                'keywords_missing': json.dumps(analysis_result.keywords_missing),
+                'sections_analysis': json.dumps(analysis_result.sections_analysis),
+                'pdf_report_path': analysis_result.pdf_report_path,
+                'processing_time_seconds': analysis_result.processing_time_seconds,
+                'api_cost_usd': analysis_result.api_cost_usd,
+                'tokens_used': analysis_result.tokens_used,
+                'status': analysis_result.status,
+                'error_message': analysis_result.error_message,
+                'created_at': analysis_result.created_at,
+                'updated_at': analysis_result.updated_at
+            })
+            
+            logger.info(f"✅ Analysis saved successfully: {analysis_result.id}")
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to save analysis: {e}")
@@ -125,49 +99,47 @@ class EnhancedAnalysisService:
     def get_user_analyses(self, user_id: str, limit: int = 50) -> List[AnalysisResult]:
         """Get all analyses for a user"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = """
-                    SELECT * FROM analysis_sessions 
-                    WHERE user_id = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT %s
-                """
-                
-                cursor.execute(query, (user_id, limit))
-                rows = cursor.fetchall()
-                
-                analyses = []
-                for row in rows:
-                    analysis = self._row_to_analysis_result(row)
-                    if analysis:
-                        analyses.append(analysis)
-                
-                logger.info(f"✅ Retrieved {len(analyses)} analyses for user {user_id}")
-                return analyses
+            analyses = []
+            for row in self.sessions.list_for_user(user_id, limit):
+                analysis = self._row_to_analysis_result(row)
+                if analysis:
+                    analyses.append(analysis)
+            
+            logger.info(f"✅ Retrieved {len(analyses)} analyses for user {user_id}")
+            return analyses
                 
         except Exception as e:
             logger.error(f"❌ Failed to get user analyses: {e}")
             return []
     
+    def get_user_history(self, user_id: str, limit: int = 20, cursor: Optional[str] = None) -> Page:
+        """
+        Get a page of a user's analyses as summary rows, newest first
+        
+        Args:
+            user_id: Owner of the analyses
+            limit: Page size
+            cursor: next_cursor of the previous page
+        """
+        try:
+            return self.sessions.page_for_user(user_id, self.SUMMARY_COLUMNS, limit, cursor)
+                
+        except Exception as e:
+            logger.error(f"❌ Failed to get user history: {e}")
+            return Page()
+    
     def get_analysis_by_id(self, analysis_id: str) -> Optional[AnalysisResult]:
         """Get specific analysis by ID"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = "SELECT * FROM analysis_sessions WHERE id = %s"
-                cursor.execute(query, (analysis_id,))
-                row = cursor.fetchone()
-                
-                if row:
-                    analysis = self._row_to_analysis_result(row)
-                    logger.info(f"✅ Retrieved analysis: {analysis_id}")
-                    return analysis
-                else:
-                    logger.warning(f"⚠️ Analysis not found: {analysis_id}")
-                    return None
+            row = self.sessions.get(analysis_id)
+            
+            if row:
+                analysis = self._row_to_analysis_result(row)
+                logger.info(f"✅ Retrieved analysis: {analysis_id}")
+                return analysis
+            else:
+                logger.warning(f"⚠️ Analysis not found: {analysis_id}")
+                return None
                     
         except Exception as e:
             logger.error(f"❌ Failed to get analysis by ID: {e}")
@@ -176,38 +148,18 @@ class EnhancedAnalysisService:
     def update_analysis(self, analysis_id: str, updates: Dict[str, Any]) -> bool:
         """Update specific fields of an analysis"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Build dynamic update query
-                set_clauses = []
-                values = []
-                
-                for field, value in updates.items():
-                    if field in ['strengths', 'weaknesses', 'recommendations', 
-                               'keywords_matched', 'keywords_missing', 'sections_analysis']:
-                        # Convert lists/dicts to JSON
-                        value = json.dumps(value)
-                    
-                    set_clauses.append(f"{field} = %s")
-                    values.append(value)
-                
-                # Add updated_at
-                set_clauses.append("updated_at = %s")
-                values.append(datetime.now())
-                values.append(analysis_id)
-                
-                query = f"""
-                    UPDATE analysis_sessions 
-                    SET {', '.join(set_clauses)}
-                    WHERE id = %s
-                """
-                
-                cursor.execute(query, values)
-                conn.commit()
-                
-                logger.info(f"✅ Analysis updated: {analysis_id}")
-                return True
+            fields = {}
+            for field, value in updates.items():
+                if field in self.JSON_FIELDS:
+                    # Convert lists/dicts to JSON
+                    value = json.dumps(value)
+                fields[field] = value
+            fields['updated_at'] = datetime.now()
+            
+            self.sessions.update(analysis_id, fields)
+            
+            logger.info(f"✅ Analysis updated: {analysis_id}")
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Failed to update analysis: {e}")
@@ -216,19 +168,12 @@ class EnhancedAnalysisService:
     def delete_analysis(self, analysis_id: str, user_id: str) -> bool:
         """Delete an analysis (with user verification)"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                query = "DELETE FROM analysis_sessions WHERE id = %s AND user_id = %s"
-                cursor.execute(query, (analysis_id, user_id))
-                
-                if cursor.rowcount > 0:
-                    conn.commit()
-                    logger.info(f"✅ Analysis deleted: {analysis_id}")
-                    return True
-                else:
-                    logger.warning(f"⚠️ Analysis not found or unauthorized: {analysis_id}")
-                    return False
+            if self.sessions.delete(analysis_id, user_id) > 0:
+                logger.info(f"✅ Analysis deleted: {analysis_id}")
+                return True
+            else:
+                logger.warning(f"⚠️ Analysis not found or unauthorized: {analysis_id}")
+                return False
                     
         except Exception as e:
             logger.error(f"❌ Failed to delete analysis: {e}")
@@ -237,50 +182,36 @@ class EnhancedAnalysisService:
     def get_user_analysis_stats(self, user_id: str) -> Dict[str, Any]:
         """Get analysis statistics for a user"""
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Get comprehensive stats
-                stats_query = """
-                    SELECT 
-                        COUNT(*) as total_analyses,
-                        AVG(match_score) as avg_match_score,
-                        MAX(match_score) as best_match_score,
-                        MIN(match_score) as lowest_match_score,
-                        SUM(api_cost_usd) as total_api_cost,
-                        SUM(tokens_used) as total_tokens_used,
-                        COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_analyses,
-                        COUNT(CASE WHEN status = 'failed' THEN 1 END) as failed_analyses
-                    FROM analysis_sessions 
-                    WHERE user_id = %s
-                """
-                
-                cursor.execute(stats_query, (user_id,))
-                stats = cursor.fetchone()
-                
-                # Get recent activity
-                recent_query = """
-                    SELECT created_at, match_score, status
-                    FROM analysis_sessions 
-                    WHERE user_id = %s 
-                    ORDER BY created_at DESC 
-                    LIMIT 10
-                """
-                
-                cursor.execute(recent_query, (user_id,))
-                recent_analyses = cursor.fetchall()
-                
-                return {
-                    'total_analyses': stats['total_analyses'] or 0,
-                    'avg_match_score': float(stats['avg_match_score'] or 0),
-                    'best_match_score': float(stats['best_match_score'] or 0),
-                    'lowest_match_score': float(stats['lowest_match_score'] or 0),
-                    'total_api_cost': float(stats['total_api_cost'] or 0),
-                    'total_tokens_used': stats['total_tokens_used'] or 0,
-                    'completed_analyses': stats['completed_analyses'] or 0,
-                    'failed_analyses': stats['failed_analyses'] or 0,
-                    'recent_analyses': [dict(row) for row in recent_analyses]
-                }
+            # Get comprehensive stats
+            stats = self.sessions.fetch_one("""
+                SELECT 
+                    COUNT(*) as total_analyses,
+                    AVG(match_score) as avg_match_score,
+                    MAX(match_score) as best_match_score,
+                    MIN(match_score) as lowest_match_score,
+                    SUM(api_cost_usd) as total_api_cost,
+                    SUM(tokens_used) as total_tokens_used,
+                    COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_analyses,
+                    COUNT(CASE WHEN status = 'failed' THEN 1 END) as failed_analyses
+                FROM analysis_sessions 
+                WHERE user_id = ?
+            """, (user_id,))
+            
+            # Get recent activity
+            recent_analyses = self.sessions.list_for_user(
+                user_id, limit=10, columns=['created_at', 'match_score', 'status'])
+            
+            return {
+                'total_analyses': stats['total_analyses'] or 0,
+                'avg_match_score': float(stats['avg_match_score'] or 0),
+                'best_match_score': float(stats['best_match_score'] or 0),
+                'lowest_match_score': float(stats['lowest_match_score'] or 0),
+                'total_api_cost': float(stats['total_api_cost'] or 0),
+                'total_tokens_used': stats['total_tokens_used'] or 0,
+                'completed_analyses': stats['completed_analyses'] or 0,
+                'failed_analyses': stats['failed_analyses'] or 0,
+                'recent_analyses': recent_analyses
+            }
                 
         except Exception as e:
             logger.error(f"❌ Failed to get user stats: {e}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Job Matching Engine
+Fans one parsed resume out across many job descriptions concurrently
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# How often waits (workers on the rate limiter, the scheduler on running jobs) re-check for cancellation
+RATE_LIMIT_POLL_SECONDS = 0.5
+
+@dataclass
+class JobMatchOutcome:
+    """Outcome of scoring the resume against one job description"""
+    index: int
+    job_name: str
+    job_description: str
+    result: Any = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+    @property
+    def success(self) -> bool:
+        return self.result is not None and self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the job result format used by the job matching pages"""
+        job_result = {
+            'job_name': self.job_name,
+            'job_description': self.job_description,
+            'success': self.success
+        }
+        if self.success:
+            job_result['result'] = self.result
+        else:
+            job_result['error'] = self.error
+        return job_result
+
+def rank_outcomes(outcomes: List[JobMatchOutcome]) -> List[JobMatchOutcome]:
+    """Order outcomes by score (best first), failures last in input order"""
+    return sorted(
+        outcomes,
+        key=lambda o: (not o.success, -(getattr(o.result, 'score', 0) or 0) if o.success else 0, o.index)
+    )
+
+class JobMatchingEngine:
+    """Scores one resume against many job descriptions with per-task timeouts"""
+
+    def __init__(self, parse_jd_fn: Callable[[str], Any], analyze_fn: Callable[[str, Dict], Any],
+                 max_workers: int = 8, task_timeout: float = 90.0, rate_limiter=None):
+        """
+        Args:
+            parse_jd_fn: Parses raw job description text
+            analyze_fn: Scores resume text against parsed job data (as a dict)
+            max_workers: Maximum number of jobs scored at once
+            task_timeout: Seconds a single job may run before it is reported as timed out
+            rate_limiter: Optional TokenBucket gating calls to analyze_fn
+        """
+        self.parse_jd_fn = parse_jd_fn
+        self.analyze_fn = analyze_fn
+        self.max_workers = max(1, max_workers)
+        self.task_timeout = task_timeout
+        self.rate_limiter = rate_limiter
+
+    def iter_ranked(self, resume_text: str, jobs: Dict[str, str],
+                    cancel_event: Optional[threading.Event] = None) -> Iterator[List[JobMatchOutcome]]:
+        """
+        Score resume_text against every job concurrently
+
+        Yields the ranked list of finished outcomes each time a job completes,
+        fails or times out. Closing the generator early (or setting cancel_event)
+        cancels every job that has not started yet.
+        """
+        cancel_event = cancel_event or threading.Event()
+        if not jobs:
+            return
+
+        started_at: Dict[int, float] = {}
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)),
+                                      thread_name_prefix='job-matching')
+        pending = {}
+        for index, (job_name, job_description) in enumerate(jobs.items()):
+            future = executor.submit(self._score, index, resume_text, job_name,
+                                     job_description, cancel_event, started_at)
+            pending[future] = (index, job_name, job_description)
+
+        finished: List[JobMatchOutcome] = []
+        try:
+            while pending:
+                if cancel_event.is_set():
+                    for index, job_name, job_description in pending.values():
+                        finished.append(JobMatchOutcome(index, job_name, job_description, error="Cancelled"))
+                    pending.clear()
+                    yield rank_outcomes(finished)
+                    break
+
+                done, _ = wait(pending, timeout=self._next_wait(pending, started_at), return_when=FIRST_COMPLETED)
+                changed = False
+
+                for future in done:
+                    pending.pop(future)
+                    finished.append(future.result())
+                    changed = True
+
+                now = time.monotonic()
+                for future, (index, job_name, job_description) in list(pending.items()):
+                    if index in started_at and now - started_at[index] >= self.task_timeout:
+                        # The worker can't be interrupted; its late result is discarded
+                        pending.pop(future)
+                        finished.append(JobMatchOutcome(
+                            index, job_name, job_description,
+                            error=f"Timed out after {self.task_timeout:.0f} seconds",
+                            elapsed_seconds=now - started_at[index]
+                        ))
+                        changed = True
+
+                if changed:
+                    yield rank_outcomes(finished)
+        finally:
+            cancel_event.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def match_all(self, resume_text: str, jobs: Dict[str, str]) -> List[JobMatchOutcome]:
+        """Score every job and return the final ranked outcomes"""
+        ranked: List[JobMatchOutcome] = []
+        for ranked in self.iter_ranked(resume_text, jobs):
+            pass
+        return ranked
+
+    def _next_wait(self, pending: Dict, started_at: Dict[int, float]) -> float:
+        """Time until the earliest running job hits its timeout"""
+        now = time.monotonic()
+        remaining = [
+            started_at[index] + self.task_timeout - now
+            for index, _, _ in pending.values() if index in started_at
+        ]
+        # Poll periodically so cancellation and newly started jobs are noticed
+        return max(0.0, min(remaining + [RATE_LIMIT_POLL_SECONDS]))
+
+    def _score(self, index: int, resume_text: str, job_name: str, job_description: str,
+               cancel_event: threading.Event, started_at: Dict[int, float]) -> JobMatchOutcome:
+        """Parse and score one job description; never raises"""
+        outcome = JobMatchOutcome(index, job_name, job_description)
+
+        # Waiting for a rate-limit token doesn't count against task_timeout
+        if cancel_event.is_set() or not self._acquire_token(cancel_event):
+            outcome.error = "Cancelled"
+            return outcome
+
+        started_at[index] = time.monotonic()
+
+        try:
+            jd_data = self.parse_jd_fn(job_description)
+            jd_dict = jd_data if isinstance(jd_data, dict) else jd_data.__dict__
+
+            if cancel_event.is_set():
+                outcome.error = "Cancelled"
+                return outcome
+
+            outcome.result = self.analyze_fn(resume_text, jd_dict)
+
+        except Exception as e:
+            logger.error(f"Job matching failed for {job_name}: {e}")
+            outcome.error = str(e)
+        finally:
+            outcome.elapsed_seconds = time.monotonic() - started_at[index]
+
+        return outcome
+
+    def _acquire_token(self, cancel_event: threading.Event) -> bool:
+        """Wait for a rate-limit token in short slices; False if cancelled first"""
+        if not self.rate_limiter:
+            return True
+
+        while not cancel_event.is_set():
+            if self.rate_limiter.acquire(timeout=RATE_LIMIT_POLL_SECONDS):
+                return True
+        return False
@@ -11,7 +11,8 @@ from dataclasses import dataclass
 import pandas as pd
 import streamlit as st
 from database.connection import get_db
-from auth.services import user_service, subscription_service, analytics_service
+from database.query_stats import get_query_stats
+from auth.services import user_service, subscription_service, analytics_service, get_cache_stats
 from auth.models import UserRole, PlanType, SubscriptionStatus
 
 logger = logging.getLogger(__name__)
@@ -300,6 +301,22 @@ class AdminDashboardService:
             'last_updated': datetime.utcnow().isoformat()
         }
     
+    def get_query_performance(self, limit: int = 10, by: str = 'total_ms') -> Dict[str, Any]:
+        """
+        Get the most expensive SQL statements run by this process
+        
+        Args:
+            limit: Number of statements to return
+            by: Statistic to rank by (total_ms, mean_ms, max_ms, calls, rows, errors)
+        """
+        query_stats = get_query_stats()
+        return {
+            'enabled': query_stats.enabled,
+            'summary': query_stats.get_summary(),
+            'top_statements': query_stats.top(limit, by),
+            'slow_queries': query_stats.slow_queries(limit=50)
+        }
+    
     def _get_revenue_metrics(self, since_date: datetime) -> Dict[str, Any]:
         """Get revenue-related metrics"""
         # Current MRR
@@ -766,6 +783,77 @@ def render_system_health_metrics(dashboard_service: AdminDashboardService):
     
     if support_data.get('note'):
         st.info(support_data['note'])
+    
+    render_query_performance(dashboard_service)
+    render_cache_performance()
+
+def render_cache_performance():
+    """Render hit ratios of the per-process user and subscription caches"""
+    st.subheader("🧠 User & Subscription Cache")
+    
+    cache_stats = get_cache_stats()
+    columns = st.columns(len(cache_stats))
+    for column, (name, stats) in zip(columns, cache_stats.items()):
+        with column:
+            if not stats['enabled']:
+                st.metric(name.title(), "Disabled")
+                continue
+            st.metric(f"{name.title()} Hit Ratio", f"{stats['hit_ratio']:.1%}")
+            st.caption(f"{stats['hits']:,} hits, {stats['misses']:,} misses, "
+                       f"{stats['entries']:,}/{stats['max_entries']:,} entries, "
+                       f"{stats['invalidations']:,} invalidations, {stats['ttl_seconds']:.0f}s TTL")
+
+def render_query_performance(dashboard_service: AdminDashboardService):
+    """Render the top SQL statements and the slow-query log"""
+    st.subheader("🗄️ Query Performance")
+    
+    limit = st.selectbox("Statements", [10, 25, 50], index=0, key="query_stats_limit")
+    query_data = dashboard_service.get_query_performance(limit)
+    if not query_data['enabled']:
+        st.info("Query statistics are disabled. Set DB_QUERY_STATS_ENABLED=true to collect them.")
+        return
+    
+    summary = query_data['summary']
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Queries", f"{summary['calls']:,}")
+    with col2:
+        st.metric("Distinct Statements", summary['statements'])
+    with col3:
+        st.metric("Avg Query Time", f"{summary['mean_ms']:.2f}ms")
+    with col4:
+        st.metric(f"Slow (≥{summary['slow_query_ms']:.0f}ms)", summary['slow_queries'])
+    
+    st.caption(f"Top statements by total time since {summary['since'][:19]}")
+    if query_data['top_statements']:
+        st.dataframe(pd.DataFrame([
+            {
+                'Statement': stats['statement'],
+                'Calls': stats['calls'],
+                'Total (ms)': stats['total_ms'],
+                'Mean (ms)': stats['mean_ms'],
+                'Max (ms)': stats['max_ms'],
+                'Rows': stats['rows'],
+                'Errors': stats['errors'],
+                'Top Call Site': stats['call_sites'][0]['call_site'] if stats['call_sites'] else ''
+            }
+            for stats in query_data['top_statements']
+        ]), use_container_width=True)
+    else:
+        st.write("No queries recorded yet.")
+    
+    if query_data['slow_queries']:
+        with st.expander(f"Slow Query Log ({len(query_data['slow_queries'])} most recent)"):
+            st.dataframe(pd.DataFrame(query_data['slow_queries']), use_container_width=True)
+    
+    query_stats = get_query_stats()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("Export JSON", query_stats.to_json(), file_name="query_stats.json",
+                           mime="application/json")
+    with col2:
+        st.download_button("Export Prometheus", query_stats.to_prometheus(), file_name="query_stats.prom",
+                           mime="text/plain")
 
 # Service instance
 admin_dashboard_service = AdminDashboardService()
\ No newline at end of file
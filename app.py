@@ -141,7 +141,8 @@ Provide analysis in this JSON format:
             "temperature": 0.2
         }
         
-        response = requests.post(
+        from resume_matcher_ai.http_client import get_http_client
+        response = get_http_client().post(
             "https://api.perplexity.ai/chat/completions",
             headers=headers,
             json=payload,
@@ -757,6 +758,10 @@ def save_analysis_with_history(user_id: str, resume_filename: str, resume_conten
             logger.error(f"Direct database save also failed: {e}")
             st.warning("⚠️ Analysis saved to session only (may not persist)")
     
+    # The history page keeps its loaded pages in session state; start it over to show this analysis
+    if analysis_id:
+        st.session_state.pop(f"history_{user_id}", None)
+    
     return analysis_id
 
 
@@ -978,41 +983,75 @@ def analyze_single_resume(resume_file, jd_text):
         if not resume_text:
             return None, "Could not extract text from PDF file"
         
-        # Perform AI analysis
-        analysis = analyze_resume_with_ai(resume_text, jd_text)
-        
-        # Convert to expected result format
-        result = type('AnalysisResult', (), {
-            'score': analysis['overall_match_score'],
-            'match_category': get_match_category(analysis['overall_match_score']),
-            'matching_skills': analysis.get('strengths', []),
-            'skill_gaps': {
-                'Critical': analysis.get('missing_skills', [])[:3],
-                'Important': analysis.get('missing_skills', [])[3:6] if len(analysis.get('missing_skills', [])) > 3 else []
-            },
-            'suggestions': analysis.get('recommendations', []),
-            'processing_time': 2.5,  # Approximate processing time
-            'analysis_type': analysis.get('analysis_type', 'ai_powered'),
-            'detailed_scores': {
-                'skills': analysis['skills_match_score'],
-                'experience': analysis['experience_match_score'],
-                'education': analysis['education_match_score'],
-                'keywords': analysis['keyword_match_score'],
-                'ats': analysis['ats_score']
-            },
-            'ai_insights': {
-                'strengths': analysis.get('strengths', []),
-                'weaknesses': analysis.get('weaknesses', []),
-                'key_insights': analysis.get('key_insights', [])
-            }
-        })()
-        
-        return result, None
+        return analyze_resume_text(resume_text, jd_text), None
         
     except Exception as e:
         logger.error(f"AI analysis error: {e}")
         return None, str(e)
 
+def analyze_resume_text(resume_text, jd_text):
+    """Analyze extracted resume text against job description using AI"""
+    # Perform AI analysis
+    analysis = analyze_resume_with_ai(resume_text, jd_text)
+    
+    # Convert to expected result format
+    return type('AnalysisResult', (), {
+        'score': analysis['overall_match_score'],
+        'match_category': get_match_category(analysis['overall_match_score']),
+        'matching_skills': analysis.get('strengths', []),
+        'skill_gaps': {
+            'Critical': analysis.get('missing_skills', [])[:3],
+            'Important': analysis.get('missing_skills', [])[3:6] if len(analysis.get('missing_skills', [])) > 3 else []
+        },
+        'suggestions': analysis.get('recommendations', []),
+        'processing_time': 2.5,  # Approximate processing time
+        'analysis_type': analysis.get('analysis_type', 'ai_powered'),
+        'detailed_scores': {
+            'skills': analysis['skills_match_score'],
+            'experience': analysis['experience_match_score'],
+            'education': analysis['education_match_score'],
+            'keywords': analysis['keyword_match_score'],
+            'ats': analysis['ats_score']
+        },
+        'ai_insights': {
+            'strengths': analysis.get('strengths', []),
+            'weaknesses': analysis.get('weaknesses', []),
+            'key_insights': analysis.get('key_insights', [])
+        }
+    })()
+
+def run_bulk_analysis(resume_files, jd_text, progress_bar, status_text):
+    """Analyze uploaded resumes concurrently, updating progress as each one finishes"""
+    from analysis.bulk_engine import BulkAnalysisEngine
+    from utils.rate_limiter import get_rate_limiter
+    from resume_matcher_ai.utils import key_fingerprint
+    from config import Config
+    
+    engine = BulkAnalysisEngine(
+        extract_fn=extract_text_from_pdf,
+        analyze_fn=analyze_resume_text,
+        max_workers=Config.BULK_MAX_CONCURRENCY,
+        rate_limiter=get_rate_limiter(
+            key_fingerprint(get_perplexity_api_key() or ''),
+            Config.PERPLEXITY_REQUESTS_PER_MINUTE
+        )
+    )
+    
+    def on_progress(completed, total, item):
+        status_text.text(f"Analyzed {item.name}... ({completed}/{total})")
+        if not item.success:
+            st.error(f"Failed to analyze {item.name}: {item.error}")
+        progress_bar.progress(completed / total)
+    
+    bulk_results = engine.run(
+        [(resume_file.name, resume_file) for resume_file in resume_files],
+        jd_text,
+        progress_callback=on_progress
+    )
+    
+    # Usage will be tracked once for the entire bulk analysis
+    return [(item.name, item.result) for item in bulk_results if item.success]
+
 def get_match_category(score):
     """Get match category based on score"""
     if score >= 80:
@@ -1309,21 +1348,12 @@ def render_simple_analysis_history(user):
     st.title("📊 Analysis History")
     
     try:
-        from database.connection import get_db
-        from database.production_connection import production_db
-        
-        db = get_db()
+        from database.repositories import AnalysisSessionRepository
         
         # Get user's analysis history
-        query = """
-        SELECT id, resume_filename, score, match_category, created_at
-        FROM analysis_sessions 
-        WHERE user_id = ? 
-        ORDER BY created_at DESC 
-        LIMIT 50
-        """
-        
-        analyses = db.execute_query(query, (user.id,))
+        analyses = AnalysisSessionRepository().list_for_user(
+            user.id, limit=50, columns=['id', 'resume_filename', 'score', 'match_category', 'created_at']
+        )
         
         if analyses:
             st.success(f"Found {len(analyses)} previous analyses")
@@ -1608,21 +1638,9 @@ def render_bulk_analysis_authenticated(user, subscription):
         if resume_files and jd_text.strip():
             progress_bar = st.progress(0)
             status_text = st.empty()
-            results = []
             start_time = time.time()
             
-            for i, resume_file in enumerate(resume_files):
-                status_text.text(f"Analyzing {resume_file.name}... ({i+1}/{len(resume_files)})")
-                
-                result, error = analyze_single_resume(resume_file, jd_text)
-                if result:
-                    results.append((resume_file.name, result))
-                    
-                    # Usage will be tracked once for the entire bulk analysis
-                else:
-                    st.error(f"Failed to analyze {resume_file.name}: {error}")
-                
-                progress_bar.progress((i + 1) / len(resume_files))
+            results = run_bulk_analysis(resume_files, jd_text, progress_bar, status_text)
             
             processing_time = time.time() - start_time
             status_text.text("✅ Bulk analysis completed!")
@@ -2186,21 +2204,9 @@ def render_bulk_analysis():
         if resume_files and jd_text.strip():
             progress_bar = st.progress(0)
             status_text = st.empty()
-            results = []
             start_time = time.time()
             
-            for i, resume_file in enumerate(resume_files):
-                status_text.text(f"Analyzing {resume_file.name}... ({i+1}/{len(resume_files)})")
-                
-                result, error = analyze_single_resume(resume_file, jd_text)
-                if result:
-                    results.append((resume_file.name, result))
-                    
-                    # Usage will be tracked once for the entire bulk analysis
-                else:
-                    st.error(f"Failed to analyze {resume_file.name}: {error}")
-                
-                progress_bar.progress((i + 1) / len(resume_files))
+            results = run_bulk_analysis(resume_files, jd_text, progress_bar, status_text)
             
             status_text.text("✅ Bulk analysis completed!")
             
@@ -3177,7 +3183,7 @@ def render_job_matching():
         
         # Analysis button
         if st.button("🎯 Find My Best Job Matches", type="primary", use_container_width=True):
-            with st.spinner(f"🔄 Analyzing your resume against {len(jobs_data)} job opportunities... This may take up to {len(jobs_data) * 5} seconds."):
+            with st.spinner(f"🔄 Analyzing your resume against {len(jobs_data)} job opportunities in parallel..."):
                 
                 # Process resume once
                 try:
@@ -3189,34 +3195,42 @@ def render_job_matching():
                     cleaned_resume = clean_resume_text(resume_text)
                     os.unlink(tmp_path)
                     
-                    # Analyze against each job
-                    job_results = []
+                    # Analyze against all jobs concurrently, sharing the cleaned resume
+                    from analysis.job_matching_engine import JobMatchingEngine
+                    from utils.rate_limiter import get_rate_limiter
+                    from resume_matcher_ai.utils import key_fingerprint
+                    from config import Config
+                    
+                    engine = JobMatchingEngine(
+                        parse_jd_fn=parse_jd_text,
+                        analyze_fn=analyze_match,
+                        max_workers=Config.JOB_MATCH_MAX_CONCURRENCY,
+                        task_timeout=Config.JOB_MATCH_TASK_TIMEOUT,
+                        rate_limiter=get_rate_limiter(
+                            key_fingerprint(get_perplexity_api_key() or ''),
+                            Config.PERPLEXITY_REQUESTS_PER_MINUTE
+                        )
+                    )
+                    
+                    ranked_outcomes = []
                     progress_bar = st.progress(0)
                     status_text = st.empty()
+                    leaderboard = st.empty()
                     
-                    for i, (job_name, job_desc) in enumerate(jobs_data.items()):
-                        status_text.text(f"Analyzing {job_name}... ({i+1}/{len(jobs_data)})")
-                        
-                        try:
-                            jd_data = parse_jd_text(job_desc)
-                            result = analyze_match(cleaned_resume, jd_data.__dict__)
-                            
-                            job_results.append({
-                                'job_name': job_name,
-                                'job_description': job_desc,
-                                'result': result,
-                                'success': True
-                            })
-                        except Exception as e:
-                            logger.error(f"Unexpected error: {e}")
-                            job_results.append({
-                                'job_name': job_name,
-                                'job_description': job_desc,
-                                'error': str(e),
-                                'success': False
-                            })
-                        
-                        progress_bar.progress((i + 1) / len(jobs_data))
+                    for ranked_outcomes in engine.iter_ranked(cleaned_resume, jobs_data):
+                        status_text.text(f"Analyzed {len(ranked_outcomes)}/{len(jobs_data)} jobs...")
+                        progress_bar.progress(len(ranked_outcomes) / len(jobs_data))
+                        leaderboard.dataframe(pd.DataFrame([
+                            {
+                                'Rank': rank,
+                                'Job': outcome.job_name,
+                                'Score': f"{outcome.result.score}%" if outcome.success else f"❌ {outcome.error[:60]}"
+                            }
+                            for rank, outcome in enumerate(ranked_outcomes, 1)
+                        ]), use_container_width=True, hide_index=True)
+                    
+                    leaderboard.empty()
+                    job_results = [outcome.to_dict() for outcome in ranked_outcomes]
                     
                     status_text.text("✅ Analysis completed!")
                     
@@ -3801,24 +3815,12 @@ def render_simple_working_history(user):
     st.title("📊 Analysis History")
     
     try:
-        import sqlite3
-        
-        # Direct database connection
-        conn = sqlite3.connect('data/app.db')
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Simple query
-        cursor.execute("""
-            SELECT id, resume_filename, score, match_category, created_at, analysis_result
-            FROM analysis_sessions 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC 
-            LIMIT 20
-        """, (user.id,))
-        
-        sessions = cursor.fetchall()
-        conn.close()
+        from database.repositories import AnalysisSessionRepository
+        
+        sessions = AnalysisSessionRepository().list_for_user(
+            user.id, limit=20,
+            columns=['id', 'resume_filename', 'score', 'match_category', 'created_at', 'analysis_result']
+        )
         
         if not sessions:
             st.info("📝 No analysis history found. Run your first analysis to see results here!")
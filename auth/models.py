@@ -10,9 +10,10 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass, asdict
 from enum import Enum
-import bcrypt
 import logging
 
+from auth.password_hashing import get_password_hasher
+
 logger = logging.getLogger(__name__)
 
 def parse_datetime(dt_value: Union[str, datetime, None]) -> Optional[datetime]:
@@ -99,16 +100,16 @@ class User:
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+        """Hash password using bcrypt (on the password hashing pool)"""
+        return get_password_hasher().hash(password)
     
     def verify_password(self, password: str) -> bool:
-        """Verify password against hash"""
-        return bcrypt.checkpw(
-            password.encode('utf-8'), 
-            self.password_hash.encode('utf-8')
-        )
+        """Verify password against hash (on the password hashing pool)"""
+        return get_password_hasher().verify(password, self.password_hash)
+    
+    def password_needs_rehash(self) -> bool:
+        """Whether the password hash uses a different bcrypt cost than configured"""
+        return get_password_hasher().needs_rehash(self.password_hash)
     
     def generate_password_reset_token(self) -> str:
         """Generate password reset token"""
@@ -191,8 +192,9 @@ class SubscriptionPlan:
         return self.monthly_analysis_limit == -1
     
     def has_feature(self, feature_name: str) -> bool:
-        """Check if plan includes a specific feature"""
-        return self.features.get(feature_name, False)
+        """Check if plan includes a specific feature (the tier's flags, not the stored display list)"""
+        from auth.plan_catalog import PlanCatalog
+        return PlanCatalog.has_feature(self.plan_type, feature_name)
 
 @dataclass
 class Subscription:
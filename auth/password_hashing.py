@@ -0,0 +1,128 @@
+"""
+Password Hashing
+bcrypt on a small bounded worker pool, so a burst of logins can't take every CPU from page rendering
+"""
+
+import os
+import re
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+_COST = re.compile(r'^\$2[abxy]?\$(\d\d)\$')
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing queue is full; the caller should ask the user to retry"""
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a dedicated thread pool
+
+    bcrypt releases the GIL while it works, so the pool's threads use real
+    CPU cores; capping them at max_workers leaves the remaining cores to the
+    Streamlit script threads. At most max_queue further requests wait for a
+    worker, and any beyond that are rejected at once with PasswordHasherBusy
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, rounds: Optional[int] = None, max_workers: Optional[int] = None,
+                 max_queue: Optional[int] = None):
+        """
+        Args:
+            rounds: bcrypt cost factor for new hashes (BCRYPT_ROUNDS)
+            max_workers: Hashes computed at once (PASSWORD_HASH_WORKERS)
+            max_queue: Requests allowed to wait for a worker (PASSWORD_HASH_MAX_QUEUE)
+        """
+        if rounds is None:
+            rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+        if max_workers is None:
+            max_workers = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(2, os.cpu_count() or 1))))
+        if max_queue is None:
+            max_queue = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', '32'))
+        if not 4 <= rounds <= 31:
+            raise ValueError(f"bcrypt rounds must be between 4 and 31, got {rounds}")
+
+        self.rounds = rounds
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='bcrypt')
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {'hashed': 0, 'verified': 0, 'rejected': 0}
+
+    def _run(self, kind: str, fn, *args) -> Any:
+        """Run fn on the pool and wait for its result"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise PasswordHasherBusy("Too many password checks in progress")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._stats[kind] += 1
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured cost
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+        """
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run('hashed', bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """
+        Check a password against a bcrypt hash of any cost
+
+        Raises:
+            PasswordHasherBusy: If the queue is full
+            ValueError: If password_hash isn't a bcrypt hash
+        """
+        return self._run('verified', bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether a hash was made with a different cost than the configured one"""
+        match = _COST.match(password_hash or '')
+        return match is not None and int(match.group(1)) != self.rounds
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counts of completed and rejected operations, and the current load"""
+        with self._lock:
+            return {
+                **self._stats,
+                'in_flight': self._in_flight,
+                'rounds': self.rounds,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads once queued work is done"""
+        self._executor.shutdown(wait=True)
+
+_password_hasher: Optional[PasswordHasher] = None
+_password_hasher_lock = threading.Lock()
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the process-wide password hasher, configured from the environment"""
+    global _password_hasher
+    if _password_hasher is None:
+        with _password_hasher_lock:
+            if _password_hasher is None:
+                _password_hasher = PasswordHasher()
+                logger.info(f"Password hashing: bcrypt cost {_password_hasher.rounds}, "
+                            f"{_password_hasher.max_workers} workers")
+    return _password_hasher
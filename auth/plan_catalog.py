@@ -0,0 +1,380 @@
+"""
+Subscription Plan Catalog
+Plans loaded once per process into an immutable index by ID and plan type, with O(1) feature checks
+"""
+
+import os
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+from auth.models import PlanType, SubscriptionPlan, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Features, limits and marketing copy of each tier. Prices and names shown
+# at checkout come from the subscription_plans table.
+TIER_DEFINITIONS: Dict[PlanType, Dict[str, Any]] = {
+    PlanType.FREE: {
+        'name': 'Free Tier',
+        'price_monthly': 0.00,
+        'price_annual': 0.00,
+        'monthly_analysis_limit': 3,
+        'features': {
+            # Core features
+            'basic_analysis': True,
+            'pdf_download': True,
+            'basic_reports': True,
+            'community_support': True,
+
+            # Limitations
+            'watermarked_pdfs': True,
+            'limited_file_size': True,  # 5MB limit
+            'basic_ai_model': True,
+
+            # Disabled features
+            'unlimited_analyses': False,
+            'premium_ai': False,
+            'all_formats': False,
+            'priority_processing': False,
+            'email_support': False,
+            'phone_support': False,
+            'team_collaboration': False,
+            'bulk_upload': False,
+            'analytics_dashboard': False,
+            'api_access': False,
+            'custom_branding': False,
+            'sso': False,
+            'dedicated_support': False
+        },
+        'description': 'Perfect for trying out our AI-powered resume analysis',
+        'target_audience': 'Individual job seekers exploring the platform',
+        'upgrade_prompts': [
+            'Unlock unlimited analyses with Professional plan',
+            'Get premium AI insights and priority processing',
+            'Remove watermarks and access all export formats'
+        ]
+    },
+
+    PlanType.PROFESSIONAL: {
+        'name': 'Professional',
+        'price_monthly': 19.00,
+        'price_annual': 190.00,  # 2 months free
+        'monthly_analysis_limit': -1,  # Unlimited
+        'features': {
+            # All free features
+            'basic_analysis': True,
+            'pdf_download': True,
+            'basic_reports': True,
+
+            # Professional features
+            'unlimited_analyses': True,
+            'premium_ai': True,
+            'all_formats': True,  # CSV, PDF, Word, JSON
+            'priority_processing': True,
+            'email_support': True,
+            'resume_templates': True,
+            'advanced_insights': True,
+            'skill_recommendations': True,
+            'industry_benchmarking': True,
+
+            # No watermarks
+            'watermarked_pdfs': False,
+            'limited_file_size': False,  # 50MB limit
+            'basic_ai_model': False,
+
+            # Still disabled
+            'team_collaboration': False,
+            'bulk_upload': False,
+            'analytics_dashboard': False,
+            'api_access': False,
+            'custom_branding': False,
+            'sso': False,
+            'dedicated_support': False
+        },
+        'description': 'Ideal for serious job seekers and career professionals',
+        'target_audience': 'Individual professionals, career changers, consultants',
+        'upgrade_prompts': [
+            'Add team collaboration with Business plan',
+            'Get bulk processing and analytics dashboard',
+            'Access API for custom integrations'
+        ]
+    },
+
+    PlanType.BUSINESS: {
+        'name': 'Business',
+        'price_monthly': 99.00,
+        'price_annual': 990.00,  # 2 months free
+        'monthly_analysis_limit': -1,  # Unlimited
+        'seat_limit': 5,
+        'features': {
+            # All professional features
+            'basic_analysis': True,
+            'pdf_download': True,
+            'basic_reports': True,
+            'unlimited_analyses': True,
+            'premium_ai': True,
+            'all_formats': True,
+            'priority_processing': True,
+            'email_support': True,
+            'resume_templates': True,
+            'advanced_insights': True,
+            'skill_recommendations': True,
+            'industry_benchmarking': True,
+
+            # Business features
+            'team_collaboration': True,
+            'bulk_upload': True,
+            'analytics_dashboard': True,
+            'api_access': True,  # 1000 calls/month
+            'integration_support': True,
+            'phone_support': True,
+            'custom_branding': True,
+            'team_management': True,
+            'usage_analytics': True,
+            'export_analytics': True,
+
+            # Still disabled
+            'sso': False,
+            'dedicated_support': False,
+            'unlimited_seats': False,
+            'white_label': False,
+            'on_premise': False
+        },
+        'description': 'Perfect for growing companies and HR teams',
+        'target_audience': 'SMEs, startups, HR departments, recruiting agencies',
+        'upgrade_prompts': [
+            'Get enterprise security with SSO integration',
+            'Add unlimited seats and dedicated support',
+            'Enable white-label and on-premise options'
+        ]
+    },
+
+    PlanType.ENTERPRISE: {
+        'name': 'Enterprise',
+        'price_monthly': 500.00,
+        'price_annual': 5000.00,  # 2 months free
+        'monthly_analysis_limit': -1,  # Unlimited
+        'seat_limit': -1,  # Unlimited
+        'features': {
+            # All business features
+            'basic_analysis': True,
+            'pdf_download': True,
+            'basic_reports': True,
+            'unlimited_analyses': True,
+            'premium_ai': True,
+            'all_formats': True,
+            'priority_processing': True,
+            'email_support': True,
+            'resume_templates': True,
+            'advanced_insights': True,
+            'skill_recommendations': True,
+            'industry_benchmarking': True,
+            'team_collaboration': True,
+            'bulk_upload': True,
+            'analytics_dashboard': True,
+            'api_access': True,  # Unlimited
+            'integration_support': True,
+            'phone_support': True,
+            'custom_branding': True,
+            'team_management': True,
+            'usage_analytics': True,
+            'export_analytics': True,
+
+            # Enterprise features
+            'unlimited_seats': True,
+            'sso': True,
+            'custom_integrations': True,
+            'dedicated_support': True,
+            'sla_guarantee': True,
+            'on_premise': True,
+            'white_label': True,
+            'custom_features': True,
+            'priority_support': True,
+            'custom_ai_models': True,
+            'advanced_security': True,
+            'audit_logs': True,
+            'compliance_reports': True
+        },
+        'description': 'Complete solution for large organizations',
+        'target_audience': 'Large enterprises, Fortune 500, government agencies',
+        'upgrade_prompts': []  # No upgrades from enterprise
+    }
+}
+
+# Enabled feature flags per tier, for set lookups
+TIER_FEATURES: Mapping[PlanType, FrozenSet[str]] = MappingProxyType({
+    plan_type: frozenset(name for name, enabled in definition['features'].items() if enabled)
+    for plan_type, definition in TIER_DEFINITIONS.items()
+})
+
+def plan_from_row(row: Dict[str, Any]) -> SubscriptionPlan:
+    """Convert a subscription_plans row to a SubscriptionPlan"""
+    # Handle JSON features field
+    features = row.get('features', '[]')
+    if isinstance(features, str):
+        try:
+            features = json.loads(features)
+        except (json.JSONDecodeError, TypeError):
+            features = []
+    elif not isinstance(features, (dict, list)):
+        features = []
+    
+    # Convert features list to dict format expected by model
+    if isinstance(features, list):
+        features = {f"feature_{i}": feature for i, feature in enumerate(features)}
+    
+    # Set monthly analysis limits based on plan type
+    plan_type = row['plan_type']
+    if plan_type == 'free':
+        monthly_limit = 3
+    elif plan_type in ['professional', 'business', 'enterprise']:
+        monthly_limit = -1  # Unlimited
+    else:
+        monthly_limit = row.get('monthly_analysis_limit', 3)
+    
+    return SubscriptionPlan(
+        id=row['id'],
+        name=row['name'],
+        plan_type=PlanType(row['plan_type']),
+        price_monthly=float(row['price_monthly']),
+        price_annual=float(row['price_annual']),
+        monthly_analysis_limit=monthly_limit,
+        features=features,
+        is_active=row.get('is_active', True),
+        created_at=parse_datetime(row.get('created_at'))
+    )
+
+def _copy_plan(plan: Optional[SubscriptionPlan]) -> Optional[SubscriptionPlan]:
+    """A copy of a catalog plan that the caller is free to change"""
+    if plan is None:
+        return None
+    plan = copy.copy(plan)
+    plan.features = dict(plan.features)
+    return plan
+
+class PlanCatalog:
+    """
+    Immutable snapshot of the subscription plans
+    
+    Lookups by ID and plan type are dict lookups and feature checks are set
+    lookups; callers get their own copy of a plan, so the snapshot itself
+    never changes. A changed plan table produces a new catalog instead.
+    """
+    
+    def __init__(self, plans: Iterable[SubscriptionPlan], version: str = ''):
+        """
+        Args:
+            plans: Every plan, active or not, in display order
+            version: Fingerprint of the rows the plans were built from
+        """
+        self.version = version
+        self.loaded_at = time.time()
+        self._plans = tuple(plans)
+        active = [plan for plan in self._plans if plan.is_active]
+        self._by_id = MappingProxyType({plan.id: plan for plan in active})
+        by_type = {}
+        for plan in active:
+            by_type.setdefault(plan.plan_type, plan)  # The cheapest plan of a type wins, as the old query's did
+        self._by_type = MappingProxyType(by_type)
+    
+    def __len__(self) -> int:
+        return len(self._plans)
+    
+    def get_by_id(self, plan_id: str) -> Optional[SubscriptionPlan]:
+        """Active plan by ID"""
+        return _copy_plan(self._by_id.get(plan_id))
+    
+    def get_by_type(self, plan_type: PlanType) -> Optional[SubscriptionPlan]:
+        """Active plan of a type"""
+        return _copy_plan(self._by_type.get(plan_type))
+    
+    def all_plans(self) -> List[SubscriptionPlan]:
+        """Every plan, active or not, cheapest first"""
+        return [_copy_plan(plan) for plan in self._plans]
+    
+    @staticmethod
+    def features(plan_type: PlanType) -> FrozenSet[str]:
+        """Feature flags enabled on a tier"""
+        return TIER_FEATURES.get(plan_type, frozenset())
+    
+    @staticmethod
+    def has_feature(plan_type: PlanType, feature_name: str) -> bool:
+        """Whether a tier includes a feature"""
+        return feature_name in TIER_FEATURES.get(plan_type, ())
+
+def load_plan_catalog(db) -> PlanCatalog:
+    """
+    Build a catalog from the subscription_plans table
+    
+    Raises:
+        Exception: If the table can't be read
+    """
+    rows = db.execute_query("SELECT * FROM subscription_plans ORDER BY price_monthly, id")
+    fingerprint = json.dumps([sorted(dict(row).items()) for row in rows], default=str)
+    version = hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:12]
+    return PlanCatalog([plan_from_row(row) for row in rows], version)
+
+_catalogs: Dict[tuple, PlanCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def _catalog_key(db) -> tuple:
+    return (db.config.database_url, db.config.sqlite_path)
+
+def get_plan_catalog(db=None) -> PlanCatalog:
+    """
+    The plan catalog of a database (the global one by default)
+    
+    Loaded on first use, then re-read every PLAN_CATALOG_REFRESH seconds so
+    plan edits made elsewhere show up; a new catalog is only built when the
+    rows' fingerprint (its version) changed. Code that edits plans calls
+    reload_plan_catalog() to apply the edit at once. If the table can't be
+    read the previous catalog is kept, or an empty one is returned and
+    loading is retried on the next call.
+    """
+    if db is None:
+        from database.connection import get_db
+        db = get_db()
+    key = _catalog_key(db)
+    catalog = _catalogs.get(key)
+    refresh = float(os.getenv('PLAN_CATALOG_REFRESH', '300'))
+    if catalog is not None and (refresh <= 0 or time.time() - catalog.loaded_at < refresh):
+        return catalog
+    
+    with _catalogs_lock:
+        current = _catalogs.get(key)
+        if current is not catalog:
+            return current  # Another thread reloaded it meanwhile
+        return _reload(db, key, catalog)
+
+def reload_plan_catalog(db=None) -> PlanCatalog:
+    """Rebuild a database's plan catalog now, e.g. after editing a plan"""
+    if db is None:
+        from database.connection import get_db
+        db = get_db()
+    key = _catalog_key(db)
+    with _catalogs_lock:
+        return _reload(db, key, _catalogs.get(key))
+
+def _reload(db, key: tuple, previous: Optional[PlanCatalog]) -> PlanCatalog:
+    try:
+        catalog = load_plan_catalog(db)
+    except Exception as e:
+        logger.warning(f"Could not load subscription plans: {e}")
+        if previous is None:
+            return PlanCatalog([])
+        previous.loaded_at = time.time()  # Keep serving it; try again after the next interval
+        return previous
+    
+    if previous is not None and previous.version == catalog.version:
+        previous.loaded_at = catalog.loaded_at
+        return previous
+    if previous is not None:
+        logger.info(f"Subscription plans changed, catalog reloaded (version {previous.version} -> {catalog.version})")
+    _catalogs[key] = catalog
+    return catalog
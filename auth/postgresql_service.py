@@ -7,7 +7,9 @@ import os
 import logging
 from typing import Optional
 from datetime import datetime
-import bcrypt
+
+from auth.password_hashing import PasswordHasherBusy, get_password_hasher
+from auth.services import invalidate_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -66,17 +68,38 @@ class PostgreSQLAuthService:
         
         try:
             # Verify password
-            if bcrypt.checkpw(password.encode('utf-8'), user['password_hash'].encode('utf-8')):
+            hasher = get_password_hasher()
+            if hasher.verify(password, user['password_hash']):
                 logger.info(f"User authenticated successfully: {email}")
+                if hasher.needs_rehash(user['password_hash']):
+                    self._rehash_password(user, password)
                 return user
             else:
                 logger.info(f"Invalid password for user: {email}")
                 return None
                 
+        except PasswordHasherBusy:
+            raise
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return None
     
+    def _rehash_password(self, user: dict, password: str):
+        """Re-hash a verified password with the configured bcrypt cost"""
+        try:
+            new_hash = get_password_hasher().hash(password)
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                # Skipped if the password was changed since it was read
+                cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s AND password_hash = %s",
+                               (new_hash, user['id'], user['password_hash']))
+                conn.commit()
+            invalidate_user_cache(user['id'])
+            user['password_hash'] = new_hash
+        except Exception as e:
+            # The old hash still works; try again on the next login
+            logger.warning(f"Failed to rehash password for user {user['id']}: {e}")
+    
     def create_user(self, email: str, password: str, first_name: str = "", last_name: str = "", 
                    company_name: str = "", role=None, phone: str = "", country: str = ""):
         """Create new user with PostgreSQL"""
@@ -97,7 +120,7 @@ class PostgreSQLAuthService:
                 # Create user
                 import uuid
                 user_id = str(uuid.uuid4())
-                password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                password_hash = get_password_hasher().hash(password)
                 
                 # Handle role parameter
                 role_str = 'individual'
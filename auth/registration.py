@@ -12,6 +12,7 @@ import logging
 from auth.postgresql_service import postgresql_auth_service
 from auth.services import user_service, subscription_service, session_service
 from auth.models import UserRole, PlanType
+from auth.password_hashing import PasswordHasherBusy
 
 logger = logging.getLogger(__name__)
 
@@ -891,7 +892,11 @@ def render_login_form():
         if login_submitted:
             if email and password:
                 with st.spinner("Signing you in..."):
-                    user = auth_service.authenticate_user(email, password)
+                    try:
+                        user = auth_service.authenticate_user(email, password)
+                    except PasswordHasherBusy:
+                        st.warning("Lots of people are signing in right now. Please try again in a few seconds.")
+                        return
                     
                     # Verify authentication was successful
                     if user:
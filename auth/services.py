@@ -3,8 +3,13 @@ User authentication services for Resume + JD Analyzer
 Handles database operations for users, subscriptions, and teams
 """
 
+import os
+import copy
+import time
 import logging
+import threading
 import uuid
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 from database.connection import get_db, DatabaseManager
@@ -12,9 +17,139 @@ from auth.models import (
     User, UserRole, Subscription, SubscriptionPlan, SubscriptionStatus, 
     PlanType, Team, TeamMember, UserSession, AnalysisSession
 )
+from auth.plan_catalog import get_plan_catalog, plan_from_row
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe per-process cache that drops entries after ttl_seconds and
+    evicts the least recently used entry beyond max_entries
+    
+    Values are copied in and out, so callers can't change a cached object by
+    mutating what they got. Writes in this process invalidate entries at
+    once; writes by other processes (e.g. a webhook worker) show up once the
+    entry expires.
+    """
+    
+    def __init__(self, name: str, ttl_seconds: float = 60, max_entries: int = 10000, enabled: bool = True):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self.enabled = enabled and ttl_seconds > 0
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+    
+    def get(self, key: Any, default: Any = _MISSING) -> Any:
+        """Cached value for key, or default if it is missing or expired"""
+        if not self.enabled:
+            return default
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+    
+    def generation(self) -> int:
+        """Token to pass to set(); take it before reading the value from the database"""
+        with self._lock:
+            return self._generation
+    
+    def set(self, key: Any, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Cache a value
+        
+        Args:
+            key: Cache key
+            value: Value to cache (None caches the absence of a row)
+            generation: generation() from before the value was read; the value
+                isn't cached if anything was invalidated since, as it may be stale
+        """
+        if not self.enabled:
+            return
+        value = copy.deepcopy(value)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def invalidate(self, key: Any) -> None:
+        """Drop the entry for key"""
+        with self._lock:
+            self._generation += 1
+            self._invalidations += 1
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Drop every entry"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the current entry count"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'enabled': self.enabled,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'entries': len(self._entries),
+                'ttl_seconds': self.ttl_seconds,
+                'max_entries': self.max_entries
+            }
+
+def _make_cache(name: str) -> TTLCache:
+    return TTLCache(
+        name,
+        ttl_seconds=float(os.getenv('AUTH_CACHE_TTL', '60')),
+        max_entries=int(os.getenv('AUTH_CACHE_MAX_ENTRIES', '10000')),
+        enabled=os.getenv('AUTH_CACHE_ENABLED', 'true').lower() == 'true'
+    )
+
+# Shared by every service instance; keys include the database so services
+# on different databases (e.g. in tests) don't see each other's entries
+user_cache = _make_cache('users')
+subscription_cache = _make_cache('subscriptions')
+
+def _cache_key(db: DatabaseManager, user_id: str) -> tuple:
+    return (db.config.database_url, db.config.sqlite_path, user_id)
+
+def invalidate_user_cache(user_id: str, db: Optional[DatabaseManager] = None) -> None:
+    """
+    Drop the cached User and Subscription of a user
+    
+    Call this after changing either table outside UserService and
+    SubscriptionService, which invalidate their own writes.
+    """
+    db = db or get_db()
+    user_cache.invalidate(_cache_key(db, user_id))
+    subscription_cache.invalidate(_cache_key(db, user_id))
+
+def get_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Hit ratios and sizes of the user and subscription caches"""
+    return {cache.name: cache.get_stats() for cache in (user_cache, subscription_cache)}
+
 class UserService:
     """Service for user management operations"""
     
@@ -50,6 +185,7 @@ class UserService:
             )
             
             self.db.execute_command(query, params)
+            invalidate_user_cache(user.id, self.db)
             
             # Create default free subscription
             self._create_default_subscription(user.id)
@@ -62,13 +198,19 @@ class UserService:
             return None
     
     def get_user_by_id(self, user_id: str) -> Optional[User]:
-        """Get user by ID"""
+        """Get user by ID (cached, see TTLCache)"""
+        key = _cache_key(self.db, user_id)
+        cached = user_cache.get(key)
+        if cached is not _MISSING:
+            return cached
+        
+        generation = user_cache.generation()
         query = "SELECT * FROM users WHERE id = ? AND is_active = TRUE"
         result = self.db.get_single_result(query, (user_id,))
         
-        if result:
-            return self._row_to_user(result)
-        return None
+        user = self._row_to_user(result) if result else None
+        user_cache.set(key, user, generation)
+        return user
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
@@ -85,6 +227,9 @@ class UserService:
         user = self.get_user_by_email(email)
         
         if user and user.verify_password(password):
+            if user.password_needs_rehash():
+                self._rehash_password(user, password)
+            
             # Update login statistics
             user.update_login()
             self.update_user(user)
@@ -92,6 +237,19 @@ class UserService:
         
         return None
     
+    def _rehash_password(self, user: User, password: str) -> None:
+        """Re-hash a verified password with the configured bcrypt cost"""
+        try:
+            new_hash = User.hash_password(password)
+            # Skipped if the password was changed since it was read
+            query = "UPDATE users SET password_hash = ? WHERE id = ? AND password_hash = ?"
+            if self.db.execute_command(query, (new_hash, user.id, user.password_hash)):
+                user.password_hash = new_hash
+                user_cache.invalidate(_cache_key(self.db, user.id))
+        except Exception as e:
+            # The old hash still works; try again on the next login
+            logger.warning(f"Failed to rehash password for user {user.id}: {e}")
+    
     def update_user(self, user: User) -> bool:
         """Update user information"""
         try:
@@ -114,6 +272,7 @@ class UserService:
             )
             
             rows_affected = self.db.execute_command(query, params)
+            user_cache.invalidate(_cache_key(self.db, user.id))
             return rows_affected > 0
             
         except Exception as e:
@@ -159,6 +318,7 @@ class UserService:
         """Deactivate user account"""
         query = "UPDATE users SET is_active = FALSE, updated_at = ? WHERE id = ?"
         rows_affected = self.db.execute_command(query, (datetime.utcnow(), user_id))
+        user_cache.invalidate(_cache_key(self.db, user_id))
         return rows_affected > 0
     
     def _create_default_subscription(self, user_id: str):
@@ -203,21 +363,12 @@ class SubscriptionService:
         self.db = db or get_db()
     
     def get_plan_by_type(self, plan_type: PlanType) -> Optional[SubscriptionPlan]:
-        """Get subscription plan by type"""
-        query = "SELECT * FROM subscription_plans WHERE plan_type = ? AND is_active = TRUE"
-        result = self.db.get_single_result(query, (plan_type.value,))
-        
-        if result:
-            return self._row_to_plan(result)
-        return None
+        """Get active subscription plan by type (from the plan catalog)"""
+        return get_plan_catalog(self.db).get_by_type(plan_type)
     
     def get_all_plans(self) -> List[SubscriptionPlan]:
-        """Get all active subscription plans"""
-        # Use simple query without is_active dependency
-        query = "SELECT * FROM subscription_plans ORDER BY price_monthly"
-        results = self.db.execute_query(query)
-        
-        return [self._row_to_plan(row) for row in results]
+        """Get all subscription plans, cheapest first (from the plan catalog)"""
+        return get_plan_catalog(self.db).all_plans()
     
     def create_subscription(self, user_id: str, plan_id: str, 
                           stripe_customer_id: str = None) -> Optional[Subscription]:
@@ -250,6 +401,7 @@ class SubscriptionService:
             )
             
             self.db.execute_command(query, params)
+            subscription_cache.invalidate(_cache_key(self.db, user_id))
             return subscription
             
         except Exception as e:
@@ -257,7 +409,18 @@ class SubscriptionService:
             return None
     
     def get_user_subscription(self, user_id: str) -> Optional[Subscription]:
-        """Get active subscription for user"""
+        """Get active subscription for user (cached, see TTLCache)"""
+        key = _cache_key(self.db, user_id)
+        cached = subscription_cache.get(key)
+        if cached is not _MISSING:
+            return cached
+        
+        generation = subscription_cache.generation()
+        subscription = self._load_user_subscription(user_id)
+        subscription_cache.set(key, subscription, generation)
+        return subscription
+    
+    def _load_user_subscription(self, user_id: str) -> Optional[Subscription]:
         query = """
             SELECT s.*, sp.id as plan_id_full, sp.name, sp.plan_type, sp.price_monthly, sp.price_annual,
                    sp.monthly_analysis_limit, sp.features, sp.is_active, sp.created_at as plan_created_at
@@ -284,7 +447,9 @@ class SubscriptionService:
                 'is_active': result['is_active'],
                 'created_at': result['plan_created_at']
             }
-            subscription.plan = self._row_to_plan(plan_data)
+            # Inactive plans aren't in the catalog, so parse those from the row
+            subscription.plan = (get_plan_catalog(self.db).get_by_id(result['plan_id_full'])
+                                 or self._row_to_plan(plan_data))
             return subscription
         
         return None
@@ -310,6 +475,7 @@ class SubscriptionService:
             )
             
             rows_affected = self.db.execute_command(query, params)
+            subscription_cache.invalidate(_cache_key(self.db, subscription.user_id))
             return rows_affected > 0
             
         except Exception as e:
@@ -328,6 +494,7 @@ class SubscriptionService:
             
             params = (datetime.utcnow(), user_id)
             rows_affected = self.db.execute_command(query, params)
+            subscription_cache.invalidate(_cache_key(self.db, user_id))
             
             if rows_affected > 0:
                 logger.info(f"✅ Incremented usage for user {user_id}")
@@ -413,59 +580,20 @@ class SubscriptionService:
                 'is_active': result['is_active'],
                 'created_at': result['plan_created_at']
             }
-            subscription.plan = self._row_to_plan(plan_data)
+            # Inactive plans aren't in the catalog, so parse those from the row
+            subscription.plan = (get_plan_catalog(self.db).get_by_id(result['plan_id_full'])
+                                 or self._row_to_plan(plan_data))
             return subscription
         
         return None
     
     def get_plan_by_id(self, plan_id: str) -> Optional[SubscriptionPlan]:
-        """Get subscription plan by ID"""
-        query = "SELECT * FROM subscription_plans WHERE id = ? AND is_active = TRUE"
-        result = self.db.get_single_result(query, (plan_id,))
-        
-        if result:
-            return self._row_to_plan(result)
-        return None
+        """Get active subscription plan by ID (from the plan catalog)"""
+        return get_plan_catalog(self.db).get_by_id(plan_id)
     
     def _row_to_plan(self, row: Dict[str, Any]) -> SubscriptionPlan:
         """Convert database row to SubscriptionPlan object"""
-        import json
-        from auth.models import parse_datetime
-        
-        # Handle JSON features field
-        features = row.get('features', '[]')
-        if isinstance(features, str):
-            try:
-                features = json.loads(features)
-            except (json.JSONDecodeError, TypeError):
-                features = []
-        elif not isinstance(features, (dict, list)):
-            features = []
-        
-        # Convert features list to dict format expected by model
-        if isinstance(features, list):
-            features = {f"feature_{i}": feature for i, feature in enumerate(features)}
-        
-        # Set monthly analysis limits based on plan type
-        plan_type = row['plan_type']
-        if plan_type == 'free':
-            monthly_limit = 3
-        elif plan_type in ['professional', 'business', 'enterprise']:
-            monthly_limit = -1  # Unlimited
-        else:
-            monthly_limit = row.get('monthly_analysis_limit', 3)
-        
-        return SubscriptionPlan(
-            id=row['id'],
-            name=row['name'],
-            plan_type=PlanType(row['plan_type']),
-            price_monthly=float(row['price_monthly']),
-            price_annual=float(row['price_annual']),
-            monthly_analysis_limit=monthly_limit,
-            features=features,
-            is_active=row.get('is_active', True),
-            created_at=parse_datetime(row.get('created_at'))
-        )
+        return plan_from_row(row)
     
     def _row_to_subscription(self, row: Dict[str, Any]) -> Subscription:
         """Convert database row to Subscription object"""
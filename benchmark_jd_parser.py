@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for job description parsing on large inputs
+
+Usage:
+    python benchmark_jd_parser.py                     # time the current parser
+    python benchmark_jd_parser.py --baseline <rev>    # compare against jd_parser.py at a git revision
+
+Outputs must match the baseline's, except for revisions from before the skill
+taxonomy (skill_taxonomy.json), whose keyword checks categorized skills
+differently; against those only timings are compared.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from resume_matcher_ai import jd_parser
+
+TECHNOLOGIES = [
+    'Python', 'Java', 'React', 'Docker', 'Kubernetes', 'AWS', 'PostgreSQL', 'Redis',
+    'GraphQL', 'Terraform', 'Kafka', 'Spark', 'TypeScript', 'Go', 'Rust'
+]
+SOFT_SKILLS = ['communication', 'leadership', 'teamwork', 'problem-solving', 'mentoring']
+
+def build_job_description(target_length: int, seed: int = 1) -> str:
+    """Build a realistic, section-heavy job description of about target_length characters"""
+    rng = random.Random(seed)
+    parts = ["Senior Platform Engineer - Infrastructure\n"
+             "We are seeking a Senior Platform Engineer to join our team.\n"]
+    length = len(parts[0])
+    i = 0
+
+    while length < target_length:
+        tech = rng.sample(TECHNOLOGIES, 4)
+        block = (
+            f"Requirements:\n"
+            f"- {rng.randint(2, 9)}+ years of experience with {tech[0]} and {tech[1]} in production systems\n"
+            f"- Strong {SOFT_SKILLS[i % 5]} skills and ability to work with {tech[2]}\n"
+            f"Key Responsibilities:\n"
+            f"- Design, build and operate services using {tech[3]} and {tech[0]} for team {i}\n"
+            f"- Collaborate with product managers on roadmap item {i}\n"
+            f"Technical Skills:\n"
+            f"- {tech[1]}, {tech[2]}, {tech[3]}, SQL, REST APIs\n"
+            f"Minimum Qualifications:\n"
+            f"- Bachelor's degree in Computer Science or related field ({i})\n"
+            f"Nice to have:\n"
+            f"- Experience working with {tech[0]} at scale\n"
+            f"We value {tech[1]} depth, Master's degree holders, and people who enjoy "
+            f"{SOFT_SKILLS[(i + 1) % 5]}.\n"
+        )
+        parts.append(block)
+        length += len(block)
+        i += 1
+
+    return ''.join(parts)[:target_length]
+
+def has_skill_taxonomy(revision: str) -> bool:
+    """Whether jd_parser at a git revision categorizes skills with the skill taxonomy"""
+    return subprocess.run(
+        ['git', 'cat-file', '-e', f'{revision}:resume_matcher_ai/skill_taxonomy.json'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True
+    ).returncode == 0
+
+def load_baseline(revision: str):
+    """Load resume_matcher_ai/jd_parser.py as it was at a git revision"""
+    source = subprocess.run(
+        ['git', 'show', f'{revision}:resume_matcher_ai/jd_parser.py'],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True, check=True
+    ).stdout
+
+    spec = importlib.util.spec_from_loader('resume_matcher_ai._jd_parser_baseline', loader=None)
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = 'resume_matcher_ai'
+    exec(compile(source, f'{revision}:jd_parser.py', 'exec'), module.__dict__)
+    return module
+
+def time_parse(parser, jd_text: str, iterations: int) -> float:
+    """Average milliseconds per parse_jd_text call"""
+    parser.parse_jd_text(jd_text)  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parser.parse_jd_text(jd_text)
+    return (time.perf_counter() - start) / iterations * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_jd_text on large job descriptions")
+    parser.add_argument('--baseline', help="git revision to compare against")
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 25000, 49000])
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    compare_outputs = baseline is not None and has_skill_taxonomy(args.baseline)
+
+    print("📊 parse_jd_text benchmark")
+    print("=" * 60)
+    if baseline and not compare_outputs:
+        print(f"ℹ️  {args.baseline} predates the skill taxonomy; comparing timings only")
+    if baseline:
+        print(f"{'chars':>8} {'current ms':>12} {'baseline ms':>12} {'speedup':>9}")
+    else:
+        print(f"{'chars':>8} {'current ms':>12}")
+
+    for size in args.sizes:
+        jd_text = build_job_description(size)
+        current_ms = time_parse(jd_parser, jd_text, args.iterations)
+
+        if not baseline:
+            print(f"{len(jd_text):>8} {current_ms:>12.2f}")
+            continue
+
+        if compare_outputs and baseline.parse_jd_text(jd_text) != jd_parser.parse_jd_text(jd_text):
+            print(f"❌ Output differs from baseline for a {len(jd_text)}-character JD")
+            sys.exit(1)
+
+        baseline_ms = time_parse(baseline, jd_text, args.iterations)
+        print(f"{len(jd_text):>8} {current_ms:>12.2f} {baseline_ms:>12.2f} {baseline_ms / current_ms:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
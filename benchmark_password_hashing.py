@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark for the bcrypt worker pool
+
+Many sessions log in at once while another thread stands in for page
+rendering; for each cost factor this reports logins per second, login
+latency, logins turned away by the queue limit, and how much rendering
+work still got done compared with an idle process.
+
+Usage:
+    python benchmark_password_hashing.py
+    python benchmark_password_hashing.py --rounds 10 12 14 --sessions 32 --workers 2
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from auth.password_hashing import PasswordHasher, PasswordHasherBusy
+
+def render_rate(stop: threading.Event, counter: list):
+    """Busy pure-Python loop standing in for Streamlit script threads"""
+    while not stop.is_set():
+        sum(range(1000))
+        counter[0] += 1
+
+def measure_render_rate(seconds: float) -> float:
+    stop, counter = threading.Event(), [0]
+    thread = threading.Thread(target=render_rate, args=(stop, counter))
+    thread.start()
+    time.sleep(seconds)
+    stop.set()
+    thread.join()
+    return counter[0] / seconds
+
+def run_logins(hasher: PasswordHasher, sessions: int, logins: int) -> dict:
+    """
+    Log in from several threads at once, each verifying the same password
+
+    Returns:
+        Timings, rejections and the rendering loop's rate meanwhile
+    """
+    password = 'correct horse battery staple'
+    password_hash = hasher.hash(password)
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+
+    def session(worker: int):
+        for _ in range(logins):
+            start = time.perf_counter()
+            try:
+                assert hasher.verify(password, password_hash)
+            except PasswordHasherBusy:
+                with lock:
+                    rejected[0] += 1
+                time.sleep(0.05)  # The user retries a moment later
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    stop, rendered = threading.Event(), [0]
+    renderer = threading.Thread(target=render_rate, args=(stop, rendered))
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    renderer.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    renderer.join()
+
+    latencies.sort()
+    return {
+        'logins': len(latencies),
+        'logins_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'rejected': rejected[0],
+        'render_per_sec': rendered[0] / elapsed if elapsed else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13], help="bcrypt cost factors")
+    parser.add_argument('--sessions', type=int, default=16, help="Sessions logging in at once")
+    parser.add_argument('--logins', type=int, default=4, help="Logins per session")
+    parser.add_argument('--workers', type=int, default=2, help="Password hashing threads")
+    parser.add_argument('--max-queue', type=int, default=32, help="Logins allowed to wait for a worker")
+    args = parser.parse_args()
+
+    idle_render = measure_render_rate(1.0)
+    print(f"{args.sessions} sessions x {args.logins} logins, {args.workers} workers, "
+          f"queue {args.max_queue}, {os.cpu_count()} CPUs\n")
+    print(f"{'cost':>4} {'logins':>7} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'retried':>8} {'render':>7}")
+
+    for rounds in args.rounds:
+        hasher = PasswordHasher(rounds=rounds, max_workers=args.workers, max_queue=args.max_queue)
+        stats = run_logins(hasher, args.sessions, args.logins)
+        hasher.shutdown()
+        render = stats['render_per_sec'] / idle_render * 100 if idle_render else 0.0
+        print(f"{rounds:>4} {stats['logins']:>7} {stats['logins_per_sec']:>9.1f} {stats['p50_ms']:>8.0f} "
+              f"{stats['p99_ms']:>8.0f} {stats['rejected']:>8} {render:>6.0f}%")
+
+if __name__ == "__main__":
+    main()
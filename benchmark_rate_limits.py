@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Rate-limit check latency as usage_events grows
+
+For each table size this times enforce_rate_limits-style checks three ways:
+the previous pair of SUM(quantity) queries over usage_events, the in-memory
+sliding-window limiter and the shared rate_limit_counters table, all on a
+throwaway SQLite database.
+
+Usage:
+    python benchmark_rate_limits.py
+    python benchmark_rate_limits.py --events 10000 100000 1000000 --checks 2000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from billing.rate_limits import DatabaseRateLimiter, MemoryRateLimiter
+from database.connection import DatabaseConfig, DatabaseManager
+from database.migrate_composite_indexes import index_statements
+
+USERS = 100
+
+def make_db(directory: str, events: int) -> DatabaseManager:
+    """SQLite database with events usage rows spread over USERS users and the last 30 days"""
+    config = DatabaseConfig()
+    config.db_type = 'sqlite'
+    config.sqlite_path = os.path.join(directory, f'rate_limits_{events}.db')
+    config.database_url = f"sqlite:///{config.sqlite_path}"
+    db = DatabaseManager(config)
+    db.execute_command("""
+        CREATE TABLE usage_events (
+            id TEXT PRIMARY KEY, user_id TEXT, event_type VARCHAR(50) NOT NULL, quantity INTEGER DEFAULT 1,
+            cost_usd REAL DEFAULT 0.0, metadata TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    for statement in index_statements(['usage_events']):
+        db.execute_command(statement)
+
+    now = datetime.utcnow()
+    rows = [(str(uuid.uuid4()), f'user-{i % USERS}', 'analysis', 1,
+             now - timedelta(seconds=(i * 7919) % (30 * 86400))) for i in range(events)]
+    db.execute_many("INSERT INTO usage_events (id, user_id, event_type, quantity, timestamp) "
+                    "VALUES (?, ?, ?, ?, ?)", rows)
+    return db
+
+def usage_count(db: DatabaseManager, user_id: str, event_type: str, since: datetime) -> int:
+    """The previous check: SUM(quantity) over the user's usage_events since a time"""
+    result = db.get_single_result("""
+        SELECT SUM(quantity) as total
+        FROM usage_events
+        WHERE user_id = ? AND event_type = ? AND timestamp >= ?
+    """, (user_id, event_type, since))
+    return result['total'] or 0
+
+def time_checks(check, checks: int) -> float:
+    """Mean microseconds per check, over every user in turn"""
+    start = time.perf_counter()
+    for i in range(checks):
+        check(f'user-{i % USERS}')
+    return (time.perf_counter() - start) / checks * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, nargs='+', default=[10000, 100000, 500000],
+                        help="usage_events rows")
+    parser.add_argument('--checks', type=int, default=1000, help="Checks timed per method")
+    args = parser.parse_args()
+
+    print(f"{'events':>9} {'scan us':>9} {'memory us':>10} {'database us':>12}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for events in args.events:
+            db = make_db(tmp_dir, events)
+
+            def scan(user_id):
+                now = datetime.utcnow()
+                usage_count(db, user_id, 'analysis', now - timedelta(minutes=1))
+                usage_count(db, user_id, 'analysis', now - timedelta(hours=1))
+
+            memory = MemoryRateLimiter(db)
+            for i in range(USERS):
+                memory.check(f'user-{i}', 'analysis')  # Seed outside the timing
+            database = DatabaseRateLimiter(db)
+            database.repository.ensure_table()
+
+            scan_us = time_checks(scan, args.checks)
+            memory_us = time_checks(lambda user_id: memory.check(user_id, 'analysis'), args.checks)
+            database_us = time_checks(lambda user_id: database.check(user_id, 'analysis'), args.checks)
+            print(f"{events:>9} {scan_us:>9.1f} {memory_us:>10.1f} {database_us:>12.1f}")
+            db.close_pool()
+
+if __name__ == "__main__":
+    main()
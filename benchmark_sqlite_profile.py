@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Concurrent-writer benchmark for the SQLite tuning profile
+
+Runs the same workload (threads saving analyses while others read history)
+against a scratch database with SQLite defaults and with the tuning profile.
+
+Usage:
+    python benchmark_sqlite_profile.py
+    python benchmark_sqlite_profile.py --writers 16 --readers 4 --saves 100
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.sqlite_profile import SQLiteProfile, connect_sqlite, remove_database_files
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis_sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    resume_filename TEXT,
+    job_description TEXT,
+    analysis_result TEXT,
+    score INTEGER,
+    match_category TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+def run_workload(db_path: str, profile: SQLiteProfile, writers: int, readers: int,
+                 saves: int, payload_kb: int) -> dict:
+    """
+    Save analyses from several threads, one connection per save like
+    AnalysisStorage, while reader threads page through history
+
+    Returns:
+        Timings and error counts
+    """
+    remove_database_files(db_path)
+    timeout = profile.busy_timeout_ms / 1000  # Same lock wait with and without the profile
+    with connect_sqlite(db_path, profile, timeout=timeout) as conn:
+        conn.execute(SCHEMA)
+
+    result_blob = json.dumps({'score': 72, 'details': 'x' * (payload_kb * 1024)})
+    latencies = []
+    errors = {'locked': 0, 'other': 0}
+    lock = threading.Lock()
+    done = threading.Event()
+    reads = [0]
+
+    def writer(worker: int):
+        for i in range(saves):
+            start = time.perf_counter()
+            try:
+                with connect_sqlite(db_path, profile, timeout=timeout) as conn:
+                    conn.execute(
+                        "INSERT INTO analysis_sessions (id, user_id, resume_filename, job_description, "
+                        "analysis_result, score, match_category) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (str(uuid.uuid4()), f"user{worker}", "resume.pdf", "Senior engineer", result_blob,
+                         72, "Strong Match"))
+                conn.close()
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors['locked' if 'locked' in str(e) else 'other'] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    def reader(worker: int):
+        while not done.is_set():
+            try:
+                conn = connect_sqlite(db_path, profile, timeout=timeout)
+                conn.execute("SELECT id, score, created_at FROM analysis_sessions WHERE user_id = ? "
+                             "ORDER BY created_at DESC LIMIT 20", (f"user{worker}",)).fetchall()
+                conn.close()
+                with lock:
+                    reads[0] += 1
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors['locked' if 'locked' in str(e) else 'other'] += 1
+
+    reader_threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        'saved': len(latencies),
+        'elapsed': elapsed,
+        'saves_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        'reads_per_sec': reads[0] / elapsed if elapsed else 0.0,
+        'locked_errors': errors['locked'],
+        'other_errors': errors['other'],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=8, help="Threads saving analyses")
+    parser.add_argument('--readers', type=int, default=4, help="Threads reading history")
+    parser.add_argument('--saves', type=int, default=50, help="Saves per writer thread")
+    parser.add_argument('--payload-kb', type=int, default=8, help="Size of each stored analysis result")
+    parser.add_argument('--busy-timeout-ms', type=int, default=1000,
+                        help="How long a connection waits for a lock before failing, in both runs")
+    args = parser.parse_args()
+
+    defaults = SQLiteProfile()
+    defaults.enabled = False
+    defaults.busy_timeout_ms = args.busy_timeout_ms
+    tuned = SQLiteProfile()
+    tuned.busy_timeout_ms = args.busy_timeout_ms
+
+    print(f"{args.writers} writers x {args.saves} saves, {args.readers} readers, "
+          f"{args.payload_kb} KB results, {args.busy_timeout_ms} ms lock wait\n")
+    print(f"{'profile':<10} {'saved':>6} {'saves/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'reads/s':>8} {'locked':>7}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'bench.db')
+        for name, profile in (('default', defaults), ('tuned', tuned)):
+            stats = run_workload(db_path, profile, args.writers, args.readers, args.saves, args.payload_kb)
+            print(f"{name:<10} {stats['saved']:>6} {stats['saves_per_sec']:>9.0f} {stats['p50_ms']:>8.1f} "
+                  f"{stats['p99_ms']:>8.1f} {stats['reads_per_sec']:>8.0f} {stats['locked_errors']:>7}")
+
+if __name__ == "__main__":
+    main()
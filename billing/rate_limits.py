@@ -0,0 +1,217 @@
+"""
+Usage rate limits for RealTimeUsageMonitor
+Counts each user's recent actions without scanning usage_events
+"""
+
+import os
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from database.repositories import RateLimitRepository
+from utils.rate_limiter import SlidingWindowCounter
+
+logger = logging.getLogger(__name__)
+
+# Allowed quantity per window, by action type
+RATE_LIMITS = {
+    'analysis': {'per_minute': 10, 'per_hour': 100},
+    'api_call': {'per_minute': 60, 'per_hour': 1000},
+    'bulk_upload': {'per_minute': 2, 'per_hour': 10}
+}
+DEFAULT_RATE_LIMITS = {'per_minute': 5, 'per_hour': 50}
+
+# Window lengths in seconds, shortest first
+WINDOWS = {'per_minute': 60, 'per_hour': 3600}
+_WINDOW_NAMES = {'per_minute': 'minute', 'per_hour': 'hour'}
+
+def _window_estimate(current: float, previous: float, window_seconds: int, now: float) -> float:
+    """Sliding-window estimate from the current and previous fixed windows' totals"""
+    overlap = 1 - (now % window_seconds) / window_seconds
+    return current + previous * overlap
+
+class UsageRateLimiter(ABC):
+    """
+    Base class for per-(user, action) rate limits over sliding windows
+
+    Subclasses keep the counts: record() is called for every tracked usage
+    event and usage() returns the estimated quantity in each window.
+    """
+
+    def check(self, user_id: str, action_type: str, now: Optional[float] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Whether the user may perform another action of this type
+
+        Returns:
+            (allowed, reason the action was refused)
+        """
+        limits = RATE_LIMITS.get(action_type, DEFAULT_RATE_LIMITS)
+        usage = self.usage(user_id, action_type, now)
+        for window in WINDOWS:
+            if usage[window] >= limits[window]:
+                return False, f"Rate limit exceeded: {limits[window]} {action_type}s per {_WINDOW_NAMES[window]}"
+        return True, None
+
+    @abstractmethod
+    def usage(self, user_id: str, action_type: str, now: Optional[float] = None) -> Dict[str, float]:
+        """Estimated quantity of this action the user performed in each window, keyed by window"""
+
+    @abstractmethod
+    def record(self, user_id: str, action_type: str, quantity: int = 1, now: Optional[float] = None) -> None:
+        """Count quantity actions of this type by the user at now (time.time() by default)"""
+
+class MemoryRateLimiter(UsageRateLimiter):
+    """
+    Sliding-window counters kept in process memory
+
+    A user's counters are seeded from usage_events the first time they are
+    checked or recorded (one indexed query), so a restart doesn't reset
+    anyone's limits; after that checks and records touch only memory. Each
+    process counts only its own events from then on, so deployments running
+    several processes should use DatabaseRateLimiter.
+    """
+
+    LOCK_STRIPES = 64
+
+    def __init__(self, db, max_keys: Optional[int] = None):
+        self.db = db
+        max_keys = max_keys or int(os.getenv('RATE_LIMIT_MAX_KEYS', '100000'))
+        self._counters = {window: SlidingWindowCounter(seconds, max_keys) for window, seconds in WINDOWS.items()}
+        # Seeding and recording a key are serialized, so an event recorded
+        # while the key is being seeded is neither lost nor overwritten
+        self._key_locks = [threading.Lock() for _ in range(self.LOCK_STRIPES)]
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        return self._key_locks[hash(key) % self.LOCK_STRIPES]
+
+    def _unseeded(self, key: tuple) -> Dict[str, SlidingWindowCounter]:
+        return {window: counter for window, counter in self._counters.items() if key not in counter}
+
+    def usage(self, user_id: str, action_type: str, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        key = (user_id, action_type)
+        if self._unseeded(key):
+            with self._key_lock(key):
+                unseeded = self._unseeded(key)
+                if unseeded:
+                    self._seed(key, unseeded, now)
+        return {window: counter.count(key, now) for window, counter in self._counters.items()}
+
+    def record(self, user_id: str, action_type: str, quantity: int = 1, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        key = (user_id, action_type)
+        with self._key_lock(key):
+            unseeded = self._unseeded(key)
+            if unseeded:
+                # The event is already in usage_events, so the seed counts it
+                self._seed(key, unseeded, now)
+            for window, counter in self._counters.items():
+                if window not in unseeded:
+                    counter.add(key, quantity, now)
+
+    def _seed(self, key: tuple, counters: Dict[str, SlidingWindowCounter], now: float) -> None:
+        """Load the key's current and previous window totals from usage_events (caller holds the key's lock)"""
+        starts = {window: now - now % seconds for window, seconds in WINDOWS.items()}
+        buckets, params = [], []
+        for window, seconds in WINDOWS.items():
+            buckets.append(f"SUM(CASE WHEN timestamp >= ? THEN quantity ELSE 0 END) AS {window}_current")
+            buckets.append(f"SUM(CASE WHEN timestamp >= ? AND timestamp < ? THEN quantity ELSE 0 END) "
+                           f"AS {window}_previous")
+            start = datetime.utcfromtimestamp(starts[window])
+            params.extend([start, datetime.utcfromtimestamp(starts[window] - seconds), start])
+        earliest = min(starts[window] - seconds for window, seconds in WINDOWS.items())
+
+        try:
+            row = self.db.get_single_result(f"""
+                SELECT {', '.join(buckets)}
+                FROM usage_events
+                WHERE user_id = ? AND event_type = ? AND timestamp >= ?
+            """, tuple(params) + key + (datetime.utcfromtimestamp(earliest),)) or {}
+        except Exception as e:
+            logger.warning(f"Could not load recent usage for rate limits: {e}")
+            row = {}
+
+        for window, counter in counters.items():
+            counter.seed(key, row.get(f'{window}_current') or 0, row.get(f'{window}_previous') or 0, now)
+
+class DatabaseRateLimiter(UsageRateLimiter):
+    """
+    Sliding-window counters in the rate_limit_counters table
+
+    Shared by every process using the database. Recording is an atomic
+    upsert per window and checking reads a handful of rows by primary key,
+    however large usage_events grows. Counting starts when this mode is
+    switched on; expired windows are purged every RATE_LIMIT_PURGE_INTERVAL
+    seconds.
+    """
+
+    def __init__(self, db, purge_interval: Optional[float] = None):
+        self.repository = RateLimitRepository(db)
+        if purge_interval is None:
+            purge_interval = float(os.getenv('RATE_LIMIT_PURGE_INTERVAL', '600'))
+        self.purge_interval = purge_interval
+        self._purged_at = 0.0
+        self._purge_lock = threading.Lock()
+
+    def usage(self, user_id: str, action_type: str, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.time() if now is None else now
+        since = min(int(now - now % seconds) - seconds for seconds in WINDOWS.values())
+        counts = self.repository.get_counts(user_id, action_type, since)
+        usage = {}
+        for window, seconds in WINDOWS.items():
+            start = int(now - now % seconds)
+            usage[window] = _window_estimate(counts.get((seconds, start), 0),
+                                             counts.get((seconds, start - seconds), 0), seconds, now)
+        return usage
+
+    def record(self, user_id: str, action_type: str, quantity: int = 1, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        self.repository.add(user_id, action_type,
+                            {seconds: int(now - now % seconds) for seconds in WINDOWS.values()}, quantity)
+        self._maybe_purge(now)
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._purged_at < self.purge_interval or not self._purge_lock.acquire(blocking=False):
+            return
+        try:
+            self._purged_at = now
+            longest = max(WINDOWS.values())
+            self.repository.purge(int(now - now % longest) - longest)
+        except Exception as e:
+            logger.warning(f"Failed to purge expired rate limit counters: {e}")
+        finally:
+            self._purge_lock.release()
+
+def create_rate_limiter(db, backend: Optional[str] = None) -> UsageRateLimiter:
+    """
+    Rate limiter for a database
+
+    Args:
+        backend: 'memory' or 'database'; defaults to RATE_LIMIT_BACKEND
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    backend = (backend or os.getenv('RATE_LIMIT_BACKEND', 'memory')).lower()
+    if backend == 'memory':
+        return MemoryRateLimiter(db)
+    if backend == 'database':
+        return DatabaseRateLimiter(db)
+    raise ValueError(f"RATE_LIMIT_BACKEND must be memory or database, not {backend!r}")
+
+_rate_limiters: Dict[tuple, UsageRateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_usage_rate_limiter(db) -> UsageRateLimiter:
+    """The shared rate limiter of a database, created on first use"""
+    key = (db.config.database_url, db.config.sqlite_path)
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        with _rate_limiters_lock:
+            limiter = _rate_limiters.get(key)
+            if limiter is None:
+                limiter = _rate_limiters[key] = create_rate_limiter(db)
+    return limiter
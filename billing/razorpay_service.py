@@ -19,6 +19,7 @@ except ImportError:
     RAZORPAY_AVAILABLE = False
 
 from auth.models import User, PlanType
+from auth.services import invalidate_user_cache
 from database.connection import get_db
 
 logger = logging.getLogger(__name__)
@@ -302,9 +303,17 @@ class RazorpayService:
             subscription['id']
         ))
         
+        self._invalidate_subscription_cache(db, subscription['id'])
         logger.info(f"Activated subscription: {subscription['id']}")
         return {'status': 'processed'}
     
+    def _invalidate_subscription_cache(self, db, razorpay_subscription_id: str):
+        """Drop the cached subscription of the users a webhook changed"""
+        rows = db.execute_query("SELECT user_id FROM subscriptions WHERE razorpay_subscription_id = ?",
+                                (razorpay_subscription_id,))
+        for row in rows:
+            invalidate_user_cache(row['user_id'], db)
+    
     def _handle_subscription_charged(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Handle successful subscription charge"""
         payment = payload['payload']['payment']['entity']
@@ -345,6 +354,7 @@ class RazorpayService:
             subscription['id']
         ))
         
+        self._invalidate_subscription_cache(db, subscription['id'])
         logger.info(f"Cancelled subscription: {subscription['id']}")
         return {'status': 'processed'}
     
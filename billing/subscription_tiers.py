@@ -7,6 +7,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from auth.models import PlanType, SubscriptionPlan, Subscription, User
+from auth.plan_catalog import TIER_DEFINITIONS, PlanCatalog
 from auth.services import subscription_service, user_service
 
 logger = logging.getLogger(__name__)
@@ -18,194 +19,8 @@ class SubscriptionTierManager:
         self.tier_definitions = self._initialize_tier_definitions()
     
     def _initialize_tier_definitions(self) -> Dict[PlanType, Dict[str, Any]]:
-        """Initialize subscription tier definitions with features and limits"""
-        return {
-            PlanType.FREE: {
-                'name': 'Free Tier',
-                'price_monthly': 0.00,
-                'price_annual': 0.00,
-                'monthly_analysis_limit': 3,
-                'features': {
-                    # Core features
-                    'basic_analysis': True,
-                    'pdf_download': True,
-                    'basic_reports': True,
-                    'community_support': True,
-                    
-                    # Limitations
-                    'watermarked_pdfs': True,
-                    'limited_file_size': True,  # 5MB limit
-                    'basic_ai_model': True,
-                    
-                    # Disabled features
-                    'unlimited_analyses': False,
-                    'premium_ai': False,
-                    'all_formats': False,
-                    'priority_processing': False,
-                    'email_support': False,
-                    'phone_support': False,
-                    'team_collaboration': False,
-                    'bulk_upload': False,
-                    'analytics_dashboard': False,
-                    'api_access': False,
-                    'custom_branding': False,
-                    'sso': False,
-                    'dedicated_support': False
-                },
-                'description': 'Perfect for trying out our AI-powered resume analysis',
-                'target_audience': 'Individual job seekers exploring the platform',
-                'upgrade_prompts': [
-                    'Unlock unlimited analyses with Professional plan',
-                    'Get premium AI insights and priority processing',
-                    'Remove watermarks and access all export formats'
-                ]
-            },
-            
-            PlanType.PROFESSIONAL: {
-                'name': 'Professional',
-                'price_monthly': 19.00,
-                'price_annual': 190.00,  # 2 months free
-                'monthly_analysis_limit': -1,  # Unlimited
-                'features': {
-                    # All free features
-                    'basic_analysis': True,
-                    'pdf_download': True,
-                    'basic_reports': True,
-                    
-                    # Professional features
-                    'unlimited_analyses': True,
-                    'premium_ai': True,
-                    'all_formats': True,  # CSV, PDF, Word, JSON
-                    'priority_processing': True,
-                    'email_support': True,
-                    'resume_templates': True,
-                    'advanced_insights': True,
-                    'skill_recommendations': True,
-                    'industry_benchmarking': True,
-                    
-                    # No watermarks
-                    'watermarked_pdfs': False,
-                    'limited_file_size': False,  # 50MB limit
-                    'basic_ai_model': False,
-                    
-                    # Still disabled
-                    'team_collaboration': False,
-                    'bulk_upload': False,
-                    'analytics_dashboard': False,
-                    'api_access': False,
-                    'custom_branding': False,
-                    'sso': False,
-                    'dedicated_support': False
-                },
-                'description': 'Ideal for serious job seekers and career professionals',
-                'target_audience': 'Individual professionals, career changers, consultants',
-                'upgrade_prompts': [
-                    'Add team collaboration with Business plan',
-                    'Get bulk processing and analytics dashboard',
-                    'Access API for custom integrations'
-                ]
-            },
-            
-            PlanType.BUSINESS: {
-                'name': 'Business',
-                'price_monthly': 99.00,
-                'price_annual': 990.00,  # 2 months free
-                'monthly_analysis_limit': -1,  # Unlimited
-                'seat_limit': 5,
-                'features': {
-                    # All professional features
-                    'basic_analysis': True,
-                    'pdf_download': True,
-                    'basic_reports': True,
-                    'unlimited_analyses': True,
-                    'premium_ai': True,
-                    'all_formats': True,
-                    'priority_processing': True,
-                    'email_support': True,
-                    'resume_templates': True,
-                    'advanced_insights': True,
-                    'skill_recommendations': True,
-                    'industry_benchmarking': True,
-                    
-                    # Business features
-                    'team_collaboration': True,
-                    'bulk_upload': True,
-                    'analytics_dashboard': True,
-                    'api_access': True,  # 1000 calls/month
-                    'integration_support': True,
-                    'phone_support': True,
-                    'custom_branding': True,
-                    'team_management': True,
-                    'usage_analytics': True,
-                    'export_analytics': True,
-                    
-                    # Still disabled
-                    'sso': False,
-                    'dedicated_support': False,
-                    'unlimited_seats': False,
-                    'white_label': False,
-                    'on_premise': False
-                },
-                'description': 'Perfect for growing companies and HR teams',
-                'target_audience': 'SMEs, startups, HR departments, recruiting agencies',
-                'upgrade_prompts': [
-                    'Get enterprise security with SSO integration',
-                    'Add unlimited seats and dedicated support',
-                    'Enable white-label and on-premise options'
-                ]
-            },
-            
-            PlanType.ENTERPRISE: {
-                'name': 'Enterprise',
-                'price_monthly': 500.00,
-                'price_annual': 5000.00,  # 2 months free
-                'monthly_analysis_limit': -1,  # Unlimited
-                'seat_limit': -1,  # Unlimited
-                'features': {
-                    # All business features
-                    'basic_analysis': True,
-                    'pdf_download': True,
-                    'basic_reports': True,
-                    'unlimited_analyses': True,
-                    'premium_ai': True,
-                    'all_formats': True,
-                    'priority_processing': True,
-                    'email_support': True,
-                    'resume_templates': True,
-                    'advanced_insights': True,
-                    'skill_recommendations': True,
-                    'industry_benchmarking': True,
-                    'team_collaboration': True,
-                    'bulk_upload': True,
-                    'analytics_dashboard': True,
-                    'api_access': True,  # Unlimited
-                    'integration_support': True,
-                    'phone_support': True,
-                    'custom_branding': True,
-                    'team_management': True,
-                    'usage_analytics': True,
-                    'export_analytics': True,
-                    
-                    # Enterprise features
-                    'unlimited_seats': True,
-                    'sso': True,
-                    'custom_integrations': True,
-                    'dedicated_support': True,
-                    'sla_guarantee': True,
-                    'on_premise': True,
-                    'white_label': True,
-                    'custom_features': True,
-                    'priority_support': True,
-                    'custom_ai_models': True,
-                    'advanced_security': True,
-                    'audit_logs': True,
-                    'compliance_reports': True
-                },
-                'description': 'Complete solution for large organizations',
-                'target_audience': 'Large enterprises, Fortune 500, government agencies',
-                'upgrade_prompts': []  # No upgrades from enterprise
-            }
-        }
+        """Subscription tier definitions with features and limits (shared, don't modify)"""
+        return TIER_DEFINITIONS
     
     def get_tier_definition(self, plan_type: PlanType) -> Dict[str, Any]:
         """Get tier definition for a plan type"""
@@ -235,8 +50,7 @@ class SubscriptionTierManager:
         if not subscription or not subscription.plan:
             return False
         
-        tier_def = self.get_tier_definition(subscription.plan.plan_type)
-        return tier_def.get('features', {}).get(feature_name, False)
+        return PlanCatalog.has_feature(subscription.plan.plan_type, feature_name)
     
     def get_usage_limits(self, user_id: str) -> Dict[str, Any]:
         """Get usage limits for a user"""
@@ -5,15 +5,21 @@ Handles real-time usage monitoring, limit enforcement, and billing automation
 
 import logging
 import json
+import weakref
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from auth.models import User, Subscription, AnalysisSession
 from auth.services import subscription_service, analytics_service
+from billing.rate_limits import UsageRateLimiter, get_usage_rate_limiter
 from database.connection import get_db
+from database.repositories import UsageEventRepository
 
 logger = logging.getLogger(__name__)
 
+# Database managers the usage tracking tables have been created on
+_usage_tables_ready = weakref.WeakSet()
+
 @dataclass
 class UsageEvent:
     """Represents a usage event for billing purposes"""
@@ -44,11 +50,34 @@ class BillingPeriod:
     total_amount: float
     currency: str = 'USD'
 
-class RealTimeUsageMonitor:
+class _UsageDatabaseMixin:
+    """Creates the usage tracking tables on a database the first time it is used"""
+    
+    @property
+    def db(self):
+        """Database manager, with the usage tracking tables created on it"""
+        if self._db not in _usage_tables_ready:
+            create_usage_tables(self._db)
+            _usage_tables_ready.add(self._db)
+        return self._db
+    
+    @db.setter
+    def db(self, db):
+        self._db = db
+
+class RealTimeUsageMonitor(_UsageDatabaseMixin):
     """Real-time usage monitoring and limit enforcement"""
     
     def __init__(self):
         self.db = get_db()
+        self._events = None
+    
+    @property
+    def events(self) -> UsageEventRepository:
+        """Usage events and their daily rollups, on this monitor's database"""
+        if self._events is None or self._events.db is not self.db:
+            self._events = UsageEventRepository(self.db)
+        return self._events
     
     def track_analysis_session(self, user_id: str, session_type: str = 'single', 
                              resume_count: int = 1, processing_time: float = 0,
@@ -123,19 +152,8 @@ class RealTimeUsageMonitor:
         period_start = subscription.current_period_start or datetime.utcnow().replace(day=1)
         period_end = subscription.current_period_end or (period_start + timedelta(days=30))
         
-        # Query usage events for current period
-        usage_query = """
-            SELECT 
-                event_type,
-                SUM(quantity) as total_quantity,
-                SUM(cost_usd) as total_cost,
-                COUNT(*) as event_count
-            FROM usage_events 
-            WHERE user_id = ? AND timestamp >= ? AND timestamp <= ?
-            GROUP BY event_type
-        """
-        
-        usage_results = self.db.execute_query(usage_query, (user_id, period_start, period_end))
+        # Usage for the current period, from the daily rollups
+        usage_results = self.events.period_totals(user_id, period_start, period_end)
         
         usage_by_type = {}
         total_cost = 0
@@ -160,32 +178,14 @@ class RealTimeUsageMonitor:
             'overage_charges': self._calculate_overage_charges(subscription, usage_by_type)
         }
     
+    @property
+    def rate_limiter(self) -> UsageRateLimiter:
+        """Rate limiter shared by every monitor on this database"""
+        return get_usage_rate_limiter(self.db)
+    
     def enforce_rate_limits(self, user_id: str, action_type: str) -> Tuple[bool, Optional[str]]:
-        """Enforce rate limits for different actions"""
-        # Define rate limits by action type
-        rate_limits = {
-            'analysis': {'per_minute': 10, 'per_hour': 100},
-            'api_call': {'per_minute': 60, 'per_hour': 1000},
-            'bulk_upload': {'per_minute': 2, 'per_hour': 10}
-        }
-        
-        limits = rate_limits.get(action_type, {'per_minute': 5, 'per_hour': 50})
-        
-        # Check minute-level rate limit
-        minute_ago = datetime.utcnow() - timedelta(minutes=1)
-        minute_count = self._get_usage_count(user_id, action_type, minute_ago)
-        
-        if minute_count >= limits['per_minute']:
-            return False, f"Rate limit exceeded: {limits['per_minute']} {action_type}s per minute"
-        
-        # Check hour-level rate limit
-        hour_ago = datetime.utcnow() - timedelta(hours=1)
-        hour_count = self._get_usage_count(user_id, action_type, hour_ago)
-        
-        if hour_count >= limits['per_hour']:
-            return False, f"Rate limit exceeded: {limits['per_hour']} {action_type}s per hour"
-        
-        return True, None
+        """Enforce per-minute and per-hour rate limits for different actions (see billing.rate_limits)"""
+        return self.rate_limiter.check(user_id, action_type)
     
     def _track_usage_event(self, user_id: str, event_type: str, quantity: int, 
                           cost_usd: float, metadata: Dict[str, Any]):
@@ -203,33 +203,15 @@ class RealTimeUsageMonitor:
                 timestamp=datetime.utcnow()
             )
             
-            query = """
-                INSERT INTO usage_events (
-                    id, user_id, event_type, quantity, cost_usd, metadata, timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """
-            
-            params = (
+            self.events.record(
                 event.id, event.user_id, event.event_type, event.quantity,
                 event.cost_usd, json.dumps(event.metadata), event.timestamp
             )
-            
-            self.db.execute_command(query, params)
+            self.rate_limiter.record(event.user_id, event.event_type, event.quantity)
             
         except Exception as e:
             logger.error(f"Failed to track usage event: {e}")
     
-    def _get_usage_count(self, user_id: str, event_type: str, since: datetime) -> int:
-        """Get usage count for a user since a specific time"""
-        query = """
-            SELECT SUM(quantity) as total
-            FROM usage_events 
-            WHERE user_id = ? AND event_type = ? AND timestamp >= ?
-        """
-        
-        result = self.db.get_single_result(query, (user_id, event_type, since))
-        return result['total'] or 0
-    
     def _calculate_overage_charges(self, subscription: Subscription, 
                                  usage_by_type: Dict[str, Any]) -> float:
         """Calculate overage charges for usage beyond plan limits"""
@@ -255,7 +237,7 @@ class RealTimeUsageMonitor:
         
         return total_overage
 
-class AutomatedBillingSystem:
+class AutomatedBillingSystem(_UsageDatabaseMixin):
     """Automated billing and invoice generation system"""
     
     def __init__(self):
@@ -473,9 +455,9 @@ class AutomatedBillingSystem:
         logger.info(f"Subscription cancellation notification sent to user {user_id}")
 
 # Create database table for usage events if it doesn't exist
-def create_usage_tables():
+def create_usage_tables(db=None):
     """Create usage tracking tables"""
-    db = get_db()
+    db = db or get_db()
     
     # Usage events table
     usage_events_table = """
@@ -511,7 +493,8 @@ def create_usage_tables():
     
     # Create indexes
     usage_events_indexes = [
-        "CREATE INDEX IF NOT EXISTS idx_usage_events_user_id ON usage_events(user_id)",
+        # Serves the rate limiter's seed query from the index alone (see database/migrate_composite_indexes.py)
+        "CREATE INDEX IF NOT EXISTS idx_usage_events_user_type_time ON usage_events(user_id, event_type, timestamp, quantity)",
         "CREATE INDEX IF NOT EXISTS idx_usage_events_timestamp ON usage_events(timestamp)",
         "CREATE INDEX IF NOT EXISTS idx_usage_events_event_type ON usage_events(event_type)"
     ]
@@ -529,6 +512,9 @@ def create_usage_tables():
         for index in usage_events_indexes + invoices_indexes:
             db.execute_command(index)
         
+        # Daily rollups read by get_current_usage, filled from existing events when first created
+        UsageEventRepository(db).ensure_table()
+        
         logger.info("Usage tracking tables created successfully")
         
     except Exception as e:
@@ -537,6 +523,3 @@ def create_usage_tables():
 # Service instances
 usage_monitor = RealTimeUsageMonitor()
 billing_system = AutomatedBillingSystem()
-
-# Initialize tables on import
-create_usage_tables()
\ No newline at end of file
@@ -5,24 +5,30 @@ Fixed Report History UI Component - Prevents state issues and analysis disappear
 import streamlit as st
 import pandas as pd
 import json
+import logging
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
 try:
-    from database.enhanced_analysis_storage import enhanced_analysis_storage
+    from database.repositories import AnalysisSessionRepository
     from auth.models import User
     STORAGE_AVAILABLE = True
 except ImportError:
     # Fallback for testing
-    enhanced_analysis_storage = None
+    AnalysisSessionRepository = None
     User = None
     STORAGE_AVAILABLE = False
 
 class FixedReportHistoryUI:
     """Fixed UI component for displaying and managing report history without state issues"""
     
+    PAGE_SIZE = 20
+    
     def __init__(self):
-        self.storage = enhanced_analysis_storage if STORAGE_AVAILABLE else None
+        self.sessions = AnalysisSessionRepository() if STORAGE_AVAILABLE else None
+        self._reports_table = True  # Until a query shows analysis_reports is missing
     
     def render_history_page(self, user: User):
         """Render the complete history page without causing state issues"""
@@ -30,75 +36,128 @@ class FixedReportHistoryUI:
         st.markdown("View and download your previous analysis reports")
         
         try:
-            # Get user reports with fallback
-            reports = self._get_user_reports_safe(user)
+            # Keep the rows loaded so far between reruns so each one costs no
+            # queries; Load more fetches just the next page from the stored cursor
+            state_key = f"history_{user.id}"
+            if state_key not in st.session_state:
+                reports, next_cursor = self._get_user_reports_safe(user)
+                st.session_state[state_key] = {'reports': reports, 'cursor': next_cursor}
+            history = st.session_state[state_key]
+            reports = history['reports']
+            st.button("🔄 Refresh", key=f"history_refresh_{user.id}",
+                      on_click=self._reset_history, args=(state_key,))
             
             if not reports:
                 st.info("📝 No analysis history found. Run your first analysis to see results here!")
                 return
             
             # Show count
-            st.success(f"Found {len(reports)} analysis reports")
+            st.success(f"Showing {len(reports)} analysis reports")
             
             # Render reports without causing state issues
             self._render_reports_safe(user, reports)
             
+            if history['cursor']:
+                st.button("Load more", key=f"history_more_{user.id}",
+                          on_click=self._load_more, args=(user, state_key))
+            
         except Exception as e:
             logger.error(f"Error rendering history page: {e}")
             st.error("Failed to load analysis history. Please refresh the page.")
     
-    def _get_user_reports_safe(self, user: User) -> List[Dict[str, Any]]:
-        """Safely get user reports with multiple fallbacks"""
+    def _load_more(self, user: User, state_key: str):
+        history = st.session_state[state_key]
+        reports, history['cursor'] = self._get_user_reports_safe(user, history['cursor'])
+        history['reports'] = history['reports'] + reports
+    
+    @staticmethod
+    def _reset_history(state_key: str):
+        """Drop the loaded pages so the next run starts again from the newest report"""
+        st.session_state.pop(state_key, None)
+    
+    def _get_user_reports_safe(self, user: User, cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Safely get a page of report summaries, falling back to analysis_sessions
+        
+        Args:
+            user: Owner of the reports
+            cursor: Cursor returned with the previous page, or None for the first page
+        
+        Returns:
+            Reports without their content (see _get_report_detail) and the
+            cursor of the next page, or None if this is the last page
+        """
+        if not self.sessions:
+            return [], None
+        
+        # The cursor records which table the previous page came from
+        source, _, page_cursor = (cursor or '').partition(':')
+        
         try:
-            # Try enhanced storage first
-            if self.storage:
-                return self.storage.get_user_reports(user.id)
+            # Try analysis_reports table first
+            if source == 'reports' or (not source and self._reports_table):
+                page = self.sessions.fetch_page('analysis_reports', ['title', 'analysis_type', 'metadata'],
+                                                'user_id = ?', (user.id,), self.PAGE_SIZE, page_cursor or None)
+                if page.items or source:
+                    for report in page.items:
+                        report['source'] = 'analysis_reports'
+                    return page.items, page.next_cursor and f"reports:{page.next_cursor}"
         except Exception as e:
-            logger.warning(f"Enhanced storage failed: {e}")
+            logger.debug(f"analysis_reports not available: {e}")
+            self._reports_table = False
         
         try:
-            # Fallback to direct database query
-            from database.connection import get_db
-            db = get_db()
-            
-            # Try analysis_reports table first
-            reports = db.execute_query("""
-                SELECT id, title, content, created_at, analysis_type, metadata
-                FROM analysis_reports 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC
-                LIMIT 50
-            """, (user.id,))
-            
-            if reports:
-                return reports
-            
             # Fallback to analysis_sessions table
-            sessions = db.execute_query("""
-                SELECT id, resume_filename as title, score, match_category, created_at
-                FROM analysis_sessions 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC 
-                LIMIT 50
-            """, (user.id,))
+            page = self.sessions.page_for_user(user.id, ['resume_filename', 'score', 'match_category'],
+                                          self.PAGE_SIZE, page_cursor or None)
             
             # Convert sessions to report format
             converted_reports = []
-            for session in sessions:
+            for session in page.items:
                 converted_reports.append({
                     'id': session['id'],
-                    'title': f"{session['title']} - {session['score']}%",
-                    'content': f"Score: {session['score']}%\nCategory: {session['match_category']}",
+                    'title': f"{session['resume_filename']} - {session['score']}%",
                     'created_at': session['created_at'],
                     'analysis_type': 'resume_jd_match',
-                    'metadata': json.dumps({'score': session['score'], 'category': session['match_category']})
+                    'metadata': json.dumps({'score': session['score'], 'category': session['match_category']}),
+                    'source': 'analysis_sessions'
                 })
             
-            return converted_reports
+            return converted_reports, page.next_cursor and f"sessions:{page.next_cursor}"
             
         except Exception as e:
             logger.error(f"Database fallback failed: {e}")
-            return []
+            return [], None
+    
+    def _get_report_detail(self, user: User, report: Dict[str, Any]) -> Dict[str, Any]:
+        """Load a report's content, which the history list leaves out"""
+        if 'content' in report:
+            return report
+        
+        try:
+            if report.get('source') == 'analysis_reports':
+                row = self.sessions.fetch_one("SELECT content FROM analysis_reports WHERE id = ? AND user_id = ?",
+                                         (report['id'], user.id))
+                return {**report, 'content': row['content'] if row else ''}
+            
+            session = self.sessions.get(report['id'], user.id)
+            if not session:
+                return {**report, 'content': ''}
+            
+            content = f"Score: {session.get('score')}%\nCategory: {session.get('match_category')}"
+            if session.get('job_description'):
+                content += f"\n\nJob Description:\n{session['job_description']}"
+            if session.get('analysis_result'):
+                try:
+                    result = json.dumps(json.loads(session['analysis_result']), indent=2)
+                except (TypeError, ValueError):
+                    result = session['analysis_result']
+                content += f"\n\nAnalysis:\n{result}"
+            return {**report, 'content': content}
+            
+        except Exception as e:
+            logger.error(f"Failed to load report {report.get('id')}: {e}")
+            return {**report, 'content': ''}
     
     def _render_reports_safe(self, user: User, reports: List[Dict[str, Any]]):
         """Render reports without causing state issues"""
@@ -131,28 +190,29 @@ class FixedReportHistoryUI:
             with st.expander(f"📄 {title} - {display_date}", expanded=False):
                 
                 # Report info
-                col1, col2 = st.columns([2, 1])
+                st.write(f"**Type:** {report.get('analysis_type', 'Unknown')}")
+                st.write(f"**Created:** {created_at}")
                 
-                with col1:
-                    st.write(f"**Type:** {report.get('analysis_type', 'Unknown')}")
-                    st.write(f"**Created:** {created_at}")
-                    
-                    # Show metadata if available
-                    metadata = report.get('metadata')
-                    if metadata:
-                        try:
-                            if isinstance(metadata, str):
-                                metadata = json.loads(metadata)
-                            if isinstance(metadata, dict):
-                                for key, value in metadata.items():
-                                    if key in ['score', 'category']:
-                                        st.write(f"**{key.title()}:** {value}")
-                        except:
-                            pass
+                # Show metadata if available
+                metadata = report.get('metadata')
+                if metadata:
+                    try:
+                        if isinstance(metadata, str):
+                            metadata = json.loads(metadata)
+                        if isinstance(metadata, dict):
+                            for key, value in metadata.items():
+                                if key in ['score', 'category']:
+                                    st.write(f"**{key.title()}:** {value}")
+                    except:
+                        pass
+                
+                # The content is only loaded for reports the user opens
+                if not st.checkbox("Show details", key=f"details_{report_key}"):
+                    continue
+                report = self._get_report_detail(user, report)
                 
-                with col2:
-                    # Download buttons that don't cause rerun
-                    self._render_download_buttons_safe(user, report, report_key)
+                # Download buttons that don't cause rerun
+                self._render_download_buttons_safe(user, report, report_key)
                 
                 # Show content preview
                 content = report.get('content', '')
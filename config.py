@@ -31,7 +31,15 @@ class Config:
     
     # AI Service
     PERPLEXITY_API_KEY: str = get_secret('PERPLEXITY_API_KEY', '')
-    
+    PERPLEXITY_REQUESTS_PER_MINUTE: int = int(get_secret('PERPLEXITY_REQUESTS_PER_MINUTE', '50'))
+
+    # Bulk Analysis
+    BULK_MAX_CONCURRENCY: int = int(get_secret('BULK_MAX_CONCURRENCY', '4'))
+
+    # Job Matching (one resume against many jobs)
+    JOB_MATCH_MAX_CONCURRENCY: int = int(get_secret('JOB_MATCH_MAX_CONCURRENCY', '8'))
+    JOB_MATCH_TASK_TIMEOUT: float = float(get_secret('JOB_MATCH_TASK_TIMEOUT', '90'))
+
     # Payment Gateway - Razorpay (Primary for India)
     RAZORPAY_KEY_ID: str = get_secret('RAZORPAY_KEY_ID', '')
     RAZORPAY_KEY_SECRET: str = get_secret('RAZORPAY_KEY_SECRET', '')
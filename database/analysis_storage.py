@@ -3,44 +3,38 @@ Analysis Storage Service
 Handles persistent storage of analysis results and reports
 """
 
-import sqlite3
 import json
 import uuid
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from pathlib import Path
 
 from auth.models import User
+from database.connection import DatabaseManager
+from database.repositories import AnalysisSessionRepository, Page
 
 class AnalysisStorage:
     """Service for storing and retrieving analysis results"""
     
-    def __init__(self):
-        self.db_path = 'data/app.db'
-        self.ensure_database()
+    # Columns listed in history; the stored result is loaded per analysis
+    SUMMARY_COLUMNS = ['id', 'resume_filename', 'score', 'match_category', 'created_at']
+    
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        # The table is created on first use, so importing this module (and
+        # building the global instance) doesn't touch the database
+        self._sessions = AnalysisSessionRepository(db)
+    
+    @property
+    def sessions(self) -> AnalysisSessionRepository:
+        """Sessions repository, with its table created on first use"""
+        self._sessions.ensure_table()
+        return self._sessions
     
     def ensure_database(self):
         """Ensure database and tables exist"""
-        Path('data').mkdir(exist_ok=True)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Create analysis sessions table if not exists
-            cursor.execute("""
-            CREATE TABLE IF NOT EXISTS analysis_sessions (
-                id TEXT PRIMARY KEY,
-                user_id TEXT NOT NULL,
-                resume_filename TEXT,
-                job_description TEXT,
-                analysis_result TEXT,
-                score INTEGER,
-                match_category TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-            """)
-            
-            conn.commit()
+        try:
+            self._sessions.ensure_table()
+        except Exception as e:
+            print(f"Error creating analysis tables: {e}")
     
     def save_analysis(self, user_id: str, resume_filename: str, 
                      job_description: str, analysis_result: Dict[str, Any]) -> str:
@@ -48,25 +42,16 @@ class AnalysisStorage:
         try:
             analysis_id = str(uuid.uuid4())
             
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                INSERT INTO analysis_sessions 
-                (id, user_id, resume_filename, job_description, analysis_result, score, match_category)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_id,
-                    user_id,
-                    resume_filename,
-                    job_description,
-                    json.dumps(analysis_result),
-                    analysis_result.get('score', 0),
-                    analysis_result.get('match_category', 'Unknown')
-                ))
-                
-                conn.commit()
-                return analysis_id
+            self.sessions.insert({
+                'id': analysis_id,
+                'user_id': user_id,
+                'resume_filename': resume_filename,
+                'job_description': job_description,
+                'analysis_result': json.dumps(analysis_result),
+                'score': analysis_result.get('score', 0),
+                'match_category': analysis_result.get('match_category', 'Unknown')
+            })
+            return analysis_id
                 
         except Exception as e:
             print(f"Error saving analysis: {e}")
@@ -75,54 +60,49 @@ class AnalysisStorage:
     def get_user_analyses(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Get all analyses for a user"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                SELECT * FROM analysis_sessions 
-                WHERE user_id = ? 
-                ORDER BY created_at DESC 
-                LIMIT ?
-                """, (user_id, limit))
-                
-                rows = cursor.fetchall()
-                
-                analyses = []
-                for row in rows:
-                    analysis = dict(row)
-                    # Parse JSON result
-                    if analysis['analysis_result']:
-                        analysis['analysis_result'] = json.loads(analysis['analysis_result'])
-                    analyses.append(analysis)
-                
-                return analyses
+            analyses = []
+            for analysis in self.sessions.list_for_user(user_id, limit):
+                # Parse JSON result
+                if analysis['analysis_result']:
+                    analysis['analysis_result'] = json.loads(analysis['analysis_result'])
+                analyses.append(analysis)
+            
+            return analyses
                 
         except Exception as e:
             print(f"Error getting user analyses: {e}")
             return []
     
+    def get_user_history(self, user_id: str, limit: int = 20, cursor: Optional[str] = None) -> Page:
+        """
+        Get a page of a user's analyses as summaries, newest first
+        
+        Args:
+            user_id: Owner of the analyses
+            limit: Page size
+            cursor: next_cursor of the previous page
+        
+        Returns:
+            Page of summary rows; get_analysis_by_id loads the full result
+        """
+        try:
+            return self.sessions.page_for_user(user_id, self.SUMMARY_COLUMNS, limit, cursor)
+                
+        except Exception as e:
+            print(f"Error getting user history: {e}")
+            return Page()
+    
     def get_analysis_by_id(self, analysis_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get specific analysis by ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                SELECT * FROM analysis_sessions 
-                WHERE id = ? AND user_id = ?
-                """, (analysis_id, user_id))
-                
-                row = cursor.fetchone()
-                
-                if row:
-                    analysis = dict(row)
-                    if analysis['analysis_result']:
-                        analysis['analysis_result'] = json.loads(analysis['analysis_result'])
-                    return analysis
-                
-                return None
+            analysis = self.sessions.get(analysis_id, user_id)
+            
+            if analysis:
+                if analysis['analysis_result']:
+                    analysis['analysis_result'] = json.loads(analysis['analysis_result'])
+                return analysis
+            
+            return None
                 
         except Exception as e:
             print(f"Error getting analysis by ID: {e}")
@@ -131,16 +111,7 @@ class AnalysisStorage:
     def delete_analysis(self, analysis_id: str, user_id: str) -> bool:
         """Delete an analysis"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                DELETE FROM analysis_sessions 
-                WHERE id = ? AND user_id = ?
-                """, (analysis_id, user_id))
-                
-                conn.commit()
-                return cursor.rowcount > 0
+            return self.sessions.delete(analysis_id, user_id) > 0
                 
         except Exception as e:
             print(f"Error deleting analysis: {e}")
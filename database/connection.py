@@ -4,7 +4,9 @@ Supports both PostgreSQL (production) and SQLite (development)
 """
 
 import os
+import time
 import sqlite3
+import threading
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
@@ -12,8 +14,19 @@ from typing import Optional, Dict, Any, List
 import logging
 from pathlib import Path
 
+from database.pool import ConnectionPool, PoolTimeout, ThreadLocalConnectionCache
+from database.query_stats import get_query_stats
+from database.statements import (STALE_STATEMENT_ERRORS, CompiledStatement, PreparedStatementConnection,
+                                 compile_statement, forget_prepared, prepared_form)
+from database.sqlite_profile import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
+# Each SQLite database's schema is checked once per process rather than on
+# every connection; holds the absolute paths of databases already checked
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
 class DatabaseConfig:
     """Database configuration management"""
     
@@ -36,6 +49,27 @@ class DatabaseConfig:
         self.pg_user = os.getenv('DB_USER', 'postgres')
         self.pg_password = os.getenv('DB_PASSWORD', '')
         
+        # Connection pooling (PostgreSQL pool; one cached connection per thread for SQLite)
+        self.pool_enabled = os.getenv('DB_POOL_ENABLED', 'true').lower() == 'true'
+        self.pool_min_size = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+        self.pool_max_size = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+        self.pool_max_lifetime = float(os.getenv('DB_POOL_MAX_LIFETIME', '1800'))
+        self.pool_health_check_interval = float(os.getenv('DB_POOL_HEALTH_CHECK_INTERVAL', '30'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+        
+        # Server-side prepared statements for statements run at least prepare_threshold times
+        # (PostgreSQL). 'auto' turns them off behind transaction-mode poolers like PgBouncer,
+        # where the next transaction may run on a server connection that never saw the PREPARE.
+        prepared = os.getenv('DB_PREPARED_STATEMENTS', 'auto').lower()
+        self.prepared_statements = (not self._uses_transaction_pooler() if prepared == 'auto'
+                                    else prepared == 'true')
+        self.prepare_threshold = int(os.getenv('DB_PREPARE_THRESHOLD', '5'))
+    
+    def _uses_transaction_pooler(self) -> bool:
+        """Whether the PostgreSQL URL points at a connection pooler rather than the server"""
+        url = self.database_url.lower()
+        return '-pooler' in url or 'pgbouncer' in url or ':6432/' in url or ':6543/' in url
+        
     def get_connection_params(self) -> Dict[str, Any]:
         """Get connection parameters based on configuration"""
         if self.database_url:
@@ -57,46 +91,138 @@ class DatabaseManager:
     def __init__(self, config: Optional[DatabaseConfig] = None):
         self.config = config or DatabaseConfig()
         self._connection = None
+        self._pg_pool: Optional[ConnectionPool] = None
+        self._sqlite_cache: Optional[ThreadLocalConnectionCache] = None
+        self._pool_lock = threading.Lock()
+        self._sqlite_dir_ready = None  # sqlite_path whose directory has been created
         
     @contextmanager
     def get_connection(self):
-        """Get database connection with automatic cleanup"""
+        """Borrow a database connection, returned to the pool (or closed) afterwards"""
         conn = None
+        release = None
+        discard = False
         try:
-            if self.config.db_type == 'postgresql':
-                conn = self._get_postgresql_connection()
-            else:
-                conn = self._get_sqlite_connection()
+            conn, release = self._borrow_connection()
             
             yield conn
             
         except Exception as e:
             if conn:
-                conn.rollback()
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                # A broken connection must not go back to the pool
+                discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
             logger.error(f"Database error: {e}")
             raise
         finally:
             if conn:
-                conn.close()
+                release(conn, discard)
+    
+    def _borrow_connection(self):
+        """
+        Get a connection and the function that gives it back
+        
+        Returns:
+            (connection, release) where release(connection, discard) returns
+            the connection to its pool, or closes it
+        """
+        if not self.config.pool_enabled:
+            if self.config.db_type == 'postgresql':
+                return self._get_postgresql_connection(), _close_connection
+            return self._get_sqlite_connection(), _close_connection
+        
+        if self.config.db_type == 'postgresql':
+            pool = self._get_postgresql_pool()
+            try:
+                return pool.acquire(), pool.release
+            except PoolTimeout:
+                raise
+            except Exception as e:
+                logger.warning(f"PostgreSQL connection failed: {e}. Falling back to SQLite.")
+                # Fallback to SQLite if PostgreSQL fails
+                self.config.db_type = 'sqlite'
+        
+        cache = self._get_sqlite_cache()
+        conn = cache.acquire()
+        if conn is None:
+            # This thread's connection is already in use further up the stack
+            return self._get_sqlite_connection(), _close_connection
+        return conn, cache.release
+    
+    def _get_postgresql_pool(self) -> ConnectionPool:
+        if self._pg_pool is None:
+            with self._pool_lock:
+                if self._pg_pool is None:
+                    self._pg_pool = ConnectionPool(
+                        self._connect_postgresql,
+                        min_size=self.config.pool_min_size,
+                        max_size=self.config.pool_max_size,
+                        max_lifetime=self.config.pool_max_lifetime,
+                        health_check_interval=self.config.pool_health_check_interval,
+                        timeout=self.config.pool_timeout
+                    )
+        return self._pg_pool
+    
+    def _get_sqlite_cache(self) -> ThreadLocalConnectionCache:
+        if self._sqlite_cache is None:
+            with self._pool_lock:
+                if self._sqlite_cache is None:
+                    self._sqlite_cache = ThreadLocalConnectionCache(
+                        self._get_sqlite_connection,
+                        max_lifetime=self.config.pool_max_lifetime,
+                        health_check_interval=self.config.pool_health_check_interval,
+                        identity=self._sqlite_file_identity
+                    )
+        return self._sqlite_cache
+    
+    def _sqlite_file_identity(self):
+        """Changes when the database file is deleted or replaced"""
+        stat = os.stat(self.config.sqlite_path)
+        return (stat.st_dev, stat.st_ino)
+    
+    def close_pool(self):
+        """Close pooled connections; the next query reconnects"""
+        if self._pg_pool is not None:
+            self._pg_pool.close_all()
+        if self._sqlite_cache is not None:
+            self._sqlite_cache.close_all()
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool counters for the active backend"""
+        if self.config.db_type == 'postgresql' and self._pg_pool is not None:
+            return dict(self._pg_pool.get_stats(), backend='postgresql')
+        if self._sqlite_cache is not None:
+            return dict(self._sqlite_cache.get_stats(), backend='sqlite')
+        return {'backend': self.config.db_type}
+    
+    def _connect_postgresql(self):
+        """Open a new PostgreSQL connection"""
+        factory = PreparedStatementConnection if self.config.prepared_statements else None
+        if self.config.database_url and (self.config.database_url.startswith('postgresql://') or self.config.database_url.startswith('postgres://')):
+            return psycopg2.connect(
+                self.config.database_url,
+                cursor_factory=RealDictCursor,
+                connection_factory=factory
+            )
+        else:
+            params = self.config.get_connection_params()
+            return psycopg2.connect(
+                host=params['host'],
+                port=params['port'],
+                database=params['database'],
+                user=params['user'],
+                password=params['password'],
+                cursor_factory=RealDictCursor,
+                connection_factory=factory
+            )
     
     def _get_postgresql_connection(self):
         """Create PostgreSQL connection"""
         try:
-            if self.config.database_url and (self.config.database_url.startswith('postgresql://') or self.config.database_url.startswith('postgres://')):
-                return psycopg2.connect(
-                    self.config.database_url,
-                    cursor_factory=RealDictCursor
-                )
-            else:
-                params = self.config.get_connection_params()
-                return psycopg2.connect(
-                    host=params['host'],
-                    port=params['port'],
-                    database=params['database'],
-                    user=params['user'],
-                    password=params['password'],
-                    cursor_factory=RealDictCursor
-                )
+            return self._connect_postgresql()
         except Exception as e:
             logger.warning(f"PostgreSQL connection failed: {e}. Falling back to SQLite.")
             # Fallback to SQLite if PostgreSQL fails
@@ -106,29 +232,44 @@ class DatabaseManager:
     def _get_sqlite_connection(self):
         """Create SQLite connection"""
         # Ensure directory exists
-        db_path = Path(self.config.sqlite_path)
-        db_path.parent.mkdir(parents=True, exist_ok=True)
+        if self._sqlite_dir_ready != self.config.sqlite_path:
+            Path(self.config.sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._sqlite_dir_ready = self.config.sqlite_path
         
-        # Initialize database if needed
+        # Initialize database if needed (a no-op after the first connection)
         self._ensure_database_initialized()
         
-        conn = sqlite3.connect(self.config.sqlite_path)
+        conn = connect_sqlite(self.config.sqlite_path)  # PRAGMAs from the shared tuning profile
         conn.row_factory = sqlite3.Row  # Enable dict-like access
         return conn
     
     def _ensure_database_initialized(self):
-        """Ensure database is initialized with all required tables"""
-        try:
-            from database.simple_init import ensure_database_exists
-            ensure_database_exists()
-        except Exception as e:
-            logger.error(f"Failed to initialize database: {e}")
+        """Ensure database is initialized with all required tables, once per process"""
+        db_path = os.path.abspath(self.config.sqlite_path)
+        if db_path in _schema_ready:
+            return
+        
+        with _schema_lock:
+            if db_path in _schema_ready:
+                return
+            try:
+                from database.simple_init import ensure_database_exists
+                # Retried on the next connection if it didn't succeed
+                if ensure_database_exists(self.config.sqlite_path):
+                    _schema_ready.add(db_path)
+            except Exception as e:
+                logger.error(f"Failed to initialize database: {e}")
     
     def _force_database_initialization(self):
         """Force database initialization when tables are missing"""
         try:
             from database.emergency_init import emergency_database_setup
-            success = emergency_database_setup()
+            success = emergency_database_setup(self.config.sqlite_path)
+            # The database file may have been recreated; don't reuse connections to the old one
+            self.close_pool()
+            with _schema_lock:
+                # Re-run migrations on the new file
+                _schema_ready.discard(os.path.abspath(self.config.sqlite_path))
             if not success:
                 raise Exception("Failed to create emergency database")
             logger.info("Database force-initialized successfully")
@@ -137,46 +278,41 @@ class DatabaseManager:
             raise
     
     
+    def _compile(self, query: str) -> CompiledStatement:
+        """Compile a statement for the backend in use (cached per statement text)"""
+        return compile_statement(query, 'postgresql' if self.config.db_type == 'postgresql' else 'sqlite')
+    
     def _convert_query_params(self, query, params):
-        """Convert query parameters based on database type"""
-        # Check the actual database type being used
-        if hasattr(self, 'config') and hasattr(self.config, 'db_type'):
-            if self.config.db_type == 'postgresql':
-                # Convert ? to %s for PostgreSQL
-                converted_query = query.replace('?', '%s')
-                logger.debug(f"PostgreSQL: Converted query: {query} -> {converted_query}")
-                return converted_query, params
-            else:
-                # Keep ? for SQLite
-                logger.debug(f"SQLite: Keeping query as-is: {query}")
-                return query, params
-        else:
-            # Fallback: check DATABASE_URL
-            database_url = os.getenv('DATABASE_URL', '')
-            if database_url and ('postgresql' in database_url.lower() or 'postgres' in database_url.lower()):
-                # Convert ? to %s for PostgreSQL
-                converted_query = query.replace('?', '%s')
-                logger.debug(f"PostgreSQL (fallback): Converted query: {query} -> {converted_query}")
-                return converted_query, params
-            else:
-                # Keep ? for SQLite
-                logger.debug(f"SQLite (fallback): Keeping query as-is: {query}")
-                return query, params
+        """Convert query placeholders (? or %s) to the style of the database in use"""
+        return self._compile(query).sql, params
+    
+    def _execute(self, cursor, query: str, params=None, fetch: Optional[str] = None, many: bool = False):
+        """
+        Compile a statement and run it on a cursor, as a prepared statement
+        once it is hot on PostgreSQL
+        
+        Args, Returns:
+            As _run_statement
+        """
+        compiled = self._compile(query)
+        params = params or ()
+        if many or self.config.db_type != 'postgresql' or not self.config.prepared_statements:
+            return _run_statement(cursor, compiled.sql, params, fetch, many)
+        
+        statement = prepared_form(cursor, compiled, self.config.prepare_threshold)
+        if statement is None:
+            return _run_statement(cursor, compiled.sql, params, fetch)
+        try:
+            return _run_statement(cursor, statement, params, fetch, label=compiled.sql)
+        except STALE_STATEMENT_ERRORS:
+            forget_prepared(cursor, compiled)
+            raise
 
     def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
         """Execute a SELECT query and return results"""
         try:
-            # Convert query parameters for database compatibility
-            converted_query, converted_params = self._convert_query_params(query, params or ())
-            
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(converted_query, converted_params)
-                
-                if self.config.db_type == 'postgresql' or self.config.database_url:
-                    return [dict(row) for row in cursor.fetchall()]
-                else:
-                    return [dict(row) for row in cursor.fetchall()]
+                return self._execute(conn.cursor(), query, params, fetch='all')
         except sqlite3.OperationalError as e:
             error_msg = str(e).lower()
             if "no such table" in error_msg or "no such column" in error_msg:
@@ -185,9 +321,7 @@ class DatabaseManager:
                 self._force_database_initialization()
                 # Retry the query
                 with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(query, params or ())
-                    return [dict(row) for row in cursor.fetchall()]
+                    return self._execute(conn.cursor(), query, params, fetch='all')
             else:
                 logger.error(f"Database error: {e}")
                 raise
@@ -195,14 +329,10 @@ class DatabaseManager:
     def execute_command(self, command: str, params: Optional[tuple] = None) -> int:
         """Execute an INSERT, UPDATE, or DELETE command"""
         try:
-            # Convert query parameters for database compatibility
-            converted_command, converted_params = self._convert_query_params(command, params or ())
-            
             with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(converted_command, converted_params)
+                rowcount = self._execute(conn.cursor(), command, params)
                 conn.commit()
-                return cursor.rowcount
+                return rowcount
         except sqlite3.OperationalError as e:
             error_msg = str(e).lower()
             if "no such table" in error_msg or "no such column" in error_msg:
@@ -211,21 +341,31 @@ class DatabaseManager:
                 self._force_database_initialization()
                 # Retry the command
                 with self.get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute(command, params or ())
+                    rowcount = self._execute(conn.cursor(), command, params)
                     conn.commit()
-                    return cursor.rowcount
+                    return rowcount
             else:
                 logger.error(f"Database error: {e}")
                 raise
     
+    @contextmanager
+    def transaction(self):
+        """
+        Run several statements on one connection and commit them together
+        
+        Yields:
+            Transaction; everything is rolled back if the block raises
+        """
+        with self.get_connection() as conn:
+            yield Transaction(self, conn)
+            conn.commit()
+    
     def execute_many(self, command: str, params_list: List[tuple]) -> int:
         """Execute multiple commands with different parameters"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.executemany(command, params_list)
+            rowcount = self._execute(conn.cursor(), command, params_list, many=True)
             conn.commit()
-            return cursor.rowcount
+            return rowcount
     
     def get_single_result(self, query: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
         """Execute query and return single result or None"""
@@ -269,6 +409,68 @@ class DatabaseManager:
         
         return self.execute_query(query, (table_name,))
 
+class Transaction:
+    """Statements on one borrowed connection, from DatabaseManager.transaction()"""
+    
+    def __init__(self, db: DatabaseManager, conn):
+        self._db = db
+        self.connection = conn
+        self._cursor = conn.cursor()
+    
+    def execute(self, command: str, params: Optional[tuple] = None) -> int:
+        """Execute a statement and return the number of rows it affected"""
+        return self._db._execute(self._cursor, command, params)
+    
+    def query(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results"""
+        return self._db._execute(self._cursor, query, params, fetch='all')
+    
+    def query_one(self, query: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """Execute a query and return the first row or None"""
+        return self._db._execute(self._cursor, query, params, fetch='one')
+
+def _run_statement(cursor, statement: str, params, fetch: Optional[str] = None, many: bool = False,
+                   label: Optional[str] = None):
+    """
+    Execute a statement on a cursor and record it in the query statistics
+    
+    Args:
+        cursor: Cursor to execute on
+        statement: SQL already converted for the backend
+        params: Parameters, or a list of parameter tuples when many is set
+        fetch: 'all' to return every row as a dict, 'one' for the first row or None
+        many: Use executemany
+        label: Statement to record in the query statistics, if not statement itself
+    
+    Returns:
+        The fetched rows, or the number of rows affected when fetch is None
+    """
+    stats = get_query_stats()
+    start = time.perf_counter()
+    try:
+        if many:
+            cursor.executemany(statement, params)
+        else:
+            cursor.execute(statement, params)
+        if fetch == 'all':
+            result = [dict(row) for row in cursor.fetchall()]
+            rows = len(result)
+        elif fetch == 'one':
+            row = cursor.fetchone()
+            result = dict(row) if row is not None else None
+            rows = int(result is not None)
+        else:
+            result = rows = cursor.rowcount
+    except Exception:
+        stats.record(label or statement, time.perf_counter() - start, error=True)
+        raise
+    stats.record(label or statement, time.perf_counter() - start, rows)
+    return result
+
+def _close_connection(conn, discard: bool = False):
+    """Release function for connections that aren't pooled"""
+    conn.close()
+
 class MigrationManager:
     """Database migration management"""
     
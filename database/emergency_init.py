@@ -3,22 +3,20 @@ Emergency Database Initialization - COMPLETE VERSION
 Ultra-simple database setup that works on any environment with ALL required tables
 """
 
-import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite, remove_database_files
+
 logger = logging.getLogger(__name__)
 
-def emergency_database_setup():
+def emergency_database_setup(db_path='data/app.db'):
     """Create the most basic database schema that works everywhere"""
     try:
         # Ensure data directory exists
-        data_dir = Path('data')
-        data_dir.mkdir(exist_ok=True)
-        
-        db_path = 'data/app.db'
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        with sqlite3.connect(db_path) as conn:
+        with connect_sqlite(db_path) as conn:
             cursor = conn.cursor()
             
             # Create users table (minimal)
@@ -220,13 +218,13 @@ def force_clean_database():
     try:
         db_path = 'data/app.db'
         
-        # Remove existing database
+        # Remove existing database (and its WAL files, which would otherwise be replayed into the new one)
         if Path(db_path).exists():
-            Path(db_path).unlink()
+            remove_database_files(db_path)
             logger.info("Removed existing database")
         
         # Create fresh database
-        return emergency_database_setup()
+        return emergency_database_setup(db_path)
         
     except Exception as e:
         logger.error(f"Force clean database failed: {e}")
@@ -3,10 +3,11 @@ Database Health Check for Streamlit Cloud
 Ensures database is working before app starts
 """
 
-import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite, remove_database_files
+
 logger = logging.getLogger(__name__)
 
 def check_and_fix_database():
@@ -19,7 +20,7 @@ def check_and_fix_database():
         db_path = 'data/app.db'
         
         # Test database connection and tables
-        with sqlite3.connect(db_path) as conn:
+        with connect_sqlite(db_path) as conn:
             cursor = conn.cursor()
             
             # Check if users table exists
@@ -162,10 +163,10 @@ def create_database_schema_from_scratch():
     
     # Remove existing database if corrupted
     if Path(db_path).exists():
-        Path(db_path).unlink()
+        remove_database_files(db_path)
     
     # Create new database
-    with sqlite3.connect(db_path) as conn:
+    with connect_sqlite(db_path) as conn:
         create_database_schema(conn)
 
 # Run health check when imported
@@ -4,10 +4,11 @@ Automatically creates database schema on app startup
 """
 
 import os
-import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
 def init_database_for_streamlit():
@@ -20,7 +21,7 @@ def init_database_for_streamlit():
         db_path = 'data/app.db'
         
         # Create database with all required tables
-        with sqlite3.connect(db_path) as conn:
+        with connect_sqlite(db_path) as conn:
             cursor = conn.cursor()
             
             # Enable foreign keys
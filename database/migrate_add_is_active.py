@@ -2,22 +2,21 @@
 Database Migration: Add is_active column to users table
 """
 
-import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
-def add_is_active_column():
+def add_is_active_column(db_path='data/app.db'):
     """Add is_active column to tables if it doesn't exist"""
     try:
-        db_path = 'data/app.db'
-        
         if not Path(db_path).exists():
             logger.info("Database doesn't exist, skipping migration")
             return True
         
-        with sqlite3.connect(db_path) as conn:
+        with connect_sqlite(db_path) as conn:
             cursor = conn.cursor()
             
             # Add is_active to users table
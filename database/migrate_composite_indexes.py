@@ -0,0 +1,93 @@
+"""
+Database Migration: Composite indexes for the hot queries
+Each index holds a query's filter columns followed by its sort columns, so the query is one index seek
+
+Usage:
+    python -m database.migrate_composite_indexes
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from database.connection import DatabaseManager
+from database.repositories import Repository, UsageRepository
+from database.sqlite_profile import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+# (index, table, columns); test_query_plans.py checks the queries use them
+HOT_QUERY_INDEXES = (
+    # MemoryRateLimiter._seed; quantity is included so SUM(quantity) reads only the index
+    ('idx_usage_events_user_type_time', 'usage_events', ('user_id', 'event_type', 'timestamp', 'quantity')),
+    # SubscriptionService.get_user_subscription: the user's newest active subscription
+    ('idx_subscriptions_user_status_created', 'subscriptions', ('user_id', 'status', 'created_at')),
+    # AnalysisSessionRepository.page_for_user: history pages, newest first
+    ('idx_analysis_sessions_user_created', 'analysis_sessions', ('user_id', 'created_at', 'id')),
+)
+
+def index_statements(tables: Iterable[str]) -> List[str]:
+    """CREATE INDEX statements for the hot query indexes on the given tables"""
+    tables = set(tables)
+    return [f"CREATE INDEX IF NOT EXISTS {name} ON {table}({', '.join(columns)})"
+            for name, table, columns in HOT_QUERY_INDEXES if table in tables]
+
+def add_composite_indexes(db_path='data/app.db'):
+    """Add the composite indexes to the SQLite database (run by simple_init)"""
+    try:
+        if not Path(db_path).exists():
+            logger.info("Database doesn't exist, skipping migration")
+            return True
+
+        with connect_sqlite(db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            for statement in index_statements(row[0] for row in cursor.fetchall()):
+                cursor.execute(statement)
+            conn.commit()
+
+        return True
+
+    except Exception as e:
+        logger.error(f"Failed to add composite indexes: {e}")
+        return False
+
+def create_composite_indexes(db: Optional[DatabaseManager] = None) -> List[str]:
+    """
+    Add the composite indexes on either backend
+
+    Tables that don't exist yet are skipped; the code that creates them adds
+    the index as well. On PostgreSQL CREATE INDEX blocks writes to the table
+    while it runs, so run this outside peak hours on large tables.
+
+    Args:
+        db: Database to migrate (the global one by default)
+
+    Returns:
+        Names of the indexes that are now in place
+    """
+    repository = Repository(db)
+    tables = {table for _, table, _ in HOT_QUERY_INDEXES if repository.table_columns(table)}
+    for statement in index_statements(tables):
+        repository.execute(statement)
+    created = [name for name, table, _ in HOT_QUERY_INDEXES if table in tables]
+
+    # usage_tracking lookups use the unique (user_id, period_start) key, which
+    # the repository adds after merging duplicate periods
+    if repository.table_columns('usage_tracking'):
+        UsageRepository(db).ensure_table()
+        created.append('idx_usage_tracking_user_period')
+
+    return created
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    created = create_composite_indexes(DatabaseManager())
+    print(f"Indexes in place: {', '.join(created) or 'none (tables not created yet)'}")
+
+if __name__ == "__main__":
+    main()
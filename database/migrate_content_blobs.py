@@ -0,0 +1,94 @@
+"""
+Database Migration: Move job descriptions and resumes into content_blobs
+Rows keep a hash reference; each distinct text is stored once, compressed
+
+Usage:
+    python -m database.migrate_content_blobs
+    python -m database.migrate_content_blobs --batch-size 500 --vacuum
+"""
+
+import argparse
+import logging
+from typing import Any, Dict, Optional
+
+from database.connection import DatabaseManager
+from database.repositories import AnalysisSessionRepository
+
+logger = logging.getLogger(__name__)
+
+def migrate_content_blobs(db: Optional[DatabaseManager] = None, batch_size: int = 200) -> Dict[str, Any]:
+    """
+    Convert analysis_sessions rows that still hold their content inline
+
+    Safe to re-run: rows that already reference a blob are skipped, so rows
+    written by code that bypasses the repository are picked up next time.
+
+    Args:
+        db: Database to migrate (the global one by default)
+        batch_size: Rows read per query
+
+    Returns:
+        Rows converted, and the inline bytes moved out of analysis_sessions
+    """
+    sessions = AnalysisSessionRepository(db)
+    content_columns = sessions.ensure_content_columns()
+    stats = {'rows': 0, 'bytes': 0, 'blobs_before': 0, 'blobs_after': 0}
+    if not content_columns:
+        logger.info("analysis_sessions has no content columns, nothing to migrate")
+        return stats
+
+    sessions.blobs.ensure_table()
+    stats['blobs_before'] = sessions.fetch_value("SELECT COUNT(*) FROM content_blobs", default=0)
+
+    pending = ' OR '.join(f"({column} IS NOT NULL AND {column} <> '' AND {column}_hash IS NULL)"
+                          for column in content_columns)
+    last_id = ''
+    while True:
+        rows = sessions.fetch_all(f"""
+            SELECT id, {', '.join(content_columns)}, {', '.join(f"{column}_hash" for column in content_columns)}
+            FROM analysis_sessions
+            WHERE id > ? AND ({pending})
+            ORDER BY id
+            LIMIT ?
+        """, (last_id, batch_size))
+        if not rows:
+            break
+
+        for row in rows:
+            fields = {column: row[column] for column in content_columns
+                      if row[column] and not row[f"{column}_hash"]}
+            # Only rows still unconverted, in case the app rewrote one meanwhile
+            conditions = ' AND '.join(f"{column}_hash IS NULL" for column in fields)
+            stored = sessions.store_content(fields)
+            assignments = ', '.join(f"{column} = ?" for column in stored)
+            sessions.execute(f"UPDATE analysis_sessions SET {assignments} WHERE id = ? AND {conditions}",
+                             tuple(stored.values()) + (row['id'],))
+            stats['rows'] += 1
+            stats['bytes'] += sum(len(text.encode('utf-8')) for text in fields.values())
+        last_id = rows[-1]['id']
+        logger.info(f"Moved content of {stats['rows']} analyses to content_blobs")
+
+    stats['blobs_after'] = sessions.fetch_value("SELECT COUNT(*) FROM content_blobs", default=0)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--batch-size', type=int, default=200, help="Rows read per query")
+    parser.add_argument('--vacuum', action='store_true', help="Reclaim the freed space afterwards (SQLite)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    db = DatabaseManager()
+    stats = migrate_content_blobs(db, args.batch_size)
+    print(f"Converted {stats['rows']} analyses ({stats['bytes'] / 1024:.0f} KB of inline text); "
+          f"content_blobs now holds {stats['blobs_after']} texts ({stats['blobs_before']} before)")
+
+    if args.vacuum and db.config.db_type != 'postgresql':
+        db.close_pool()
+        with db.get_connection() as conn:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # VACUUM's output sits in the WAL until then
+        print("Database vacuumed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Database Migration: Fill usage_daily_rollups from usage_events
+Per-user, per-event-type, per-day totals that billing period queries read instead of raw events
+
+The table is filled automatically when it is first created; run this to
+rebuild it, e.g. after events were written or deleted by hand.
+
+Usage:
+    python -m database.migrate_usage_rollups
+    python -m database.migrate_usage_rollups --since 2024-06-01
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from database.connection import DatabaseManager
+from database.repositories import UsageEventRepository
+
+logger = logging.getLogger(__name__)
+
+def backfill_usage_rollups(db: Optional[DatabaseManager] = None,
+                           since: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Rebuild the daily usage rollups from the raw events
+
+    Safe to re-run: the affected days are recomputed from scratch in one
+    transaction rather than added to.
+
+    Args:
+        db: Database to migrate (the global one by default)
+        since: Only rebuild from this day on (every day by default)
+
+    Returns:
+        Events rolled up and rollup rows written
+    """
+    events = UsageEventRepository(db)
+    if not events.table_columns('usage_events'):
+        logger.info("usage_events doesn't exist yet, nothing to roll up")
+        return {'events': 0, 'rollups': 0}
+
+    events.ensure_table()
+    # Anonymous events have no rollup, so they aren't counted either
+    where, params = ('AND timestamp >= ?', (datetime.combine(since.date(), datetime.min.time()),)) \
+        if since else ('', None)
+    stats = {'events': events.fetch_value(f"SELECT COUNT(*) FROM usage_events WHERE user_id IS NOT NULL {where}",
+                                          params, default=0)}
+    stats['rollups'] = events.backfill(since)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--since', type=datetime.fromisoformat, default=None,
+                        help="Only rebuild days from this date on (YYYY-MM-DD)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    stats = backfill_usage_rollups(DatabaseManager(), args.since)
+    print(f"Rolled up {stats['events']} usage events into {stats['rollups']} daily rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""
+Connection pools for DatabaseManager
+Reuse connections across queries instead of connecting for every statement
+"""
+
+import os
+import threading
+import time
+import logging
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections
+
+    Connections are opened on demand up to max_size, and min_size of them are
+    kept open once the pool is first used. A borrower that finds the pool
+    exhausted waits up to timeout seconds for a connection to come back.
+    Connections older than max_lifetime are closed instead of reused, and a
+    connection that sat idle for longer than health_check_interval is checked
+    with a trivial query before it is handed out.
+    """
+
+    def __init__(self, connect: Callable[[], Any], min_size: int = 1, max_size: int = 10,
+                 max_lifetime: float = 1800.0, health_check_interval: float = 30.0,
+                 timeout: float = 30.0):
+        """
+        Args:
+            connect: Opens a new connection
+            min_size: Connections kept open once the pool is in use
+            max_size: Most connections open at once
+            max_lifetime: Seconds after which a connection is replaced
+            health_check_interval: Idle seconds after which a connection is pinged before reuse
+            timeout: Seconds to wait for a connection when the pool is exhausted
+        """
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max(1, max_size)
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle: deque = deque()  # (connection, created_at, returned_at)
+        self._created_at: Dict[int, float] = {}
+        self._generations: Dict[int, int] = {}
+        self._generation = 0  # Bumped by close_all() to retire borrowed connections
+        self._size = 0
+        self._warmed = False
+        self._pid = os.getpid()
+        self._stats = {'connections_opened': 0, 'connections_closed': 0, 'acquired': 0,
+                       'waits': 0, 'failed_health_checks': 0}
+
+    def acquire(self):
+        """
+        Borrow a connection
+
+        Raises:
+            PoolTimeout: If the pool stayed exhausted for timeout seconds
+        """
+        self._check_fork()
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            with self._condition:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No database connection available after {self.timeout:.0f}s "
+                                          f"(pool size {self.max_size})")
+                    self._stats['waits'] += 1
+                    self._condition.wait(remaining)
+
+                if self._idle:
+                    conn, created_at, returned_at = self._idle.pop()
+                else:
+                    conn = None
+                    self._size += 1  # Reserve the slot before connecting outside the lock
+
+            if conn is None:
+                conn = self._open()
+                self._warm_up()
+                break
+
+            if self._usable(conn, created_at, returned_at):
+                break
+            self._discard(conn)
+
+        with self._condition:
+            self._stats['acquired'] += 1
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """
+        Return a borrowed connection
+
+        Args:
+            conn: Connection from acquire()
+            discard: Close the connection instead of reusing it (e.g. after a connection error)
+        """
+        if os.getpid() != self._pid:
+            return  # Borrowed before a fork; the new process has its own pool
+
+        created_at = self._created_at.get(id(conn), 0.0)
+        retired = self._generations.get(id(conn)) != self._generation
+        if discard or retired or getattr(conn, 'closed', False) or self._expired(created_at):
+            self._discard(conn)
+            return
+
+        try:
+            # Never hand out a connection in the middle of a transaction
+            conn.rollback()
+            if getattr(conn, 'autocommit', False):
+                conn.autocommit = False
+        except Exception as e:
+            logger.debug(f"Discarding connection that failed to reset: {e}")
+            self._discard(conn)
+            return
+
+        with self._condition:
+            self._idle.append((conn, created_at, time.monotonic()))
+            self._condition.notify()
+
+    def close_all(self) -> None:
+        """Close idle connections; connections currently borrowed are closed when returned"""
+        with self._condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._warmed = False
+            self._generation += 1
+
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool size and usage counters"""
+        with self._condition:
+            return dict(self._stats, size=self._size, idle=len(self._idle),
+                        in_use=self._size - len(self._idle), max_size=self.max_size)
+
+    def _open(self):
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._created_at[id(conn)] = time.monotonic()
+            self._generations[id(conn)] = self._generation
+            self._stats['connections_opened'] += 1
+        return conn
+
+    def _warm_up(self) -> None:
+        """Open connections up to min_size the first time the pool is used"""
+        with self._condition:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = self.min_size - self._size
+            self._size += max(0, missing)
+
+        for _ in range(max(0, missing)):
+            try:
+                conn = self._open()
+            except Exception as e:
+                logger.warning(f"Could not pre-open pooled connection: {e}")
+                continue
+            with self._condition:
+                self._idle.appendleft((conn, self._created_at[id(conn)], time.monotonic()))
+                self._condition.notify()
+
+    def _usable(self, conn, created_at: float, returned_at: float) -> bool:
+        if getattr(conn, 'closed', False) or self._expired(created_at):
+            return False
+        if time.monotonic() - returned_at < self.health_check_interval:
+            return True
+
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception as e:
+            logger.info(f"Dropping pooled connection that failed its health check: {e}")
+            with self._condition:
+                self._stats['failed_health_checks'] += 1
+            return False
+
+    def _expired(self, created_at: float) -> bool:
+        return bool(self.max_lifetime) and time.monotonic() - created_at >= self.max_lifetime
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._created_at.pop(id(conn), None)
+            self._generations.pop(id(conn), None)
+            self._size -= 1
+            self._stats['connections_closed'] += 1
+            self._condition.notify()
+
+    def _check_fork(self) -> None:
+        """Forget connections inherited from a parent process; they belong to it"""
+        if os.getpid() == self._pid:
+            return
+        with self._condition:
+            if os.getpid() != self._pid:
+                self._pid = os.getpid()
+                self._idle.clear()
+                self._created_at.clear()
+                self._generations.clear()
+                self._size = 0
+                self._warmed = False
+
+class ThreadLocalConnectionCache:
+    """
+    One cached connection per thread, for SQLite
+
+    SQLite connections can't be shared between threads and opening one is
+    cheap, so each thread keeps its own and reuses it. The connection is
+    replaced after max_lifetime seconds, after close_all(), or when a health
+    check (run after health_check_interval idle seconds) finds it unusable,
+    e.g. because the database file was replaced.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_lifetime: float = 1800.0,
+                 health_check_interval: float = 30.0, identity: Optional[Callable[[], Any]] = None):
+        """
+        Args:
+            connect: Opens a new connection
+            max_lifetime: Seconds after which a thread's connection is replaced
+            health_check_interval: Idle seconds after which a connection is checked before reuse
+            identity: Returns something that changes when the database is replaced
+                (e.g. the file's inode); checked along with a trivial query
+        """
+        self._connect = connect
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self._identity = identity
+        self._local = threading.local()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'connections_opened': 0, 'reused': 0, 'failed_health_checks': 0}
+
+    def acquire(self):
+        """
+        Get this thread's connection, or None if it is already in use further
+        up the stack (the caller should then use a separate connection)
+        """
+        local = self._local
+        if getattr(local, 'in_use', False):
+            return None
+
+        conn = getattr(local, 'conn', None)
+        if conn is not None and not self._usable(local):
+            self._close_local()
+            conn = None
+
+        if conn is None:
+            conn = self._connect()
+            local.conn = conn
+            local.created_at = time.monotonic()
+            local.generation = self._generation
+            local.identity = self._identity() if self._identity else None
+            with self._lock:
+                self._stats['connections_opened'] += 1
+        else:
+            with self._lock:
+                self._stats['reused'] += 1
+
+        local.in_use = True
+        return conn
+
+    def release(self, conn, discard: bool = False) -> None:
+        """Hand this thread's connection back"""
+        local = self._local
+        local.in_use = False
+        local.returned_at = time.monotonic()
+        if getattr(local, 'conn', None) is not conn:
+            return
+
+        try:
+            # Uncommitted changes used to be dropped when the connection closed
+            if not discard and getattr(conn, 'in_transaction', False):
+                conn.rollback()
+        except Exception:
+            discard = True
+
+        if discard:
+            self._close_local()
+
+    def close_all(self) -> None:
+        """Close this thread's connection and make other threads reconnect on next use"""
+        with self._lock:
+            self._generation += 1
+        self._close_local()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get usage counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def _usable(self, local) -> bool:
+        now = time.monotonic()
+        if local.generation != self._generation:
+            return False
+        if self.max_lifetime and now - local.created_at >= self.max_lifetime:
+            return False
+        if now - getattr(local, 'returned_at', now) < self.health_check_interval:
+            return True
+
+        try:
+            if self._identity and self._identity() != local.identity:
+                raise RuntimeError("database file was replaced")
+            local.conn.execute("SELECT 1").fetchone()
+            return True
+        except Exception as e:
+            logger.info(f"Replacing cached connection that failed its health check: {e}")
+            with self._lock:
+                self._stats['failed_health_checks'] += 1
+            return False
+
+    def _close_local(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
@@ -8,6 +8,8 @@ import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
 class ProductionDatabaseManager:
@@ -65,7 +67,7 @@ class ProductionDatabaseManager:
             import psycopg2
             return psycopg2.connect(**self.connection_params)
         else:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect_sqlite(self.db_path)
             conn.row_factory = sqlite3.Row
             return conn
     
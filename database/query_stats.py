@@ -0,0 +1,302 @@
+"""
+Query Instrumentation
+Per-statement timings, row counts and call sites for DatabaseManager, plus a slow-query log
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Statements beyond max_statements are counted under this fingerprint
+OTHER_STATEMENT = '<other>'
+
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.S)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w.])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_VALUE_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+@lru_cache(maxsize=2048)
+def fingerprint(sql: str) -> str:
+    """
+    Normalize a statement so that executions differing only in literal values
+    or placeholder style share one key
+
+    Literals and placeholders become ?, lists of them become (?, ...), and
+    comments and runs of whitespace are removed.
+    """
+    normalized = _COMMENT.sub(' ', sql)
+    normalized = _STRING.sub('?', normalized)
+    normalized = _NUMBER.sub('?', normalized)
+    normalized = _PLACEHOLDER.sub('?', normalized)
+    normalized = _WHITESPACE.sub(' ', normalized).strip().rstrip(';').strip()
+    return _VALUE_LIST.sub('(?, ...)', normalized)
+
+def fingerprint_id(statement: str) -> str:
+    """Short stable ID for a fingerprint, used as a metrics label"""
+    return hashlib.sha1(statement.encode('utf-8')).hexdigest()[:12]
+
+# Frames in these files are part of the database layer, not the caller
+_INTERNAL_FILES = {
+    os.path.join('database', 'connection.py'),
+    os.path.join('database', 'repositories.py'),
+    os.path.join('database', 'query_stats.py'),
+    'contextlib.py',
+}
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _call_site() -> str:
+    """The first frame outside the database layer, as 'path:line function'"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not any(filename.endswith(internal) for internal in _INTERNAL_FILES):
+            if filename.startswith(_ROOT):
+                filename = os.path.relpath(filename, _ROOT)
+            return f"{filename}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+class _StatementStats:
+    """Running totals for one fingerprint"""
+
+    __slots__ = ('statement', 'calls', 'errors', 'rows', 'total_time', 'max_time', 'buckets', 'call_sites')
+
+    def __init__(self, statement: str):
+        self.statement = statement
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.call_sites: Dict[str, int] = {}
+
+    def to_dict(self, call_sites: int = 3) -> Dict[str, Any]:
+        top_sites = sorted(self.call_sites.items(), key=lambda item: item[1], reverse=True)[:call_sites]
+        return {
+            'fingerprint': fingerprint_id(self.statement),
+            'statement': self.statement,
+            'calls': self.calls,
+            'errors': self.errors,
+            'rows': self.rows,
+            'total_ms': round(self.total_time * 1000, 3),
+            'mean_ms': round(self.total_time * 1000 / self.calls, 3) if self.calls else 0.0,
+            'max_ms': round(self.max_time * 1000, 3),
+            'call_sites': [{'call_site': site, 'calls': calls} for site, calls in top_sites]
+        }
+
+class QueryStats:
+    """
+    In-process statistics of executed SQL statements
+
+    Each execution is recorded under its fingerprint: call count, errors,
+    rows returned or affected, total and maximum time, a latency histogram
+    and the calling code locations. Executions slower than slow_query_ms are
+    logged and kept in a bounded slow-query log.
+    """
+
+    MAX_CALL_SITES = 20  # Distinct call sites kept per statement
+
+    def __init__(self, enabled: bool = True, slow_query_ms: float = 250.0,
+                 slow_log_size: int = 200, max_statements: int = 500):
+        """
+        Args:
+            enabled: Record statements at all
+            slow_query_ms: Executions at least this slow go to the slow-query log (0 disables)
+            slow_log_size: Number of slow executions kept
+            max_statements: Distinct fingerprints tracked before new ones are lumped together
+        """
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._slow_log: deque = deque(maxlen=slow_log_size)
+        self._started_at = time.time()
+
+    def record(self, sql: str, duration: float, rows: int = 0, error: bool = False) -> None:
+        """
+        Record one execution
+
+        Args:
+            sql: Statement text as executed
+            duration: Seconds spent executing (and fetching)
+            rows: Rows returned or affected
+            error: Whether the statement raised
+        """
+        if not self.enabled:
+            return
+
+        statement = fingerprint(sql)
+        call_site = _call_site()
+        bucket = next((i for i, bound in enumerate(BUCKETS) if duration <= bound), len(BUCKETS))
+        rows = max(rows or 0, 0)
+
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                if len(self._statements) >= self.max_statements:
+                    statement = OTHER_STATEMENT
+                    stats = self._statements.get(statement)
+                if stats is None:
+                    stats = self._statements[statement] = _StatementStats(statement)
+
+            stats.calls += 1
+            stats.rows += rows
+            stats.total_time += duration
+            stats.max_time = max(stats.max_time, duration)
+            stats.buckets[bucket] += 1
+            if error:
+                stats.errors += 1
+            if call_site in stats.call_sites or len(stats.call_sites) < self.MAX_CALL_SITES:
+                stats.call_sites[call_site] = stats.call_sites.get(call_site, 0) + 1
+
+            slow = self.slow_query_ms and duration * 1000 >= self.slow_query_ms
+            if slow:
+                self._slow_log.append({
+                    'timestamp': datetime.now().isoformat(),
+                    'fingerprint': fingerprint_id(statement),
+                    'statement': statement,
+                    'duration_ms': round(duration * 1000, 3),
+                    'rows': rows,
+                    'error': error,
+                    'call_site': call_site
+                })
+
+        if slow:
+            logger.warning(f"Slow query ({duration * 1000:.0f}ms, {rows} rows) at {call_site}: {statement[:200]}")
+
+    def top(self, limit: int = 10, by: str = 'total_ms') -> List[Dict[str, Any]]:
+        """
+        Statements with the highest value of a metric
+
+        Args:
+            limit: Number of statements
+            by: One of total_ms, mean_ms, max_ms, calls, rows, errors
+        """
+        if by not in ('total_ms', 'mean_ms', 'max_ms', 'calls', 'rows', 'errors'):
+            raise ValueError(f"Unknown query statistic: {by}")
+        with self._lock:
+            statements = [stats.to_dict() for stats in self._statements.values()]
+        statements.sort(key=lambda stats: stats[by], reverse=True)
+        return statements[:limit]
+
+    def slow_queries(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Most recent slow executions, newest first"""
+        with self._lock:
+            entries = list(self._slow_log)
+        entries.reverse()
+        return entries[:limit] if limit else entries
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Totals across all statements"""
+        with self._lock:
+            statements = list(self._statements.values())
+            slow = len(self._slow_log)
+        calls = sum(stats.calls for stats in statements)
+        total_time = sum(stats.total_time for stats in statements)
+        return {
+            'statements': len(statements),
+            'calls': calls,
+            'errors': sum(stats.errors for stats in statements),
+            'total_ms': round(total_time * 1000, 3),
+            'mean_ms': round(total_time * 1000 / calls, 3) if calls else 0.0,
+            'slow_queries': slow,
+            'slow_query_ms': self.slow_query_ms,
+            'since': datetime.fromtimestamp(self._started_at).isoformat()
+        }
+
+    def to_json(self, limit: Optional[int] = None) -> str:
+        """Export statistics, histograms included, as a JSON document"""
+        with self._lock:
+            statements = []
+            for stats in self._statements.values():
+                entry = stats.to_dict(call_sites=self.MAX_CALL_SITES)
+                entry['histogram'] = {
+                    ('+Inf' if i == len(BUCKETS) else str(BUCKETS[i])): count
+                    for i, count in enumerate(stats.buckets)
+                }
+                statements.append(entry)
+        statements.sort(key=lambda stats: stats['total_ms'], reverse=True)
+
+        return json.dumps({
+            'summary': self.get_summary(),
+            'statements': statements[:limit] if limit else statements,
+            'slow_queries': self.slow_queries()
+        }, indent=2)
+
+    def to_prometheus(self) -> str:
+        """Export statistics in the Prometheus text exposition format"""
+        with self._lock:
+            snapshot = [(stats.statement, stats.calls, stats.errors, stats.rows, stats.total_time,
+                         list(stats.buckets)) for stats in self._statements.values()]
+
+        lines = [
+            '# HELP db_query_duration_seconds Time spent executing SQL statements',
+            '# TYPE db_query_duration_seconds histogram',
+        ]
+        for statement, calls, _, _, total_time, buckets in snapshot:
+            labels = _prometheus_labels(statement)
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float('inf'),), buckets):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'db_query_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'db_query_duration_seconds_sum{{{labels}}} {total_time:.6f}')
+            lines.append(f'db_query_duration_seconds_count{{{labels}}} {calls}')
+
+        lines += ['# HELP db_query_rows_total Rows returned or affected by SQL statements',
+                  '# TYPE db_query_rows_total counter']
+        lines += [f'db_query_rows_total{{{_prometheus_labels(statement)}}} {rows}'
+                  for statement, _, _, rows, _, _ in snapshot]
+
+        lines += ['# HELP db_query_errors_total SQL statements that raised an error',
+                  '# TYPE db_query_errors_total counter']
+        lines += [f'db_query_errors_total{{{_prometheus_labels(statement)}}} {errors}'
+                  for statement, _, errors, _, _, _ in snapshot]
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        """Forget all recorded statements"""
+        with self._lock:
+            self._statements.clear()
+            self._slow_log.clear()
+            self._started_at = time.time()
+
+def _prometheus_labels(statement: str) -> str:
+    text = statement[:200].replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+    return f'fingerprint="{fingerprint_id(statement)}",statement="{text}"'
+
+_query_stats: Optional[QueryStats] = None
+_query_stats_lock = threading.Lock()
+
+def get_query_stats() -> QueryStats:
+    """Get the process-wide query statistics, configured from the environment on first use"""
+    global _query_stats
+    if _query_stats is None:
+        with _query_stats_lock:
+            if _query_stats is None:
+                _query_stats = QueryStats(
+                    enabled=os.getenv('DB_QUERY_STATS_ENABLED', 'true').lower() == 'true',
+                    slow_query_ms=float(os.getenv('DB_SLOW_QUERY_MS', '250')),
+                    slow_log_size=int(os.getenv('DB_SLOW_QUERY_LOG_SIZE', '200')),
+                    max_statements=int(os.getenv('DB_QUERY_STATS_MAX_STATEMENTS', '500'))
+                )
+    return _query_stats
@@ -0,0 +1,776 @@
+"""
+Data Access Repositories
+Storage modules query through these instead of opening their own connections
+"""
+
+import os
+import re
+import json
+import zlib
+import uuid
+import base64
+import hashlib
+import sqlite3
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from database.connection import DatabaseManager, get_db
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# INSERT ... RETURNING needs SQLite 3.35; older system libraries (Debian bullseye ships 3.34) read back separately
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def _check_columns(columns: Iterable[str]) -> List[str]:
+    """Column names end up in SQL text, so only plain identifiers are allowed"""
+    columns = list(columns)
+    for column in columns:
+        if not _IDENTIFIER.match(column):
+            raise ValueError(f"Invalid column name: {column!r}")
+    return columns
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor for the position just after row"""
+    created_at = row['created_at']
+    if created_at is not None and not isinstance(created_at, str):
+        created_at = str(created_at)  # datetime from PostgreSQL
+    key = json.dumps([created_at, row['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    The (created_at, id) position encoded in a cursor
+    
+    Raises:
+        ValueError: If the cursor wasn't produced by encode_cursor
+    """
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError(f"Invalid page cursor: {cursor!r}")
+    return created_at, row_id
+
+@dataclass
+class Page:
+    """One page of rows, newest first"""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # Pass back for the following page; None on the last page
+
+class Repository:
+    """
+    Base class for repositories over DatabaseManager
+
+    Queries are written once with ? placeholders. DatabaseManager borrows a
+    pooled connection, applies the SQLite tuning profile and translates the
+    placeholders for PostgreSQL, so every storage module gets the same
+    behaviour on either backend.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        self._db = db
+
+    @property
+    def db(self) -> DatabaseManager:
+        """Database manager, resolved lazily to the global one"""
+        if self._db is None:
+            self._db = get_db()
+        return self._db
+
+    def fetch_all(self, query: str, params: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        return self.db.execute_query(query, params)
+
+    def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        return self.db.get_single_result(query, params)
+
+    def fetch_value(self, query: str, params: Optional[tuple] = None, default: Any = None) -> Any:
+        """First column of the first row"""
+        row = self.fetch_one(query, params)
+        if not row:
+            return default
+        value = next(iter(row.values()))
+        return default if value is None else value
+
+    def execute(self, command: str, params: Optional[tuple] = None) -> int:
+        return self.db.execute_command(command, params)
+
+    def transaction(self):
+        return self.db.transaction()
+
+    def table_columns(self, table: str) -> List[str]:
+        """Column names of a table (empty if it doesn't exist)"""
+        _check_columns([table])
+        if self.db.config.db_type == 'postgresql':
+            rows = self.fetch_all("SELECT column_name AS name FROM information_schema.columns "
+                                  "WHERE table_name = ?", (table,))
+        else:
+            rows = self.fetch_all(f"PRAGMA table_info({table})")
+        return [row['name'] for row in rows]
+
+    def fetch_page(self, table: str, columns: Iterable[str], where: str, params: tuple,
+                   limit: int = 20, cursor: Optional[str] = None) -> Page:
+        """
+        A page of rows newest first, keyed on (created_at, id)
+        
+        Seeking from the cursor instead of using OFFSET keeps every page as
+        cheap as the first one, given an index on the where columns followed
+        by (created_at, id).
+        
+        Args:
+            table: Table name
+            columns: Columns to return; id and created_at are always included
+            where: Filter with ? placeholders, e.g. "user_id = ?"
+            params: Values for the filter
+            limit: Page size
+            cursor: next_cursor of the previous page, or None for the first page
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        _check_columns([table])
+        columns = _check_columns(columns)
+        selected = ', '.join(dict.fromkeys(['id', 'created_at'] + columns))
+        if cursor:
+            where = f"({where}) AND (created_at, id) < (?, ?)"
+            params = tuple(params) + decode_cursor(cursor)
+        
+        rows = self.fetch_all(f"""
+            SELECT {selected} FROM {table}
+            WHERE {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, tuple(params) + (limit + 1,))
+        
+        if len(rows) > limit:
+            return Page(rows[:limit], encode_cursor(rows[limit - 1]))
+        return Page(rows)
+
+class ContentBlobRepository(Repository):
+    """
+    Texts stored once in the content_blobs table, keyed by their SHA-256
+
+    Job descriptions and resumes repeat across analyses (a bulk run uses one
+    JD for every resume), so rows reference them by hash instead of holding
+    a copy each. Blobs are compressed with CONTENT_BLOB_CODEC (zlib, or zstd
+    when the zstandard package is installed).
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        super().__init__(db)
+        self._table_ready = False
+        self._lock = threading.Lock()
+        self.codec = os.getenv('CONTENT_BLOB_CODEC', 'zlib').lower()
+        if self.codec not in ('zlib', 'zstd'):
+            raise ValueError(f"CONTENT_BLOB_CODEC must be zlib or zstd, not {self.codec!r}")
+        if self.codec == 'zstd' and not ZSTD_AVAILABLE:
+            logger.warning("zstandard is not installed, compressing content blobs with zlib")
+            self.codec = 'zlib'
+
+    def ensure_table(self) -> None:
+        """Create the table if it doesn't exist (once per repository)"""
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            data_type = 'BYTEA' if self.db.config.db_type == 'postgresql' else 'BLOB'
+            self.execute(f"""
+                CREATE TABLE IF NOT EXISTS content_blobs (
+                    hash TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data {data_type} NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self._table_ready = True
+
+    def put(self, text: Optional[str]) -> Optional[str]:
+        """
+        Store a text unless it is already stored
+
+        Returns:
+            The text's hash, or None for an empty text
+        """
+        if not text:
+            return None
+        raw = text.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        codec, data = self._compress(raw)
+        self.ensure_table()
+        self.execute("""
+            INSERT INTO content_blobs (hash, codec, size, data)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (hash) DO NOTHING
+        """, (digest, codec, len(raw), data))
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """The text stored under a hash, or None"""
+        return self.get_many([digest]).get(digest)
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, str]:
+        """Texts for several hashes in one query; unknown hashes are left out"""
+        digests = list(dict.fromkeys(digest for digest in digests if digest))
+        if not digests:
+            return {}
+        self.ensure_table()
+        placeholders = ', '.join('?' for _ in digests)
+        rows = self.fetch_all(f"SELECT hash, codec, data FROM content_blobs WHERE hash IN ({placeholders})",
+                              tuple(digests))
+        return {row['hash']: self._decompress(row['codec'], bytes(row['data'])) for row in rows}
+
+    def _compress(self, raw: bytes) -> tuple:
+        if self.codec == 'zstd':
+            data = zstandard.ZstdCompressor(level=9).compress(raw)
+        else:
+            data = zlib.compress(raw, 9)
+        # Short texts can come out larger
+        return (self.codec, data) if len(data) < len(raw) else ('none', raw)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> str:
+        if codec == 'zstd':
+            if not ZSTD_AVAILABLE:
+                raise RuntimeError("Content blob is zstd-compressed but zstandard is not installed")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        elif codec == 'zlib':
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+
+class AnalysisSessionRepository(Repository):
+    """Rows of the analysis_sessions table"""
+
+    # Text columns stored in content_blobs; each row keeps the hash in <column>_hash
+    CONTENT_COLUMNS = ('job_description', 'resume_content')
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        super().__init__(db)
+        self.blobs = ContentBlobRepository(db)
+        self._table_ready = False
+        self._content_columns: Optional[List[str]] = None
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        """Create the table if it doesn't exist (once per repository)"""
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_sessions (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    resume_filename TEXT,
+                    job_description TEXT,
+                    analysis_result TEXT,
+                    score INTEGER,
+                    match_category TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.execute("""
+                CREATE INDEX IF NOT EXISTS idx_analysis_sessions_user_created
+                ON analysis_sessions(user_id, created_at, id)
+            """)
+            self._table_ready = True
+
+    def ensure_content_columns(self) -> List[str]:
+        """
+        Add the <column>_hash columns for the table's content columns if missing
+        (once per repository)
+
+        Returns:
+            The content columns the table has
+        """
+        if self._content_columns is not None:
+            return self._content_columns
+        with self._lock:
+            if self._content_columns is None:
+                columns = self.table_columns('analysis_sessions')
+                for column in self.CONTENT_COLUMNS:
+                    if column in columns and f"{column}_hash" not in columns:
+                        self.execute(f"ALTER TABLE analysis_sessions ADD COLUMN {column}_hash TEXT")
+                content_columns = [column for column in self.CONTENT_COLUMNS if column in columns]
+                if not columns:
+                    return content_columns  # No table yet; check again next time
+                self._content_columns = content_columns
+        return self._content_columns
+
+    def store_content(self, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Move content texts in fields into content_blobs, leaving their hashes
+
+        A content column set to an empty value also clears its hash, so the
+        old text isn't loaded back from content_blobs.
+        """
+        if not any(column in fields for column in self.CONTENT_COLUMNS):
+            return fields
+        fields = dict(fields)
+        for column in self.ensure_content_columns():
+            if column not in fields:
+                continue
+            if fields[column]:
+                fields[f"{column}_hash"] = self.blobs.put(fields[column])
+                fields[column] = ''
+            else:
+                fields[f"{column}_hash"] = None
+        return fields
+
+    def load_content(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fill in content texts that rows reference by hash"""
+        digests = [row.get(f"{column}_hash") for row in rows for column in self.CONTENT_COLUMNS]
+        if not any(digests):
+            return rows
+        texts = self.blobs.get_many(digests)
+        for row in rows:
+            for column in self.CONTENT_COLUMNS:
+                digest = row.get(f"{column}_hash")
+                if digest and not row.get(column):
+                    row[column] = texts.get(digest, '')
+        return rows
+
+    def insert(self, fields: Dict[str, Any]) -> int:
+        """
+        Insert one session
+
+        Args:
+            fields: Column values; must include id and user_id
+        """
+        fields = self.store_content(fields)
+        columns = _check_columns(fields)
+        placeholders = ', '.join('?' for _ in columns)
+        return self.execute(
+            f"INSERT INTO analysis_sessions ({', '.join(columns)}) VALUES ({placeholders})",
+            tuple(fields.values())
+        )
+
+    def list_for_user(self, user_id: str, limit: int = 50,
+                      columns: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        A user's sessions, newest first
+
+        Args:
+            user_id: Owner of the sessions
+            limit: Maximum number of rows
+            columns: Columns to return (all by default)
+        """
+        selected = ', '.join(_check_columns(columns)) if columns else '*'
+        return self.load_content(self.fetch_all(f"""
+            SELECT {selected} FROM analysis_sessions
+            WHERE user_id = ?
+            ORDER BY created_at DESC
+            LIMIT ?
+        """, (user_id, limit)))
+
+    def page_for_user(self, user_id: str, columns: Iterable[str], limit: int = 20,
+                      cursor: Optional[str] = None) -> Page:
+        """
+        A page of a user's sessions, newest first
+        
+        Args:
+            user_id: Owner of the sessions
+            columns: Columns to return; list summary columns here and fetch
+                the JSON result and job description with get() when needed
+            limit: Page size
+            cursor: next_cursor of the previous page
+        """
+        return self.fetch_page('analysis_sessions', columns, 'user_id = ?', (user_id,), limit, cursor)
+
+    def get(self, analysis_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """One session by ID, optionally only if it belongs to user_id"""
+        if user_id is None:
+            row = self.fetch_one("SELECT * FROM analysis_sessions WHERE id = ?", (analysis_id,))
+        else:
+            row = self.fetch_one("SELECT * FROM analysis_sessions WHERE id = ? AND user_id = ?",
+                                 (analysis_id, user_id))
+        return self.load_content([row])[0] if row else None
+
+    def update(self, analysis_id: str, fields: Dict[str, Any]) -> int:
+        """Set columns of one session; returns the number of rows updated"""
+        fields = self.store_content(fields)
+        assignments = ', '.join(f"{column} = ?" for column in _check_columns(fields))
+        return self.execute(f"UPDATE analysis_sessions SET {assignments} WHERE id = ?",
+                            tuple(fields.values()) + (analysis_id,))
+
+    def delete(self, analysis_id: str, user_id: str) -> int:
+        """Delete a user's session; returns the number of rows deleted"""
+        return self.execute("DELETE FROM analysis_sessions WHERE id = ? AND user_id = ?",
+                            (analysis_id, user_id))
+
+class UsageRepository(Repository):
+    """Monthly analysis counters in the usage_tracking table"""
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        super().__init__(db)
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        """Create the table and its indexes if they don't exist (once per repository)"""
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS usage_tracking (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    analysis_count INTEGER DEFAULT 0,
+                    period_start TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    period_end TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+                )
+            """)
+            self.execute("""
+                CREATE INDEX IF NOT EXISTS idx_usage_tracking_user_id
+                ON usage_tracking(user_id)
+            """)
+            self._ensure_period_key()
+            self._table_ready = True
+
+    def _ensure_period_key(self) -> None:
+        """
+        Add the unique (user_id, period_start) key that increment() upserts on
+
+        Concurrent increments used to be able to insert the same period twice;
+        such duplicates are merged into one row holding their combined count
+        before the key is created.
+        """
+        create_key = """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_usage_tracking_user_period
+            ON usage_tracking(user_id, period_start)
+        """
+        try:
+            self.execute(create_key)
+            return
+        except Exception as e:
+            logger.warning(f"Merging duplicate usage periods before adding the unique key: {e}")
+
+        with self.transaction() as tx:
+            tx.execute("""
+                UPDATE usage_tracking
+                SET analysis_count = (
+                    SELECT SUM(other.analysis_count) FROM usage_tracking other
+                    WHERE other.user_id = usage_tracking.user_id
+                    AND other.period_start = usage_tracking.period_start
+                )
+                WHERE id IN (
+                    SELECT MIN(id) FROM usage_tracking
+                    WHERE period_start IS NOT NULL
+                    GROUP BY user_id, period_start
+                    HAVING COUNT(*) > 1
+                )
+            """)
+            tx.execute("""
+                DELETE FROM usage_tracking
+                WHERE period_start IS NOT NULL
+                AND id NOT IN (
+                    SELECT MIN(id) FROM usage_tracking
+                    WHERE period_start IS NOT NULL
+                    GROUP BY user_id, period_start
+                )
+            """)
+        self.execute(create_key)
+
+    def get_period(self, user_id: str, period_start: datetime,
+                   period_end: datetime) -> Optional[Dict[str, Any]]:
+        """The user's record for the period starting in [period_start, period_end)"""
+        return self.fetch_one("""
+            SELECT * FROM usage_tracking
+            WHERE user_id = ?
+            AND period_start >= ?
+            AND period_start < ?
+            ORDER BY created_at DESC
+            LIMIT 1
+        """, (user_id, period_start, period_end))
+
+    def create_period(self, user_id: str, period_start: datetime, period_end: datetime,
+                      analysis_count: int = 0) -> str:
+        """Insert a period record unless the user already has one; returns the new record's ID"""
+        record_id = str(uuid.uuid4())
+        self.execute("""
+            INSERT INTO usage_tracking
+            (id, user_id, analysis_count, period_start, period_end)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id, period_start) DO NOTHING
+        """, (record_id, user_id, analysis_count, period_start, period_end))
+        return record_id
+
+    def increment(self, user_id: str, period_start: datetime, period_end: datetime) -> int:
+        """
+        Add one analysis to the user's period, creating the record if needed
+
+        A single upsert, so concurrent increments can neither lose a count
+        nor create a second record for the period. Without RETURNING the
+        count is read back in the same transaction, which already holds the
+        write lock.
+
+        Returns:
+            The period's analysis count after the increment
+        """
+        upsert = """
+            INSERT INTO usage_tracking
+            (id, user_id, analysis_count, period_start, period_end)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT (user_id, period_start) DO UPDATE
+            SET analysis_count = usage_tracking.analysis_count + 1,
+                updated_at = CURRENT_TIMESTAMP
+        """
+        params = (str(uuid.uuid4()), user_id, period_start, period_end)
+        with self.transaction() as tx:
+            if self.db.config.db_type == 'postgresql' or SQLITE_HAS_RETURNING:
+                row = tx.query_one(upsert + " RETURNING analysis_count", params)
+            else:
+                tx.execute(upsert, params)
+                row = tx.query_one("""
+                    SELECT analysis_count FROM usage_tracking
+                    WHERE user_id = ? AND period_start = ?
+                """, (user_id, period_start))
+        return row['analysis_count']
+
+    def reset(self, user_id: str, period_start: datetime) -> int:
+        """Zero the user's counters from period_start on"""
+        return self.execute("""
+            UPDATE usage_tracking
+            SET analysis_count = 0,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE user_id = ?
+            AND period_start >= ?
+        """, (user_id, period_start))
+
+class RateLimitRepository(Repository):
+    """
+    Per-window usage counters in the rate_limit_counters table
+
+    Each (user, event type, window length, window start) has one row that
+    writes add to with an upsert, so processes sharing the database count
+    together without scanning usage_events.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        super().__init__(db)
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        """Create the table if it doesn't exist (once per repository)"""
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                    user_id TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    window_seconds INTEGER NOT NULL,
+                    window_start BIGINT NOT NULL,
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, event_type, window_seconds, window_start)
+                )
+            """)
+            self.execute("""
+                CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_window_start
+                ON rate_limit_counters(window_start)
+            """)
+            self._table_ready = True
+
+    def add(self, user_id: str, event_type: str, window_starts: Dict[int, int], quantity: int) -> None:
+        """
+        Add quantity to the user's counter in each window, in one transaction
+
+        Args:
+            window_starts: Start (epoch seconds) of the current window, by window length
+        """
+        self.ensure_table()
+        with self.transaction() as tx:
+            for window_seconds, window_start in window_starts.items():
+                tx.execute("""
+                    INSERT INTO rate_limit_counters
+                    (user_id, event_type, window_seconds, window_start, quantity)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, event_type, window_seconds, window_start) DO UPDATE
+                    SET quantity = rate_limit_counters.quantity + excluded.quantity
+                """, (user_id, event_type, window_seconds, window_start, quantity))
+
+    def get_counts(self, user_id: str, event_type: str, since: int) -> Dict[tuple, int]:
+        """The user's counters for windows starting at or after since, by (window length, start)"""
+        self.ensure_table()
+        rows = self.fetch_all("""
+            SELECT window_seconds, window_start, quantity
+            FROM rate_limit_counters
+            WHERE user_id = ? AND event_type = ? AND window_start >= ?
+        """, (user_id, event_type, since))
+        return {(row['window_seconds'], row['window_start']): row['quantity'] for row in rows}
+
+    def purge(self, before: int) -> int:
+        """Delete counters for windows that started before before; returns the rows deleted"""
+        self.ensure_table()
+        return self.execute("DELETE FROM rate_limit_counters WHERE window_start < ?", (before,))
+
+class UsageEventRepository(Repository):
+    """
+    Billable usage events and their daily rollups
+
+    Every event in usage_events is also added to usage_daily_rollups, one row
+    per user, event type and UTC day, in the same transaction. Period totals
+    read whole days from the rollups and only the partial days at either end
+    from the raw events, so they cost the same however many events a user has.
+    """
+
+    def __init__(self, db: Optional[DatabaseManager] = None):
+        super().__init__(db)
+        self._table_ready = False
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        """
+        Create the rollup table if it doesn't exist (once per repository)
+
+        A newly created table is filled from the usage_events already stored.
+        """
+        if self._table_ready:
+            return
+        with self._lock:
+            if self._table_ready:
+                return
+            created = not self.table_columns('usage_daily_rollups')
+            self.execute("""
+                CREATE TABLE IF NOT EXISTS usage_daily_rollups (
+                    user_id TEXT NOT NULL,
+                    day DATE NOT NULL,
+                    event_type VARCHAR(50) NOT NULL,
+                    quantity INTEGER NOT NULL DEFAULT 0,
+                    cost_usd REAL NOT NULL DEFAULT 0.0,
+                    event_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user_id, day, event_type)
+                )
+            """)
+            if created and self.table_columns('usage_events'):
+                days = self.backfill()
+                logger.info(f"Filled usage_daily_rollups with {days} user-days from usage_events")
+            self._table_ready = True
+
+    def record(self, event_id: str, user_id: str, event_type: str, quantity: int, cost_usd: float,
+               metadata: str, timestamp: datetime) -> None:
+        """Insert an event and add it to its day's rollup, in one transaction"""
+        self.ensure_table()
+        with self.transaction() as tx:
+            tx.execute("""
+                INSERT INTO usage_events (
+                    id, user_id, event_type, quantity, cost_usd, metadata, timestamp
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (event_id, user_id, event_type, quantity, cost_usd, metadata, timestamp))
+            if user_id is None:
+                return  # Not billable to anyone, so not rolled up
+            tx.execute("""
+                INSERT INTO usage_daily_rollups
+                (user_id, day, event_type, quantity, cost_usd, event_count)
+                VALUES (?, ?, ?, ?, ?, 1)
+                ON CONFLICT (user_id, day, event_type) DO UPDATE
+                SET quantity = usage_daily_rollups.quantity + excluded.quantity,
+                    cost_usd = usage_daily_rollups.cost_usd + excluded.cost_usd,
+                    event_count = usage_daily_rollups.event_count + 1
+            """, (user_id, timestamp.date(), event_type, quantity, cost_usd))
+
+    def period_totals(self, user_id: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        """
+        The user's usage from start to end inclusive, by event type
+
+        Returns:
+            Rows of event_type, total_quantity, total_cost and event_count
+        """
+        self.ensure_table()
+        first_day = start.date() if start == datetime.combine(start.date(), datetime.min.time()) \
+            else start.date() + timedelta(days=1)
+        last_day = end.date()  # Exclusive: events on end's own day may come after end
+        totals: Dict[str, Dict[str, Any]] = {}
+
+        if first_day < last_day:
+            self._add_totals(totals, self.fetch_all("""
+                SELECT event_type, SUM(quantity) AS total_quantity, SUM(cost_usd) AS total_cost,
+                       SUM(event_count) AS event_count
+                FROM usage_daily_rollups
+                WHERE user_id = ? AND day >= ? AND day < ?
+                GROUP BY event_type
+            """, (user_id, first_day, last_day)))
+            edges = [(start, datetime.combine(first_day, datetime.min.time()), '<'),
+                     (datetime.combine(last_day, datetime.min.time()), end, '<=')]
+        else:
+            edges = [(start, end, '<=')]
+
+        for edge_start, edge_end, upper in edges:
+            if edge_start > edge_end or (edge_start == edge_end and upper == '<'):
+                continue
+            # Only event types the rollups show on those days, so the lookup stays on the index
+            event_types = [row['event_type'] for row in self.fetch_all("""
+                SELECT DISTINCT event_type FROM usage_daily_rollups
+                WHERE user_id = ? AND day >= ? AND day <= ?
+            """, (user_id, edge_start.date(), edge_end.date()))]
+            if not event_types:
+                continue
+            placeholders = ', '.join('?' for _ in event_types)
+            self._add_totals(totals, self.fetch_all(f"""
+                SELECT event_type, SUM(quantity) AS total_quantity, SUM(cost_usd) AS total_cost,
+                       COUNT(*) AS event_count
+                FROM usage_events
+                WHERE user_id = ? AND event_type IN ({placeholders})
+                AND timestamp >= ? AND timestamp {upper} ?
+                GROUP BY event_type
+            """, (user_id, *event_types, edge_start, edge_end)))
+
+        return list(totals.values())
+
+    @staticmethod
+    def _add_totals(totals: Dict[str, Dict[str, Any]], rows: List[Dict[str, Any]]) -> None:
+        for row in rows:
+            total = totals.setdefault(row['event_type'], {
+                'event_type': row['event_type'], 'total_quantity': 0, 'total_cost': 0.0, 'event_count': 0
+            })
+            total['total_quantity'] += row['total_quantity'] or 0
+            total['total_cost'] += row['total_cost'] or 0.0
+            total['event_count'] += row['event_count'] or 0
+
+    def backfill(self, since: Optional[datetime] = None) -> int:
+        """
+        Rebuild the rollups from usage_events, for every day or from since's day on
+
+        Runs as one transaction, so readers see either the old or the new
+        rollups. Events written while it runs wait for it on SQLite; on
+        PostgreSQL run it when few events are being written.
+
+        Returns:
+            Number of rollup rows written
+        """
+        where, params = '', ()
+        if since is not None:
+            since = datetime.combine(since.date(), datetime.min.time())
+            where, params = 'WHERE timestamp >= ?', (since,)
+        with self.transaction() as tx:
+            tx.execute("DELETE FROM usage_daily_rollups" + (" WHERE day >= ?" if since else ""),
+                       (since.date(),) if since else None)
+            return tx.execute(f"""
+                INSERT INTO usage_daily_rollups
+                (user_id, day, event_type, quantity, cost_usd, event_count)
+                SELECT user_id, DATE(timestamp), event_type,
+                       COALESCE(SUM(quantity), 0), COALESCE(SUM(cost_usd), 0), COUNT(*)
+                FROM usage_events
+                {where}
+                {'AND' if where else 'WHERE'} user_id IS NOT NULL
+                GROUP BY user_id, DATE(timestamp), event_type
+            """, params)
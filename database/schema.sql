@@ -199,6 +199,7 @@ CREATE INDEX idx_users_last_login ON users(last_login);
 CREATE INDEX idx_subscriptions_user_id ON subscriptions(user_id);
 CREATE INDEX idx_subscriptions_status ON subscriptions(status);
 CREATE INDEX idx_subscriptions_current_period_end ON subscriptions(current_period_end);
+CREATE INDEX idx_subscriptions_user_status_created ON subscriptions(user_id, status, created_at);
 
 CREATE INDEX idx_teams_owner_id ON teams(owner_id);
 CREATE INDEX idx_team_members_team_id ON team_members(team_id);
@@ -207,6 +208,7 @@ CREATE INDEX idx_team_members_user_id ON team_members(user_id);
 CREATE INDEX idx_analysis_sessions_user_id ON analysis_sessions(user_id);
 CREATE INDEX idx_analysis_sessions_created_at ON analysis_sessions(created_at);
 CREATE INDEX idx_analysis_sessions_status ON analysis_sessions(status);
+CREATE INDEX idx_analysis_sessions_user_created ON analysis_sessions(user_id, created_at, id);
 
 CREATE INDEX idx_user_sessions_user_id ON user_sessions(user_id);
 CREATE INDEX idx_user_sessions_token ON user_sessions(session_token);
@@ -3,22 +3,24 @@ Simple Database Initialization
 Minimal, bulletproof database setup for Streamlit Cloud
 """
 
-import sqlite3
 import logging
 from pathlib import Path
 
+from database.sqlite_profile import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
-def create_minimal_database():
+# Stored in PRAGMA user_version once the schema is complete and migrated.
+# Bump it when create_minimal_database() or the migrations change.
+SCHEMA_VERSION = 2
+
+def create_minimal_database(db_path='data/app.db'):
     """Create minimal database with essential tables only"""
     try:
         # Ensure data directory exists
-        data_dir = Path('data')
-        data_dir.mkdir(exist_ok=True)
-        
-        db_path = 'data/app.db'
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        with sqlite3.connect(db_path) as conn:
+        with connect_sqlite(db_path) as conn:
             cursor = conn.cursor()
             
             # Create users table (essential)
@@ -121,38 +123,53 @@ def create_minimal_database():
         logger.error(f"Failed to create minimal database: {e}")
         return False
 
-def ensure_database_exists():
+def ensure_database_exists(db_path='data/app.db'):
     """Ensure database exists and is functional"""
     try:
-        db_path = 'data/app.db'
-        
         # Check if database exists and has users table
         if Path(db_path).exists():
-            with sqlite3.connect(db_path) as conn:
+            with connect_sqlite(db_path) as conn:
                 cursor = conn.cursor()
+                if get_schema_version(cursor) >= SCHEMA_VERSION:
+                    logger.debug("Database schema is up to date")
+                    return True
                 cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
                 if cursor.fetchone():
                     # Database exists, run migration to add missing columns
-                    _run_migrations()
+                    if _run_migrations(db_path):
+                        _set_schema_version(db_path)
                     logger.info("Database already exists and is functional")
                     return True
         
         # Create database if it doesn't exist or is incomplete
-        return create_minimal_database()
+        if create_minimal_database(db_path) and _run_migrations(db_path):
+            _set_schema_version(db_path)
+            return True
+        return False
         
     except Exception as e:
         logger.error(f"Database check failed: {e}")
         # Try to create from scratch
-        return create_minimal_database()
+        return create_minimal_database(db_path)
+
+def get_schema_version(cursor) -> int:
+    """Get the schema version stamped on a database (0 if never stamped)"""
+    cursor.execute("PRAGMA user_version")
+    return cursor.fetchone()[0]
 
-def _run_migrations():
+def _set_schema_version(db_path):
+    with connect_sqlite(db_path) as conn:
+        conn.execute(f"PRAGMA user_version = {int(SCHEMA_VERSION)}")
+
+def _run_migrations(db_path):
     """Run database migrations"""
     try:
         from database.migrate_add_is_active import add_is_active_column
-        add_is_active_column()
+        from database.migrate_composite_indexes import add_composite_indexes
+        return add_is_active_column(db_path) and add_composite_indexes(db_path)
     except Exception as e:
         logger.error(f"Migration failed: {e}")
+        return False
 
-# Auto-run when imported
-if __name__ != "__main__":
+if __name__ == "__main__":
     ensure_database_exists()
\ No newline at end of file
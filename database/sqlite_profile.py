@@ -0,0 +1,111 @@
+"""
+SQLite Tuning Profile
+Connection settings applied to every SQLite connection the app opens
+"""
+
+import os
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_LEVELS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+TEMP_STORES = {'DEFAULT', 'FILE', 'MEMORY'}
+
+class SQLiteProfile:
+    """
+    SQLite PRAGMA settings
+
+    The defaults suit a web app with concurrent sessions: WAL journaling lets
+    readers run alongside a writer, synchronous=NORMAL is durable across
+    application crashes under WAL (only a power loss can drop the last
+    commits), and the busy timeout makes writers wait for the lock instead of
+    failing with "database is locked".
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv('SQLITE_TUNING_ENABLED', 'true').lower() == 'true'
+        self.journal_mode = os.getenv('SQLITE_JOURNAL_MODE', 'WAL').upper()
+        self.synchronous = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper()
+        # Negative values are KiB, positive values are pages
+        self.cache_size = int(os.getenv('SQLITE_CACHE_SIZE', '-20000'))
+        self.mmap_size = int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))
+        self.busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+        self.temp_store = os.getenv('SQLITE_TEMP_STORE', 'MEMORY').upper()
+        self._validate()
+        self._script = None
+
+    def _validate(self):
+        for name, value, allowed in (('SQLITE_JOURNAL_MODE', self.journal_mode, JOURNAL_MODES),
+                                     ('SQLITE_SYNCHRONOUS', self.synchronous, SYNCHRONOUS_LEVELS),
+                                     ('SQLITE_TEMP_STORE', self.temp_store, TEMP_STORES)):
+            if value not in allowed:
+                raise ValueError(f"{name} must be one of {', '.join(sorted(allowed))}, got {value!r}")
+
+    @property
+    def connection_script(self) -> str:
+        """PRAGMA statements run on every new connection, built once"""
+        if self._script is None:
+            self._script = ''.join([
+                f"PRAGMA busy_timeout = {self.busy_timeout_ms};",
+                f"PRAGMA journal_mode = {self.journal_mode};",
+                f"PRAGMA synchronous = {self.synchronous};",
+                f"PRAGMA cache_size = {self.cache_size};",
+                f"PRAGMA mmap_size = {self.mmap_size};",
+                f"PRAGMA temp_store = {self.temp_store};",
+            ])
+        return self._script
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        """Apply the profile to an open connection"""
+        if not self.enabled:
+            return
+        try:
+            conn.executescript(self.connection_script)
+        except sqlite3.OperationalError as e:
+            # Switching journal mode needs a moment without other connections;
+            # the connection is still usable and the next one tries again
+            logger.warning(f"Could not apply SQLite profile: {e}")
+
+_profile: Optional[SQLiteProfile] = None
+_profile_lock = threading.Lock()
+
+def get_sqlite_profile() -> SQLiteProfile:
+    """Get the global SQLite profile, read from the environment on first use"""
+    global _profile
+    if _profile is None:
+        with _profile_lock:
+            if _profile is None:
+                _profile = SQLiteProfile()
+    return _profile
+
+def connect_sqlite(db_path: Union[str, Path], profile: Optional[SQLiteProfile] = None,
+                   **kwargs) -> sqlite3.Connection:
+    """
+    Open a SQLite connection with the tuning profile applied
+
+    Args:
+        db_path: Database file
+        profile: Settings to apply (defaults to the global profile)
+        **kwargs: Passed on to sqlite3.connect
+
+    Returns:
+        The new connection
+    """
+    profile = profile or get_sqlite_profile()
+    if profile.enabled:
+        kwargs.setdefault('timeout', profile.busy_timeout_ms / 1000)
+    conn = sqlite3.connect(str(db_path), **kwargs)
+    profile.apply(conn)
+    return conn
+
+def remove_database_files(db_path: Union[str, Path]) -> None:
+    """Delete a database file along with its WAL and shared-memory files"""
+    for suffix in ('', '-wal', '-shm', '-journal'):
+        path = Path(f"{db_path}{suffix}")
+        if path.exists():
+            path.unlink()
@@ -0,0 +1,182 @@
+"""
+SQL Statement Compiler
+Translates placeholders once per statement and prepares hot statements on PostgreSQL
+"""
+
+import re
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+# Literals, quoted identifiers and comments are copied verbatim; placeholders
+# and percent signs are only translated outside them.
+_TOKEN = re.compile(r"""
+      (?P<string>'(?:[^']|'')*'?)
+    | (?P<identifier>"(?:[^"]|"")*"?)
+    | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<dollar>\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?(?:\$(?P=tag)\$|\Z))
+    | (?P<placeholder>\?|%s)
+    | (?P<percent>%%|%)
+""", re.S | re.X)
+
+# Errors of an EXECUTE that mean the prepared statement itself is unusable:
+# the session lost it, or a schema change altered its result type ("cached
+# plan must not change result type"). Any other error is the statement's own.
+STALE_STATEMENT_ERRORS = (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported)
+
+_PREPARABLE = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'VALUES'}
+_FIRST_WORD = re.compile(r'[\s(]*([A-Za-z]+)')
+
+class CompiledStatement:
+    """
+    A statement translated for one dialect
+
+    Attributes:
+        sql: Statement in the driver's parameter style
+        placeholders: Number of parameters it takes
+        name: Server-side prepared statement name (PostgreSQL)
+        prepare_sql: PREPARE body with $n parameters, or None if it can't be prepared
+        execute_sql: EXECUTE statement that runs the prepared form with the same parameters
+        executions: How often the statement has run, to find hot statements
+    """
+
+    __slots__ = ('sql', 'placeholders', 'name', 'prepare_sql', 'execute_sql', 'executions')
+
+    def __init__(self, sql: str, placeholders: int, prepare_sql: Optional[str] = None):
+        self.sql = sql
+        self.placeholders = placeholders
+        self.prepare_sql = prepare_sql
+        self.name = None
+        self.execute_sql = None
+        self.executions = 0
+        if prepare_sql is not None:
+            self.name = 'stmt_' + hashlib.sha1(prepare_sql.encode('utf-8')).hexdigest()[:16]
+            args = ', '.join(['%s'] * placeholders)
+            self.execute_sql = f"EXECUTE {self.name} ({args})" if placeholders else f"EXECUTE {self.name}"
+
+@lru_cache(maxsize=2048)
+def compile_statement(sql: str, dialect: str) -> CompiledStatement:
+    """
+    Translate a statement written with ? or %s placeholders for a dialect
+
+    Placeholders inside string literals, quoted identifiers and comments are
+    left alone. A statement written with %s is taken to escape literal
+    percent signs as %%, as psycopg2 requires; one written with ? is not.
+
+    Args:
+        sql: Statement text
+        dialect: 'postgresql' (psycopg2 %s style) or 'sqlite' (? style)
+
+    Returns:
+        The compiled statement; cached, so compile the same text as often as needed
+    """
+    tokens = [(match.lastgroup, match.group(), match.start(), match.end()) for match in _TOKEN.finditer(sql)]
+    pyformat = any(kind == 'placeholder' and text == '%s' for kind, text, _, _ in tokens)
+    postgresql = dialect == 'postgresql'
+
+    driver_parts, prepare_parts = [], []
+    placeholders = 0
+    multiple_statements = False
+    position = 0
+
+    def plain(text):
+        driver_parts.append(text)
+        prepare_parts.append(text)
+
+    for kind, text, start, end in tokens:
+        between = sql[position:start]
+        if ';' in between.rstrip().rstrip(';'):
+            multiple_statements = True
+        plain(between)
+        position = end
+
+        if kind == 'placeholder':
+            placeholders += 1
+            driver_parts.append('%s' if postgresql else '?')
+            prepare_parts.append(f'${placeholders}')
+            continue
+
+        # Everything else is copied, with percent signs escaped for psycopg2
+        literal = text.replace('%%', '%') if pyformat else text
+        driver_parts.append(literal.replace('%', '%%') if postgresql else literal)
+        prepare_parts.append(literal)
+
+    tail = sql[position:]
+    if ';' in tail.rstrip().rstrip(';'):
+        multiple_statements = True
+    plain(tail)
+
+    prepare_sql = None
+    if postgresql and not multiple_statements:
+        first_word = _FIRST_WORD.match(''.join(prepare_parts))
+        if first_word and first_word.group(1).upper() in _PREPARABLE:
+            prepare_sql = ''.join(prepare_parts).strip().rstrip(';')
+
+    return CompiledStatement(''.join(driver_parts), placeholders, prepare_sql)
+
+class PreparedStatementConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has prepared"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+        self.stale_statements = set()
+
+def _in_savepoint(cursor, statement: str) -> bool:
+    """Run a statement so that a failure doesn't abort the surrounding transaction"""
+    cursor.execute("SAVEPOINT prepare_statement")
+    try:
+        cursor.execute(statement)
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT prepare_statement")
+        cursor.execute("RELEASE SAVEPOINT prepare_statement")
+        logger.debug(f"Statement preparation failed: {e}")
+        return False
+    cursor.execute("RELEASE SAVEPOINT prepare_statement")
+    return True
+
+def prepared_form(cursor, compiled: CompiledStatement, threshold: int) -> Optional[str]:
+    """
+    The EXECUTE statement to use instead of compiled.sql, preparing it on
+    the cursor's connection once the statement has run threshold times
+
+    Returns:
+        The EXECUTE statement, or None to run compiled.sql as is
+    """
+    compiled.executions += 1
+    if compiled.prepare_sql is None or compiled.executions < threshold:
+        return None
+
+    connection = cursor.connection
+    prepared = getattr(connection, 'prepared_statements', None)
+    if prepared is None:
+        return None  # Not a PreparedStatementConnection
+    if compiled.name in prepared:
+        return compiled.execute_sql
+
+    if compiled.name in connection.stale_statements:
+        _in_savepoint(cursor, f"DEALLOCATE {compiled.name}")
+        connection.stale_statements.discard(compiled.name)
+    if not _in_savepoint(cursor, f"PREPARE {compiled.name} AS {compiled.prepare_sql}"):
+        compiled.prepare_sql = None  # e.g. parameter types PostgreSQL can't infer
+        return None
+    prepared.add(compiled.name)
+    return compiled.execute_sql
+
+def forget_prepared(cursor, compiled: CompiledStatement) -> None:
+    """
+    Mark a prepared statement as unusable after its EXECUTE failed with one
+    of STALE_STATEMENT_ERRORS; it is re-prepared on next use
+    """
+    connection = cursor.connection
+    prepared = getattr(connection, 'prepared_statements', None)
+    if prepared is not None and compiled.name in prepared:
+        prepared.discard(compiled.name)
+        connection.stale_statements.add(compiled.name)
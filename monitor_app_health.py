@@ -3,56 +3,56 @@
 Monitor app health - users, analyses, and database status
 """
 
-import sqlite3
+import os
 import time
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+
+from database.repositories import Repository
+
+def _hours_ago(hours: int) -> str:
+    """UTC timestamp string, comparable with CURRENT_TIMESTAMP values on either backend"""
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return cutoff.strftime('%Y-%m-%d %H:%M:%S')
 
 def show_app_health_dashboard():
     """Show comprehensive app health dashboard"""
     print("🏥 RESUME + JD ANALYZER - HEALTH DASHBOARD")
     print("=" * 60)
     
-    db_path = 'data/app.db'
+    repo = Repository()
     
     try:
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        last_24h = _hours_ago(24)
         
         # Overall statistics
         print("📊 OVERALL STATISTICS")
         print("-" * 25)
         
         # Users
-        cursor.execute("SELECT COUNT(*) as count FROM users WHERE is_active = 1")
-        active_users = cursor.fetchone()['count']
-        
-        cursor.execute("SELECT COUNT(*) as count FROM users")
-        total_users = cursor.fetchone()['count']
+        active_users = repo.fetch_value("SELECT COUNT(*) as count FROM users WHERE is_active = TRUE", default=0)
+        total_users = repo.fetch_value("SELECT COUNT(*) as count FROM users", default=0)
         
         print(f"👥 Users: {active_users} active / {total_users} total")
         
         # Analyses
-        cursor.execute("SELECT COUNT(*) as count FROM analysis_sessions")
-        total_analyses = cursor.fetchone()['count']
+        total_analyses = repo.fetch_value("SELECT COUNT(*) as count FROM analysis_sessions", default=0)
         
-        cursor.execute("""
+        recent_analyses = repo.fetch_value("""
             SELECT COUNT(*) as count FROM analysis_sessions 
-            WHERE created_at > datetime('now', '-24 hours')
-        """)
-        recent_analyses = cursor.fetchone()['count']
+            WHERE created_at > ?
+        """, (last_24h,), default=0)
         
         print(f"📊 Analyses: {total_analyses} total, {recent_analyses} in last 24h")
         
         # Subscriptions
-        cursor.execute("SELECT COUNT(*) as count FROM subscriptions WHERE status = 'active'")
-        active_subscriptions = cursor.fetchone()['count']
+        active_subscriptions = repo.fetch_value(
+            "SELECT COUNT(*) as count FROM subscriptions WHERE status = 'active'", default=0)
         
         print(f"💳 Active Subscriptions: {active_subscriptions}")
         
         # Sessions
-        cursor.execute("SELECT COUNT(*) as count FROM user_sessions WHERE is_active = 1")
-        active_sessions = cursor.fetchone()['count']
+        active_sessions = repo.fetch_value(
+            "SELECT COUNT(*) as count FROM user_sessions WHERE is_active = TRUE", default=0)
         
         print(f"🔐 Active Sessions: {active_sessions}")
         
@@ -61,24 +61,21 @@ def show_app_health_dashboard():
         print("-" * 35)
         
         # New users
-        cursor.execute("""
+        new_users = repo.fetch_value("""
             SELECT COUNT(*) as count FROM users 
-            WHERE created_at > datetime('now', '-24 hours')
-        """)
-        new_users = cursor.fetchone()['count']
+            WHERE created_at > ?
+        """, (last_24h,), default=0)
         
         if new_users > 0:
             print(f"👤 New users: {new_users}")
             
-            cursor.execute("""
+            recent_users = repo.fetch_all("""
                 SELECT email, first_name, last_name, created_at 
                 FROM users 
-                WHERE created_at > datetime('now', '-24 hours')
+                WHERE created_at > ?
                 ORDER BY created_at DESC
                 LIMIT 5
-            """)
-            
-            recent_users = cursor.fetchall()
+            """, (last_24h,))
             for user in recent_users:
                 print(f"   - {user['email']} ({user['first_name']} {user['last_name']}) at {user['created_at']}")
         else:
@@ -88,16 +85,14 @@ def show_app_health_dashboard():
         if recent_analyses > 0:
             print(f"\n📄 Recent analyses: {recent_analyses}")
             
-            cursor.execute("""
+            recent_analysis_list = repo.fetch_all("""
                 SELECT a.resume_filename, a.score, a.match_category, a.created_at, u.email
                 FROM analysis_sessions a
                 LEFT JOIN users u ON a.user_id = u.id
-                WHERE a.created_at > datetime('now', '-24 hours')
+                WHERE a.created_at > ?
                 ORDER BY a.created_at DESC
                 LIMIT 5
-            """)
-            
-            recent_analysis_list = cursor.fetchall()
+            """, (last_24h,))
             for analysis in recent_analysis_list:
                 score = analysis['score'] or 'N/A'
                 category = analysis['match_category'] or 'N/A'
@@ -110,11 +105,10 @@ def show_app_health_dashboard():
         print("-" * 20)
         
         # Users with analyses
-        cursor.execute("""
+        users_with_analyses = repo.fetch_value("""
             SELECT COUNT(DISTINCT user_id) as count 
             FROM analysis_sessions
-        """)
-        users_with_analyses = cursor.fetchone()['count']
+        """, default=0)
         
         engagement_rate = (users_with_analyses / total_users * 100) if total_users > 0 else 0
         print(f"🎯 Users with analyses: {users_with_analyses}/{total_users} ({engagement_rate:.1f}%)")
@@ -125,17 +119,14 @@ def show_app_health_dashboard():
             print(f"📊 Average analyses per active user: {avg_analyses:.1f}")
         
         # Top users by analysis count
-        cursor.execute("""
+        top_users = repo.fetch_all("""
             SELECT u.email, u.first_name, u.last_name, COUNT(a.id) as analysis_count
             FROM users u
-            LEFT JOIN analysis_sessions a ON u.id = a.user_id
-            GROUP BY u.id
-            HAVING analysis_count > 0
+            JOIN analysis_sessions a ON u.id = a.user_id
+            GROUP BY u.id, u.email, u.first_name, u.last_name
             ORDER BY analysis_count DESC
             LIMIT 5
         """)
-        
-        top_users = cursor.fetchall()
         if top_users:
             print(f"\n🏆 TOP USERS BY ANALYSES:")
             for user in top_users:
@@ -146,15 +137,14 @@ def show_app_health_dashboard():
         print("-" * 18)
         
         # Database size
-        import os
-        db_size = os.path.getsize(db_path) / (1024 * 1024)  # MB
-        print(f"💾 Database size: {db_size:.2f} MB")
+        if repo.db.config.db_type == 'sqlite':
+            db_size = os.path.getsize(repo.db.config.sqlite_path) / (1024 * 1024)  # MB
+            print(f"💾 Database size: {db_size:.2f} MB")
         
         # Table health
         tables = ['users', 'subscriptions', 'analysis_sessions', 'user_sessions']
         for table in tables:
-            cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-            count = cursor.fetchone()['count']
+            count = repo.fetch_value(f"SELECT COUNT(*) as count FROM {table}", default=0)
             print(f"📋 {table}: {count} records")
         
         # Performance indicators
@@ -162,13 +152,12 @@ def show_app_health_dashboard():
         print("-" * 28)
         
         # Average analysis score
-        cursor.execute("SELECT AVG(score) as avg_score FROM analysis_sessions WHERE score IS NOT NULL")
-        avg_score_result = cursor.fetchone()
-        avg_score = avg_score_result['avg_score'] if avg_score_result['avg_score'] else 0
+        avg_score = float(repo.fetch_value(
+            "SELECT AVG(score) as avg_score FROM analysis_sessions WHERE score IS NOT NULL", default=0))
         print(f"📊 Average analysis score: {avg_score:.1f}%")
         
         # Score distribution
-        cursor.execute("""
+        distribution = repo.fetch_one("""
             SELECT 
                 COUNT(CASE WHEN score >= 90 THEN 1 END) as excellent,
                 COUNT(CASE WHEN score >= 70 AND score < 90 THEN 1 END) as good,
@@ -177,8 +166,6 @@ def show_app_health_dashboard():
             FROM analysis_sessions 
             WHERE score IS NOT NULL
         """)
-        
-        distribution = cursor.fetchone()
         if distribution:
             print(f"🎯 Score distribution:")
             print(f"   - Excellent (90%+): {distribution['excellent']}")
@@ -186,8 +173,6 @@ def show_app_health_dashboard():
             print(f"   - Fair (50-69%): {distribution['fair']}")
             print(f"   - Poor (<50%): {distribution['poor']}")
         
-        conn.close()
-        
         # Status summary
         print(f"\n🚦 OVERALL STATUS")
         print("-" * 18)
@@ -250,21 +235,15 @@ def monitor_real_time():
     print("-" * 35)
     
     last_stats = {}
+    repo = Repository()
     
     try:
         while True:
-            conn = sqlite3.connect('data/app.db')
-            cursor = conn.cursor()
-            
             # Get current stats
-            cursor.execute("SELECT COUNT(*) as count FROM users")
-            user_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) as count FROM analysis_sessions")
-            analysis_count = cursor.fetchone()[0]
-            
-            cursor.execute("SELECT COUNT(*) as count FROM user_sessions WHERE is_active = 1")
-            session_count = cursor.fetchone()[0]
+            user_count = repo.fetch_value("SELECT COUNT(*) as count FROM users", default=0)
+            analysis_count = repo.fetch_value("SELECT COUNT(*) as count FROM analysis_sessions", default=0)
+            session_count = repo.fetch_value(
+                "SELECT COUNT(*) as count FROM user_sessions WHERE is_active = TRUE", default=0)
             
             current_stats = {
                 'users': user_count,
@@ -285,20 +264,17 @@ def monitor_real_time():
                     
                     # Show details for new analyses
                     if current_stats['analyses'] > last_stats.get('analyses', 0):
-                        cursor.execute("""
+                        latest = repo.fetch_one("""
                             SELECT a.resume_filename, u.email, a.score, a.created_at
                             FROM analysis_sessions a
                             LEFT JOIN users u ON a.user_id = u.id
                             ORDER BY a.created_at DESC
                             LIMIT 1
                         """)
-                        
-                        latest = cursor.fetchone()
                         if latest:
-                            print(f"    📄 New analysis: {latest[0]} by {latest[1]} ({latest[2]}%)")
+                            print(f"    📄 New analysis: {latest['resume_filename']} by {latest['email']} ({latest['score']}%)")
             
             last_stats = current_stats
-            conn.close()
             
             # Show current status
             timestamp = datetime.now().strftime("%H:%M:%S")
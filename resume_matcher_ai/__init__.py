@@ -9,6 +9,7 @@ __version__ = "1.0.0"
 try:
     from .utils import MatchResult, JobDescription, ResumeData, UsageRecord
     from .matcher import analyze_match
+    from .async_matcher import analyze_match_async
     from .protected_matcher import analyze_match_protected
     from .resume_parser import extract_text_from_pdf, clean_resume_text
     from .jd_parser import parse_jd_text
@@ -19,6 +20,7 @@ try:
         'ResumeData',
         'UsageRecord',
         'analyze_match',
+        'analyze_match_async',
         'analyze_match_protected',
         'extract_text_from_pdf',
         'clean_resume_text',
@@ -0,0 +1,267 @@
+"""
+Asynchronous counterparts of the core matching functions
+Lets a single worker keep many Perplexity analyses in flight without blocking on I/O
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional
+
+import requests
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+from .utils import MatchResult, load_config, format_prompt, invalidate_api_key_validation
+from .http_client import backoff_delay, get_http_client
+from .matcher import (
+    _build_api_headers,
+    _build_api_payload,
+    _build_match_result,
+    _check_api_key,
+    _error_match_result,
+    _extract_response_content,
+    _handle_api_response_status,
+    _lookup_cached_result,
+    _retries_exhausted_error,
+    _track_successful_call,
+    _translate_api_error
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncPerplexityClient:
+    """
+    Non-blocking HTTP client for Perplexity API calls
+
+    Requests go through a pooled httpx.AsyncClient, so one event loop keeps
+    every in-flight call on a single thread. If httpx is missing from the
+    environment, requests fall back to the pooled synchronous client on a
+    dedicated thread pool, which keeps the loop free at the cost of one thread
+    per in-flight request. Network errors are raised as requests exceptions
+    either way so callers handle one set.
+    """
+
+    def __init__(self, max_connections: int = 100, connect_timeout: float = 5.0, read_timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._client = None
+
+    def _get_client(self):
+        """Lazily create the httpx client on the running loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                headers={'User-Agent': 'Resume-Matcher-AI/1.0'}
+            )
+        return self._client
+
+    async def post(self, url: str, headers: Optional[Dict] = None, json: Optional[Dict] = None,
+                   timeout: Optional[float] = None):
+        """
+        POST without blocking the event loop
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            json: JSON body
+            timeout: Read timeout in seconds
+
+        Returns:
+            The HTTP response (httpx.Response or requests.Response)
+
+        Raises:
+            requests.exceptions.Timeout: If the request timed out
+            requests.exceptions.ConnectionError: If the connection failed
+        """
+        read_timeout = float(timeout) if timeout is not None else self.read_timeout
+
+        async with self._semaphore:
+            if HTTPX_AVAILABLE:
+                try:
+                    return await self._get_client().post(
+                        url, headers=headers, json=json,
+                        timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout)
+                    )
+                except httpx.TimeoutException as e:
+                    raise requests.exceptions.Timeout(str(e)) from e
+                except httpx.TransportError as e:
+                    raise requests.exceptions.ConnectionError(str(e)) from e
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_fallback_executor(self.max_connections),
+                partial(get_http_client().post, url, headers=headers, json=json,
+                        timeout=read_timeout, retries=0)
+            )
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+_async_clients = weakref.WeakKeyDictionary()
+_fallback_executor: Optional[ThreadPoolExecutor] = None
+_fallback_executor_lock = threading.Lock()
+
+def get_async_http_client() -> AsyncPerplexityClient:
+    """Get the async client for the running event loop"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        config = load_config()
+        client = AsyncPerplexityClient(
+            max_connections=config.get('async_max_connections', 100),
+            connect_timeout=config.get('connect_timeout', 5.0),
+            read_timeout=float(config.get('timeout', '30'))
+        )
+        _async_clients[loop] = client
+    return client
+
+def _get_fallback_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Thread pool used for requests when httpx is not installed"""
+    global _fallback_executor
+
+    if _fallback_executor is None:
+        with _fallback_executor_lock:
+            if _fallback_executor is None:
+                _fallback_executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                        thread_name_prefix='perplexity-async')
+    return _fallback_executor
+
+async def analyze_match_async(resume_text: str, jd_data: Dict) -> MatchResult:
+    """
+    Async version of analyze_match
+
+    Prompt building, cache access and response parsing run on the default
+    executor; only the API call itself runs on the event loop.
+    """
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+
+    try:
+        jd_text = jd_data.get('raw_text', '')
+        prompt = await loop.run_in_executor(None, format_prompt, resume_text, jd_text)
+
+        # Serve repeat analyses from the result cache
+        cache, cache_key, cached_result = await loop.run_in_executor(
+            None, _lookup_cached_result, prompt, start_time
+        )
+        if cached_result:
+            return cached_result
+
+        api_response = await call_perplexity_api_async(prompt)
+
+        result, parsed = await loop.run_in_executor(
+            None, _build_match_result, resume_text, jd_data, api_response, start_time
+        )
+
+        # Fallback-parsed replies are not cached so a rerun can recover
+        if cache_key and parsed:
+            await loop.run_in_executor(None, cache.set, cache_key, result)
+
+        return result
+
+    except Exception as e:
+        return _error_match_result(e, start_time)
+
+async def call_perplexity_api_async(prompt: str) -> str:
+    """
+    Async version of call_perplexity_api
+
+    Args:
+        prompt: The prompt to send to the API
+
+    Returns:
+        API response content
+
+    Raises:
+        Exception: Various API-related errors with helpful guidance
+    """
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+
+    # Config loading and key validation may touch disk or the network
+    config = await loop.run_in_executor(None, load_config)
+    api_key = await loop.run_in_executor(None, _check_api_key, config)
+
+    headers = _build_api_headers(api_key)
+    payload = _build_api_payload(prompt, config)
+
+    api_url = f"{config.get('api_base_url', 'https://api.perplexity.ai')}/chat/completions"
+    timeout = int(config.get('timeout', '30'))
+
+    try:
+        response = await _make_api_request_with_retry_async(api_url, headers, payload, timeout)
+
+        if response.status_code == 401:
+            invalidate_api_key_validation(api_key)
+
+        _handle_api_response_status(response)
+
+        content, response_data = await loop.run_in_executor(None, _extract_response_content, response)
+        await loop.run_in_executor(None, _track_successful_call, prompt, content, response_data, start_time)
+
+        return content
+
+    except Exception as e:
+        raise await loop.run_in_executor(None, _translate_api_error, e, prompt, timeout, start_time)
+
+async def _make_api_request_with_retry_async(url: str, headers: Dict, payload: Dict, timeout: int,
+                                             max_retries: int = 3):
+    """
+    Make an API request with the same retry policy as the synchronous matcher,
+    sleeping with asyncio between attempts
+
+    Raises:
+        Exception: If all retry attempts fail
+    """
+    client = get_async_http_client()
+    last_exception = None
+
+    for attempt in range(max_retries):
+        try:
+            response = await client.post(url, headers=headers, json=payload, timeout=timeout)
+
+            if response.status_code >= 500 and attempt < max_retries - 1:
+                delay = backoff_delay(attempt)
+                if response.status_code == 503:
+                    # Service unavailable - retry with longer delay
+                    delay *= 2
+                logger.warning(f"Server error ({response.status_code}). Retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+                continue
+
+            return response
+
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            last_exception = e
+            if attempt < max_retries - 1:
+                delay = backoff_delay(attempt)
+                logger.warning(f"Request failed ({e}). Retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+                continue
+
+        except requests.exceptions.RequestException as e:
+            last_exception = e
+            # SSL, certificate, hostname, or DNS errors - don't retry
+            if any(keyword in str(e).lower() for keyword in ['ssl', 'certificate', 'hostname', 'dns']):
+                raise
+
+            if attempt < max_retries - 1:
+                await asyncio.sleep(backoff_delay(attempt))
+                continue
+
+    raise _retries_exhausted_error(max_retries, last_exception)
@@ -0,0 +1,204 @@
+"""
+Persistent analysis result cache
+Content-addressed store for MatchResult objects keyed by prompt and API parameters
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Any, Optional
+
+from .utils import MatchResult, load_config
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """TTL + LRU cache of analysis results backed by the application database"""
+
+    def __init__(self, ttl_seconds: int = 604800, max_entries: int = 5000, db_manager=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._db = db_manager
+        self._table_ready = False
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def db(self):
+        """Database manager, resolved lazily so the CLI can run without a database"""
+        if self._db is None:
+            from database.connection import get_db
+            self._db = get_db()
+        return self._db
+
+    def ensure_table(self):
+        """Create the cache table if it doesn't exist"""
+        if self._table_ready:
+            return
+
+        self.db.execute_command("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                cache_key VARCHAR(64) PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at DOUBLE PRECISION NOT NULL,
+                last_accessed DOUBLE PRECISION NOT NULL,
+                expires_at DOUBLE PRECISION NOT NULL,
+                hit_count INTEGER DEFAULT 0
+            )
+        """)
+        self.db.execute_command("""
+            CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_accessed
+            ON analysis_cache(last_accessed)
+        """)
+        self._table_ready = True
+
+    @staticmethod
+    def make_key(prompt: str, payload: Dict[str, Any]) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            prompt: The formatted analysis prompt
+            payload: The API payload that would be sent for this prompt
+
+        Returns:
+            SHA-256 hex digest of the normalized prompt, model and sampling parameters
+        """
+        system_messages = [
+            message.get('content', '') for message in payload.get('messages', [])
+            if message.get('role') == 'system'
+        ]
+        key_material = {
+            'prompt': ' '.join(prompt.split()),
+            'system': [' '.join(content.split()) for content in system_messages],
+            'params': {k: v for k, v in payload.items() if k != 'messages'}
+        }
+        encoded = json.dumps(key_material, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[MatchResult]:
+        """Return the cached MatchResult for key, or None on miss or expiry"""
+        try:
+            self.ensure_table()
+            now = time.time()
+            row = self.db.get_single_result(
+                "SELECT result, expires_at FROM analysis_cache WHERE cache_key = ?",
+                (key,)
+            )
+
+            if not row or row['expires_at'] < now:
+                if row:
+                    self.db.execute_command("DELETE FROM analysis_cache WHERE cache_key = ?", (key,))
+                self._record(hit=False)
+                return None
+
+            self.db.execute_command(
+                "UPDATE analysis_cache SET last_accessed = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, key)
+            )
+            self._record(hit=True)
+            return MatchResult(**json.loads(row['result']))
+
+        except Exception as e:
+            # A broken cache must never break analysis
+            logger.warning(f"Analysis cache lookup failed: {e}")
+            self._record(hit=False)
+            return None
+
+    def set(self, key: str, result: MatchResult) -> bool:
+        """Store a MatchResult under key and evict least recently used entries"""
+        try:
+            self.ensure_table()
+            now = time.time()
+            self.db.execute_command("""
+                INSERT INTO analysis_cache (cache_key, result, created_at, last_accessed, expires_at, hit_count)
+                VALUES (?, ?, ?, ?, ?, 0)
+                ON CONFLICT (cache_key) DO UPDATE SET
+                    result = excluded.result,
+                    created_at = excluded.created_at,
+                    last_accessed = excluded.last_accessed,
+                    expires_at = excluded.expires_at
+            """, (key, json.dumps(asdict(result)), now, now, now + self.ttl_seconds))
+
+            self._evict(now)
+            return True
+
+        except Exception as e:
+            logger.warning(f"Analysis cache store failed: {e}")
+            return False
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then trim to max_entries by last access time"""
+        evicted = self.db.execute_command("DELETE FROM analysis_cache WHERE expires_at < ?", (now,))
+
+        row = self.db.get_single_result("SELECT COUNT(*) AS entries FROM analysis_cache")
+        overflow = (row['entries'] if row else 0) - self.max_entries
+        if overflow > 0:
+            evicted += self.db.execute_command("""
+                DELETE FROM analysis_cache WHERE cache_key IN (
+                    SELECT cache_key FROM analysis_cache ORDER BY last_accessed ASC LIMIT ?
+                )
+            """, (overflow,))
+
+        if evicted > 0:
+            with self._lock:
+                self._evictions += evicted
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def clear(self) -> None:
+        """Remove every cached entry"""
+        self.ensure_table()
+        self.db.execute_command("DELETE FROM analysis_cache")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for this process and the current entry count"""
+        with self._lock:
+            hits, misses, evictions = self._hits, self._misses, self._evictions
+
+        stats = {
+            'hits': hits,
+            'misses': misses,
+            'evictions': evictions,
+            'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': 0,
+            'ttl_seconds': self.ttl_seconds,
+            'max_entries': self.max_entries
+        }
+
+        try:
+            self.ensure_table()
+            row = self.db.get_single_result("SELECT COUNT(*) AS entries FROM analysis_cache")
+            stats['entries'] = row['entries'] if row else 0
+        except Exception as e:
+            logger.warning(f"Could not count analysis cache entries: {e}")
+
+        return stats
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+def get_analysis_cache() -> Optional[AnalysisCache]:
+    """Get the global analysis cache, or None when caching is disabled"""
+    global _analysis_cache
+
+    config = load_config()
+    if not config.get('enable_analysis_cache', False):
+        return None
+
+    with _analysis_cache_lock:
+        if _analysis_cache is None:
+            _analysis_cache = AnalysisCache(
+                ttl_seconds=config.get('analysis_cache_ttl', 604800),
+                max_entries=config.get('analysis_cache_max_entries', 5000)
+            )
+        return _analysis_cache
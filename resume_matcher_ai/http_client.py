@@ -0,0 +1,129 @@
+"""
+Shared HTTP client for Perplexity API calls
+Keeps TLS connections alive in a sized pool and applies jittered retry backoff
+"""
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional, Tuple, Union
+
+# Server-side statuses that are usually transient and safe to retry
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """
+    Delay before retry number attempt + 1
+
+    Exponential in the attempt number with "equal jitter": half the delay is
+    fixed and half is random, so concurrent clients don't retry in lockstep.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+class PerplexityHTTPClient:
+    """Pooled, keep-alive HTTP client with retry and jittered exponential backoff"""
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 30.0,
+                 max_retries: int = 2, backoff_base: float = 1.0, backoff_cap: float = 30.0):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Shared session; created on first use so importing stays cheap"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Retries are handled in post() so backoff and logging stay in one place
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({'User-Agent': 'Resume-Matcher-AI/1.0'})
+                    self._session = session
+        return self._session
+
+    def _timeout(self, timeout: Union[None, float, Tuple[float, float]]) -> Tuple[float, float]:
+        """Normalize a read timeout into a (connect, read) tuple"""
+        if isinstance(timeout, tuple):
+            return timeout
+        return (self.connect_timeout, float(timeout) if timeout is not None else self.read_timeout)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Jittered delay before retry number attempt + 1"""
+        return backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+
+    def post(self, url: str, headers: Optional[Dict] = None, json: Optional[Dict] = None,
+             timeout: Union[None, float, Tuple[float, float]] = None,
+             retries: Optional[int] = None) -> requests.Response:
+        """
+        POST through the pooled session
+
+        Args:
+            url: Request URL
+            headers: Request headers
+            json: JSON body
+            timeout: Read timeout in seconds, or a (connect, read) tuple
+            retries: Retries for connection errors, timeouts and 5xx responses
+                (defaults to the client's max_retries; 0 disables retrying)
+
+        Returns:
+            The final HTTP response (which may still be a 5xx after the last attempt)
+
+        Raises:
+            requests.RequestException: If the last attempt failed at the network level
+        """
+        retries = self.max_retries if retries is None else retries
+        request_timeout = self._timeout(timeout)
+
+        for attempt in range(retries + 1):
+            try:
+                response = self.session.post(url, headers=headers, json=json, timeout=request_timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if attempt >= retries:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < retries:
+                response.close()
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            return response
+
+    def close(self) -> None:
+        """Close pooled connections"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+_http_client: Optional[PerplexityHTTPClient] = None
+_http_client_lock = threading.Lock()
+
+def get_http_client() -> PerplexityHTTPClient:
+    """Get the process-wide Perplexity HTTP client"""
+    global _http_client
+
+    if _http_client is None:
+        from .utils import load_config
+
+        config = load_config()
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = PerplexityHTTPClient(
+                    pool_size=config.get('http_pool_size', 10),
+                    connect_timeout=config.get('connect_timeout', 5.0),
+                    read_timeout=float(config.get('timeout', '30')),
+                    max_retries=config.get('http_max_retries', 2)
+                )
+    return _http_client
@@ -4,6 +4,171 @@ Job description parsing and processing functionality
 import re
 from typing import Dict, List, Any, Optional
 from .utils import JobDescription
+from .skill_matcher import get_skill_matcher
+
+# Compiled pattern registry. Everything below is compiled once at import time;
+# parse_jd_text runs these on inputs of up to 50K characters.
+
+# Section headers ("Requirements:\n", "Key Responsibilities:\n", ...). A section's
+# body is the text on the line following its header.
+_SECTION_HEADERS = {
+    'required_skills': r'required\s+skills?',
+    'requirements': r'requirements?',
+    'must_have': r'must\s+have',
+    'essential': r'essential\s+(?:skills?|requirements?)',
+    'minimum': r'minimum\s+(?:requirements?|qualifications?)',
+    'preferred_skills': r'preferred\s+skills?',
+    'technical_skills': r'technical\s+skills?',
+    'qualifications': r'qualifications?',
+    'nice_to_have': r'nice\s+to\s+have',
+    'technologies': r'technologies?',
+    'responsibilities': r'(?:key\s+)?responsibilities',
+    'duties': r'duties',
+    'what_youll_do': r'what\s+you\'?ll\s+do',
+    'job_duties': r'job\s+duties',
+    'role_overview': r'role\s+overview',
+}
+
+# Headers always end in ":" followed by a line break, so candidate colons are
+# found with one cheap scan and header patterns only run on the text just before them
+_HEADER_COLON = re.compile(r':\s*\n')
+_HEADER_ENDINGS = {
+    kind: re.compile(f'(?:{header})\\Z', re.IGNORECASE) for kind, header in _SECTION_HEADERS.items()
+}
+# Header kinds by the word a header ends with, used to skip colons that can't be a header
+_HEADER_LAST_WORDS = {
+    'skill': ('required_skills', 'essential', 'preferred_skills', 'technical_skills'),
+    'skills': ('required_skills', 'essential', 'preferred_skills', 'technical_skills'),
+    'requirement': ('requirements', 'essential', 'minimum'),
+    'requirements': ('requirements', 'essential', 'minimum'),
+    'have': ('must_have', 'nice_to_have'),
+    'qualification': ('qualifications', 'minimum'),
+    'qualifications': ('qualifications', 'minimum'),
+    'technology': ('technologies',),
+    'technologies': ('technologies',),
+    'responsibilities': ('responsibilities',),
+    'duties': ('duties', 'job_duties'),
+    'do': ('what_youll_do',),
+    'overview': ('role_overview',),
+}
+_HEADER_LAST_WORD = re.compile('(' + '|'.join(_HEADER_LAST_WORDS) + r')\Z', re.IGNORECASE)
+# Longest header text considered before a colon
+_HEADER_MAX_LENGTH = 64
+
+_REQUIREMENT_SECTIONS = ('required_skills', 'requirements', 'must_have', 'essential', 'minimum')
+_SKILL_SECTIONS = (
+    'required_skills', 'preferred_skills', 'technical_skills', 'qualifications',
+    'must_have', 'nice_to_have', 'technologies'
+)
+_RESPONSIBILITY_SECTIONS = ('responsibilities', 'duties', 'what_youll_do', 'job_duties', 'role_overview')
+
+def _compile_case_insensitive(*patterns: str) -> List[tuple]:
+    """
+    Compile each single-group pattern twice: with IGNORECASE, and lowercased
+    for matching against lowercased ASCII text (see _findall_case_insensitive).
+    Sources must not use uppercase escapes such as \\S or \\W.
+    """
+    return [(re.compile(pattern, re.IGNORECASE), re.compile(pattern.lower())) for pattern in patterns]
+
+# Experience and education requirements
+_REQUIREMENT_DETAIL_PATTERNS = _compile_case_insensitive(
+    r'(\d+\+?\s*years?\s+(?:of\s+)?experience[^.]*)',
+    r'(minimum\s+of\s+\d+\s+years?[^.]*)',
+    r'(\d+\+?\s*years?\s+in[^.]*)',
+    r'(bachelor\'?s?\s+degree[^.]*)',
+    r'(master\'?s?\s+degree[^.]*)',
+    r'(phd\s+(?:degree)?[^.]*)'
+)
+
+# Technology names mentioned anywhere in the text
+_TECH_NAME_PATTERNS = _compile_case_insensitive(
+    r'\b(Python|Java|JavaScript|TypeScript|C\+\+|C#|PHP|Ruby|Go|Rust|Swift|Kotlin)\b',
+    r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|Laravel)\b',
+    r'\b(MySQL|PostgreSQL|MongoDB|Redis|Docker|Kubernetes|AWS|Azure|GCP)\b',
+    r'\b(Git|HTML|CSS|SQL|API|REST|GraphQL|JSON|XML)\b'
+)
+_CAPITALIZED_TERM = re.compile(r'\b([A-Z][a-z]*(?:\.[a-z]+)?|[A-Z]{2,})\b')
+
+_TITLE_PATTERNS = [
+    re.compile(pattern, re.MULTILINE) for pattern in (
+        r'^([^:\n]+?)(?:\s*-\s*[^:\n]+)?(?:\n|$)',  # First line before dash or newline
+        r'(?i)(?:job\s+title|position|role):\s*([^\n]+)',
+        r'(?i)we\s+are\s+(?:seeking|looking\s+for|hiring)\s+(?:a|an)\s+([^.]+?)(?:\s+to\s+join|\.|$)',
+        r'(?i)([A-Z][^:\n]*(?:engineer|developer|manager|analyst|scientist|specialist|coordinator|director|lead))',
+    )
+]
+_TITLE_LABEL_PREFIX = re.compile(r'^(job\s+title|position|role):\s*', re.IGNORECASE)
+_TITLE_SEEKING_PREFIX = re.compile(r'^(we\s+are\s+seeking\s+(?:a|an)\s+)', re.IGNORECASE)
+
+# Patterns for experience levels - prioritize years of experience over degrees
+_EXPERIENCE_LEVEL_PATTERNS = [
+    (re.compile(r'(\d+)\+?\s*years?\s+(?:of\s+)?experience'), lambda m: f"{m.group(1)}+ years"),
+    (re.compile(r'minimum\s+of\s+(\d+)\s+years?'), lambda m: f"{m.group(1)}+ years"),
+    (re.compile(r'(\d+)-(\d+)\s+years?'), lambda m: f"{m.group(1)}-{m.group(2)} years"),
+    (re.compile(r'(?i)(entry.level|junior)'), lambda m: "Entry Level"),
+    (re.compile(r'(?i)(senior|lead)'), lambda m: "Senior Level"),
+    (re.compile(r'(?i)(mid.level|intermediate)'), lambda m: "Mid Level"),
+    (re.compile(r'(?i)phd\s+(?:degree)?'), lambda m: "PhD Degree"),
+    (re.compile(r'(?i)master\'?s?\s+degree'), lambda m: "Master's Degree"),
+    (re.compile(r'(?i)bachelor\'?s?\s+degree'), lambda m: "Bachelor's Degree"),
+]
+
+# Technical skill patterns (keywords live in the skill taxonomy)
+_TECHNICAL_PATTERN = re.compile('|'.join((
+    r'\b\d+\+?\s*years?\b',  # "3+ years"
+    r'\bapi\b', r'\bsdk\b', r'\bide\b', r'\borm\b', r'\bmvc\b',
+    r'\bui/ux\b', r'\bfrontend\b', r'\bbackend\b', r'\bfull.?stack\b',
+    r'\bdatabase\b', r'\bcloud\b', r'\bdevops\b', r'\bmobile\b',
+    r'\bweb\s+development\b', r'\bsoftware\s+development\b',
+    r'\bversion\s+control\b', r'\bunit\s+testing\b'
+)))
+
+# Soft skill patterns (keywords live in the skill taxonomy)
+_SOFT_PATTERN = re.compile('|'.join((
+    r'\bstrong\b', r'\bexcellent\b', r'\beffective\b',
+    r'\bability\s+to\b', r'\bskills?\s+in\b',
+    r'\bexperience\s+working\s+with\b'
+)))
+
+# Ambiguous skills mentioning these are treated as technical
+_TECHNICAL_INDICATORS = ('experience', 'knowledge', 'proficiency', 'familiarity')
+
+_HORIZONTAL_WHITESPACE = re.compile(r'[ \t]+')
+_ELLIPSIS_RUN = re.compile(r'[.]{3,}')
+_DASH_RUN = re.compile(r'[-]{3,}')
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+_BULLET_MARKERS = (
+    re.compile(r'^[-•*]\s*'),
+    re.compile(r'^\d+\.\s*'),
+    re.compile(r'^[a-zA-Z]\.\s*'),
+)
+_TRAILING_PUNCTUATION = re.compile(r'[.,:;]+$')
+
+_SUSPICIOUS_PATTERNS = [
+    re.compile(r'^[^a-zA-Z]*$'),  # Only non-alphabetic characters
+    re.compile(r'(.)\1{20,}'),    # Same character repeated 20+ times
+    re.compile(r'^https?://'),    # Starts with URL
+    re.compile(r'^\d+$'),         # Only numbers
+]
+
+def _findall_case_insensitive(pattern_pair: tuple, text: str, lowered: Optional[str]) -> List[str]:
+    """
+    Equivalent of an IGNORECASE findall for a single-group pattern
+    
+    Case-insensitive matching can't use the regex engine's literal prefix
+    scan, so for ASCII text the lowercased pattern runs on the lowercased text
+    instead (same length, so match positions map straight back onto text).
+    """
+    ignorecase_pattern, lowercase_pattern = pattern_pair
+    if lowered is None:
+        return ignorecase_pattern.findall(text)
+    return [text[match.start(1):match.end(1)] for match in lowercase_pattern.finditer(lowered)]
+
+
+def _lowered_if_ascii(text: str) -> Optional[str]:
+    """Lowercased text for _findall_case_insensitive, or None if text isn't ASCII"""
+    return text.lower() if text.isascii() else None
 
 
 def parse_jd_text(jd_text: str) -> JobDescription:
@@ -29,18 +194,22 @@ def parse_jd_text(jd_text: str) -> JobDescription:
     # Extract job title
     title = _extract_job_title(cleaned_text)
     
+    # Locate every section once; the extractors below share the result
+    sections = _split_sections(cleaned_text)
+    lowered = _lowered_if_ascii(cleaned_text)
+    
     # Extract requirements
-    requirements = extract_requirements(cleaned_text)
+    requirements = _extract_requirements(cleaned_text, sections, lowered)
     
     # Extract skills and categorize them
-    all_skills = _extract_skills_from_text(cleaned_text)
+    all_skills = _extract_skills_from_text(cleaned_text, sections, requirements, lowered)
     categorized_skills = categorize_skills(all_skills)
     
     # Extract experience level
     experience_level = _extract_experience_level(cleaned_text)
     
     # Extract key responsibilities
-    responsibilities = _extract_responsibilities(cleaned_text)
+    responsibilities = _extract_responsibilities(cleaned_text, sections)
     
     return JobDescription(
         raw_text=jd_text,
@@ -66,37 +235,21 @@ def extract_requirements(jd_text: str) -> List[str]:
     if not jd_text:
         return []
     
+    return _extract_requirements(jd_text, _split_sections(jd_text), _lowered_if_ascii(jd_text))
+
+
+def _extract_requirements(jd_text: str, sections: Dict[str, List[str]], lowered: Optional[str]) -> List[str]:
+    """Extract requirements using precomputed sections"""
     requirements = []
     
-    # Common requirement section headers - improved patterns
-    requirement_patterns = [
-        r'(?i)required\s+skills?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)requirements?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)must\s+have:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)essential\s+(?:skills?|requirements?):\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)minimum\s+(?:requirements?|qualifications?):\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)'
-    ]
-    
     # Extract from requirement sections
-    for pattern in requirement_patterns:
-        matches = re.findall(pattern, jd_text, re.DOTALL | re.MULTILINE)
-        for match in matches:
-            req_items = _parse_bullet_points(match)
-            requirements.extend(req_items)
+    for kind in _REQUIREMENT_SECTIONS:
+        for body in sections.get(kind, []):
+            requirements.extend(_parse_bullet_points(body))
     
     # Extract experience requirements
-    exp_patterns = [
-        r'(\d+\+?\s*years?\s+(?:of\s+)?experience[^.]*)',
-        r'(minimum\s+of\s+\d+\s+years?[^.]*)',
-        r'(\d+\+?\s*years?\s+in[^.]*)',
-        r'(bachelor\'?s?\s+degree[^.]*)',
-        r'(master\'?s?\s+degree[^.]*)',
-        r'(phd\s+(?:degree)?[^.]*)'
-    ]
-    
-    for pattern in exp_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        requirements.extend([match.strip() for match in matches])
+    for pattern in _REQUIREMENT_DETAIL_PATTERNS:
+        requirements.extend([match.strip() for match in _findall_case_insensitive(pattern, jd_text, lowered)])
     
     # Clean and deduplicate requirements
     cleaned_requirements = []
@@ -124,106 +277,24 @@ def categorize_skills(skills: List[str]) -> Dict[str, List[str]]:
     if not skills:
         return {'technical': [], 'soft': []}
     
-    # Technical skill keywords and patterns
-    technical_keywords = {
-        # Programming languages
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'php', 'ruby', 'go', 'rust',
-        'swift', 'kotlin', 'scala', 'r', 'matlab', 'sql', 'html', 'css', 'sass', 'less',
-        
-        # Frameworks and libraries
-        'react', 'angular', 'vue', 'node.js', 'express', 'django', 'flask', 'spring', 'laravel',
-        'rails', 'asp.net', '.net', 'jquery', 'bootstrap', 'tailwind', 'next.js', 'nuxt.js',
-        
-        # Databases
-        'mysql', 'postgresql', 'mongodb', 'redis', 'elasticsearch', 'cassandra', 'dynamodb',
-        'oracle', 'sqlite', 'mariadb', 'neo4j', 'influxdb',
-        
-        # Cloud and DevOps
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'gitlab', 'github', 'terraform',
-        'ansible', 'chef', 'puppet', 'vagrant', 'nginx', 'apache', 'linux', 'unix', 'bash',
-        
-        # Tools and technologies
-        'git', 'svn', 'jira', 'confluence', 'slack', 'postman', 'swagger', 'graphql', 'rest',
-        'api', 'microservices', 'ci/cd', 'tdd', 'bdd', 'agile', 'scrum', 'kanban',
-        
-        # Testing
-        'jest', 'mocha', 'chai', 'cypress', 'selenium', 'junit', 'pytest', 'rspec',
-        
-        # Data and Analytics
-        'pandas', 'numpy', 'scikit-learn', 'tensorflow', 'pytorch', 'spark', 'hadoop', 'kafka',
-        'tableau', 'power bi', 'excel', 'powerpoint'
-    }
-    
-    # Soft skill keywords
-    soft_keywords = {
-        'communication', 'leadership', 'teamwork', 'collaboration', 'problem-solving',
-        'analytical', 'creative', 'innovative', 'adaptable', 'flexible', 'organized',
-        'detail-oriented', 'time management', 'project management', 'mentoring',
-        'presentation', 'negotiation', 'customer service', 'interpersonal', 'emotional intelligence',
-        'critical thinking', 'decision making', 'conflict resolution', 'multitasking',
-        'self-motivated', 'proactive', 'reliable', 'accountable', 'initiative'
-    }
-    
     technical_skills = []
     soft_skills = []
     
-    for skill in skills:
-        skill_lower = skill.lower().strip()
-        
-        # Check if it's a technical skill
-        is_technical = False
-        for tech_keyword in technical_keywords:
-            if tech_keyword in skill_lower or skill_lower in tech_keyword:
-                is_technical = True
-                break
-        
-        # Check for technical patterns
-        if not is_technical:
-            technical_patterns = [
-                r'\b\d+\+?\s*years?\b',  # "3+ years"
-                r'\bapi\b', r'\bsdk\b', r'\bide\b', r'\borm\b', r'\bmvc\b',
-                r'\bui/ux\b', r'\bfrontend\b', r'\bbackend\b', r'\bfull.?stack\b',
-                r'\bdatabase\b', r'\bcloud\b', r'\bdevops\b', r'\bmobile\b',
-                r'\bweb\s+development\b', r'\bsoftware\s+development\b',
-                r'\bversion\s+control\b', r'\bunit\s+testing\b'
-            ]
-            
-            for pattern in technical_patterns:
-                if re.search(pattern, skill_lower):
-                    is_technical = True
-                    break
-        
-        if is_technical:
+    skills_lower = [skill.lower().strip() for skill in skills]
+    # First taxonomy category each skill mentions, technical before soft
+    taxonomy_categories = get_skill_matcher().first_categories(skills_lower, ('technical', 'soft'))
+    
+    for skill, skill_lower, category in zip(skills, skills_lower, taxonomy_categories):
+        # Check if it's a technical skill (taxonomy, then patterns)
+        if category == 'technical' or _TECHNICAL_PATTERN.search(skill_lower):
+            technical_skills.append(skill)
+        elif category == 'soft' or _SOFT_PATTERN.search(skill_lower):
+            soft_skills.append(skill)
+        elif any(indicator in skill_lower for indicator in _TECHNICAL_INDICATORS):
+            # Default ambiguous skills to technical if they contain certain indicators
             technical_skills.append(skill)
         else:
-            # Check if it's a soft skill
-            is_soft = False
-            for soft_keyword in soft_keywords:
-                if soft_keyword in skill_lower or skill_lower in soft_keyword:
-                    is_soft = True
-                    break
-            
-            # Check for soft skill patterns
-            if not is_soft:
-                soft_patterns = [
-                    r'\bstrong\b', r'\bexcellent\b', r'\beffective\b',
-                    r'\bability\s+to\b', r'\bskills?\s+in\b',
-                    r'\bexperience\s+working\s+with\b'
-                ]
-                
-                for pattern in soft_patterns:
-                    if re.search(pattern, skill_lower):
-                        is_soft = True
-                        break
-            
-            if is_soft:
-                soft_skills.append(skill)
-            else:
-                # Default ambiguous skills to technical if they contain certain indicators
-                if any(indicator in skill_lower for indicator in ['experience', 'knowledge', 'proficiency', 'familiarity']):
-                    technical_skills.append(skill)
-                else:
-                    soft_skills.append(skill)
+            soft_skills.append(skill)
     
     return {
         'technical': technical_skills,
@@ -231,21 +302,60 @@ def categorize_skills(skills: List[str]) -> Dict[str, List[str]]:
     }
 
 
+def _split_sections(jd_text: str) -> Dict[str, List[str]]:
+    """
+    Find every section header in one pass over the text
+    
+    Returns:
+        Mapping of header kind (see _SECTION_HEADERS) to the bodies of its
+        sections in document order. As with a findall over each header, a
+        header that falls inside an earlier section of the same kind is skipped.
+    """
+    sections: Dict[str, List[str]] = {}
+    section_ends: Dict[str, int] = {}
+    
+    for colon in _HEADER_COLON.finditer(jd_text):
+        colon_pos = colon.start()
+        
+        # The body starts after the last line break following the header
+        body_start = colon.end()
+        if body_start >= len(jd_text):
+            continue
+        
+        # The body runs to the end of its line
+        body_end = jd_text.find('\n', body_start)
+        if body_end == -1:
+            body_end = len(jd_text)
+        
+        last_word = _HEADER_LAST_WORD.search(jd_text, max(0, colon_pos - 16), colon_pos)
+        if not last_word:
+            continue
+        
+        window_start = max(0, colon_pos - _HEADER_MAX_LENGTH)
+        for kind in _HEADER_LAST_WORDS[last_word.group(1).lower()]:
+            match = _HEADER_ENDINGS[kind].search(jd_text, window_start, colon_pos)
+            if not match or match.start() < section_ends.get(kind, 0):
+                continue
+            sections.setdefault(kind, []).append(jd_text[body_start:body_end])
+            section_ends[kind] = body_end
+    
+    return sections
+
+
 def _clean_jd_text(jd_text: str) -> str:
     """Clean and normalize job description text"""
     if not jd_text:
         return ""
     
     # Remove excessive whitespace but preserve line breaks for section parsing
-    text = re.sub(r'[ \t]+', ' ', jd_text.strip())
+    text = _HORIZONTAL_WHITESPACE.sub(' ', jd_text.strip())
     
     # Normalize line breaks for better parsing
-    text = re.sub(r'\r\n', '\n', text)
-    text = re.sub(r'\r', '\n', text)
+    text = text.replace('\r\n', '\n').replace('\r', '\n')
     
     # Remove excessive punctuation
-    text = re.sub(r'[.]{3,}', '...', text)
-    text = re.sub(r'[-]{3,}', '---', text)
+    text = _ELLIPSIS_RUN.sub('...', text)
+    text = _DASH_RUN.sub('---', text)
     
     return text
 
@@ -256,22 +366,15 @@ def _extract_job_title(jd_text: str) -> str:
         return "Unknown Position"
     
     # Common patterns for job titles
-    title_patterns = [
-        r'^([^:\n]+?)(?:\s*-\s*[^:\n]+)?(?:\n|$)',  # First line before dash or newline
-        r'(?i)(?:job\s+title|position|role):\s*([^\n]+)',
-        r'(?i)we\s+are\s+(?:seeking|looking\s+for|hiring)\s+(?:a|an)\s+([^.]+?)(?:\s+to\s+join|\.|$)',
-        r'(?i)([A-Z][^:\n]*(?:engineer|developer|manager|analyst|scientist|specialist|coordinator|director|lead))',
-    ]
-    
-    for pattern in title_patterns:
-        match = re.search(pattern, jd_text, re.MULTILINE)
+    for pattern in _TITLE_PATTERNS:
+        match = pattern.search(jd_text)
         if match:
             title = match.group(1).strip()
             # Clean up the title
-            title = re.sub(r'\s+', ' ', title)
-            title = re.sub(r'^(job\s+title|position|role):\s*', '', title, flags=re.IGNORECASE)
+            title = _WHITESPACE_RUN.sub(' ', title)
+            title = _TITLE_LABEL_PREFIX.sub('', title)
             # Remove common prefixes that aren't part of the title
-            title = re.sub(r'^(we\s+are\s+seeking\s+(?:a|an)\s+)', '', title, flags=re.IGNORECASE)
+            title = _TITLE_SEEKING_PREFIX.sub('', title)
             if len(title) > 3 and len(title) < 100:
                 return title
     
@@ -291,48 +394,27 @@ def _extract_experience_level(jd_text: str) -> str:
     if not jd_text:
         return "Not specified"
     
-    # Patterns for experience levels - prioritize years of experience over degrees
-    exp_patterns = [
-        (r'(\d+)\+?\s*years?\s+(?:of\s+)?experience', lambda m: f"{m.group(1)}+ years"),
-        (r'minimum\s+of\s+(\d+)\s+years?', lambda m: f"{m.group(1)}+ years"),
-        (r'(\d+)-(\d+)\s+years?', lambda m: f"{m.group(1)}-{m.group(2)} years"),
-        (r'(?i)(entry.level|junior)', lambda m: "Entry Level"),
-        (r'(?i)(senior|lead)', lambda m: "Senior Level"),
-        (r'(?i)(mid.level|intermediate)', lambda m: "Mid Level"),
-        (r'(?i)phd\s+(?:degree)?', lambda m: "PhD Degree"),
-        (r'(?i)master\'?s?\s+degree', lambda m: "Master's Degree"),
-        (r'(?i)bachelor\'?s?\s+degree', lambda m: "Bachelor's Degree"),
-    ]
-    
-    for pattern, formatter in exp_patterns:
-        match = re.search(pattern, jd_text)
+    for pattern, formatter in _EXPERIENCE_LEVEL_PATTERNS:
+        match = pattern.search(jd_text)
         if match:
             return formatter(match)
     
     return "Not specified"
 
 
-def _extract_responsibilities(jd_text: str) -> List[str]:
+def _extract_responsibilities(jd_text: str, sections: Optional[Dict[str, List[str]]] = None) -> List[str]:
     """Extract key responsibilities from job description"""
     if not jd_text:
         return []
     
-    responsibilities = []
+    if sections is None:
+        sections = _split_sections(jd_text)
     
-    # Common responsibility section headers - improved pattern to handle multiline sections
-    resp_patterns = [
-        r'(?i)(?:key\s+)?responsibilities:\s*\n(.+?)(?=\n\s*[A-Z][a-z\s]+:|\n\s*$|$)',
-        r'(?i)duties:\s*\n(.+?)(?=\n\s*[A-Z][a-z\s]+:|\n\s*$|$)',
-        r'(?i)what\s+you\'?ll\s+do:\s*\n(.+?)(?=\n\s*[A-Z][a-z\s]+:|\n\s*$|$)',
-        r'(?i)job\s+duties:\s*\n(.+?)(?=\n\s*[A-Z][a-z\s]+:|\n\s*$|$)',
-        r'(?i)role\s+overview:\s*\n(.+?)(?=\n\s*[A-Z][a-z\s]+:|\n\s*$|$)'
-    ]
+    responsibilities = []
     
-    for pattern in resp_patterns:
-        matches = re.findall(pattern, jd_text, re.DOTALL | re.MULTILINE)
-        for match in matches:
-            resp_items = _parse_bullet_points(match)
-            responsibilities.extend(resp_items)
+    for kind in _RESPONSIBILITY_SECTIONS:
+        for body in sections.get(kind, []):
+            responsibilities.extend(_parse_bullet_points(body))
     
     # Clean and limit responsibilities
     cleaned_responsibilities = []
@@ -344,49 +426,44 @@ def _extract_responsibilities(jd_text: str) -> List[str]:
     return cleaned_responsibilities[:10]  # Limit to top 10 responsibilities
 
 
-def _extract_skills_from_text(jd_text: str) -> List[str]:
-    """Extract all skills mentioned in the job description"""
+def _extract_skills_from_text(jd_text: str, sections: Optional[Dict[str, List[str]]] = None,
+                              requirements: Optional[List[str]] = None,
+                              lowered: Optional[str] = None) -> List[str]:
+    """
+    Extract all skills mentioned in the job description
+    
+    Args:
+        jd_text: Job description text
+        sections: Result of _split_sections(jd_text), if already computed
+        requirements: Result of extract_requirements(jd_text), if already computed
+        lowered: Result of _lowered_if_ascii(jd_text), if already computed
+    """
     if not jd_text:
         return []
     
-    skills = []
+    if sections is None:
+        sections = _split_sections(jd_text)
+    if lowered is None:
+        lowered = _lowered_if_ascii(jd_text)
     
-    # Extract from skills sections - improved patterns
-    skill_patterns = [
-        r'(?i)required\s+skills?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)preferred\s+skills?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)technical\s+skills?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)qualifications?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)must\s+have:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)nice\s+to\s+have:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)',
-        r'(?i)technologies?:\s*\n(.+?)(?=\n\s*[A-Z][^:]*:|$)'
-    ]
+    skills = []
     
-    for pattern in skill_patterns:
-        matches = re.findall(pattern, jd_text, re.DOTALL | re.MULTILINE)
-        for match in matches:
-            skill_items = _parse_bullet_points(match)
-            skills.extend(skill_items)
+    # Extract from skills sections
+    for kind in _SKILL_SECTIONS:
+        for body in sections.get(kind, []):
+            skills.extend(_parse_bullet_points(body))
     
     # Extract skills from requirements and responsibilities
-    requirements = extract_requirements(jd_text)
+    if requirements is None:
+        requirements = _extract_requirements(jd_text, sections, lowered)
     for req in requirements:
         # Extract technology names and skills from requirements
-        tech_matches = re.findall(r'\b([A-Z][a-z]*(?:\.[a-z]+)?|[A-Z]{2,})\b', req)
-        skills.extend(tech_matches)
+        skills.extend(_CAPITALIZED_TERM.findall(req))
     
     # Also extract common technology names directly from the text
     # This helps with unstructured job descriptions
-    tech_patterns = [
-        r'\b(Python|Java|JavaScript|TypeScript|C\+\+|C#|PHP|Ruby|Go|Rust|Swift|Kotlin)\b',
-        r'\b(React|Angular|Vue|Node\.js|Express|Django|Flask|Spring|Laravel)\b',
-        r'\b(MySQL|PostgreSQL|MongoDB|Redis|Docker|Kubernetes|AWS|Azure|GCP)\b',
-        r'\b(Git|HTML|CSS|SQL|API|REST|GraphQL|JSON|XML)\b'
-    ]
-    
-    for pattern in tech_patterns:
-        matches = re.findall(pattern, jd_text, re.IGNORECASE)
-        skills.extend(matches)
+    for pattern in _TECH_NAME_PATTERNS:
+        skills.extend(_findall_case_insensitive(pattern, jd_text, lowered))
     
     # Clean and deduplicate skills
     cleaned_skills = []
@@ -483,15 +560,8 @@ def _validate_job_description_input(jd_text: str) -> None:
         )
     
     # Check for suspicious patterns that might indicate copy-paste errors
-    suspicious_patterns = [
-        r'^[^a-zA-Z]*$',  # Only non-alphabetic characters
-        r'(.)\1{20,}',    # Same character repeated 20+ times
-        r'^https?://',    # Starts with URL
-        r'^\d+$',         # Only numbers
-    ]
-    
-    for pattern in suspicious_patterns:
-        if re.search(pattern, cleaned_text):
+    for pattern in _SUSPICIOUS_PATTERNS:
+        if pattern.search(cleaned_text):
             raise ValueError(
                 "The job description appears to contain invalid or incomplete content. "
                 "Please ensure you've pasted the complete job description text, not just a URL or partial content."
@@ -513,9 +583,8 @@ def _parse_bullet_points(text: str) -> List[str]:
         line = line.strip()
         if line:
             # Remove bullet markers from the beginning of lines
-            line = re.sub(r'^[-•*]\s*', '', line)
-            line = re.sub(r'^\d+\.\s*', '', line)
-            line = re.sub(r'^[a-zA-Z]\.\s*', '', line)
+            for marker in _BULLET_MARKERS:
+                line = marker.sub('', line)
             if line.strip():
                 cleaned_lines.append(line.strip())
     
@@ -525,7 +594,7 @@ def _parse_bullet_points(text: str) -> List[str]:
     cleaned_items = []
     for item in items:
         # Remove trailing punctuation and clean up
-        item = re.sub(r'[.,:;]+$', '', item.strip())
+        item = _TRAILING_PUNCTUATION.sub('', item.strip())
         if len(item) > 5:
             cleaned_items.append(item)
     
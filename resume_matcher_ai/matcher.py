@@ -1,72 +1,134 @@
 """
 Core matching logic and Perplexity API integration
 """
+import copy
 import json
 import time
 import requests
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from .utils import (
     MatchResult, 
     load_config, 
     validate_api_key, 
+    invalidate_api_key_validation,
     format_prompt, 
     handle_rate_limits,
     get_match_category,
     track_api_usage
 )
+from .http_client import get_http_client
+from .cache import AnalysisCache
 
 def analyze_match(resume_text: str, jd_data: Dict) -> MatchResult:
     """Orchestrate the matching process"""
     start_time = time.time()
-    
+
     try:
         # Create structured prompt for analysis
         jd_text = jd_data.get('raw_text', '')
         prompt = format_prompt(resume_text, jd_text)
-        
-        # Call Perplexity API
-        api_response = call_perplexity_api(prompt)
-        
-        # Parse the structured response
-        parsed_data = _parse_api_response(api_response)
-        
-        # Extract components from parsed response
-        score = parsed_data.get('compatibility_score', 0)
-        matching_skills = parsed_data.get('matching_skills', [])
-        missing_skills = parsed_data.get('missing_skills', [])
-        
-        # Enhanced gap analysis with prioritization (Requirements 4.2, 4.3)
-        skill_gaps = identify_skill_gaps_by_priority(resume_text, jd_data, api_response)
-        
-        # Enhanced suggestion generation (Requirements 5.1, 5.2, 5.3, 5.4)
-        suggestions = generate_enhanced_suggestions(resume_text, jd_data, skill_gaps, score, api_response)
-        
-        # Calculate processing time
-        processing_time = time.time() - start_time
-        
-        # Create and return MatchResult
-        return MatchResult(
-            score=score,
-            match_category=get_match_category(score),
-            matching_skills=matching_skills,
-            missing_skills=missing_skills,
-            skill_gaps=skill_gaps,
-            suggestions=suggestions,
-            processing_time=processing_time
+
+        # Serve repeat analyses from the result cache
+        cache, cache_key, cached_result = _lookup_cached_result(prompt, start_time)
+        if cached_result:
+            return cached_result
+
+        def run_analysis() -> MatchResult:
+            # Call Perplexity API
+            api_response = call_perplexity_api(prompt)
+            
+            result, parsed = _build_match_result(resume_text, jd_data, api_response, start_time)
+
+            # Fallback-parsed replies are not cached so a rerun can recover
+            if cache_key and parsed:
+                cache.set(cache_key, result)
+
+            return result
+
+        # Identical analyses already in flight share one API call
+        from .single_flight import get_single_flight
+        single_flight = get_single_flight()
+        if not single_flight:
+            return run_analysis()
+
+        flight_key = cache_key or AnalysisCache.make_key(prompt, _build_api_payload(prompt, load_config()))
+        result, shared = single_flight.do(
+            flight_key, run_analysis,
+            lookup=(lambda: cache.get(cache_key)) if cache_key else None
         )
-        
+        if shared:
+            result = copy.deepcopy(result)
+            result.processing_time = time.time() - start_time
+        return result
+
     except Exception as e:
-        # Return error result with processing time
-        processing_time = time.time() - start_time
-        return MatchResult(
-            score=0,
-            match_category="Error",
-            matching_skills=[],
-            missing_skills=[],
-            skill_gaps={'Critical': [], 'Important': [], 'Nice-to-have': []},
-            suggestions=[f"Analysis failed: {str(e)}"],
-            processing_time=processing_time
-        )
+        return _error_match_result(e, start_time)
+
+def _lookup_cached_result(prompt: str, start_time: float) -> Tuple[Optional[object], Optional[str], Optional[MatchResult]]:
+    """
+    Check the analysis result cache for a prompt
+    
+    Returns:
+        (cache, cache_key, cached_result); cache and cache_key are None when caching is disabled
+    """
+    from .cache import get_analysis_cache
+    cache = get_analysis_cache()
+    if not cache:
+        return None, None, None
+
+    cache_key = cache.make_key(prompt, _build_api_payload(prompt, load_config()))
+    cached_result = cache.get(cache_key)
+    if cached_result:
+        cached_result.processing_time = time.time() - start_time
+    return cache, cache_key, cached_result
+
+def _build_match_result(resume_text: str, jd_data: Dict, api_response: str, start_time: float) -> Tuple[MatchResult, bool]:
+    """
+    Turn a raw API response into a MatchResult
+    
+    Returns:
+        (result, parsed); parsed is False when the response was not valid JSON
+        and the result came from fallback text parsing
+    """
+    # Parse the structured response
+    parsed_data, parsed = _parse_api_response_with_status(api_response)
+    
+    # Extract components from parsed response
+    score = parsed_data.get('compatibility_score', 0)
+    matching_skills = parsed_data.get('matching_skills', [])
+    missing_skills = parsed_data.get('missing_skills', [])
+    
+    # Enhanced gap analysis with prioritization (Requirements 4.2, 4.3)
+    skill_gaps = identify_skill_gaps_by_priority(resume_text, jd_data, api_response)
+    
+    # Enhanced suggestion generation (Requirements 5.1, 5.2, 5.3, 5.4)
+    suggestions = generate_enhanced_suggestions(resume_text, jd_data, skill_gaps, score, api_response)
+    
+    # Calculate processing time
+    processing_time = time.time() - start_time
+    
+    return MatchResult(
+        score=score,
+        match_category=get_match_category(score),
+        matching_skills=matching_skills,
+        missing_skills=missing_skills,
+        skill_gaps=skill_gaps,
+        suggestions=suggestions,
+        processing_time=processing_time
+    ), parsed
+
+def _error_match_result(error: Exception, start_time: float) -> MatchResult:
+    """Return error result with processing time"""
+    processing_time = time.time() - start_time
+    return MatchResult(
+        score=0,
+        match_category="Error",
+        matching_skills=[],
+        missing_skills=[],
+        skill_gaps={'Critical': [], 'Important': [], 'Nice-to-have': []},
+        suggestions=[f"Analysis failed: {str(error)}"],
+        processing_time=processing_time
+    )
 
 def call_perplexity_api(prompt: str) -> str:
     """
@@ -86,6 +148,44 @@ def call_perplexity_api(prompt: str) -> str:
     
     # Validate API configuration
     config = load_config()
+    api_key = _check_api_key(config)
+    
+    # Prepare API request
+    headers = _build_api_headers(api_key)
+    payload = _build_api_payload(prompt, config)
+
+    api_url = f"{config.get('api_base_url', 'https://api.perplexity.ai')}/chat/completions"
+    timeout = int(config.get('timeout', '30'))
+    
+    # Make API request with comprehensive error handling
+    try:
+        response = _make_api_request_with_retry(api_url, headers, payload, timeout)
+        
+        # A rejected key must be re-checked rather than served from the validation cache
+        if response.status_code == 401:
+            invalidate_api_key_validation(api_key)
+        
+        # Handle various HTTP status codes
+        _handle_api_response_status(response)
+        
+        # Parse and validate response
+        content, response_data = _extract_response_content(response)
+        
+        # Track successful API usage
+        _track_successful_call(prompt, content, response_data, start_time)
+        
+        return content
+        
+    except Exception as e:
+        raise _translate_api_error(e, prompt, timeout, start_time)
+
+def _check_api_key(config: Dict) -> str:
+    """
+    Return the configured API key after checking it is present and accepted
+    
+    Raises:
+        Exception: If the key is missing or rejected
+    """
     api_key = config.get('perplexity_api_key')
     
     if not api_key:
@@ -115,108 +215,103 @@ def call_perplexity_api(prompt: str) -> str:
         # If validation fails due to network issues, continue but warn
         print("⚠️  Warning: Could not validate API key due to network issues. Proceeding anyway...")
     
-    # Prepare API request
-    headers = {
+    return api_key
+
+def _build_api_headers(api_key: str) -> Dict:
+    """Build request headers for the Perplexity API"""
+    return {
         'Authorization': f'Bearer {api_key}',
         'Content-Type': 'application/json',
         'User-Agent': 'Resume-Matcher-AI/1.0'
     }
+
+def _extract_response_content(response) -> Tuple[str, Dict]:
+    """
+    Parse a successful API response and pull out the message content
     
-    payload = {
-        'model': 'sonar-pro',
-        'messages': [
-            {
-                'role': 'system',
-                'content': 'You are an expert HR analyst specializing in resume and job description matching. Provide accurate, structured analysis in the requested JSON format.'
-            },
-            {
-                'role': 'user',
-                'content': prompt
-            }
-        ],
-        'max_tokens': int(config.get('max_tokens', '4000')),
-        'temperature': 0.1,  # Low temperature for consistent, factual responses
-        'top_p': 0.9
-    }
+    Returns:
+        (content, response_data)
+        
+    Raises:
+        Exception: If the response is not valid JSON or is missing content
+    """
+    try:
+        response_data = response.json()
+    except json.JSONDecodeError as e:
+        raise Exception(
+            f"Failed to parse API response as JSON.\n"
+            f"This may indicate a temporary service issue.\n"
+            f"Response status: {response.status_code}\n"
+            f"Response preview: {response.text[:200]}...\n\n"
+            f"Please try again in a few moments."
+        )
     
-    # Apply cost optimization to the payload
-    from .utils import optimize_api_payload
-    payload = optimize_api_payload(payload)
+    # Validate response structure
+    if 'choices' not in response_data:
+        raise Exception(
+            f"Invalid API response format: missing 'choices' field.\n"
+            f"Response: {response_data}\n\n"
+            f"This may indicate an API service issue. Please try again."
+        )
     
-    api_url = f"{config.get('api_base_url', 'https://api.perplexity.ai')}/chat/completions"
-    timeout = int(config.get('timeout', '30'))
+    if not response_data['choices'] or len(response_data['choices']) == 0:
+        raise Exception(
+            f"API response contains no choices.\n"
+            f"This may indicate an issue with the request or API service.\n"
+            f"Please try again with a shorter prompt if the issue persists."
+        )
     
-    # Make API request with comprehensive error handling
+    # Extract content
+    choice = response_data['choices'][0]
+    if 'message' not in choice or 'content' not in choice['message']:
+        raise Exception(
+            f"Invalid API response structure: missing message content.\n"
+            f"Response: {response_data}\n\n"
+            f"Please try again."
+        )
+    
+    content = choice['message']['content']
+    
+    if not content or not content.strip():
+        raise Exception(
+            "API returned empty content. This may indicate a processing issue.\n"
+            "Please try again with a different prompt or check your API quota."
+        )
+    
+    return content, response_data
+
+def _track_successful_call(prompt: str, content: str, response_data: Dict, start_time: float) -> None:
+    """Record token usage for a successful API call"""
     try:
-        response = _make_api_request_with_retry(api_url, headers, payload, timeout)
-        
-        # Handle various HTTP status codes
-        _handle_api_response_status(response)
-        
-        # Parse and validate response
-        try:
-            response_data = response.json()
-        except json.JSONDecodeError as e:
-            raise Exception(
-                f"Failed to parse API response as JSON.\n"
-                f"This may indicate a temporary service issue.\n"
-                f"Response status: {response.status_code}\n"
-                f"Response preview: {response.text[:200]}...\n\n"
-                f"Please try again in a few moments."
-            )
-        
-        # Validate response structure
-        if 'choices' not in response_data:
-            raise Exception(
-                f"Invalid API response format: missing 'choices' field.\n"
-                f"Response: {response_data}\n\n"
-                f"This may indicate an API service issue. Please try again."
-            )
-        
-        if not response_data['choices'] or len(response_data['choices']) == 0:
-            raise Exception(
-                f"API response contains no choices.\n"
-                f"This may indicate an issue with the request or API service.\n"
-                f"Please try again with a shorter prompt if the issue persists."
-            )
-        
-        # Extract content
-        choice = response_data['choices'][0]
-        if 'message' not in choice or 'content' not in choice['message']:
-            raise Exception(
-                f"Invalid API response structure: missing message content.\n"
-                f"Response: {response_data}\n\n"
-                f"Please try again."
-            )
+        usage_data = response_data.get('usage', {})
+        tokens_used = usage_data.get('total_tokens', 0)
         
-        content = choice['message']['content']
+        # If no usage data, estimate tokens (rough estimate: 1 token ≈ 4 characters)
+        if tokens_used == 0:
+            estimated_tokens = (len(prompt) + len(content)) // 4
+            tokens_used = max(estimated_tokens, 100)  # Minimum reasonable estimate
         
-        if not content or not content.strip():
-            raise Exception(
-                "API returned empty content. This may indicate a processing issue.\n"
-                "Please try again with a different prompt or check your API quota."
-            )
-        
-        # Track successful API usage
-        try:
-            usage_data = response_data.get('usage', {})
-            tokens_used = usage_data.get('total_tokens', 0)
-            
-            # If no usage data, estimate tokens (rough estimate: 1 token ≈ 4 characters)
-            if tokens_used == 0:
-                estimated_tokens = (len(prompt) + len(content)) // 4
-                tokens_used = max(estimated_tokens, 100)  # Minimum reasonable estimate
-            
-            processing_time = time.time() - start_time if 'start_time' in locals() else 0
-            track_api_usage(tokens_used, processing_time, True)
-        except Exception:
-            # Don't fail the main operation if usage tracking fails
-            pass
-        
-        return content
+        processing_time = time.time() - start_time
+        track_api_usage(tokens_used, processing_time, True)
+    except Exception:
+        # Don't fail the main operation if usage tracking fails
+        pass
+
+def _translate_api_error(error: Exception, prompt: str, timeout: int, start_time: float) -> Exception:
+    """
+    Map a failed API call to the exception shown to the user
+    
+    Args:
+        error: The exception raised while calling the API
+        prompt: The prompt that was sent (for usage estimates)
+        timeout: Request timeout in seconds
+        start_time: When the call started
         
-    except requests.exceptions.Timeout:
-        raise Exception(
+    Returns:
+        The exception to raise
+    """
+    if isinstance(error, requests.exceptions.Timeout):
+        return Exception(
             f"API request timed out after {timeout} seconds.\n\n"
             f"This could be due to:\n"
             f"• High API load\n"
@@ -228,8 +323,8 @@ def call_perplexity_api(prompt: str) -> str:
             f"• Consider using a shorter resume or job description"
         )
     
-    except requests.exceptions.ConnectionError as e:
-        raise Exception(
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return Exception(
             f"Failed to connect to Perplexity API.\n\n"
             f"This could be due to:\n"
             f"• Internet connectivity issues\n"
@@ -241,48 +336,70 @@ def call_perplexity_api(prompt: str) -> str:
             f"• Try accessing https://api.perplexity.ai in your browser\n"
             f"• Check if you're behind a corporate firewall\n"
             f"• Wait a few minutes and try again\n\n"
-            f"Technical details: {str(e)}"
+            f"Technical details: {str(error)}"
         )
     
-    except requests.exceptions.RequestException as e:
-        raise Exception(
+    if isinstance(error, requests.exceptions.RequestException):
+        return Exception(
             f"API request failed due to a network error.\n\n"
-            f"Error details: {str(e)}\n\n"
+            f"Error details: {str(error)}\n\n"
             f"Solutions:\n"
             f"• Check your internet connection\n"
             f"• Try again in a few moments\n"
             f"• Contact support if the issue persists"
         )
     
-    except Exception as e:
-        # Track failed API usage
-        try:
-            processing_time = time.time() - start_time
-            # Estimate tokens for failed request (just the prompt)
-            estimated_tokens = len(prompt) // 4
-            track_api_usage(estimated_tokens, processing_time, False, str(e))
-        except Exception:
-            # Don't fail if usage tracking fails
-            pass
-        
-        # Catch any other unexpected errors
-        error_msg = str(e)
-        if "rate limit" in error_msg.lower():
-            # Re-raise rate limit errors as-is (they have good messages)
-            raise
-        elif "api key" in error_msg.lower():
-            # Re-raise API key errors as-is
-            raise
-        else:
-            # Wrap other errors with context
-            raise Exception(
-                f"Unexpected error during API call: {error_msg}\n\n"
-                f"Please try again. If the problem persists, this may indicate:\n"
-                f"• A temporary service issue\n"
-                f"• An issue with your API configuration\n"
-                f"• A problem with the input data\n\n"
-                f"Contact support if you continue to see this error."
-            )
+    # Track failed API usage
+    try:
+        processing_time = time.time() - start_time
+        # Estimate tokens for failed request (just the prompt)
+        estimated_tokens = len(prompt) // 4
+        track_api_usage(estimated_tokens, processing_time, False, str(error))
+    except Exception:
+        # Don't fail if usage tracking fails
+        pass
+    
+    # Catch any other unexpected errors
+    error_msg = str(error)
+    if "rate limit" in error_msg.lower():
+        # Re-raise rate limit errors as-is (they have good messages)
+        return error
+    elif "api key" in error_msg.lower():
+        # Re-raise API key errors as-is
+        return error
+    else:
+        # Wrap other errors with context
+        return Exception(
+            f"Unexpected error during API call: {error_msg}\n\n"
+            f"Please try again. If the problem persists, this may indicate:\n"
+            f"• A temporary service issue\n"
+            f"• An issue with your API configuration\n"
+            f"• A problem with the input data\n\n"
+            f"Contact support if you continue to see this error."
+        )
+
+def _build_api_payload(prompt: str, config: Dict) -> Dict:
+    """Build the cost-optimized chat completion payload for a prompt"""
+    payload = {
+        'model': 'sonar-pro',
+        'messages': [
+            {
+                'role': 'system',
+                'content': 'You are an expert HR analyst specializing in resume and job description matching. Provide accurate, structured analysis in the requested JSON format.'
+            },
+            {
+                'role': 'user',
+                'content': prompt
+            }
+        ],
+        'max_tokens': int(config.get('max_tokens', '4000')),
+        'temperature': 0.1,  # Low temperature for consistent, factual responses
+        'top_p': 0.9
+    }
+
+    # Apply cost optimization to the payload
+    from .utils import optimize_api_payload
+    return optimize_api_payload(payload)
 
 def calculate_score(api_response: str) -> int:
     """Generate 0-100% compatibility score from API response"""
@@ -589,7 +706,8 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
         Exception: If all retry attempts fail
     """
     last_exception = None
-    retry_delays = [1, 2, 4]  # Exponential backoff: 1s, 2s, 4s
+    # Pooled keep-alive client; retries stay here so status-specific handling is preserved
+    client = get_http_client()
     
     for attempt in range(max_retries):
         try:
@@ -598,7 +716,7 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
                 print(f"🔄 Retrying API request (attempt {attempt + 1}/{max_retries})...")
             
             # Make the request
-            response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+            response = client.post(url, headers=headers, json=payload, timeout=timeout, retries=0)
             
             # Handle different response scenarios
             if response.status_code == 200:
@@ -615,31 +733,31 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
                 # Authentication/authorization errors - don't retry
                 return response
             
+            elif response.status_code == 503 and attempt < max_retries - 1:
+                # Service unavailable - retry with longer delay
+                delay = client.backoff_delay(attempt) * 2
+                print(f"⚠️  Service unavailable. Retrying in {delay:.1f} seconds...")
+                time.sleep(delay)
+                continue
+            
             elif response.status_code >= 500 and attempt < max_retries - 1:
                 # Server errors - retry with backoff
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Server error ({response.status_code}). Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Server error ({response.status_code}). Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             
             elif response.status_code == 502 and attempt < max_retries - 1:
                 # Bad gateway - often transient, retry
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Bad gateway error. Retrying in {delay} seconds...")
-                time.sleep(delay)
-                continue
-            
-            elif response.status_code == 503 and attempt < max_retries - 1:
-                # Service unavailable - retry with longer delay
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)] * 2
-                print(f"⚠️  Service unavailable. Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Bad gateway error. Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             
             elif response.status_code == 504 and attempt < max_retries - 1:
                 # Gateway timeout - retry
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Gateway timeout. Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Gateway timeout. Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             
@@ -650,16 +768,16 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
         except requests.exceptions.Timeout as e:
             last_exception = e
             if attempt < max_retries - 1:
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Request timeout. Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Request timeout. Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
             
         except requests.exceptions.ConnectionError as e:
             last_exception = e
             if attempt < max_retries - 1:
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Connection error. Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Connection error. Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
         
@@ -674,14 +792,18 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
                 raise e
             
             if attempt < max_retries - 1:
-                delay = retry_delays[min(attempt, len(retry_delays) - 1)]
-                print(f"⚠️  Request error: {str(e)[:100]}... Retrying in {delay} seconds...")
+                delay = client.backoff_delay(attempt)
+                print(f"⚠️  Request error: {str(e)[:100]}... Retrying in {delay:.1f} seconds...")
                 time.sleep(delay)
                 continue
     
     # If all retries failed, raise the last exception with context
+    raise _retries_exhausted_error(max_retries, last_exception)
+
+def _retries_exhausted_error(max_retries: int, last_exception: Optional[Exception]) -> Exception:
+    """Build the error raised once every retry attempt has failed"""
     if last_exception:
-        raise Exception(
+        return Exception(
             f"API request failed after {max_retries} attempts.\n"
             f"Last error: {str(last_exception)}\n\n"
             f"This could indicate:\n"
@@ -690,13 +812,23 @@ def _make_api_request_with_retry(url: str, headers: Dict, payload: Dict, timeout
             f"• Firewall or proxy blocking requests\n\n"
             f"Please check your internet connection and try again later."
         )
-    else:
-        raise Exception(
-            f"API request failed after {max_retries} attempts with no specific error captured."
-        )
+    return Exception(
+        f"API request failed after {max_retries} attempts with no specific error captured."
+    )
 
 def _parse_api_response(api_response: str) -> Dict:
     """Parse structured JSON response from Perplexity API"""
+    parsed_data, _ = _parse_api_response_with_status(api_response)
+    return parsed_data
+
+def _parse_api_response_with_status(api_response: str) -> Tuple[Dict, bool]:
+    """
+    Parse structured JSON response from Perplexity API
+    
+    Returns:
+        (parsed_data, parsed); parsed is False when JSON parsing failed and
+        parsed_data came from _fallback_text_parsing
+    """
     try:
         # Try to find JSON in the response
         # Sometimes the API returns text before/after the JSON
@@ -728,11 +860,11 @@ def _parse_api_response(api_response: str) -> Dict:
             if category not in result['skill_gaps']:
                 result['skill_gaps'][category] = []
         
-        return result
+        return result, True
         
     except (json.JSONDecodeError, ValueError) as e:
         # If JSON parsing fails, try to extract information using text parsing
-        return _fallback_text_parsing(api_response)
+        return _fallback_text_parsing(api_response), False
 
 def _fallback_text_parsing(api_response: str) -> Dict:
     """Fallback text parsing when JSON parsing fails"""
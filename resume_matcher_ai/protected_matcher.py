@@ -8,6 +8,7 @@ import json
 import requests
 from typing import Dict, List, Any
 from .utils import MatchResult
+from .skill_matcher import get_skill_matcher
 
 def get_analysis_mode() -> str:
     """Get analysis mode from environment"""
@@ -31,20 +32,16 @@ def basic_keyword_analysis(resume_text: str, jd_data: Dict) -> MatchResult:
     # Extract basic keywords from job description
     jd_text = jd_data.get('raw_text', '')
     
-    # Simple keyword extraction
-    common_skills = [
-        'python', 'java', 'javascript', 'react', 'node.js', 'sql', 'aws',
-        'machine learning', 'data analysis', 'project management', 'agile',
-        'communication', 'leadership', 'teamwork', 'problem solving'
-    ]
+    # One pass over each text finds every taxonomy skill it mentions; both are
+    # prose, so words like "go" or "rest" only count next to other tech skills
+    skill_matcher = get_skill_matcher()
+    resume_skills = set(skill_matcher.find_skills(resume_text, prose=True))
+    jd_skills = skill_matcher.find_skills(jd_text, prose=True)
     
     # Find matches
-    resume_lower = resume_text.lower()
-    jd_lower = jd_text.lower()
-    
     matching_skills = []
-    for skill in common_skills:
-        if skill in resume_lower and skill in jd_lower:
+    for skill in jd_skills:
+        if skill in resume_skills:
             matching_skills.append({
                 'skill': skill,
                 'resume': f"Found '{skill}' in resume",
@@ -70,10 +67,7 @@ def basic_keyword_analysis(resume_text: str, jd_data: Dict) -> MatchResult:
     ]
     
     # Basic skill gaps
-    missing_skills = []
-    for skill in common_skills:
-        if skill in jd_lower and skill not in resume_lower:
-            missing_skills.append(skill)
+    missing_skills = [skill for skill in jd_skills if skill not in resume_skills]
     
     skill_gaps = {
         'Critical': missing_skills[:3],
@@ -85,6 +79,7 @@ def basic_keyword_analysis(resume_text: str, jd_data: Dict) -> MatchResult:
         score=score,
         match_category=match_category,
         matching_skills=matching_skills,
+        missing_skills=missing_skills,
         skill_gaps=skill_gaps,
         suggestions=suggestions,
         processing_time=1.0  # Simulated processing time
@@ -0,0 +1,224 @@
+"""
+In-flight request coalescing
+Concurrent analyses of the same prompt share one upstream API call
+"""
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .utils import load_config
+
+logger = logging.getLogger(__name__)
+
+class _Call:
+    """An execution that other callers with the same key can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into a single execution
+
+    Within a process, the first caller for a key runs the function and later
+    callers block until it finishes, then receive the same value (or exception).
+    With distributed=True a lock row in the database extends this across
+    processes: callers that find the row held by another process wait for it to
+    be released and then check lookup() for the result the owner stored.
+    """
+
+    def __init__(self, distributed: bool = False, lock_ttl: float = 120.0,
+                 poll_interval: float = 0.25, db_manager=None):
+        """
+        Args:
+            distributed: Also coordinate with other processes through the database
+            lock_ttl: Seconds after which another process's lock is considered stale
+            poll_interval: Seconds between checks while waiting on another process
+            db_manager: Database manager for lock rows (defaults to get_db())
+        """
+        self.distributed = distributed
+        self.lock_ttl = lock_ttl
+        self.poll_interval = poll_interval
+        self._db = db_manager
+        self._table_ready = False
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    @property
+    def db(self):
+        """Database manager, resolved lazily so the CLI can run without a database"""
+        if self._db is None:
+            from database.connection import get_db
+            self._db = get_db()
+        return self._db
+
+    def ensure_table(self):
+        """Create the lock table if it doesn't exist"""
+        if self._table_ready:
+            return
+
+        self.db.execute_command("""
+            CREATE TABLE IF NOT EXISTS analysis_inflight (
+                flight_key VARCHAR(64) PRIMARY KEY,
+                owner VARCHAR(128) NOT NULL,
+                acquired_at DOUBLE PRECISION NOT NULL,
+                expires_at DOUBLE PRECISION NOT NULL
+            )
+        """)
+        self._table_ready = True
+
+    def do(self, key: str, fn: Callable[[], Any],
+           lookup: Optional[Callable[[], Any]] = None) -> Tuple[Any, bool]:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Identity of the work (e.g. the prompt hash)
+            fn: Produces the value; only one caller per key runs it at a time
+            lookup: Returns a value stored by another process, or None
+                (only used in distributed mode)
+
+        Returns:
+            (value, shared) where shared is True if this caller did not run fn itself
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value, shared = self._execute(key, fn, lookup)
+            return call.value, shared
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _execute(self, key: str, fn: Callable[[], Any],
+                 lookup: Optional[Callable[[], Any]]) -> Tuple[Any, bool]:
+        """Run fn, first taking the cross-process lock when distributed"""
+        if not self.distributed:
+            return self._run(fn), False
+
+        owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        try:
+            acquired = self._wait_for_lock(key, owner, lookup)
+        except Exception as e:
+            # The lock is an optimization; never fail an analysis over it
+            logger.warning(f"Single-flight lock unavailable, running without it: {e}")
+            return self._run(fn), False
+
+        if acquired is not True:
+            # Another process finished the same work while we waited
+            return acquired, True
+
+        try:
+            return self._run(fn), False
+        finally:
+            self._release_lock(key, owner)
+
+    def _run(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._executions += 1
+        return fn()
+
+    def _wait_for_lock(self, key: str, owner: str, lookup: Optional[Callable[[], Any]]) -> Any:
+        """
+        Take the lock row for key, waiting while another process holds it
+
+        Returns:
+            True once the lock is held, or the value another process produced
+        """
+        self.ensure_table()
+        while True:
+            now = time.time()
+            inserted = self.db.execute_command("""
+                INSERT INTO analysis_inflight (flight_key, owner, acquired_at, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (flight_key) DO NOTHING
+            """, (key, owner, now, now + self.lock_ttl))
+            if inserted:
+                return True
+
+            # Clear a lock left behind by a crashed process
+            self.db.execute_command(
+                "DELETE FROM analysis_inflight WHERE flight_key = ? AND expires_at < ?",
+                (key, now)
+            )
+
+            while self._lock_held(key):
+                time.sleep(self.poll_interval)
+
+            if lookup:
+                value = lookup()
+                if value is not None:
+                    with self._lock:
+                        self._coalesced += 1
+                    return value
+
+    def _lock_held(self, key: str) -> bool:
+        row = self.db.get_single_result(
+            "SELECT expires_at FROM analysis_inflight WHERE flight_key = ?", (key,)
+        )
+        return bool(row) and row['expires_at'] >= time.time()
+
+    def _release_lock(self, key: str, owner: str) -> None:
+        try:
+            self.db.execute_command(
+                "DELETE FROM analysis_inflight WHERE flight_key = ? AND owner = ?",
+                (key, owner)
+            )
+        except Exception as e:
+            logger.warning(f"Failed to release single-flight lock: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get execution and coalescing counters for this process"""
+        with self._lock:
+            return {
+                'executions': self._executions,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls),
+                'distributed': self.distributed
+            }
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """Get the global single-flight group, or None when coalescing is disabled"""
+    global _single_flight
+
+    config = load_config()
+    if not config.get('enable_single_flight', True):
+        return None
+
+    with _single_flight_lock:
+        if _single_flight is None:
+            # Waiters in other processes can only pick up results through the analysis cache
+            _single_flight = SingleFlight(
+                distributed=config.get('single_flight_distributed', False)
+                and config.get('enable_analysis_cache', False),
+                lock_ttl=config.get('single_flight_lock_ttl', 120)
+            )
+        return _single_flight
@@ -0,0 +1,379 @@
+"""
+Dictionary-based skill matching
+Finds every taxonomy skill mentioned in a text in one pass, however large the taxonomy
+"""
+import json
+import logging
+import re
+import threading
+from bisect import bisect_left
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from .utils import load_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).with_name('skill_taxonomy.json')
+
+class SkillHit(NamedTuple):
+    """A taxonomy skill found in a text"""
+    skill: str      # Canonical skill name
+    category: str   # Taxonomy category, e.g. 'technical' or 'soft'
+    start: int      # Offset of the matched term in the text
+    end: int
+    ambiguous: bool = False  # The term is also an everyday word, e.g. "go" or "rest"
+
+# Texts and terms are matched as sequences of these tokens: words, single
+# punctuation characters and whitespace runs. Every character falls in exactly
+# one token, so token lengths add up to text offsets.
+_TOKEN = re.compile(r'\w+|[^\w\s]|\s+')
+_WORD = re.compile(r'\w+')
+# Whitespace other than single spaces, which has to be collapsed before matching
+_IRREGULAR_WHITESPACE = re.compile(r'\s(?<! )|\s\s')
+
+def _lower_aligned(text: str) -> str:
+    """Lowercase text, leaving the few characters that lowercase to several as they are"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Keeps offsets in the lowered text aligned with text
+        lowered = ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+    return lowered
+
+def _tokenize(text: str) -> List[str]:
+    """Split lowercased text into tokens, with whitespace runs collapsed to one space"""
+    return [' ' if token[0].isspace() else token for token in _TOKEN.findall(text)]
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over the names and aliases of a skill taxonomy
+
+    The automaton steps over word tokens rather than characters, which makes
+    matching word-boundary aware in the same way as a regex \\b around each
+    term: "java" doesn't match inside "javascript", while ".net" still matches
+    inside "asp.net". Matching is case-insensitive and treats any run of
+    whitespace as a single space. Scanning cost depends on the length of the
+    text and the number of hits, not on the size of the taxonomy.
+
+    Skills flagged "ambiguous" in the taxonomy are names that double as
+    everyday words ("go", "rest", "spring"). In prose they only count when
+    another skill of the same category is mentioned nearby; see find_all.
+    """
+
+    # Characters between an ambiguous term and a skill that vouches for it
+    CONTEXT_WINDOW = 50
+    # Up to this many multi-token terms ("c++", "power bi"), first_categories() finds
+    # them with one regex per category, which beats stepping the automaton on
+    # short texts; past it the regex's cost grows with the taxonomy and the
+    # automaton wins. Single-word terms are set lookups at any taxonomy size.
+    PHRASE_REGEX_MAX_TERMS = 300
+
+    def __init__(self, taxonomy: Dict[str, Iterable[Union[str, Dict]]]):
+        """
+        Args:
+            taxonomy: Mapping of category to skills. Each skill is a name, or a
+                dict with 'name' and optional 'aliases' and 'ambiguous'. The
+                ambiguous flag applies to the name only; aliases such as
+                "golang" are distinctive enough on their own. A skill listed
+                under several categories keeps the first one.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[tuple] = [()]
+        # Per term: (skill, category, number of tokens, ambiguous), and its tokens
+        self._terms: List[tuple] = []
+        self._term_token_lists: List[List[str]] = []
+        self.skill_categories: Dict[str, str] = {}
+
+        for category, skills in taxonomy.items():
+            for entry in skills:
+                if isinstance(entry, str):
+                    name, aliases, ambiguous = entry, [], False
+                else:
+                    name, aliases = entry['name'], entry.get('aliases', [])
+                    ambiguous = bool(entry.get('ambiguous', False))
+                name = name.strip().lower()
+                if not name or name in self.skill_categories:
+                    continue
+                self.skill_categories[name] = category
+                self._add_term(_tokenize(name), name, category, ambiguous)
+                for term in [alias.strip().lower() for alias in aliases]:
+                    if term:
+                        self._add_term(_tokenize(term), name, category, False)
+
+        self._build_failure_links()
+        self._category_index = self._build_category_index()
+
+    def _add_term(self, tokens: List[str], skill: str, category: str, ambiguous: bool) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+                self._goto[state][token] = next_state
+            state = next_state
+
+        if self._output[state]:
+            return  # Same text as an earlier name or alias
+        self._output[state] = (len(self._terms),)
+        self._terms.append((skill, category, len(tokens), ambiguous))
+        self._term_token_lists.append(tokens)
+
+    def _build_failure_links(self) -> None:
+        """Breadth-first pass linking each state to its longest proper suffix state"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                link = self._goto[fallback].get(token, 0)
+                self._fail[next_state] = link if link != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.skill_categories)
+
+    def find_all(self, text: str, prose: bool = False) -> List[SkillHit]:
+        """
+        Find every occurrence of every taxonomy term in text
+
+        Args:
+            text: Text to search
+            prose: Text is free-form writing rather than a list of skills, so
+                ambiguous terms are dropped unless a non-ambiguous skill of the
+                same category is within CONTEXT_WINDOW characters
+
+        Returns:
+            Hits ordered by end offset; overlapping terms (e.g. "project
+            management" and "management") are all reported
+        """
+        hits = list(self.iter_all(text))
+        if prose:
+            hits = self._drop_unsupported(hits)
+        return hits
+
+    def _drop_unsupported(self, hits: List[SkillHit]) -> List[SkillHit]:
+        """Remove ambiguous hits with no non-ambiguous hit of their category nearby"""
+        if not any(hit.ambiguous for hit in hits):
+            return hits
+
+        # Per category, anchors ordered by end with the smallest start of every
+        # suffix: an anchor is near a hit if it ends no earlier than
+        # hit.start - window and starts no later than hit.end + window
+        anchors: Dict[str, tuple] = {}
+        for hit in hits:
+            if not hit.ambiguous:
+                ends, starts = anchors.setdefault(hit.category, ([], []))
+                ends.append(hit.end)
+                starts.append(hit.start)
+        for ends, starts in anchors.values():
+            for i in range(len(starts) - 2, -1, -1):
+                starts[i] = min(starts[i], starts[i + 1])
+
+        window = self.CONTEXT_WINDOW
+        kept = []
+        for hit in hits:
+            if hit.ambiguous:
+                ends, min_starts = anchors.get(hit.category, ((), ()))
+                i = bisect_left(ends, hit.start - window)
+                if i == len(ends) or min_starts[i] > hit.end + window:
+                    continue
+            kept.append(hit)
+        return kept
+
+    def iter_all(self, text: str) -> Iterator[SkillHit]:
+        """Lazy version of find_all, for callers that can stop at the first hit they need"""
+        if not text:
+            return
+
+        lowered = _lower_aligned(text)
+        goto, fail, output, terms = self._goto, self._fail, self._output, self._terms
+        root = goto[0]
+        raw_tokens = _TOKEN.findall(lowered)
+        tokens = raw_tokens
+        if _IRREGULAR_WHITESPACE.search(lowered):
+            tokens = [' ' if token[0].isspace() else token for token in raw_tokens]
+
+        # Text offsets are only worked out when there is a hit
+        offset_index = offset = 0
+        state = 0
+
+        for i, token in enumerate(tokens):
+            if state:
+                next_state = goto[state].get(token)
+                while next_state is None and state:
+                    state = fail[state]
+                    next_state = goto[state].get(token)
+                state = next_state or 0
+            else:
+                state = root.get(token, 0)
+
+            if not output[state]:
+                continue
+
+            offset += sum(map(len, raw_tokens[offset_index:i + 1]))
+            offset_index = i + 1
+            for term_id in output[state]:
+                skill, category, length, ambiguous = terms[term_id]
+                start = offset - sum(map(len, raw_tokens[i + 1 - length:i + 1]))
+                yield SkillHit(skill, category, start, offset, ambiguous)
+
+    def first_categories(self, texts: Iterable[str], categories: Iterable[str]) -> List[Optional[str]]:
+        """
+        For each text, the first of categories it has a term of (ambiguous
+        terms included), or None
+
+        Same matches as iter_all, but much cheaper on short texts such as the
+        entries of a skills list: each text is split into words once, single
+        words are set lookups and only the category's phrases need a regex.
+        """
+        categories = list(categories)
+        if self._category_index is None:
+            results = []
+            for text in texts:
+                found = {hit.category for hit in self.iter_all(text)}
+                results.append(next((category for category in categories if category in found), None))
+            return results
+
+        indexes = [(category,) + self._category_index[category]
+                   for category in categories if category in self._category_index]
+        findall = _WORD.findall
+        results = []
+        for text in texts:
+            lowered = _lower_aligned(text)
+            words = findall(lowered)
+            first = None
+            for category, word_terms, candidate, exact in indexes:
+                # Phrases are rare, so a boundary-free pattern rules most texts out first
+                if not word_terms.isdisjoint(words) or (
+                        candidate is not None and candidate.search(lowered) and exact.search(lowered)):
+                    first = category
+                    break
+            results.append(first)
+        return results
+
+    def mentions(self, text: str, category: str) -> bool:
+        """Whether text has a term of the category; see first_categories"""
+        return self.first_categories([text], [category])[0] is not None
+
+    def _build_category_index(self) -> Optional[Dict[str, tuple]]:
+        """
+        Per category: (single-word terms, candidate phrase regex, exact phrase regex),
+        or None past PHRASE_REGEX_MAX_TERMS
+
+        The exact regex doesn't let a phrase start or end inside a word token,
+        as iter_all; phrases are grouped by the boundaries they need so each
+        group is one alternation. Whitespace in a phrase matches any run.
+        """
+        words: Dict[str, set] = {}
+        phrases: Dict[str, List[List[str]]] = {}
+        for tokens, (_, category, _, _) in zip(self._term_token_lists, self._terms):
+            words.setdefault(category, set())
+            if len(tokens) == 1 and _WORD.fullmatch(tokens[0]):
+                words[category].add(tokens[0])
+            else:
+                phrases.setdefault(category, []).append(tokens)
+        if sum(map(len, phrases.values())) > self.PHRASE_REGEX_MAX_TERMS:
+            return None
+
+        index = {}
+        for category, word_terms in words.items():
+            candidate = exact = None
+            if category in phrases:
+                bodies, groups = [], {}
+                for tokens in phrases[category]:
+                    body = ''.join(r'\s+' if token == ' ' else re.escape(token) for token in tokens)
+                    bodies.append(body)
+                    boundaries = (bool(_WORD.match(tokens[0])), bool(_WORD.match(tokens[-1])))
+                    groups.setdefault(boundaries, []).append(body)
+                candidate = re.compile('|'.join(bodies))
+                exact = re.compile('|'.join(
+                    (r'(?<!\w)' if before else '') + f"(?:{'|'.join(group)})" + (r'(?!\w)' if after else '')
+                    for (before, after), group in groups.items()
+                ))
+            index[category] = (frozenset(word_terms), candidate, exact)
+        return index
+
+    def find_skills(self, text: str, category: Optional[str] = None,
+                    prose: bool = False) -> List[str]:
+        """
+        Canonical names of the skills mentioned in text, in order of first mention
+
+        Args:
+            text: Text to search
+            category: Only return skills from this category
+            prose: Treat text as free-form writing; see find_all
+        """
+        skills = {}
+        for hit in self.find_all(text, prose=prose):
+            if category is None or hit.category == category:
+                skills.setdefault(hit.skill, None)
+        return list(skills)
+
+def load_skill_taxonomy(path: Optional[Union[str, Path]] = None) -> Dict[str, List]:
+    """
+    Load a skill taxonomy file
+
+    The file is JSON: {"version": 1, "categories": {"technical": [...], ...}}
+    where each skill is a name or {"name": ..., "aliases": [...], "ambiguous": true}.
+
+    Args:
+        path: Taxonomy file (defaults to the bundled skill_taxonomy.json)
+
+    Raises:
+        ValueError: If the file is not a valid taxonomy
+    """
+    path = Path(path) if path else DEFAULT_TAXONOMY_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    categories = data.get('categories') if isinstance(data, dict) else None
+    if not isinstance(categories, dict):
+        raise ValueError(f"Skill taxonomy {path} has no 'categories' mapping")
+
+    for category, skills in categories.items():
+        if not isinstance(skills, list):
+            raise ValueError(f"Skill taxonomy category '{category}' must be a list")
+        for entry in skills:
+            if not isinstance(entry, str) and not (isinstance(entry, dict) and 'name' in entry):
+                raise ValueError(f"Invalid skill entry in category '{category}': {entry!r}")
+
+    return categories
+
+_skill_matcher: Optional[SkillMatcher] = None
+_skill_matcher_lock = threading.Lock()
+
+def get_skill_matcher() -> SkillMatcher:
+    """
+    Get the global skill matcher, built on first use from the taxonomy at
+    SKILL_TAXONOMY_PATH (or the bundled taxonomy)
+    """
+    global _skill_matcher
+
+    matcher = _skill_matcher
+    if matcher is not None:
+        return matcher
+
+    with _skill_matcher_lock:
+        if _skill_matcher is None:
+            path = load_config().get('skill_taxonomy_path') or None
+            _skill_matcher = SkillMatcher(load_skill_taxonomy(path))
+            logger.info(f"Loaded {len(_skill_matcher)} skills from {path or DEFAULT_TAXONOMY_PATH}")
+        return _skill_matcher
+
+def reload_skill_matcher(path: Optional[Union[str, Path]] = None) -> SkillMatcher:
+    """Rebuild the global skill matcher, e.g. after the taxonomy file changed"""
+    global _skill_matcher
+
+    taxonomy = load_skill_taxonomy(path or load_config().get('skill_taxonomy_path') or None)
+    matcher = SkillMatcher(taxonomy)
+    with _skill_matcher_lock:
+        _skill_matcher = matcher
+    return matcher
@@ -0,0 +1,373 @@
+"""
+Append-only API usage log
+One JSON record per line, size-based rotation and a running 30-day cost total
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    fcntl = None
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+class UsageLog:
+    """
+    Usage records stored as JSON Lines
+
+    The log is <name>.jsonl; a configured <name>.json path (the old JSON array
+    log) is mapped to it. If the old array file exists it is folded into the
+    JSON Lines log once, ahead of any records already there, and renamed to
+    <name>.json.migrated so it is never imported twice.
+
+    Each record is written with a single O_APPEND write, so concurrent writers
+    (threads or processes) never interleave or lose records. Appends hold a
+    shared lock on the <path>.lock sidecar; prune() and the legacy migration,
+    which rewrite files, hold it exclusively so no append lands between their
+    read and replace. When the file grows past max_bytes it is renamed to
+    <path>.1 (shifting older backups up to backup_count), like a rotating log
+    handler.
+
+    The cost of successful calls over the trailing window is kept as a running
+    total. Records are read once: the log is tailed from the last offset seen,
+    which also picks up records appended by other processes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3,
+                 window_days: int = 30):
+        """
+        Args:
+            path: Log file path; a .json suffix is replaced with .jsonl
+            max_bytes: Rotate once the log reaches this size (0 disables rotation)
+            backup_count: Number of rotated files to keep
+            window_days: Length of the running cost window
+        """
+        self.path = _log_path(path)
+        self.legacy_path = self.path.with_suffix('.json') if self.path.suffix == '.jsonl' else None
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.window = timedelta(days=window_days)
+        self._lock = threading.Lock()
+        self._migrated = False
+
+        # Running cost window: (timestamp, cost) of successful calls in order read
+        self._window_entries: deque = deque()
+        self._window_cost = 0.0
+        self._loaded = False
+        self._read_inode: Optional[int] = None
+        self._read_offset = 0
+
+    def backup_path(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{index}")
+
+    @property
+    def lock_path(self) -> Path:
+        return self.path.with_name(self.path.name + '.lock')
+
+    def create(self) -> None:
+        """Create an empty log if there is none, migrating a legacy log first"""
+        with self._lock:
+            self._migrate_legacy_file()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self.lock_path, shared=True):
+                os.close(os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644))
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append one record and rotate the log if it has grown too large"""
+        line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+
+        with self._lock:
+            self._migrate_legacy_file()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with _file_lock(self.lock_path, shared=True):
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                    size = os.fstat(fd).st_size
+                finally:
+                    os.close(fd)
+
+            if self.max_bytes and size >= self.max_bytes:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        """Move the current log to <path>.1, shifting older backups"""
+        with _file_lock(self.lock_path):
+            # Another process may have rotated while we waited for the lock
+            try:
+                if self.path.stat().st_size < self.max_bytes:
+                    return
+            except FileNotFoundError:
+                return
+
+            if self.backup_count <= 0:
+                os.remove(self.path)
+                return
+
+            for index in range(self.backup_count - 1, 0, -1):
+                if self.backup_path(index).exists():
+                    os.replace(self.backup_path(index), self.backup_path(index + 1))
+            os.replace(self.path, self.backup_path(1))
+
+    def _migrate_legacy_file(self) -> None:
+        """Fold a log written as one JSON array into the JSON Lines log, once"""
+        if self._migrated:
+            return
+        self._migrated = True
+
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+
+        with _file_lock(self.lock_path):
+            try:
+                with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                    records = json.load(f)
+            except FileNotFoundError:
+                return  # Migrated by another process while we waited for the lock
+            except ValueError:
+                logger.warning(f"Not migrating unreadable usage log {self.legacy_path}")
+                return
+            if not isinstance(records, list):
+                logger.warning(f"Not migrating usage log {self.legacy_path}: not a JSON array")
+                return
+
+            temp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, separators=(',', ':')) + '\n')
+                # Records appended before the migration ran are newer, so they go last
+                try:
+                    with open(self.path, 'r', encoding='utf-8') as current:
+                        shutil.copyfileobj(current, f)
+                except FileNotFoundError:
+                    pass
+            os.replace(temp_path, self.path)
+            os.replace(self.legacy_path, self.legacy_path.with_name(self.legacy_path.name + '.migrated'))
+            logger.info(f"Migrated {len(records)} usage records from {self.legacy_path} to {self.path}")
+
+    def iter_records(self, since: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records oldest first, from rotated backups and then the current log
+
+        Args:
+            since: Skip records older than this (and records without a valid timestamp)
+        """
+        with self._lock:
+            self._migrate_legacy_file()
+
+        for index in range(self.backup_count, 0, -1):
+            yield from self._read_file(self.backup_path(index), since)
+        yield from self._read_file(self.path, since)
+
+    def _read_file(self, path: Path, since: Optional[datetime]) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                record = _parse_line(line)
+                if record is None:
+                    continue
+                if since is not None:
+                    timestamp = _record_time(record)
+                    if timestamp is None or timestamp < since:
+                        continue
+                yield record
+
+    def recent_cost(self) -> float:
+        """Cost of successful calls within the window, updated incrementally"""
+        with self._lock:
+            self._migrate_legacy_file()
+            cutoff = datetime.now() - self.window
+
+            if not self._loaded:
+                # Seed from the rotated backups; the current file is tailed below
+                for index in range(self.backup_count, 0, -1):
+                    for record in self._read_file(self.backup_path(index), cutoff):
+                        self._add_to_window(record)
+                self._loaded = True
+
+            self._tail(cutoff)
+
+            while self._window_entries and self._window_entries[0][0] < cutoff:
+                self._window_cost -= self._window_entries.popleft()[1]
+            if not self._window_entries:
+                self._window_cost = 0.0  # Don't let float drift accumulate
+
+            return max(self._window_cost, 0.0)
+
+    def _tail(self, cutoff: datetime) -> None:
+        """Read records appended to the log since the last call"""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return
+
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            if inode != self._read_inode:
+                if self._read_inode is not None:
+                    self._catch_up_after_rotation(cutoff)
+                self._read_inode = inode
+                self._read_offset = 0
+
+            f.seek(self._read_offset)
+            data = f.read()
+
+        # Leave a partially written last line for the next call
+        end = data.rfind(b'\n') + 1
+        self._read_offset += end
+        self._add_lines(data[:end], cutoff)
+
+    def _catch_up_after_rotation(self, cutoff: datetime) -> None:
+        """
+        Read what was appended to rotated files since the last call: the rest
+        of the file we were reading, then any backups rotated after it
+        """
+        newer_backups = []
+        for index in range(1, self.backup_count + 1):
+            try:
+                f = open(self.backup_path(index), 'rb')
+            except FileNotFoundError:
+                break
+            with f:
+                if os.fstat(f.fileno()).st_ino == self._read_inode:
+                    f.seek(self._read_offset)
+                    self._add_lines(f.read(), cutoff)
+                    break
+                newer_backups.append(f.read())
+
+        for data in reversed(newer_backups):
+            self._add_lines(data, cutoff)
+
+    def _add_lines(self, data: bytes, cutoff: datetime) -> None:
+        for line in data.splitlines():
+            record = _parse_line(line.decode('utf-8', errors='replace'))
+            if record is not None:
+                timestamp = _record_time(record)
+                if timestamp is not None and timestamp >= cutoff:
+                    self._add_to_window(record, timestamp)
+
+    def _add_to_window(self, record: Dict[str, Any], timestamp: Optional[datetime] = None) -> None:
+        if not record.get('success', False):
+            return
+        timestamp = timestamp or _record_time(record)
+        if timestamp is None:
+            return
+        cost = record.get('estimated_cost', 0.0) or 0.0
+        self._window_entries.append((timestamp, cost))
+        self._window_cost += cost
+
+    def prune(self, cutoff: datetime) -> int:
+        """
+        Remove records older than cutoff (records without a valid timestamp are kept)
+
+        Returns:
+            Number of records removed
+        """
+        removed = 0
+        with self._lock:
+            self._migrate_legacy_file()
+            with _file_lock(self.lock_path):
+                removed = self._prune_files(cutoff)
+
+            # Offsets into the rewritten files are no longer valid
+            self._window_entries.clear()
+            self._window_cost = 0.0
+            self._loaded = False
+            self._read_inode = None
+            self._read_offset = 0
+
+        return removed
+
+    def _prune_files(self, cutoff: datetime) -> int:
+        removed = 0
+        for path in [self.backup_path(i) for i in range(self.backup_count, 0, -1)] + [self.path]:
+            if not path.exists():
+                continue
+
+            kept = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = _parse_line(line)
+                    timestamp = _record_time(record) if record is not None else None
+                    if timestamp is not None and timestamp < cutoff:
+                        removed += 1
+                    elif line.strip():
+                        kept.append(line if line.endswith('\n') else line + '\n')
+
+            if not kept:
+                os.remove(path)
+                continue
+            temp_path = path.with_name(path.name + '.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(kept)
+            os.replace(temp_path, path)
+
+        return removed
+
+def _log_path(path: str) -> Path:
+    """The JSON Lines path for a configured log path"""
+    path = Path(path)
+    return path.with_suffix('.jsonl') if path.suffix == '.json' else path
+
+def _parse_line(line: str) -> Optional[Dict[str, Any]]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+def _record_time(record: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(record['timestamp'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class _file_lock:
+    """Advisory lock on a sidecar file (exclusive unless shared); a no-op where fcntl is unavailable"""
+
+    def __init__(self, path: Path, shared: bool = False):
+        self.path = path
+        self.shared = shared
+        self._fd = None
+
+    def __enter__(self):
+        if FCNTL_AVAILABLE:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+_usage_logs: Dict[str, UsageLog] = {}
+_usage_logs_lock = threading.Lock()
+
+def get_usage_log(path: str, max_bytes: int = 5 * 1024 * 1024, backup_count: int = 3) -> UsageLog:
+    """Get the shared UsageLog for a path, so the running totals are kept per process"""
+    key = os.path.abspath(_log_path(path))
+    with _usage_logs_lock:
+        usage_log = _usage_logs.get(key)
+        if usage_log is None:
+            usage_log = UsageLog(path, max_bytes=max_bytes, backup_count=backup_count)
+            _usage_logs[key] = usage_log
+        return usage_log
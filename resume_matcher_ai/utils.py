@@ -3,15 +3,25 @@ Shared utilities and configuration management
 """
 import os
 import re
-import json
 import time
+import hashlib
+import threading
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from typing import List
 from pathlib import Path
 
+from .usage_log import UsageLog, get_usage_log
+
+# Cached API key validation results: key fingerprint -> (is_valid, checked_at)
+_key_validation_cache: Dict[str, Tuple[bool, float]] = {}
+_key_validation_refreshing = set()
+_key_validation_lock = threading.Lock()
+_INVALID_KEY_TTL = 60  # Seconds to remember a rejected key
+_KEY_REFRESH_FRACTION = 0.75  # Refresh in the background after this share of the TTL
+
 @dataclass
 class MatchResult:
     """Data class for match analysis results"""
@@ -75,12 +85,32 @@ def load_config() -> Dict[str, str]:
     config['api_base_url'] = os.getenv('PERPLEXITY_API_URL', 'https://api.perplexity.ai')
     config['max_tokens'] = os.getenv('MAX_TOKENS', '4000')
     config['timeout'] = os.getenv('API_TIMEOUT', '30')
-    
+    config['connect_timeout'] = float(os.getenv('API_CONNECT_TIMEOUT', '5'))
+    config['http_pool_size'] = int(os.getenv('HTTP_POOL_SIZE', '10'))
+    config['http_max_retries'] = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+    config['async_max_connections'] = int(os.getenv('ASYNC_MAX_CONNECTIONS', '100'))
+    config['api_key_validation_ttl'] = int(os.getenv('API_KEY_VALIDATION_TTL', '3600'))
+
     # Load usage tracking configuration
     config['enable_usage_tracking'] = os.getenv('ENABLE_USAGE_TRACKING', 'true').lower() == 'true'
-    config['usage_log_file'] = os.getenv('USAGE_LOG_FILE', 'usage_log.json')
+    config['usage_log_file'] = os.getenv('USAGE_LOG_FILE', 'usage_log.jsonl')
+    config['usage_log_max_bytes'] = int(os.getenv('USAGE_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+    config['usage_log_backup_count'] = int(os.getenv('USAGE_LOG_BACKUP_COUNT', '3'))
     config['cost_alert_threshold'] = float(os.getenv('COST_ALERT_THRESHOLD', '10.00'))
-    
+
+    # Load analysis result cache configuration
+    config['enable_analysis_cache'] = os.getenv('ENABLE_ANALYSIS_CACHE', 'false').lower() == 'true'
+    config['analysis_cache_ttl'] = int(os.getenv('ANALYSIS_CACHE_TTL', '604800'))
+    config['analysis_cache_max_entries'] = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '5000'))
+
+    # Load in-flight request coalescing configuration
+    config['enable_single_flight'] = os.getenv('ENABLE_SINGLE_FLIGHT', 'true').lower() == 'true'
+    config['single_flight_distributed'] = os.getenv('SINGLE_FLIGHT_DISTRIBUTED', 'false').lower() == 'true'
+    config['single_flight_lock_ttl'] = float(os.getenv('SINGLE_FLIGHT_LOCK_TTL', '120'))
+
+    # Load skill taxonomy configuration (empty means the bundled taxonomy)
+    config['skill_taxonomy_path'] = os.getenv('SKILL_TAXONOMY_PATH', '')
+
     # Load application configuration
     config['debug_mode'] = os.getenv('DEBUG_MODE', 'false').lower() == 'true'
     config['log_level'] = os.getenv('LOG_LEVEL', 'INFO')
@@ -150,7 +180,7 @@ def setup_environment() -> Dict[str, Any]:
     # Step 3: Set up usage tracking
     if config.get('enable_usage_tracking', True):
         try:
-            _initialize_usage_tracking(config.get('usage_log_file', 'usage_log.json'))
+            _initialize_usage_tracking(_get_usage_log(config))
             setup_result['setup_steps'].append('✅ Usage tracking initialized')
         except Exception as e:
             setup_result['warnings'].append(f'Usage tracking setup failed: {str(e)}')
@@ -168,15 +198,19 @@ def setup_environment() -> Dict[str, Any]:
     return setup_result
 
 
-def _initialize_usage_tracking(log_file: str) -> None:
+def _initialize_usage_tracking(usage_log: UsageLog) -> None:
     """Initialize usage tracking log file"""
-    log_path = Path(log_file)
-    
-    # Create log file if it doesn't exist
-    if not log_path.exists():
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(log_path, 'w') as f:
-            json.dump([], f)
+    # Creates the log if it doesn't exist, migrating a legacy JSON array log
+    usage_log.create()
+
+
+def _get_usage_log(config: Dict[str, Any]) -> UsageLog:
+    """Get the usage log configured by config"""
+    return get_usage_log(
+        config.get('usage_log_file', 'usage_log.jsonl'),
+        max_bytes=config.get('usage_log_max_bytes', 5 * 1024 * 1024),
+        backup_count=config.get('usage_log_backup_count', 3)
+    )
 
 
 def track_api_usage(tokens_used: int, processing_time: float, success: bool, error_message: Optional[str] = None) -> None:
@@ -208,63 +242,27 @@ def track_api_usage(tokens_used: int, processing_time: float, success: bool, err
     )
     
     # Save to log file
-    log_file = config.get('usage_log_file', 'usage_log.json')
-    _save_usage_record(log_file, usage_record)
+    usage_log = _get_usage_log(config)
+    _save_usage_record(usage_log, usage_record)
     
     # Check cost threshold
-    _check_cost_threshold(log_file, config.get('cost_alert_threshold', 10.00))
+    _check_cost_threshold(usage_log, config.get('cost_alert_threshold', 10.00))
 
 
-def _save_usage_record(log_file: str, record: UsageRecord) -> None:
-    """Save usage record to log file"""
-    log_path = Path(log_file)
-    
+def _save_usage_record(usage_log: UsageLog, record: UsageRecord) -> None:
+    """Append usage record to the log"""
     try:
-        # Read existing records
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                records = json.load(f)
-        else:
-            records = []
-        
-        # Add new record
-        records.append(asdict(record))
-        
-        # Keep only last 1000 records to prevent file from growing too large
-        if len(records) > 1000:
-            records = records[-1000:]
-        
-        # Save back to file
-        log_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(log_path, 'w') as f:
-            json.dump(records, f, indent=2)
-            
+        usage_log.append(asdict(record))
     except Exception as e:
         # Silently fail if logging fails - don't break the main application
         pass
 
 
-def _check_cost_threshold(log_file: str, threshold: float) -> None:
+def _check_cost_threshold(usage_log: UsageLog, threshold: float) -> None:
     """Check if cost threshold has been exceeded and alert user"""
     try:
-        log_path = Path(log_file)
-        if not log_path.exists():
-            return
-        
-        with open(log_path, 'r') as f:
-            records = json.load(f)
-        
-        # Calculate costs for the last 30 days
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        recent_cost = 0.0
-        
-        for record in records:
-            try:
-                record_time = datetime.fromisoformat(record['timestamp'])
-                if record_time >= thirty_days_ago and record.get('success', False):
-                    recent_cost += record.get('estimated_cost', 0.0)
-            except (ValueError, KeyError):
-                continue
+        # Running total of costs for the last 30 days
+        recent_cost = usage_log.recent_cost()
         
         # Alert if threshold exceeded
         if recent_cost >= threshold:
@@ -288,8 +286,7 @@ def get_usage_statistics(days: int = 30) -> Dict[str, Any]:
         Dictionary containing usage statistics
     """
     config = load_config()
-    log_file = config.get('usage_log_file', 'usage_log.json')
-    log_path = Path(log_file)
+    usage_log = _get_usage_log(config)
     
     stats = {
         'total_calls': 0,
@@ -303,36 +300,24 @@ def get_usage_statistics(days: int = 30) -> Dict[str, Any]:
         'period_end': datetime.now().isoformat()
     }
     
-    if not log_path.exists():
-        return stats
-    
     try:
-        with open(log_path, 'r') as f:
-            records = json.load(f)
-        
-        # Filter records for the specified period
+        # Records for the specified period
         cutoff_date = datetime.now() - timedelta(days=days)
         processing_times = []
         
-        for record in records:
-            try:
-                record_time = datetime.fromisoformat(record['timestamp'])
-                if record_time >= cutoff_date:
-                    stats['total_calls'] += 1
-                    
-                    if record.get('success', False):
-                        stats['successful_calls'] += 1
-                        stats['total_tokens'] += record.get('tokens_used', 0)
-                        stats['total_cost'] += record.get('estimated_cost', 0.0)
-                    else:
-                        stats['failed_calls'] += 1
-                    
-                    processing_time = record.get('processing_time', 0.0)
-                    if processing_time > 0:
-                        processing_times.append(processing_time)
-                        
-            except (ValueError, KeyError):
-                continue
+        for record in usage_log.iter_records(since=cutoff_date):
+            stats['total_calls'] += 1
+            
+            if record.get('success', False):
+                stats['successful_calls'] += 1
+                stats['total_tokens'] += record.get('tokens_used', 0)
+                stats['total_cost'] += record.get('estimated_cost', 0.0)
+            else:
+                stats['failed_calls'] += 1
+            
+            processing_time = record.get('processing_time', 0.0)
+            if processing_time > 0:
+                processing_times.append(processing_time)
         
         # Calculate average processing time
         if processing_times:
@@ -399,12 +384,17 @@ def display_setup_instructions() -> None:
     
     print("=" * 70)
 
-def validate_api_key(api_key: str) -> bool:
+def validate_api_key(api_key: str, use_cache: bool = True) -> bool:
     """
     Check Perplexity API key validity with comprehensive validation
     
+    Probe results are cached per key fingerprint for API_KEY_VALIDATION_TTL
+    seconds and refreshed in the background shortly before they expire, so
+    analyses don't pay for an extra API round trip.
+    
     Args:
         api_key: The API key to validate
+        use_cache: Set to False to always probe the API
         
     Returns:
         True if the API key appears to be valid, False otherwise
@@ -432,8 +422,85 @@ def validate_api_key(api_key: str) -> bool:
     if not re.match(r'^pplx-[a-zA-Z0-9_\-]+$', api_key):
         return False
     
-    # Test API key with a minimal request (with enhanced error handling)
+    if not use_cache:
+        return _probe_api_key(api_key) is not False
+    
+    fingerprint = key_fingerprint(api_key)
+    ttl = load_config().get('api_key_validation_ttl', 3600)
+    
+    with _key_validation_lock:
+        entry = _key_validation_cache.get(fingerprint)
+    
+    if entry:
+        is_valid, checked_at = entry
+        age = time.time() - checked_at
+        entry_ttl = ttl if is_valid else min(ttl, _INVALID_KEY_TTL)
+        if age < entry_ttl:
+            if is_valid and age >= entry_ttl * _KEY_REFRESH_FRACTION:
+                _refresh_api_key_validation(api_key, fingerprint)
+            return is_valid
+    
+    result = _probe_api_key(api_key)
+    _store_api_key_validation(fingerprint, result)
+    
+    # Inconclusive probes (network/server issues) don't mean the key is invalid
+    return result is not False
+
+
+def invalidate_api_key_validation(api_key: str) -> None:
+    """Drop the cached validation result for a key (e.g. after a 401 from a real call)"""
+    if api_key:
+        with _key_validation_lock:
+            _key_validation_cache.pop(key_fingerprint(api_key.strip()), None)
+
+
+def clear_api_key_validation_cache() -> None:
+    """Drop all cached API key validation results"""
+    with _key_validation_lock:
+        _key_validation_cache.clear()
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Stable, non-reversible identifier for an API key"""
+    return hashlib.sha256((api_key or '').encode('utf-8')).hexdigest()[:16]
+
+
+def _store_api_key_validation(fingerprint: str, result: Optional[bool]) -> None:
+    """Cache a conclusive probe result; inconclusive results are retried next call"""
+    if result is None:
+        return
+    with _key_validation_lock:
+        _key_validation_cache[fingerprint] = (result, time.time())
+
+
+def _refresh_api_key_validation(api_key: str, fingerprint: str) -> None:
+    """Re-probe a key on a background thread, at most one refresh per key at a time"""
+    with _key_validation_lock:
+        if fingerprint in _key_validation_refreshing:
+            return
+        _key_validation_refreshing.add(fingerprint)
+    
+    def refresh():
+        try:
+            _store_api_key_validation(fingerprint, _probe_api_key(api_key))
+        finally:
+            with _key_validation_lock:
+                _key_validation_refreshing.discard(fingerprint)
+    
+    threading.Thread(target=refresh, name='api-key-refresh', daemon=True).start()
+
+
+def _probe_api_key(api_key: str) -> Optional[bool]:
+    """
+    Test an API key with a minimal request
+    
+    Returns:
+        True/False when the API gave a definite answer, None when the
+        result was inconclusive (network or server problems)
+    """
     try:
+        from .http_client import get_http_client
+
         headers = {
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json',
@@ -447,11 +514,12 @@ def validate_api_key(api_key: str) -> bool:
             'max_tokens': 1
         }
         
-        response = requests.post(
+        response = get_http_client().post(
             'https://api.perplexity.ai/chat/completions',
             headers=headers,
             json=test_payload,
-            timeout=10
+            timeout=10,
+            retries=0
         )
         
         # Detailed status code handling
@@ -468,27 +536,27 @@ def validate_api_key(api_key: str) -> bool:
             # Rate limited - key is valid but hitting limits
             return True
         elif response.status_code >= 500:
-            # Server errors - assume key is valid, server issue
-            return True
+            # Server errors - key status unknown, server issue
+            return None
         else:
-            # Other status codes - assume key is valid for now
-            return True
+            # Other status codes - key status unknown
+            return None
         
     except requests.exceptions.Timeout:
         # Timeout doesn't mean the key is invalid
-        return True
+        return None
     except requests.exceptions.ConnectionError:
         # Connection issues don't mean the key is invalid
-        return True
+        return None
     except requests.exceptions.SSLError:
         # SSL issues don't mean the key is invalid
-        return True
+        return None
     except requests.RequestException:
         # Other network issues don't mean the key is invalid
-        return True
+        return None
     except Exception:
-        # Any other unexpected error - assume key might be valid
-        return True
+        # Any other unexpected error - key might be valid
+        return None
 
 def format_prompt(resume_text: str, jd_text: str) -> str:
     """Create optimized prompts for Perplexity API integration with enhanced token efficiency"""
@@ -787,8 +855,7 @@ def get_cost_optimization_stats() -> Dict[str, Any]:
         Dictionary containing optimization statistics
     """
     config = load_config()
-    log_file = config.get('usage_log_file', 'usage_log.json')
-    log_path = Path(log_file)
+    usage_log = _get_usage_log(config)
     
     stats = {
         'total_tokens_saved': 0,
@@ -798,12 +865,8 @@ def get_cost_optimization_stats() -> Dict[str, Any]:
         'recommendations': []
     }
     
-    if not log_path.exists():
-        return stats
-    
     try:
-        with open(log_path, 'r') as f:
-            records = json.load(f)
+        records = list(usage_log.iter_records())
         
         if not records:
             return stats
@@ -961,38 +1024,13 @@ def cleanup_old_usage_logs(days_to_keep: int = 90) -> None:
         days_to_keep: Number of days of logs to retain
     """
     config = load_config()
-    log_file = config.get('usage_log_file', 'usage_log.json')
-    log_path = Path(log_file)
-    
-    if not log_path.exists():
-        return
     
     try:
-        with open(log_path, 'r') as f:
-            records = json.load(f)
-        
-        if not records:
-            return
-        
-        # Filter records to keep only recent ones
+        # Drop records older than the cutoff from the log and its rotated backups
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
-        filtered_records = []
+        removed_count = _get_usage_log(config).prune(cutoff_date)
         
-        for record in records:
-            try:
-                record_time = datetime.fromisoformat(record['timestamp'])
-                if record_time >= cutoff_date:
-                    filtered_records.append(record)
-            except (ValueError, KeyError):
-                # Keep records with invalid timestamps to be safe
-                filtered_records.append(record)
-        
-        # Save filtered records back to file
-        if len(filtered_records) < len(records):
-            with open(log_path, 'w') as f:
-                json.dump(filtered_records, f, indent=2)
-            
-            removed_count = len(records) - len(filtered_records)
+        if removed_count:
             print(f"🧹 Cleaned up {removed_count} old usage log entries")
         
     except Exception as e:
@@ -254,7 +254,7 @@ API_TIMEOUT=30
 
 # Usage Tracking Configuration (Optional)
 ENABLE_USAGE_TRACKING=true
-USAGE_LOG_FILE=usage_log.json
+USAGE_LOG_FILE=usage_log.jsonl
 COST_ALERT_THRESHOLD=10.00
 
 # Application Configuration (Optional)
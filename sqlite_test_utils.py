@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for tests that run against a throwaway SQLite database
+"""
+import os
+
+import database.connection as connection_module
+from database.connection import DatabaseConfig, DatabaseManager
+
+def make_sqlite_manager(directory: str, filename: str = 'test.db', manager_class=DatabaseManager) -> DatabaseManager:
+    """Build a DatabaseManager (or subclass) on a SQLite file inside directory"""
+    config = DatabaseConfig()
+    config.db_type = 'sqlite'
+    config.sqlite_path = os.path.join(directory, filename)
+    config.database_url = f"sqlite:///{config.sqlite_path}"
+    # Tests create the tables they need, so skip the app's schema setup on this file
+    connection_module._schema_ready.add(os.path.abspath(config.sqlite_path))
+    return manager_class(config)
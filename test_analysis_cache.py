@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent analysis result cache
+"""
+import os
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai.cache import AnalysisCache
+from resume_matcher_ai.matcher import analyze_match
+from resume_matcher_ai.utils import MatchResult
+from sqlite_test_utils import make_sqlite_manager
+
+MOCK_RESPONSE = '''
+{
+    "compatibility_score": 82,
+    "matching_skills": ["Python", "SQL"],
+    "missing_skills": ["Docker"],
+    "skill_gaps": {"Critical": ["Docker"], "Important": [], "Nice-to-have": []},
+    "suggestions": ["Add Docker experience", "Quantify achievements", "Add a summary"],
+    "analysis_summary": "Strong match"
+}
+'''
+
+def _make_result(score: int = 75) -> MatchResult:
+    return MatchResult(
+        score=score,
+        match_category="Strong Match",
+        matching_skills=["Python"],
+        missing_skills=["Docker"],
+        skill_gaps={'Critical': ["Docker"], 'Important': [], 'Nice-to-have': []},
+        suggestions=["Add Docker experience"],
+        processing_time=1.5
+    )
+
+def test_make_key_normalizes_prompt():
+    """Test that cache keys ignore whitespace but not parameters"""
+    print("Testing cache key generation...")
+
+    payload = {'model': 'sonar', 'max_tokens': 3000, 'temperature': 0.1, 'messages': []}
+    key = AnalysisCache.make_key("Resume  text\n\nJD text", payload)
+
+    assert key == AnalysisCache.make_key("Resume text JD text", payload)
+    assert key != AnalysisCache.make_key("Resume text JD text", dict(payload, model='sonar-pro'))
+    assert key != AnalysisCache.make_key("Different resume JD text", payload)
+    assert len(key) == 64
+    print("✓ Cache keys are content-addressed")
+
+def test_cache_roundtrip_and_stats():
+    """Test storing, retrieving and counting cache hits"""
+    print("\nTesting cache round trip...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+
+        assert cache.get("missing-key") is None
+        assert cache.set("key-1", _make_result(75))
+
+        cached = cache.get("key-1")
+        assert cached.score == 75
+        assert cached.skill_gaps['Critical'] == ["Docker"]
+
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+        assert stats['hit_ratio'] == 0.5
+    print("✓ Cache round trip and counters work")
+
+def test_cache_ttl_expiry():
+    """Test that expired entries are treated as misses"""
+    print("\nTesting cache TTL...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(ttl_seconds=-1, db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+        cache.set("key-1", _make_result())
+
+        assert cache.get("key-1") is None
+        assert cache.get_stats()['entries'] == 0
+    print("✓ Expired entries are dropped")
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first"""
+    print("\nTesting LRU eviction...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(ttl_seconds=10 ** 10, max_entries=2, db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+
+        with patch('resume_matcher_ai.cache.time') as mock_time:
+            mock_time.time.side_effect = [100.0, 101.0, 102.0, 103.0]
+            cache.set("oldest", _make_result(10))
+            cache.set("middle", _make_result(20))
+            cache.get("oldest")
+            cache.set("newest", _make_result(30))
+
+        assert cache.get("middle") is None
+        assert cache.get("oldest").score == 10
+        assert cache.get("newest").score == 30
+        assert cache.get_stats()['evictions'] == 1
+    print("✓ Least recently used entry evicted")
+
+def test_analyze_match_uses_cache():
+    """Test that repeat analyses skip the API call"""
+    print("\nTesting analyze_match cache integration...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+        jd_data = {'raw_text': 'Looking for a Python developer with SQL and Docker experience.'}
+        resume_text = 'Python developer with five years of SQL experience.'
+
+        with patch('resume_matcher_ai.cache.get_analysis_cache', return_value=cache), \
+             patch('resume_matcher_ai.matcher.call_perplexity_api', return_value=MOCK_RESPONSE) as mock_api:
+            first = analyze_match(resume_text, jd_data)
+            second = analyze_match(resume_text, jd_data)
+
+        assert mock_api.call_count == 1
+        assert first.score == second.score == 82
+        assert second.matching_skills == ["Python", "SQL"]
+        assert cache.get_stats()['hits'] == 1
+    print("✓ Repeat analysis served from cache")
+
+def test_analyze_match_does_not_cache_errors():
+    """Test that failed analyses are not cached"""
+    print("\nTesting that errors bypass the cache...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+        jd_data = {'raw_text': 'Looking for a Python developer.'}
+
+        with patch('resume_matcher_ai.cache.get_analysis_cache', return_value=cache), \
+             patch('resume_matcher_ai.matcher.call_perplexity_api', side_effect=Exception("API down")):
+            result = analyze_match('Python developer', jd_data)
+
+        assert result.match_category == "Error"
+        assert cache.get_stats()['entries'] == 0
+    print("✓ Errors are not cached")
+
+def test_analyze_match_does_not_cache_fallback_parsing():
+    """Test that responses without valid JSON are not cached"""
+    print("\nTesting that fallback-parsed responses bypass the cache...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = AnalysisCache(db_manager=make_sqlite_manager(tmp_dir, 'cache_test.db'))
+        jd_data = {'raw_text': 'Looking for a Python developer.'}
+
+        with patch('resume_matcher_ai.cache.get_analysis_cache', return_value=cache), \
+             patch('resume_matcher_ai.matcher.call_perplexity_api',
+                   side_effect=["The candidate scores 60% overall", MOCK_RESPONSE]) as mock_api:
+            first = analyze_match('Python developer', jd_data)
+            second = analyze_match('Python developer', jd_data)
+
+        assert first.score == 60
+        assert mock_api.call_count == 2
+        assert second.score == 82
+        assert cache.get_stats()['entries'] == 1
+    print("✓ Fallback-parsed responses are not cached")
+
+def main():
+    """Run all analysis cache tests"""
+    print("Running analysis cache tests...\n")
+
+    try:
+        test_make_key_normalizes_prompt()
+        test_cache_roundtrip_and_stats()
+        test_cache_ttl_expiry()
+        test_cache_lru_eviction()
+        test_analyze_match_uses_cache()
+        test_analyze_match_does_not_cache_errors()
+        test_analyze_match_does_not_cache_fallback_parsing()
+
+        print("\n✅ All analysis cache tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Analysis cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
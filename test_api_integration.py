@@ -51,7 +51,7 @@ def create_mock_api_response():
         }]
     }
 
-@patch('resume_matcher_ai.matcher.requests.post')
+@patch('resume_matcher_ai.http_client.requests.Session.post')
 def test_full_integration(mock_post):
     """Test full integration with mocked API response"""
     print("Testing full Perplexity API integration...")
@@ -145,7 +145,7 @@ def test_full_integration(mock_post):
     # Clean up
     del os.environ['PERPLEXITY_API_KEY']
 
-@patch('resume_matcher_ai.matcher.requests.post')
+@patch('resume_matcher_ai.http_client.requests.Session.post')
 def test_rate_limit_handling(mock_post):
     """Test rate limit error handling"""
     print("\nTesting rate limit handling...")
@@ -168,7 +168,7 @@ def test_rate_limit_handling(mock_post):
     
     del os.environ['PERPLEXITY_API_KEY']
 
-@patch('resume_matcher_ai.matcher.requests.post')
+@patch('resume_matcher_ai.http_client.requests.Session.post')
 def test_server_error_handling(mock_post):
     """Test server error handling"""
     print("\nTesting server error handling...")
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script for the asyncio analysis pipeline
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import requests
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai import async_matcher
+from resume_matcher_ai.async_matcher import analyze_match_async, call_perplexity_api_async
+from resume_matcher_ai.utils import clear_api_key_validation_cache
+
+API_KEY = "pplx-async-key-for-testing-purposes-12345"
+TEST_ENV = {'PERPLEXITY_API_KEY': API_KEY, 'ENABLE_USAGE_TRACKING': 'false', 'ENABLE_ANALYSIS_CACHE': 'false'}
+
+API_CONTENT = json.dumps({
+    'compatibility_score': 82,
+    'matching_skills': ['Python', 'SQL'],
+    'missing_skills': ['Kubernetes'],
+    'skill_gaps': {'Critical': ['Kubernetes'], 'Important': [], 'Nice-to-have': []},
+    'suggestions': ['Add container orchestration experience']
+})
+
+JD_DATA = {
+    'raw_text': 'Backend engineer with Python, SQL and Kubernetes',
+    'technical_skills': ['Python', 'SQL', 'Kubernetes'],
+    'soft_skills': [],
+    'requirements': []
+}
+
+def _response(status_code, content=API_CONTENT):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = {}
+    response.text = content
+    response.json.return_value = {
+        'choices': [{'message': {'content': content}}],
+        'usage': {'total_tokens': 500}
+    }
+    return response
+
+def _run(coro):
+    clear_api_key_validation_cache()
+    with patch.dict(os.environ, TEST_ENV), patch.object(async_matcher, 'HTTPX_AVAILABLE', False):
+        return asyncio.run(coro)
+
+def test_call_api_async():
+    """Test that the async API call returns message content"""
+    print("Testing async API call...")
+
+    with patch('resume_matcher_ai.http_client.requests.Session.post', return_value=_response(200)) as mock_post:
+        content = _run(call_perplexity_api_async("test prompt"))
+
+    assert content == API_CONTENT
+    # One validation probe plus the analysis request
+    assert mock_post.call_count == 2
+    print("✓ Async API call works")
+
+def test_analyze_match_async():
+    """Test that the async pipeline builds the same MatchResult as the sync one"""
+    print("\nTesting async analysis...")
+
+    with patch('resume_matcher_ai.http_client.requests.Session.post', return_value=_response(200)):
+        result = _run(analyze_match_async("Python and SQL developer", JD_DATA))
+
+    assert result.score == 82
+    assert result.match_category != "Error"
+    assert 'Python' in result.matching_skills
+    print("✓ Async analysis returns a MatchResult")
+
+def test_many_analyses_in_flight():
+    """Test that slow API calls overlap instead of running one by one"""
+    print("\nTesting concurrent analyses...")
+
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_post(url, **kwargs):
+        if kwargs['json']['max_tokens'] == 1:
+            return _response(200)
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        time.sleep(0.2)
+        with lock:
+            in_flight.pop()
+        return _response(200)
+
+    async def run_batch():
+        return await asyncio.gather(*[analyze_match_async(f"Resume {i} Python", JD_DATA) for i in range(20)])
+
+    with patch('resume_matcher_ai.http_client.requests.Session.post', side_effect=slow_post):
+        start = time.time()
+        results = _run(run_batch())
+        elapsed = time.time() - start
+
+    assert len(results) == 20
+    assert all(r.score == 82 for r in results)
+    assert max(peak) > 1
+    assert elapsed < 20 * 0.2
+    print(f"✓ 20 analyses finished in {elapsed:.2f}s (peak {max(peak)} in flight)")
+
+def test_async_retry_backoff():
+    """Test that server errors are retried with asyncio.sleep"""
+    print("\nTesting async retries...")
+
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    responses = [_response(200), _response(502), _response(200)]
+    with patch('resume_matcher_ai.http_client.requests.Session.post', side_effect=responses), \
+         patch('resume_matcher_ai.async_matcher.asyncio.sleep', side_effect=fake_sleep), \
+         patch('resume_matcher_ai.matcher.time.sleep') as blocking_sleep:
+        content = _run(call_perplexity_api_async("test prompt"))
+
+    assert content == API_CONTENT
+    assert len(sleeps) == 1 and 0.5 <= sleeps[0] <= 1.0
+    assert not blocking_sleep.called
+    print("✓ Retries back off without blocking the loop")
+
+def test_async_service_unavailable_backoff():
+    """Test that 503 responses wait twice as long, like the sync retry loop"""
+    print("\nTesting async 503 backoff...")
+
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    responses = [_response(200), _response(503), _response(200)]
+    with patch('resume_matcher_ai.http_client.requests.Session.post', side_effect=responses), \
+         patch('resume_matcher_ai.async_matcher.asyncio.sleep', side_effect=fake_sleep):
+        content = _run(call_perplexity_api_async("test prompt"))
+
+    assert content == API_CONTENT
+    assert len(sleeps) == 1 and 1.0 <= sleeps[0] <= 2.0
+    print("✓ Service unavailable backs off with a doubled delay")
+
+def test_httpx_transport():
+    """Test that requests go through httpx on the event loop when it is installed"""
+    print("\nTesting httpx transport...")
+
+    import httpx
+
+    async def post_once():
+        client = async_matcher.AsyncPerplexityClient()
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={'ok': True})
+        ))
+        try:
+            with patch.object(async_matcher, '_get_fallback_executor') as fallback:
+                response = await client.post("https://api.perplexity.ai/chat/completions", json={})
+            assert not fallback.called
+            return response
+        finally:
+            await client.aclose()
+
+    with patch.object(async_matcher, 'HTTPX_AVAILABLE', True):
+        response = asyncio.run(post_once())
+
+    assert response.status_code == 200
+    assert response.json() == {'ok': True}
+    print("✓ httpx carries requests without the thread-pool fallback")
+
+def test_async_errors():
+    """Test that failures surface as error results and friendly exceptions"""
+    print("\nTesting async error handling...")
+
+    errors = [_response(200)] + [requests.exceptions.ConnectionError("offline")] * 3
+    with patch('resume_matcher_ai.http_client.requests.Session.post', side_effect=errors), \
+         patch('resume_matcher_ai.async_matcher.asyncio.sleep', return_value=None):
+        result = _run(analyze_match_async("resume", JD_DATA))
+
+    assert result.match_category == "Error"
+    assert "after 3 attempts" in result.suggestions[0]
+
+    with patch('resume_matcher_ai.http_client.requests.Session.post', return_value=_response(429)):
+        try:
+            _run(call_perplexity_api_async("test prompt"))
+            assert False, "Expected a rate limit error"
+        except Exception as e:
+            assert "Rate limit exceeded" in str(e)
+    print("✓ Errors are reported like the sync API")
+
+def main():
+    """Run all async matcher tests"""
+    print("Running async matcher tests...\n")
+
+    try:
+        test_call_api_async()
+        test_analyze_match_async()
+        test_many_analyses_in_flight()
+        test_async_retry_backoff()
+        test_async_service_unavailable_backoff()
+        test_httpx_transport()
+        test_async_errors()
+
+        print("\n✅ All async matcher tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Async matcher test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Test script for the user and subscription cache in auth.services
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from auth.models import PlanType, User
+from auth.services import (
+    SubscriptionService, TTLCache, UserService, get_cache_stats, invalidate_user_cache, subscription_cache
+)
+from database.connection import DatabaseManager
+from sqlite_test_utils import make_sqlite_manager
+
+TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY, email TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL,
+        first_name TEXT, last_name TEXT, company_name TEXT, role TEXT DEFAULT 'individual',
+        phone TEXT, country TEXT, timezone TEXT, email_verified BOOLEAN DEFAULT FALSE,
+        email_verification_token TEXT, password_reset_token TEXT, password_reset_expires TIMESTAMP,
+        last_login TIMESTAMP, login_count INTEGER DEFAULT 0, is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP, updated_at TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS subscription_plans (
+        id TEXT PRIMARY KEY, name TEXT NOT NULL, plan_type TEXT NOT NULL, price_monthly REAL NOT NULL,
+        price_annual REAL NOT NULL, monthly_analysis_limit INTEGER, features TEXT DEFAULT '[]',
+        is_active BOOLEAN DEFAULT TRUE, created_at TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS subscriptions (
+        id TEXT PRIMARY KEY, user_id TEXT NOT NULL, plan_id TEXT, status TEXT,
+        current_period_start TIMESTAMP, current_period_end TIMESTAMP, trial_start TIMESTAMP,
+        trial_end TIMESTAMP, monthly_analysis_used INTEGER DEFAULT 0, stripe_customer_id TEXT,
+        stripe_subscription_id TEXT, razorpay_subscription_id TEXT, cancel_at_period_end BOOLEAN DEFAULT FALSE,
+        canceled_at TIMESTAMP, created_at TIMESTAMP, updated_at TIMESTAMP
+    )""",
+]
+
+def _make_sqlite_manager(directory: str) -> DatabaseManager:
+    db = make_sqlite_manager(directory, 'auth_cache_test.db')
+    for statement in TABLES:
+        db.execute_command(statement)
+    db.execute_command("INSERT INTO subscription_plans (id, name, plan_type, price_monthly, price_annual, "
+                       "monthly_analysis_limit) VALUES ('plan_free', 'Free', 'free', 0, 0, 3)")
+    return db
+
+def test_ttl_lru_cache():
+    """Test expiry, LRU eviction, copies and stale-read protection"""
+    print("Testing TTLCache...")
+
+    cache = TTLCache('test', ttl_seconds=0.05, max_entries=2)
+    cache.set('a', {'n': 1})
+    cache.set('b', {'n': 2})
+    assert cache.get('a') == {'n': 1}  # a is now the most recently used
+    cache.set('c', {'n': 3})
+    assert cache.get('b', None) is None and cache.get('a') == {'n': 1}
+
+    # Callers get copies
+    cache.get('a')['n'] = 99
+    assert cache.get('a') == {'n': 1}
+
+    # A value read before an invalidation isn't cached
+    generation = cache.generation()
+    cache.invalidate('c')
+    cache.set('c', {'n': 'stale'}, generation)
+    assert cache.get('c', None) is None
+
+    time.sleep(0.06)
+    assert cache.get('a', None) is None
+
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1 and stats['invalidations'] == 1
+    assert stats['hits'] == 4 and stats['misses'] == 3
+    assert abs(stats['hit_ratio'] - 4 / 7) < 1e-9
+    print("✓ Entries expire, evict least recently used and are copied")
+
+def test_service_caching():
+    """Test that services cache lookups and invalidate on writes"""
+    print("\nTesting service caching...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        users = UserService(db)
+        subscriptions = SubscriptionService(db)
+
+        user = User.create('cache@example.com', 'pw-123456', first_name='Ada')
+        db.execute_command("INSERT INTO users (id, email, password_hash, first_name, role) VALUES (?, ?, ?, ?, ?)",
+                           (user.id, user.email, user.password_hash, user.first_name, user.role.value))
+        assert users.get_user_by_id(user.id).first_name == 'Ada'
+
+        # Served from the cache: a write behind the service's back isn't seen
+        db.execute_command("UPDATE users SET first_name = 'Behind' WHERE id = ?", (user.id,))
+        cached = users.get_user_by_id(user.id)
+        assert cached.first_name == 'Ada'
+
+        # update_user writes through and invalidates
+        cached.first_name = 'Grace'
+        assert users.update_user(cached)
+        assert users.get_user_by_id(user.id).first_name == 'Grace'
+
+        # No subscription is cached too, until one is created
+        assert subscriptions.get_user_subscription(user.id) is None
+        free_plan = subscriptions.get_plan_by_type(PlanType.FREE)
+        subscriptions.create_subscription(user.id, free_plan.id)
+        subscription = subscriptions.get_user_subscription(user.id)
+        assert subscription.monthly_analysis_used == 0
+
+        hits_before = subscription_cache.get_stats()['hits']
+        for _ in range(5):
+            assert subscriptions.get_user_subscription(user.id).plan.plan_type == PlanType.FREE
+        assert subscription_cache.get_stats()['hits'] == hits_before + 5
+
+        assert subscriptions.increment_usage(user.id)
+        assert subscriptions.get_user_subscription(user.id).monthly_analysis_used == 1
+        assert subscriptions.increment_user_usage(user.id)
+        assert subscriptions.get_user_subscription(user.id).monthly_analysis_used == 2
+
+        # Writes outside the services, like the Razorpay webhooks, invalidate explicitly
+        db.execute_command("UPDATE subscriptions SET status = 'cancelled' WHERE user_id = ?", (user.id,))
+        assert subscriptions.get_user_subscription(user.id) is not None
+        invalidate_user_cache(user.id, db)
+        assert subscriptions.get_user_subscription(user.id) is None
+
+        stats = get_cache_stats()
+        assert set(stats) == {'users', 'subscriptions'}
+        assert stats['subscriptions']['hit_ratio'] > 0
+        db.close_pool()
+    print("✓ Lookups cached, writes invalidate")
+
+def main():
+    """Run all auth cache tests"""
+    print("Running auth cache tests...\n")
+
+    try:
+        test_ttl_lru_cache()
+        test_service_caching()
+
+        print("\n✅ All auth cache tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Auth cache test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
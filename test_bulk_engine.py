@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent bulk analysis engine
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from analysis.bulk_engine import BulkAnalysisEngine
+from utils.rate_limiter import TokenBucket, get_rate_limiter
+
+def test_results_keep_input_order():
+    """Test that results come back in input order even when completion order differs"""
+    print("Testing result ordering...")
+
+    delays = {'slow.pdf': 0.2, 'medium.pdf': 0.1, 'fast.pdf': 0.0}
+
+    def extract(file_obj):
+        time.sleep(delays[file_obj])
+        return f"text of {file_obj}"
+
+    engine = BulkAnalysisEngine(extract, lambda text, jd: {'text': text}, max_workers=3)
+    completion_order = []
+    results = engine.run(
+        [(name, name) for name in delays],
+        "Python developer",
+        progress_callback=lambda done, total, item: completion_order.append((done, total, item.name))
+    )
+
+    assert [item.name for item in results] == ['slow.pdf', 'medium.pdf', 'fast.pdf']
+    assert [item.result['text'] for item in results] == ['text of slow.pdf', 'text of medium.pdf', 'text of fast.pdf']
+    assert [name for _, _, name in completion_order] == ['fast.pdf', 'medium.pdf', 'slow.pdf']
+    assert [done for done, _, _ in completion_order] == [1, 2, 3]
+    print("✓ Results are returned in input order")
+
+def test_max_in_flight_is_bounded():
+    """Test that no more than max_workers analyses run at once"""
+    print("\nTesting bounded concurrency...")
+
+    lock = threading.Lock()
+    state = {'current': 0, 'peak': 0}
+
+    def analyze(text, jd):
+        with lock:
+            state['current'] += 1
+            state['peak'] = max(state['peak'], state['current'])
+        time.sleep(0.05)
+        with lock:
+            state['current'] -= 1
+        return text
+
+    engine = BulkAnalysisEngine(lambda f: f, analyze, max_workers=2)
+    start = time.time()
+    results = engine.run([(f"r{i}.pdf", f"resume {i}") for i in range(6)], "JD")
+    elapsed = time.time() - start
+
+    assert all(item.success for item in results)
+    assert state['peak'] == 2
+    assert elapsed < 6 * 0.05
+    print("✓ In-flight analyses are bounded")
+
+def test_failures_are_reported_per_item():
+    """Test that extraction and analysis failures don't abort the batch"""
+    print("\nTesting per-item error handling...")
+
+    def analyze(text, jd):
+        if 'bad' in text:
+            raise ValueError("API exploded")
+        return text
+
+    engine = BulkAnalysisEngine(lambda f: f, analyze, max_workers=2)
+    results = engine.run([('ok.pdf', 'good resume'), ('empty.pdf', ''), ('bad.pdf', 'bad resume')], "JD")
+
+    assert results[0].success
+    assert results[1].error == "Could not extract text from PDF file"
+    assert results[2].error == "API exploded"
+    print("✓ Failures are isolated per resume")
+
+def test_rate_limiter_gates_api_calls():
+    """Test that the per-key limiter paces analysis calls"""
+    print("\nTesting rate limiting...")
+
+    limiter = TokenBucket(rate_per_second=20, capacity=1)
+    engine = BulkAnalysisEngine(lambda f: f, lambda text, jd: text, max_workers=4, rate_limiter=limiter)
+
+    start = time.time()
+    engine.run([(f"r{i}.pdf", f"resume {i}") for i in range(5)], "JD")
+    elapsed = time.time() - start
+
+    # One burst token, then four more at 20/s
+    assert elapsed >= 0.15
+    print("✓ API calls are paced by the rate limiter")
+
+def test_token_bucket_and_registry():
+    """Test token bucket accounting and shared per-key limiters"""
+    print("\nTesting token bucket...")
+
+    bucket = TokenBucket(rate_per_second=1, capacity=2)
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert not bucket.acquire(timeout=0.01)
+
+    assert get_rate_limiter('key-a', 60) is get_rate_limiter('key-a', 60)
+    assert get_rate_limiter('key-a', 60) is not get_rate_limiter('key-b', 60)
+
+    # A zero or negative rate is a configuration error, not a bucket that never refills
+    for rate in (0, -5):
+        try:
+            get_rate_limiter(f'key-rate-{rate}', rate)
+            assert False, f"rate {rate} was accepted"
+        except ValueError as e:
+            assert 'PERPLEXITY_REQUESTS_PER_MINUTE' in str(e)
+        try:
+            TokenBucket(rate_per_second=rate, capacity=1)
+            assert False, f"rate {rate} was accepted"
+        except ValueError:
+            pass
+    print("✓ Token bucket works")
+
+def main():
+    """Run all bulk engine tests"""
+    print("Running bulk analysis engine tests...\n")
+
+    try:
+        test_results_keep_input_order()
+        test_max_in_flight_is_bounded()
+        test_failures_are_reported_per_item()
+        test_rate_limiter_gates_api_calls()
+        test_token_bucket_and_registry()
+
+        print("\n✅ All bulk analysis engine tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Bulk analysis engine test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Test script for database connection pooling
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import database.connection as connection_module
+from database import simple_init
+from database.pool import ConnectionPool, PoolTimeout, ThreadLocalConnectionCache
+from sqlite_test_utils import make_sqlite_manager
+
+class FakeConnection:
+    """Stands in for a psycopg2 connection"""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.rollbacks = 0
+        self.autocommit = False
+
+    def cursor(self):
+        if self.broken:
+            raise RuntimeError("server closed the connection unexpectedly")
+        return self
+
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return (1,)
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+def test_pool_reuse_and_limits():
+    """Test that the pool reuses connections and blocks at max_size"""
+    print("Testing pool reuse and size limits...")
+
+    opened = []
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    pool = ConnectionPool(connect, min_size=2, max_size=2, timeout=0.2)
+    first = pool.acquire()
+    assert len(opened) == 2  # Warmed up to min_size
+    second = pool.acquire()
+    assert {id(first), id(second)} == {id(c) for c in opened}
+
+    start = time.monotonic()
+    try:
+        pool.acquire()
+        assert False, "Expected PoolTimeout"
+    except PoolTimeout:
+        assert time.monotonic() - start >= 0.2
+
+    # A waiting borrower gets the connection as soon as it is returned
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.acquire()))
+    pool.timeout = 5
+    waiter.start()
+    time.sleep(0.05)
+    pool.release(first)
+    waiter.join()
+    assert got == [first] and first.rollbacks == 1
+    assert pool.get_stats()['in_use'] == 2 and len(opened) == 2
+    print("✓ Pool reuses connections and waits when exhausted")
+
+def test_pool_recycling():
+    """Test discard, health checks, max lifetime and close_all"""
+    print("\nTesting pool recycling...")
+
+    opened = []
+    def connect():
+        opened.append(FakeConnection())
+        return opened[-1]
+
+    pool = ConnectionPool(connect, max_size=3, health_check_interval=0)
+
+    conn = pool.acquire()
+    pool.release(conn, discard=True)
+    assert conn.closed and pool.get_stats()['size'] == 0
+
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.broken = True
+    replacement = pool.acquire()
+    assert replacement is not conn and conn.closed
+    assert pool.get_stats()['failed_health_checks'] == 1
+
+    # Connections borrowed before close_all are closed when returned
+    pool.close_all()
+    pool.release(replacement)
+    assert replacement.closed and pool.get_stats()['size'] == 0
+
+    pool.max_lifetime = 0.05
+    conn = pool.acquire()
+    time.sleep(0.06)
+    pool.release(conn)
+    assert conn.closed
+    print("✓ Broken, expired and retired connections are replaced")
+
+def test_thread_local_cache():
+    """Test one reused SQLite connection per thread"""
+    print("\nTesting thread-local SQLite connections...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'cache.db')
+        cache = ThreadLocalConnectionCache(lambda: sqlite3.connect(path, check_same_thread=False),
+                                           health_check_interval=0, identity=lambda: os.stat(path).st_ino)
+
+        conn = cache.acquire()
+        assert cache.acquire() is None  # Nested use gets its own connection
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        cache.release(conn)
+        assert cache.acquire() is conn
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0  # Uncommitted insert rolled back
+        cache.release(conn)
+
+        other = []
+        worker = threading.Thread(target=lambda: (other.append(cache.acquire()), cache.release(other[0])))
+        worker.start()
+        worker.join()
+        assert other[0] is not conn
+
+        # The database file was replaced; the health check notices
+        os.replace(path, path + '.old')
+        sqlite3.connect(path).close()
+        replacement = cache.acquire()
+        assert replacement is not conn
+        cache.release(replacement)
+        assert cache.get_stats()['failed_health_checks'] == 1
+        cache.close_all()
+    print("✓ Connections are reused per thread and replaced when stale")
+
+def test_database_manager_pooling():
+    """Test that DatabaseManager queries reuse a connection"""
+    print("\nTesting DatabaseManager pooling...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'pool_test.db')
+        db.execute_command("CREATE TABLE IF NOT EXISTS pool_items (id INTEGER PRIMARY KEY, name TEXT)")
+        for i in range(5):
+            db.execute_command("INSERT INTO pool_items (name) VALUES (?)", (f"item{i}",))
+        assert db.execute_query("SELECT COUNT(*) AS n FROM pool_items")[0]['n'] == 5
+
+        stats = db.get_pool_stats()
+        assert stats['backend'] == 'sqlite'
+        assert stats['connections_opened'] == 1 and stats['reused'] == 6
+
+        # Nested use and failed statements don't leak the cached connection
+        with db.get_connection() as outer:
+            with db.get_connection() as inner:
+                assert inner is not outer
+        try:
+            db.execute_command("INSERT INTO pool_items (id, name) VALUES (1, 'duplicate')")
+        except Exception:
+            pass
+        assert db.execute_query("SELECT name FROM pool_items WHERE id = ?", (1,))[0]['name'] == 'item0'
+
+        db.close_pool()
+        assert db.execute_query("SELECT COUNT(*) AS n FROM pool_items")[0]['n'] == 5
+        assert db.get_pool_stats()['connections_opened'] == 2
+        db.close_pool()
+    print("✓ DatabaseManager borrows pooled connections")
+
+def test_schema_checked_once():
+    """Test that opening SQLite connections doesn't re-run the schema check"""
+    print("\nTesting one-time schema initialization...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'schema_test.db')
+        other_db = make_sqlite_manager(tmp_dir, 'other_test.db')
+        db.config.pool_enabled = other_db.config.pool_enabled = False
+
+        with patch.object(connection_module, '_schema_ready', set()), \
+             patch.object(simple_init, 'ensure_database_exists', return_value=True) as ensure:
+            threads = [threading.Thread(target=lambda: [db.execute_query("SELECT 1") for _ in range(10)])
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            ensure.assert_called_once_with(db.config.sqlite_path)
+
+            # Readiness is tracked per database file
+            other_db.execute_query("SELECT 1")
+            assert ensure.call_count == 2
+            ensure.assert_called_with(other_db.config.sqlite_path)
+
+    # The schema version stamp lets later processes skip the migration probe
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'data', 'app.db')
+        assert simple_init.ensure_database_exists(db_path)
+        with sqlite3.connect(db_path) as conn:
+            assert simple_init.get_schema_version(conn.cursor()) == simple_init.SCHEMA_VERSION
+        with patch.object(simple_init, '_run_migrations') as migrate:
+            assert simple_init.ensure_database_exists(db_path)
+            assert migrate.call_count == 0
+    print("✓ Schema checked once per database and skipped when the version matches")
+
+def main():
+    """Run all connection pool tests"""
+    print("Running connection pool tests...\n")
+
+    try:
+        test_pool_reuse_and_limits()
+        test_pool_recycling()
+        test_thread_local_cache()
+        test_database_manager_pooling()
+        test_schema_checked_once()
+
+        print("\n✅ All connection pool tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Connection pool test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
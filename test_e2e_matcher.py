@@ -141,7 +141,7 @@ def test_complete_workflow():
     # Set up environment and mock
     os.environ['PERPLEXITY_API_KEY'] = 'pplx-test-key-for-e2e-testing-12345'
     
-    with patch('resume_matcher_ai.matcher.requests.post') as mock_post:
+    with patch('resume_matcher_ai.http_client.requests.Session.post') as mock_post:
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = mock_api_response
@@ -223,7 +223,7 @@ def test_error_scenarios():
     # Test with API key but network error
     os.environ['PERPLEXITY_API_KEY'] = 'pplx-test-key-for-error-testing-12345'
     
-    with patch('resume_matcher_ai.matcher.requests.post') as mock_post:
+    with patch('resume_matcher_ai.http_client.requests.Session.post') as mock_post:
         mock_post.side_effect = Exception("Network error")
         
         result = analyze_match("test resume", {"raw_text": "test jd"})
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled Perplexity HTTP client
+"""
+import os
+import sys
+from unittest.mock import Mock, patch
+
+import requests
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai.http_client import PerplexityHTTPClient, get_http_client
+
+URL = 'https://api.perplexity.ai/chat/completions'
+
+def _response(status_code):
+    response = Mock()
+    response.status_code = status_code
+    return response
+
+def test_session_is_pooled_and_reused():
+    """Test that one keep-alive session with a sized pool serves every call"""
+    print("Testing session pooling...")
+
+    client = PerplexityHTTPClient(pool_size=7)
+    session = client.session
+    adapter = session.get_adapter(URL)
+
+    assert client.session is session
+    assert adapter._pool_maxsize == 7
+    assert session.headers['User-Agent'] == 'Resume-Matcher-AI/1.0'
+    assert get_http_client() is get_http_client()
+
+    client.close()
+    assert client.session is not session
+    print("✓ Session is shared and pooled")
+
+def test_timeout_tuple():
+    """Test that read timeouts are paired with the connect timeout"""
+    print("\nTesting timeouts...")
+
+    client = PerplexityHTTPClient(connect_timeout=3.0, read_timeout=20.0)
+    assert client._timeout(None) == (3.0, 20.0)
+    assert client._timeout(45) == (3.0, 45.0)
+    assert client._timeout((1.0, 2.0)) == (1.0, 2.0)
+    print("✓ Connect and read timeouts are separate")
+
+def test_backoff_jitter_bounds():
+    """Test that backoff grows exponentially with bounded jitter"""
+    print("\nTesting backoff jitter...")
+
+    client = PerplexityHTTPClient(backoff_base=1.0, backoff_cap=8.0)
+    for attempt, full_delay in [(0, 1.0), (1, 2.0), (2, 4.0), (5, 8.0)]:
+        delays = [client.backoff_delay(attempt) for _ in range(50)]
+        assert all(full_delay / 2 <= d <= full_delay for d in delays)
+        assert len(set(delays)) > 1
+    print("✓ Backoff is jittered and capped")
+
+@patch('resume_matcher_ai.http_client.time.sleep')
+def test_retries_transient_status(mock_sleep):
+    """Test that 5xx responses are retried until a success"""
+    print("\nTesting status retries...")
+
+    client = PerplexityHTTPClient(max_retries=2)
+    with patch.object(requests.Session, 'post', side_effect=[_response(503), _response(200)]) as mock_post:
+        response = client.post(URL, json={}, timeout=10)
+
+    assert response.status_code == 200
+    assert mock_post.call_count == 2
+    assert mock_post.call_args.kwargs['timeout'] == (5.0, 10.0)
+    assert mock_sleep.call_count == 1
+    print("✓ Transient errors are retried")
+
+@patch('resume_matcher_ai.http_client.time.sleep')
+def test_no_retry_when_disabled(mock_sleep):
+    """Test that retries=0 returns the first response as-is"""
+    print("\nTesting disabled retries...")
+
+    client = PerplexityHTTPClient(max_retries=2)
+    with patch.object(requests.Session, 'post', return_value=_response(502)) as mock_post:
+        response = client.post(URL, json={}, retries=0)
+
+    assert response.status_code == 502
+    assert mock_post.call_count == 1
+    assert not mock_sleep.called
+    print("✓ Callers can handle retries themselves")
+
+@patch('resume_matcher_ai.http_client.time.sleep')
+def test_connection_error_after_retries(mock_sleep):
+    """Test that network errors are raised once retries run out"""
+    print("\nTesting connection errors...")
+
+    client = PerplexityHTTPClient(max_retries=1)
+    with patch.object(requests.Session, 'post', side_effect=requests.exceptions.ConnectionError("down")) as mock_post:
+        try:
+            client.post(URL, json={})
+            assert False, "Expected ConnectionError"
+        except requests.exceptions.ConnectionError:
+            pass
+
+    assert mock_post.call_count == 2
+    print("✓ Connection errors surface after the last retry")
+
+def main():
+    """Run all HTTP client tests"""
+    print("Running HTTP client tests...\n")
+
+    try:
+        test_session_is_pooled_and_reused()
+        test_timeout_tuple()
+        test_backoff_jitter_bounds()
+        test_retries_transient_status()
+        test_no_retry_when_disabled()
+        test_connection_error_after_retries()
+
+        print("\n✅ All HTTP client tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ HTTP client test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 """
 Unit tests for job description parsing functionality
 """
+import re
 import unittest
+from contextlib import ExitStack
+from unittest import mock
 from resume_matcher_ai.jd_parser import (
     parse_jd_text, extract_requirements, categorize_skills,
     _extract_job_title, _extract_experience_level, _extract_responsibilities,
-    _extract_skills_from_text, _parse_bullet_points, _clean_jd_text
+    _extract_skills_from_text, _parse_bullet_points, _clean_jd_text, _split_sections
 )
 from resume_matcher_ai.utils import JobDescription
 
@@ -338,6 +341,39 @@ Nice to Have:
         self.assertIsInstance(result, JobDescription)
         self.assertTrue(len(result.requirements) > 0)
 
+    def test_split_sections_overlapping_headers(self):
+        """Test that one header can open sections of several kinds"""
+        sections = _split_sections(
+            "Minimum Requirements:\n- 5 years Python\nKey Responsibilities:\n- Build APIs\n"
+        )
+        
+        self.assertEqual(sections['requirements'], ['- 5 years Python'])
+        self.assertEqual(sections['minimum'], ['- 5 years Python'])
+        self.assertEqual(sections['responsibilities'], ['- Build APIs'])
+        self.assertNotIn('duties', sections)
+
+    def test_large_jd_parsing_uses_precompiled_patterns(self):
+        """Test that parsing a large job description compiles no patterns"""
+        block = (
+            "Requirements:\n- 5+ years of experience with Python and Docker\n"
+            "Key Responsibilities:\n- Design services on AWS with strong communication\n"
+            "Technical Skills:\n- PostgreSQL, Redis, Kubernetes\n"
+        )
+        large_jd = "Senior Platform Engineer\n" + block * (49000 // len(block))
+        
+        # Module-level re helpers compile (or look up) a pattern on every call;
+        # the parser must only use the pattern objects built at import time
+        with ExitStack() as stack:
+            for name in ('compile', 'search', 'match', 'fullmatch', 'findall',
+                         'finditer', 'sub', 'subn', 'split'):
+                stack.enter_context(
+                    mock.patch.object(re, name, side_effect=AssertionError(f"re.{name} called"))
+                )
+            result = parse_jd_text(large_jd)
+        
+        self.assertIn("Python", result.technical_skills)
+        self.assertTrue(len(result.requirements) > 0)
+        self.assertTrue(len(result.key_responsibilities) > 0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test script for the parallel one-resume-vs-many-jobs matcher
+"""
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from analysis.job_matching_engine import JobMatchingEngine, rank_outcomes
+from utils.rate_limiter import TokenBucket
+
+JOBS = {
+    'Backend Engineer': 'score=60 delay=0.15',
+    'Data Scientist': 'score=90 delay=0.05',
+    'Frontend Engineer': 'score=40 delay=0.0',
+}
+
+def _parse(job_description):
+    fields = dict(part.split('=') for part in job_description.split())
+    return {'raw_text': job_description, 'score': int(fields['score']), 'delay': float(fields['delay'])}
+
+def _analyze(resume_text, jd_data):
+    time.sleep(jd_data['delay'])
+    return SimpleNamespace(score=jd_data['score'], resume=resume_text)
+
+def test_streams_ranked_results():
+    """Test that each yielded snapshot is ranked and grows as jobs finish"""
+    print("Testing ranked streaming...")
+
+    engine = JobMatchingEngine(_parse, _analyze, max_workers=3)
+    snapshots = [[o.job_name for o in ranked] for ranked in engine.iter_ranked("shared resume", JOBS)]
+
+    assert snapshots[0] == ['Frontend Engineer']
+    assert snapshots[1] == ['Data Scientist', 'Frontend Engineer']
+    assert snapshots[-1] == ['Data Scientist', 'Backend Engineer', 'Frontend Engineer']
+    print("✓ Results stream back in ranked order")
+
+def test_runs_concurrently_with_shared_resume():
+    """Test that jobs overlap and all see the same resume text"""
+    print("\nTesting fan-out...")
+
+    jobs = {f"Job {i}": 'score=50 delay=0.1' for i in range(8)}
+    engine = JobMatchingEngine(_parse, _analyze, max_workers=8)
+
+    start = time.time()
+    outcomes = engine.match_all("shared resume", jobs)
+    elapsed = time.time() - start
+
+    assert len(outcomes) == 8
+    assert all(o.success and o.result.resume == "shared resume" for o in outcomes)
+    assert elapsed < 0.5
+    print("✓ Jobs are scored concurrently")
+
+def test_task_timeout():
+    """Test that a hung job is reported as timed out without blocking the rest"""
+    print("\nTesting per-task timeouts...")
+
+    release = threading.Event()
+
+    def analyze(resume_text, jd_data):
+        if jd_data['score'] == 0:
+            release.wait(2)
+        return SimpleNamespace(score=jd_data['score'])
+
+    engine = JobMatchingEngine(_parse, analyze, max_workers=2, task_timeout=0.2)
+    start = time.time()
+    outcomes = engine.match_all("resume", {'Hung': 'score=0 delay=0', 'Fine': 'score=70 delay=0'})
+    elapsed = time.time() - start
+    release.set()
+
+    by_name = {o.job_name: o for o in outcomes}
+    assert by_name['Fine'].success
+    assert by_name['Hung'].error.startswith("Timed out")
+    assert [o.job_name for o in outcomes] == ['Fine', 'Hung']
+    assert elapsed < 1.0
+    print("✓ Slow jobs time out individually")
+
+def test_cancellation():
+    """Test that closing the stream cancels jobs that haven't started"""
+    print("\nTesting cancellation...")
+
+    calls = []
+
+    def analyze(resume_text, jd_data):
+        calls.append(jd_data['raw_text'])
+        time.sleep(0.05)
+        return SimpleNamespace(score=50)
+
+    jobs = {f"Job {i}": f'score=50 delay=0 id={i}' for i in range(10)}
+    engine = JobMatchingEngine(lambda text: {'raw_text': text}, analyze, max_workers=1)
+
+    stream = engine.iter_ranked("resume", jobs)
+    first = next(stream)
+    stream.close()
+    time.sleep(0.2)
+
+    assert len(first) == 1
+    assert len(calls) < len(jobs)
+    print("✓ Pending jobs are cancelled")
+
+def test_rate_limit_wait_not_timed():
+    """Test that waiting on the rate limiter neither times jobs out nor outlives cancellation"""
+    print("\nTesting rate-limited jobs...")
+
+    limiter = TokenBucket(rate_per_second=5, capacity=1)
+    jobs = {f"Job {i}": 'score=50 delay=0' for i in range(3)}
+    engine = JobMatchingEngine(_parse, _analyze, max_workers=3, task_timeout=0.15, rate_limiter=limiter)
+    outcomes = engine.match_all("resume", jobs)
+
+    assert all(o.success for o in outcomes)
+
+    slow_limiter = TokenBucket(rate_per_second=0.1, capacity=1)
+    engine = JobMatchingEngine(_parse, _analyze, max_workers=3, rate_limiter=slow_limiter)
+    cancel_event = threading.Event()
+    stream = engine.iter_ranked("resume", jobs, cancel_event)
+    next(stream)
+    stream.close()
+
+    time.sleep(1.0)
+    assert not [t for t in threading.enumerate() if t.name.startswith('job-matching')]
+    print("✓ Rate-limit waits are untimed and cancellable")
+
+def test_failures_rank_last():
+    """Test that failed jobs rank below successful ones and convert to dicts"""
+    print("\nTesting failure handling...")
+
+    def analyze(resume_text, jd_data):
+        if jd_data['score'] < 0:
+            raise RuntimeError("API unavailable")
+        return SimpleNamespace(score=jd_data['score'])
+
+    engine = JobMatchingEngine(_parse, analyze)
+    outcomes = engine.match_all("resume", {'Broken': 'score=-1 delay=0', 'Good': 'score=10 delay=0'})
+
+    assert [o.job_name for o in outcomes] == ['Good', 'Broken']
+    broken = outcomes[1].to_dict()
+    assert broken['success'] is False and broken['error'] == "API unavailable"
+    assert outcomes[0].to_dict()['result'].score == 10
+    assert rank_outcomes([]) == []
+    print("✓ Failures are reported and ranked last")
+
+def main():
+    """Run all job matching engine tests"""
+    print("Running job matching engine tests...\n")
+
+    try:
+        test_streams_ranked_results()
+        test_runs_concurrently_with_shared_resume()
+        test_task_timeout()
+        test_cancellation()
+        test_rate_limit_wait_not_timed()
+        test_failures_rank_last()
+
+        print("\n✅ All job matching engine tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Job matching engine test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
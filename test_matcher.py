@@ -127,7 +127,7 @@ def test_generate_suggestions():
     assert "Docker" in suggestions[0]
     print("✓ Suggestion generation works")
 
-@patch('resume_matcher_ai.matcher.requests.post')
+@patch('resume_matcher_ai.http_client.requests.Session.post')
 def test_api_error_handling(mock_post):
     """Test API error handling"""
     print("\nTesting API error handling...")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for the bcrypt worker pool and rehash-on-login
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import auth.password_hashing as password_hashing
+import auth.postgresql_service as postgresql_service
+from auth.models import User
+from auth.password_hashing import PasswordHasher, PasswordHasherBusy
+from auth.services import UserService
+from sqlite_test_utils import make_sqlite_manager
+
+USERS_TABLE = """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY, email TEXT UNIQUE NOT NULL, password_hash TEXT NOT NULL,
+        first_name TEXT, last_name TEXT, company_name TEXT, role TEXT DEFAULT 'individual',
+        phone TEXT, country TEXT, timezone TEXT, email_verified BOOLEAN DEFAULT FALSE,
+        email_verification_token TEXT, password_reset_token TEXT, password_reset_expires TIMESTAMP,
+        last_login TIMESTAMP, login_count INTEGER DEFAULT 0, is_active BOOLEAN DEFAULT TRUE,
+        created_at TIMESTAMP, updated_at TIMESTAMP
+    )
+"""
+
+def test_hash_and_verify():
+    """Test hashing, verification and cost detection"""
+    print("Testing hash and verify...")
+
+    hasher = PasswordHasher(rounds=4, max_workers=2, max_queue=4)
+    password_hash = hasher.hash('s3cret')
+    assert password_hash.startswith('$2b$04$')
+    assert hasher.verify('s3cret', password_hash)
+    assert not hasher.verify('wrong', password_hash)
+
+    assert not hasher.needs_rehash(password_hash)
+    assert PasswordHasher(rounds=5, max_workers=1).needs_rehash(password_hash)
+    assert not hasher.needs_rehash('not a bcrypt hash')
+
+    stats = hasher.get_stats()
+    assert stats['hashed'] == 1 and stats['verified'] == 2 and stats['in_flight'] == 0
+
+    try:
+        PasswordHasher(rounds=3)
+        assert False, "cost below bcrypt's minimum accepted"
+    except ValueError:
+        pass
+    hasher.shutdown()
+    print("✓ Hashes verify and report their cost")
+
+def test_queue_limit():
+    """Test that requests beyond the workers and queue are rejected"""
+    print("\nTesting queue limit...")
+
+    hasher = PasswordHasher(rounds=4, max_workers=1, max_queue=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return True
+
+    # One request on the worker, one waiting for it
+    blockers = [threading.Thread(target=hasher._run, args=('verified', slow)) for _ in range(2)]
+    for thread in blockers:
+        thread.start()
+    started.wait(5)
+    deadline = time.time() + 5
+    while hasher.get_stats()['in_flight'] < 2 and time.time() < deadline:
+        time.sleep(0.001)
+
+    try:
+        hasher.hash('s3cret')
+        assert False, "request beyond the queue limit accepted"
+    except PasswordHasherBusy:
+        pass
+
+    release.set()
+    for thread in blockers:
+        thread.join()
+    assert hasher.get_stats()['rejected'] == 1
+    assert hasher.verify('s3cret', hasher.hash('s3cret'))  # Slots are released afterwards
+    hasher.shutdown()
+    print("✓ Full queue rejects new requests at once")
+
+def test_rehash_on_login():
+    """Test that a login re-hashes a password stored with an old cost"""
+    print("\nTesting rehash on login...")
+
+    original = password_hashing._password_hasher
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = make_sqlite_manager(tmp_dir, 'password_hashing_test.db')
+            db.execute_command(USERS_TABLE)
+            service = UserService(db)
+
+            password_hashing._password_hasher = PasswordHasher(rounds=4, max_workers=1)
+            user = User.create('rehash@example.com', 'hunter22')
+            db.execute_command("INSERT INTO users (id, email, password_hash) VALUES (?, ?, ?)",
+                               (user.id, user.email, user.password_hash))
+            assert service.authenticate_user(user.email, 'hunter22')
+            assert db.get_single_result("SELECT password_hash FROM users")['password_hash'] == user.password_hash
+
+            # Raising the cost re-hashes at the next successful login only
+            password_hashing._password_hasher = PasswordHasher(rounds=5, max_workers=1)
+            assert service.authenticate_user(user.email, 'wrong') is None
+            assert db.get_single_result("SELECT password_hash FROM users")['password_hash'] == user.password_hash
+
+            authenticated = service.authenticate_user(user.email, 'hunter22')
+            stored = db.get_single_result("SELECT password_hash FROM users")['password_hash']
+            assert stored.startswith('$2b$05$') and authenticated.password_hash == stored
+            assert service.authenticate_user(user.email, 'hunter22')
+            db.close_pool()
+    finally:
+        password_hashing._password_hasher = original
+    print("✓ Password re-hashed with the new cost")
+
+def test_postgresql_rehash_invalidates_cache():
+    """Test that the PostgreSQL-only service drops the cached user after a rehash"""
+    print("\nTesting PostgreSQL rehash cache invalidation...")
+
+    original = password_hashing._password_hasher
+    try:
+        password_hashing._password_hasher = PasswordHasher(rounds=4, max_workers=1)
+        service = postgresql_service.PostgreSQLAuthService()
+        service.get_connection = MagicMock()
+        user = {'id': 'user-1', 'password_hash': 'old-hash'}
+        with patch.object(postgresql_service, 'invalidate_user_cache') as invalidate:
+            service._rehash_password(user, 'hunter22')
+        invalidate.assert_called_once_with('user-1')
+        assert user['password_hash'].startswith('$2b$04$')
+    finally:
+        password_hashing._password_hasher = original
+    print("✓ Cached user dropped after the rehash")
+
+def main():
+    """Run all password hashing tests"""
+    print("Running password hashing tests...\n")
+
+    try:
+        test_hash_and_verify()
+        test_queue_limit()
+        test_rehash_on_login()
+        test_postgresql_rehash_invalidates_cache()
+
+        print("\n✅ All password hashing tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Password hashing test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
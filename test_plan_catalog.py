@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-memory subscription plan catalog
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from auth.models import PlanType
+from auth.plan_catalog import PlanCatalog, get_plan_catalog, reload_plan_catalog
+from auth.services import SubscriptionService
+from sqlite_test_utils import make_sqlite_manager
+
+PLANS_TABLE = """
+    CREATE TABLE IF NOT EXISTS subscription_plans (
+        id TEXT PRIMARY KEY, plan_type TEXT NOT NULL, name TEXT NOT NULL, price_monthly REAL NOT NULL,
+        price_annual REAL NOT NULL, monthly_analysis_limit INTEGER, features TEXT DEFAULT '',
+        is_active BOOLEAN DEFAULT TRUE, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+def test_catalog_lookups():
+    """Test lookups by ID and type, copies and feature checks"""
+    print("Testing catalog lookups...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'plan_catalog_test.db')
+        db.execute_command(PLANS_TABLE)
+        db.execute_command("""
+            INSERT INTO subscription_plans (id, plan_type, name, price_monthly, price_annual, features, is_active)
+            VALUES ('plan_free', 'free', 'Free', 0, 0, '["3 analyses per month"]', TRUE),
+                   ('plan_business', 'business', 'Business', 7999, 79990, '["Team collaboration"]', TRUE),
+                   ('plan_legacy', 'professional', 'Legacy Pro', 999, 9990, '[]', FALSE)
+        """)
+        service = SubscriptionService(db)
+
+        catalog = get_plan_catalog(db)
+        assert len(catalog) == 3 and catalog.version
+        assert get_plan_catalog(db) is catalog  # Loaded once
+
+        free_plan = service.get_plan_by_type(PlanType.FREE)
+        assert free_plan.id == 'plan_free' and free_plan.monthly_analysis_limit == 3
+        assert free_plan.features == {'feature_0': '3 analyses per month'}
+        assert service.get_plan_by_id('plan_business').name == 'Business'
+
+        # Inactive plans are listed but can't be looked up
+        assert service.get_plan_by_id('plan_legacy') is None
+        assert service.get_plan_by_type(PlanType.PROFESSIONAL) is None
+        assert [plan.id for plan in service.get_all_plans()] == ['plan_free', 'plan_legacy', 'plan_business']
+
+        # Callers get copies
+        free_plan.name = 'Changed'
+        free_plan.features['feature_0'] = 'changed'
+        assert service.get_plan_by_type(PlanType.FREE).name == 'Free'
+        assert service.get_plan_by_type(PlanType.FREE).features['feature_0'] == '3 analyses per month'
+
+        # Feature flags come from the tier definitions
+        assert PlanCatalog.has_feature(PlanType.ENTERPRISE, 'sso')
+        assert 'basic_analysis' in PlanCatalog.features(PlanType.FREE)
+        db.close_pool()
+    print("✓ Plans indexed by ID and type, features are set lookups")
+
+def test_feature_gates():
+    """Test that feature gates follow the tier, not the plan's stored feature list"""
+    print("\nTesting feature gates...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'plan_catalog_test.db')
+        db.execute_command(PLANS_TABLE)
+        db.execute_command("""
+            INSERT INTO subscription_plans (id, plan_type, name, price_monthly, price_annual, features) VALUES
+            ('plan_free', 'free', 'Free', 0, 0, '["3 analyses per month"]'),
+            ('plan_professional', 'professional', 'Professional', 1499, 14990, '["Unlimited analyses"]'),
+            ('plan_business', 'business', 'Business', 7999, 79990, '["Team collaboration", "Bulk upload"]')
+        """)
+        catalog = get_plan_catalog(db)
+
+        # The stored features are display strings; the gate reads the tier's flags
+        business_plan = catalog.get_by_id('plan_business')
+        assert business_plan.features.get('bulk_upload') is None
+        assert business_plan.has_feature('bulk_upload')
+
+        gates = {plan.plan_type: plan.has_feature('bulk_upload') for plan in catalog.all_plans()}
+        assert gates == {PlanType.FREE: False, PlanType.PROFESSIONAL: False, PlanType.BUSINESS: True}
+        assert catalog.get_by_type(PlanType.PROFESSIONAL).has_feature('premium_ai')
+        assert not catalog.get_by_type(PlanType.FREE).has_feature('premium_ai')
+        db.close_pool()
+    print("✓ SubscriptionPlan.has_feature reads the tier's feature flags")
+
+def test_catalog_reload():
+    """Test that the catalog is rebuilt only when the plans change"""
+    print("\nTesting catalog reload...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'plan_catalog_test.db')
+
+        # A table that can't be read gives an empty catalog and is retried
+        with patch.object(db, 'execute_query', side_effect=sqlite3.OperationalError("database is locked")):
+            assert len(get_plan_catalog(db)) == 0
+        db.execute_command(PLANS_TABLE)
+        db.execute_command("INSERT INTO subscription_plans (id, plan_type, name, price_monthly, price_annual) "
+                           "VALUES ('plan_free', 'free', 'Free', 0, 0)")
+        catalog = get_plan_catalog(db)
+        assert len(catalog) == 1
+
+        # Unchanged rows keep the same catalog
+        assert reload_plan_catalog(db) is catalog
+
+        db.execute_command("UPDATE subscription_plans SET name = 'Starter' WHERE id = 'plan_free'")
+        assert get_plan_catalog(db).get_by_id('plan_free').name == 'Free'  # Until reloaded
+        reloaded = reload_plan_catalog(db)
+        assert reloaded is not catalog and reloaded.version != catalog.version
+        assert get_plan_catalog(db).get_by_id('plan_free').name == 'Starter'
+
+        # Other processes' edits are picked up after PLAN_CATALOG_REFRESH
+        db.execute_command("UPDATE subscription_plans SET price_annual = 10 WHERE id = 'plan_free'")
+        os.environ['PLAN_CATALOG_REFRESH'] = '0.000001'
+        try:
+            assert get_plan_catalog(db).get_by_id('plan_free').price_annual == 10
+        finally:
+            del os.environ['PLAN_CATALOG_REFRESH']
+        db.close_pool()
+    print("✓ Catalog reloaded when the plans change")
+
+def main():
+    """Run all plan catalog tests"""
+    print("Running plan catalog tests...\n")
+
+    try:
+        test_catalog_lookups()
+        test_feature_gates()
+        test_catalog_reload()
+
+        print("\n✅ All plan catalog tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Plan catalog test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
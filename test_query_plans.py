@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Query plan regression tests: the hot queries must seek an index, never scan the table
+Runs on SQLite, and also on PostgreSQL when TEST_POSTGRES_URL is set
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.connection import DatabaseConfig, DatabaseManager
+from database.migrate_composite_indexes import create_composite_indexes
+from database.repositories import AnalysisSessionRepository, UsageRepository
+from sqlite_test_utils import make_sqlite_manager
+
+TEST_TABLES = [
+    """CREATE TABLE IF NOT EXISTS subscription_plans (
+        id TEXT PRIMARY KEY, name TEXT, plan_type TEXT, price_monthly REAL, price_annual REAL,
+        monthly_analysis_limit INTEGER, features TEXT, is_active BOOLEAN, created_at TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS subscriptions (
+        id TEXT PRIMARY KEY, user_id TEXT NOT NULL, plan_id TEXT, status TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+    """CREATE TABLE IF NOT EXISTS usage_events (
+        id TEXT PRIMARY KEY, user_id TEXT, event_type VARCHAR(50) NOT NULL, quantity INTEGER DEFAULT 1,
+        cost_usd REAL DEFAULT 0.0, metadata TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""",
+]
+
+class RecordingDatabaseManager(DatabaseManager):
+    """DatabaseManager that records the statements the application code runs"""
+    def __init__(self, config):
+        super().__init__(config)
+        self.statements = []
+
+    def _execute(self, cursor, query, params=None, fetch=None, many=False):
+        self.statements.append((query, params))
+        return super()._execute(cursor, query, params, fetch, many)
+
+def _setup(db):
+    """Create and fill the hot tables, then run the index migration"""
+    for statement in TEST_TABLES:
+        db.execute_command(statement)
+    sessions = AnalysisSessionRepository(db)
+    sessions.ensure_table()
+    UsageRepository(db).ensure_table()
+
+    now = datetime.now()
+    db.execute_command("INSERT INTO subscription_plans (id, name, plan_type) VALUES (?, ?, ?)",
+                       ('plan_free', 'Free', 'free'))
+    for user in range(20):
+        user_id = f"user-{user}"
+        db.execute_command("INSERT INTO subscriptions (id, user_id, plan_id, status) VALUES (?, ?, ?, ?)",
+                           (str(uuid.uuid4()), user_id, 'plan_free', 'active'))
+        for i in range(5):
+            db.execute_command("INSERT INTO usage_events (id, user_id, event_type, quantity, timestamp) "
+                               "VALUES (?, ?, ?, ?, ?)",
+                               (str(uuid.uuid4()), user_id, 'analysis', 1, now - timedelta(days=i)))
+            sessions.insert({'id': str(uuid.uuid4()), 'user_id': user_id, 'score': i})
+
+    assert 'idx_usage_events_user_type_time' in create_composite_indexes(db)
+
+def _plan_nodes(node):
+    description = node['Node Type']
+    if node.get('Relation Name'):
+        description += f" on {node['Relation Name']}"
+    if node.get('Index Name'):
+        description += f" using {node['Index Name']}"
+    yield description
+    for child in node.get('Plans', []):
+        yield from _plan_nodes(child)
+
+def explain(db, query, params):
+    """The plan of a statement, one line per step"""
+    if db.config.db_type == 'postgresql':
+        with db.transaction() as tx:
+            # Tiny test tables are cheapest to scan; with scans priced out of
+            # reach a Seq Scan in the plan means no index fits the query
+            tx.execute("SET LOCAL enable_seqscan = off")
+            row = tx.query_one(f"EXPLAIN (FORMAT JSON) {query}", params)
+        return list(_plan_nodes(row['QUERY PLAN'][0]['Plan']))
+    return [row['detail'] for row in db.execute_query(f"EXPLAIN QUERY PLAN {query}", params)]
+
+def _last_select(db, call, table):
+    """Run application code and return the last SELECT it ran on table"""
+    start = len(db.statements)
+    call()
+    selects = [(query, params) for query, params in db.statements[start:]
+               if query.lstrip().upper().startswith('SELECT') and table in query]
+    assert selects, f"no query on {table} was run"
+    return selects[-1]
+
+def check_hot_query_plans(db):
+    """Assert every hot query seeks its index"""
+    from auth.services import SubscriptionService
+    from billing.rate_limits import MemoryRateLimiter
+
+    sessions = AnalysisSessionRepository(db)
+    first_page = sessions.page_for_user('user-3', ['score'], limit=2)
+    now = datetime.now()
+
+    hot_queries = [
+        # (name, statement and params, index, also served in index order, answered from the index alone)
+        ('rate limit seed', _last_select(db, lambda: MemoryRateLimiter(db).usage('user-3', 'analysis'),
+                                         'usage_events'), 'idx_usage_events_user_type_time', False, True),
+        # A user without a subscription, so only the query runs, not the mapping of its row
+        ('subscription', _last_select(db, lambda: SubscriptionService(db).get_user_subscription('user-none'),
+                                      'subscriptions'), 'idx_subscriptions_user_status_created', False, False),
+        ('history page', _last_select(db, lambda: sessions.page_for_user('user-3', ['score'], 2, first_page.next_cursor),
+                                      'analysis_sessions'), 'idx_analysis_sessions_user_created', True, False),
+        ('usage period', _last_select(db, lambda: UsageRepository(db).get_period('user-3', now, now + timedelta(days=30)),
+                                      'usage_tracking'), 'idx_usage_tracking_user_period', False, False),
+    ]
+
+    postgresql = db.config.db_type == 'postgresql'
+    for name, (query, params), index, ordered, covering in hot_queries:
+        plan = explain(db, query, params)
+        text = '\n'.join(plan)
+        assert not any(step.startswith('SCAN ') or 'Seq Scan' in step for step in plan), \
+            f"{name} query scans a table:\n{text}"
+        assert index in text, f"{name} query doesn't use {index}:\n{text}"
+        if ordered:
+            assert not any('TEMP B-TREE' in step or step.startswith('Sort') for step in plan), \
+                f"{name} query sorts instead of reading the index in order:\n{text}"
+        if covering and not postgresql:
+            assert 'COVERING INDEX' in text, f"{name} query reads the table:\n{text}"
+        print(f"✓ {name}: {plan[0]}")
+
+def test_sqlite_query_plans():
+    """Test that the hot queries use their indexes on SQLite"""
+    print("Testing SQLite query plans...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'query_plans_test.db', manager_class=RecordingDatabaseManager)
+        _setup(db)
+        check_hot_query_plans(db)
+        db.close_pool()
+
+def test_postgresql_query_plans():
+    """Test that the hot queries use their indexes on PostgreSQL"""
+    print("\nTesting PostgreSQL query plans...")
+
+    url = os.getenv('TEST_POSTGRES_URL')
+    if not url:
+        print("- TEST_POSTGRES_URL not set, skipped")
+        return
+
+    import psycopg2
+    schema = f"query_plans_{uuid.uuid4().hex[:8]}"
+    admin = psycopg2.connect(url)
+    admin.autocommit = True
+    admin.cursor().execute(f"CREATE SCHEMA {schema}")
+    try:
+        config = DatabaseConfig()
+        config.db_type = 'postgresql'
+        separator = '&' if '?' in url else '?'
+        config.database_url = f"{url}{separator}options=-csearch_path%3D{schema}"
+        config.prepared_statements = False
+        db = RecordingDatabaseManager(config)
+        _setup(db)
+        check_hot_query_plans(db)
+        db.close_pool()
+    finally:
+        admin.cursor().execute(f"DROP SCHEMA {schema} CASCADE")
+        admin.close()
+
+def main():
+    """Run all query plan tests"""
+    print("Running query plan tests...\n")
+
+    try:
+        test_sqlite_query_plans()
+        test_postgresql_query_plans()
+
+        print("\n✅ All query plan tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Query plan test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
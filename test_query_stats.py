@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test script for query instrumentation in DatabaseManager
+"""
+import os
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.query_stats import QueryStats, fingerprint, fingerprint_id, get_query_stats
+from sqlite_test_utils import make_sqlite_manager
+
+def test_fingerprint():
+    """Test that literals, placeholders and formatting don't split statements"""
+    print("Testing statement fingerprints...")
+
+    expected = "SELECT * FROM users WHERE id = ? AND name = ? AND plan IN (?, ...)"
+    for sql in (
+        "SELECT * FROM users WHERE id = 42 AND name = 'O''Brien' AND plan IN (1, 2, 3)",
+        "SELECT *  FROM users\n  WHERE id = ? AND name = ? AND plan IN (?, ?) -- lookup",
+        "SELECT * FROM users WHERE id = %s AND name = %s AND plan IN (%s,%s,%s,%s);",
+    ):
+        assert fingerprint(sql) == expected, fingerprint(sql)
+
+    # Digits inside identifiers are not literals
+    assert fingerprint("SELECT col1 FROM t2 LIMIT 10") == "SELECT col1 FROM t2 LIMIT ?"
+    print("✓ Equivalent statements share a fingerprint")
+
+def test_manager_records_statements():
+    """Test that DatabaseManager records timings, rows, errors and call sites"""
+    print("\nTesting statement recording...")
+
+    stats = get_query_stats()
+    stats.reset()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'query_stats_test.db')
+        db.execute_command("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT)")
+        db.execute_many("INSERT INTO items (id, name) VALUES (?, ?)", [(i, f"item{i}") for i in range(5)])
+        for i in range(3):
+            db.execute_query("SELECT * FROM items WHERE id >= ?", (i,))
+        with db.transaction() as tx:
+            tx.execute("UPDATE items SET name = ? WHERE id < ?", ('renamed', 2))
+            assert tx.query_one("SELECT name FROM items WHERE id = ?", (0,)) == {'name': 'renamed'}
+        try:
+            db.execute_command("INSERT INTO items (id, name) VALUES (?, ?)", (1, 'duplicate'))
+        except Exception:
+            pass
+        db.close_pool()
+
+    by_statement = {entry['statement']: entry for entry in stats.top(50)}
+
+    select = by_statement["SELECT * FROM items WHERE id >= ?"]
+    assert select['calls'] == 3 and select['rows'] == 5 + 4 + 3
+    assert select['call_sites'][0]['call_site'].startswith('test_query_stats.py:')
+    assert select['call_sites'][0]['calls'] == 3
+
+    insert = by_statement["INSERT INTO items (id, name) VALUES (?, ...)"]
+    assert insert['calls'] == 2 and insert['rows'] == 5 and insert['errors'] == 1
+    assert by_statement["UPDATE items SET name = ? WHERE id < ?"]['rows'] == 2
+    assert by_statement["SELECT name FROM items WHERE id = ?"]['rows'] == 1
+
+    assert stats.get_summary()['errors'] == 1
+    stats.reset()
+    assert stats.top() == []
+    print("✓ Timings, row counts, errors and call sites recorded")
+
+def test_slow_log_and_exports():
+    """Test the slow-query log and the JSON and Prometheus exports"""
+    print("\nTesting slow-query log and exports...")
+
+    stats = QueryStats(slow_query_ms=100, slow_log_size=2)
+    stats.record("SELECT * FROM users WHERE email = 'a@b.c'", 0.0004, rows=1)
+    stats.record("SELECT * FROM users WHERE email = 'd@e.f'", 0.3, rows=1)
+    for i in range(3):
+        stats.record(f"DELETE FROM sessions WHERE id = {i}", 0.2 + i, rows=1)
+
+    slow = stats.slow_queries()
+    assert len(slow) == 2
+    assert slow[0]['statement'] == "DELETE FROM sessions WHERE id = ?" and slow[0]['duration_ms'] == 2200.0
+    assert stats.top(1)[0]['statement'] == "DELETE FROM sessions WHERE id = ?"
+    assert stats.top(1, by='max_ms')[0]['max_ms'] == 2200.0
+
+    exported = json.loads(stats.to_json())
+    assert exported['summary']['calls'] == 5 and exported['summary']['slow_queries'] == 2
+    users = next(entry for entry in exported['statements'] if entry['statement'].startswith('SELECT'))
+    assert users['histogram']['0.001'] == 1 and users['histogram']['0.5'] == 1
+
+    text = stats.to_prometheus()
+    statement = "SELECT * FROM users WHERE email = ?"
+    labels = f'fingerprint="{fingerprint_id(statement)}",statement="{statement}"'
+    assert '# TYPE db_query_duration_seconds histogram' in text
+    for le, count in (('0.001', 1), ('0.25', 1), ('0.5', 2), ('+Inf', 2)):
+        assert f'db_query_duration_seconds_bucket{{{labels},le="{le}"}} {count}\n' in text
+    assert f'db_query_duration_seconds_count{{{labels}}} 2\n' in text
+    assert f'db_query_rows_total{{{labels}}} 2\n' in text
+
+    try:
+        stats.top(by='statement')
+        assert False, "Expected an unknown statistic error"
+    except ValueError:
+        pass
+
+    disabled = QueryStats(enabled=False)
+    disabled.record("SELECT 1", 1.0)
+    assert disabled.top() == [] and disabled.slow_queries() == []
+    print("✓ Slow queries logged and statistics exported")
+
+def main():
+    """Run all query statistics tests"""
+    print("Running query statistics tests...\n")
+
+    try:
+        test_fingerprint()
+        test_manager_records_statements()
+        test_slow_log_and_exports()
+
+        print("\n✅ All query statistics tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Query statistics test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
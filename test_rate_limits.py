@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test script for the usage rate limiters behind RealTimeUsageMonitor.enforce_rate_limits
+"""
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from billing.rate_limits import DatabaseRateLimiter, MemoryRateLimiter, create_rate_limiter
+from billing.usage_tracker import RealTimeUsageMonitor
+from database.connection import DatabaseManager
+from utils.rate_limiter import SlidingWindowCounter
+from sqlite_test_utils import make_sqlite_manager
+
+USAGE_EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS usage_events (
+        id TEXT PRIMARY KEY, user_id TEXT, event_type VARCHAR(50) NOT NULL, quantity INTEGER DEFAULT 1,
+        cost_usd REAL DEFAULT 0.0, metadata TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Half past an hour plus 30 seconds, so half way through a minute window
+NOW = 1_800_000_000 - 1_800_000_000 % 3600 + 1830
+
+def _make_sqlite_manager(directory: str) -> DatabaseManager:
+    db = make_sqlite_manager(directory, 'rate_limits_test.db')
+    db.execute_command(USAGE_EVENTS_TABLE)
+    return db
+
+def _insert_event(db: DatabaseManager, event_id: str, user_id: str, event_type: str,
+                  quantity: int, at: float):
+    db.execute_command("INSERT INTO usage_events (id, user_id, event_type, quantity, timestamp) "
+                       "VALUES (?, ?, ?, ?, ?)", (event_id, user_id, event_type, quantity,
+                                                  datetime.utcfromtimestamp(at)))
+
+def test_sliding_window_counter():
+    """Test rolling, weighting of the previous window and eviction"""
+    print("Testing SlidingWindowCounter...")
+
+    counter = SlidingWindowCounter(window_seconds=60, max_keys=2)
+    start = NOW - NOW % 60
+    assert counter.add('a', 4, now=start + 10) == 4
+    assert counter.count('a', now=start + 59) == 4
+
+    # Next window: the previous total counts for the part still inside the last 60 seconds
+    assert counter.count('a', now=start + 60) == 4
+    assert counter.count('a', now=start + 90) == 2
+    assert counter.add('a', 1, now=start + 90) == 3
+
+    # Two windows later everything has expired
+    assert counter.count('a', now=start + 180) == 0
+
+    counter.add('b', now=start)
+    counter.seed('c', current=5, previous=0, now=start)
+    assert 'a' not in counter and len(counter) == 2  # Least recently used evicted
+    assert counter.count('c', now=start + 1) == 5
+    print("✓ Counts slide across windows and idle keys are evicted")
+
+def test_memory_rate_limiter():
+    """Test seeding from usage_events and limits in memory"""
+    print("\nTesting MemoryRateLimiter...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        minute_start = NOW - NOW % 60
+        _insert_event(db, 'e1', 'user-1', 'analysis', 4, minute_start + 5)   # This minute
+        _insert_event(db, 'e2', 'user-1', 'analysis', 6, minute_start - 30)  # Previous minute
+        _insert_event(db, 'e3', 'user-1', 'analysis', 50, NOW - 1200)        # Earlier this hour
+        _insert_event(db, 'e4', 'user-1', 'analysis', 99, NOW - 9000)        # Too old
+        _insert_event(db, 'e5', 'user-2', 'analysis', 99, NOW)               # Someone else
+
+        limiter = MemoryRateLimiter(db)
+        usage = limiter.usage('user-1', 'analysis', now=NOW)
+        assert usage['per_minute'] == 4 + 6 * 0.5
+        assert usage['per_hour'] == 60  # The previous hour had nothing
+
+        # Once seeded, records count without touching the database
+        db.execute_command("DELETE FROM usage_events")
+        limiter.record('user-1', 'analysis', 3, now=NOW)
+        assert limiter.usage('user-1', 'analysis', now=NOW)['per_minute'] == 10
+        assert limiter.check('user-1', 'analysis', now=NOW) == (False, "Rate limit exceeded: 10 analysiss per minute")
+
+        # Recording for a user who hasn't been checked yet seeds them; the seed counts the stored event
+        _insert_event(db, 'e6', 'user-3', 'bulk_upload', 1, NOW)
+        limiter.record('user-3', 'bulk_upload', 1, now=NOW)
+        assert limiter.usage('user-3', 'bulk_upload', now=NOW)['per_minute'] == 1
+        limiter.record('user-3', 'bulk_upload', 1, now=NOW)
+        assert limiter.check('user-3', 'bulk_upload', now=NOW) == (False, "Rate limit exceeded: 2 bulk_uploads per minute")
+        db.close_pool()
+    print("✓ Seeded from usage_events once, then counted in memory")
+
+def test_memory_rate_limiter_seed_race():
+    """Test that an event recorded while its key is being seeded is still counted"""
+    print("\nTesting MemoryRateLimiter seeding races...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        _insert_event(db, 'e1', 'user-1', 'analysis', 4, NOW)
+        limiter = MemoryRateLimiter(db)
+        select = db.get_single_result
+        late_event_stored = threading.Event()
+
+        def track_late_event():
+            _insert_event(db, 'e2', 'user-1', 'analysis', 1, NOW)
+            late_event_stored.set()
+            limiter.record('user-1', 'analysis', 1, now=NOW)
+
+        recorder = threading.Thread(target=track_late_event)
+
+        def select_then_track(*args, **kwargs):
+            # Another session commits and records an event after the seed's SELECT
+            row = select(*args, **kwargs)
+            recorder.start()
+            late_event_stored.wait(5)
+            return row
+
+        with patch.object(db, 'get_single_result', side_effect=select_then_track):
+            assert limiter.usage('user-1', 'analysis', now=NOW)['per_minute'] == 4
+        recorder.join(5)
+
+        assert limiter.usage('user-1', 'analysis', now=NOW) == {'per_minute': 5, 'per_hour': 5}
+        db.close_pool()
+    print("✓ Records wait for the seed and add to it")
+
+def test_database_rate_limiter():
+    """Test shared counters across limiter instances"""
+    print("\nTesting DatabaseRateLimiter...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        first, second = DatabaseRateLimiter(db), DatabaseRateLimiter(db)
+        minute_start = NOW - NOW % 60
+
+        first.record('user-1', 'bulk_upload', 1, now=minute_start - 30)
+        second.record('user-1', 'bulk_upload', 1, now=NOW)
+        first.record('user-1', 'bulk_upload', 1, now=NOW)
+        rows = db.execute_query("SELECT * FROM rate_limit_counters WHERE window_seconds = 60")
+        assert len(rows) == 2  # One row per window, updated in place
+
+        usage = second.usage('user-1', 'bulk_upload', now=NOW)
+        assert usage['per_minute'] == 2 + 1 * 0.5 and usage['per_hour'] == 3
+        assert second.usage('user-2', 'bulk_upload', now=NOW) == {'per_minute': 0, 'per_hour': 0}
+
+        # Windows more than an hour old are purged
+        first.record('user-1', 'bulk_upload', 1, now=NOW + 3 * 3600)
+        starts = {row['window_start'] for row in db.execute_query("SELECT window_start FROM rate_limit_counters")}
+        assert min(starts) >= NOW - NOW % 3600 + 2 * 3600
+
+        try:
+            create_rate_limiter(db, 'redis')
+            assert False, "unknown backend accepted"
+        except ValueError:
+            pass
+        db.close_pool()
+    print("✓ Processes share atomic per-window counters")
+
+def test_enforce_rate_limits():
+    """Test that tracked usage events count towards the monitor's limits"""
+    print("\nTesting enforce_rate_limits...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        monitor = RealTimeUsageMonitor()
+        monitor.db = db
+
+        assert monitor.enforce_rate_limits('user-1', 'bulk_upload') == (True, None)
+        monitor._track_usage_event('user-1', 'bulk_upload', 1, 0.0, {})
+        assert monitor.enforce_rate_limits('user-1', 'bulk_upload') == (True, None)
+        monitor._track_usage_event('user-1', 'bulk_upload', 1, 0.0, {})
+        allowed, message = monitor.enforce_rate_limits('user-1', 'bulk_upload')
+        assert not allowed and message == "Rate limit exceeded: 2 bulk_uploads per minute"
+
+        # Other monitors on the same database share the limiter
+        other = RealTimeUsageMonitor()
+        other.db = db
+        assert other.rate_limiter is monitor.rate_limiter
+        db.close_pool()
+    print("✓ Tracked events are counted by enforce_rate_limits")
+
+def main():
+    """Run all rate limit tests"""
+    print("Running rate limit tests...\n")
+
+    try:
+        test_sliding_window_counter()
+        test_memory_rate_limiter()
+        test_memory_rate_limiter_seed_race()
+        test_database_rate_limiter()
+        test_enforce_rate_limits()
+
+        print("\n✅ All rate limit tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Rate limit test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
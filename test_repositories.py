@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Test script for the repository layer and the storage services built on it
+"""
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from analysis.enhanced_analysis_service import EnhancedAnalysisService, create_analysis_result
+from database.analysis_storage import AnalysisStorage
+from database import repositories
+from database.repositories import AnalysisSessionRepository, Repository, UsageRepository
+from database.migrate_content_blobs import migrate_content_blobs
+from database.usage_tracker import PersistentUsageTracker, _current_period
+from sqlite_test_utils import make_sqlite_manager
+
+def test_transaction():
+    """Test that transactions commit together and roll back on errors"""
+    print("Testing transactions...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = Repository(make_sqlite_manager(tmp_dir, 'repositories_test.db'))
+        repo.execute("CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT)")
+
+        with repo.transaction() as tx:
+            tx.execute("INSERT INTO items (id, name) VALUES (?, ?)", (1, 'first'))
+            assert tx.query_one("SELECT name FROM items WHERE id = ?", (1,)) == {'name': 'first'}
+
+        try:
+            with repo.transaction() as tx:
+                tx.execute("INSERT INTO items (id, name) VALUES (?, ?)", (2, 'second'))
+                tx.execute("INSERT INTO items (id, name) VALUES (?, ?)", (1, 'duplicate'))
+            assert False, "Expected an integrity error"
+        except Exception as e:
+            assert 'UNIQUE' in str(e)
+
+        assert repo.fetch_value("SELECT COUNT(*) FROM items") == 1
+        assert repo.fetch_value("SELECT name FROM items WHERE id = ?", (9,), default='none') == 'none'
+
+        try:
+            AnalysisSessionRepository(repo.db).update('x', {'score = 0; --': 1})
+            assert False, "Expected an invalid column error"
+        except ValueError:
+            pass
+    print("✓ Transactions are atomic and column names are checked")
+
+def test_storage_services():
+    """Test AnalysisStorage and PersistentUsageTracker through the repositories"""
+    print("\nTesting storage services...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+
+        storage = AnalysisStorage(db)
+        analysis_id = storage.save_analysis('user-1', 'resume.pdf', 'Python developer',
+                                            {'score': 81, 'match_category': 'Strong Match'})
+        assert analysis_id
+        analyses = storage.get_user_analyses('user-1')
+        assert len(analyses) == 1 and analyses[0]['analysis_result']['score'] == 81
+        assert storage.get_analysis_by_id(analysis_id, 'user-2') is None
+        assert storage.delete_analysis(analysis_id, 'user-1')
+        assert storage.get_user_analyses('user-1') == []
+
+        tracker = PersistentUsageTracker(db)
+        assert tracker.get_current_usage('user-1')['analysis_count'] == 0
+        assert tracker.increment_usage('user-1') and tracker.increment_usage('user-1')
+        assert tracker.get_current_usage('user-1')['analysis_count'] == 2
+        assert tracker.increment_usage('user-2')
+        assert tracker.get_current_usage('user-2')['analysis_count'] == 1
+        assert tracker.reset_usage_for_user('user-1')
+        assert tracker.get_current_usage('user-1')['analysis_count'] == 0
+
+        # Everything went through the manager's pooled connection
+        assert db.get_pool_stats()['connections_opened'] == 1
+        db.close_pool()
+    print("✓ Storage services use the shared database manager")
+
+def test_history_pagination():
+    """Test keyset pages of analysis history, including rows with equal timestamps"""
+    print("\nTesting history pagination...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+        storage = AnalysisStorage(db)
+        for i in range(45):
+            # Three analyses per timestamp, so pages split ties
+            storage.sessions.insert({
+                'id': f"analysis-{i:02d}", 'user_id': 'user-1', 'resume_filename': f"resume{i}.pdf",
+                'job_description': 'JD' * 1000, 'analysis_result': '{"score": 70}', 'score': 70,
+                'match_category': 'Good', 'created_at': f"2026-10-{1 + i // 3:02d} 09:00:00"
+            })
+        storage.save_analysis('user-2', 'other.pdf', 'JD', {'score': 50})
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = storage.get_user_history('user-1', limit=20, cursor=cursor)
+            pages += 1
+            assert all('analysis_result' not in row and 'job_description' not in row for row in page.items)
+            seen += [row['id'] for row in page.items]
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert pages == 3
+        assert seen == [f"analysis-{i:02d}" for i in reversed(range(45))]
+        assert storage.get_analysis_by_id(seen[0], 'user-1')['analysis_result'] == {'score': 70}
+
+        # An exact multiple of the page size has no empty trailing page
+        page = storage.sessions.page_for_user('user-1', ['score'], limit=45)
+        assert len(page.items) == 45 and page.next_cursor is None
+
+        try:
+            storage.sessions.page_for_user('user-1', ['score'], cursor='not-a-cursor')
+            assert False, "Expected an invalid cursor error"
+        except ValueError:
+            pass
+        assert storage.get_user_history('user-1', cursor='not-a-cursor').items == []
+        db.close_pool()
+    print("✓ 45 analyses paged 20 at a time without gaps or repeats")
+
+def test_content_blobs():
+    """Test that job descriptions are stored once and existing rows are migrated"""
+    print("\nTesting content blob storage...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+        storage = AnalysisStorage(db)
+        job_description = "Senior Python engineer. " * 400
+
+        # A bulk run: one JD, many resumes
+        ids = [storage.save_analysis('user-1', f"resume{i}.pdf", job_description, {'score': i}) for i in range(10)]
+        assert db.execute_query("SELECT COUNT(*) AS n FROM content_blobs")[0]['n'] == 1
+        blob = db.execute_query("SELECT codec, size, LENGTH(data) AS stored FROM content_blobs")[0]
+        assert blob['codec'] == 'zlib' and blob['size'] == len(job_description) and blob['stored'] < blob['size'] / 10
+        assert db.execute_query("SELECT DISTINCT job_description FROM analysis_sessions") == [{'job_description': ''}]
+
+        assert storage.get_analysis_by_id(ids[0], 'user-1')['job_description'] == job_description
+        assert all(a['job_description'] == job_description for a in storage.get_user_analyses('user-1'))
+
+        # Clearing the text also clears its hash
+        storage.sessions.update(ids[1], {'job_description': ''})
+        assert storage.sessions.get(ids[1])['job_description'] == ''
+        assert storage.sessions.get(ids[1])['job_description_hash'] is None
+        assert storage.sessions.get(ids[2])['job_description'] == job_description
+
+        # Rows written with the text inline, as before the blob table existed
+        for i in range(3):
+            db.execute_command("INSERT INTO analysis_sessions (id, user_id, resume_filename, job_description) "
+                               "VALUES (?, ?, ?, ?)", (f"old-{i}", 'user-2', 'old.pdf', f"Old JD {i % 2} " * 50))
+        stats = migrate_content_blobs(db, batch_size=2)
+        assert stats['rows'] == 3 and stats['blobs_before'] == 1 and stats['blobs_after'] == 3
+        assert storage.get_analysis_by_id('old-2', 'user-2')['job_description'] == "Old JD 0 " * 50
+        assert migrate_content_blobs(db)['rows'] == 0
+        db.close_pool()
+    print("✓ Repeated job descriptions stored once, compressed")
+
+def test_concurrent_usage_increments():
+    """Test that concurrent increments for one user lose no counts"""
+    print("\nTesting concurrent usage increments...")
+    _check_concurrent_increments()
+    print("✓ 400 concurrent increments counted exactly")
+
+def test_usage_increments_without_returning():
+    """Test the read-back path used on SQLite older than 3.35"""
+    print("\nTesting usage increments without RETURNING...")
+    with patch.object(repositories, 'SQLITE_HAS_RETURNING', False):
+        _check_concurrent_increments()
+    print("✓ Increments read the count back in the same transaction")
+
+def _check_concurrent_increments():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+        tracker = PersistentUsageTracker(db)
+
+        errors = []
+        def hammer():
+            try:
+                for _ in range(25):
+                    assert tracker.increment_usage('user-1')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=hammer) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert tracker.get_current_usage('user-1')['analysis_count'] == 400
+        assert db.execute_query("SELECT COUNT(*) AS n FROM usage_tracking WHERE user_id = ?", ('user-1',))[0]['n'] == 1
+        assert tracker.usage.increment('user-1', *_current_period()) == 401
+        db.close_pool()
+
+def test_duplicate_periods_merged():
+    """Test that duplicate period rows are merged before the unique key is added"""
+    print("\nTesting duplicate usage period merge...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+        start, end = _period()
+        db.execute_command("""
+            CREATE TABLE IF NOT EXISTS usage_tracking (
+                id TEXT PRIMARY KEY, user_id TEXT NOT NULL, analysis_count INTEGER DEFAULT 0,
+                period_start TIMESTAMP, period_end TIMESTAMP,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        db.execute_many("INSERT INTO usage_tracking (id, user_id, analysis_count, period_start, period_end) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        [('a', 'user-1', 2, start, end), ('b', 'user-1', 1, start, end), ('c', 'user-2', 1, start, end)])
+
+        usage = UsageRepository(db)
+        usage.ensure_table()
+        rows = db.execute_query("SELECT id, analysis_count FROM usage_tracking ORDER BY id")
+        assert rows == [{'id': 'a', 'analysis_count': 3}, {'id': 'c', 'analysis_count': 1}]
+        assert usage.increment('user-1', start, end) == 4
+        db.close_pool()
+    print("✓ Duplicate periods merged into one record")
+
+def _period():
+    start = datetime(2026, 10, 1)
+    return start, datetime(2026, 11, 1)
+
+def test_enhanced_analysis_service():
+    """Test the enhanced analysis service on SQLite"""
+    print("\nTesting enhanced analysis service...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'repositories_test.db')
+        db.execute_command("""
+            CREATE TABLE IF NOT EXISTS analysis_sessions (
+                id TEXT PRIMARY KEY, user_id TEXT NOT NULL, resume_filename TEXT,
+                job_description TEXT, resume_content TEXT, analysis_type TEXT, match_score REAL,
+                strengths TEXT, weaknesses TEXT, recommendations TEXT, keywords_matched TEXT,
+                keywords_missing TEXT, sections_analysis TEXT, pdf_report_path TEXT,
+                processing_time_seconds REAL, api_cost_usd REAL, tokens_used INTEGER,
+                status TEXT, error_message TEXT, created_at TIMESTAMP, updated_at TIMESTAMP
+            )
+        """)
+        service = EnhancedAnalysisService(db)
+
+        result = create_analysis_result('user-1', 'resume.pdf', 'JD', 'Resume text', {
+            'match_score': 77.5, 'strengths': ['Python'], 'api_cost_usd': 0.01, 'tokens_used': 1200
+        })
+        assert service.save_analysis(result)
+        assert service.update_analysis(result.id, {'recommendations': ['Add metrics']})
+
+        saved = service.get_analysis_by_id(result.id)
+        assert saved.strengths == ['Python'] and saved.recommendations == ['Add metrics']
+        assert saved.job_description == 'JD' and saved.resume_content == 'Resume text'
+        assert db.execute_query("SELECT resume_content FROM analysis_sessions") == [{'resume_content': ''}]
+        assert [a.id for a in service.get_user_analyses('user-1')] == [result.id]
+        history = service.get_user_history('user-1')
+        assert history.next_cursor is None
+        assert history.items == [{'id': result.id, 'created_at': history.items[0]['created_at'],
+                                  'resume_filename': 'resume.pdf', 'analysis_type': 'resume_jd_match',
+                                  'match_score': 77.5, 'status': 'completed'}]
+
+        stats = service.get_user_analysis_stats('user-1')
+        assert stats['total_analyses'] == 1 and stats['total_tokens_used'] == 1200
+        assert stats['recent_analyses'][0]['match_score'] == 77.5
+
+        assert not service.delete_analysis(result.id, 'user-2')
+        assert service.delete_analysis(result.id, 'user-1')
+        db.close_pool()
+    print("✓ Enhanced analysis service works on either backend")
+
+def main():
+    """Run all repository tests"""
+    print("Running repository tests...\n")
+
+    try:
+        test_transaction()
+        test_storage_services()
+        test_history_pagination()
+        test_content_blobs()
+        test_concurrent_usage_increments()
+        test_usage_increments_without_returning()
+        test_duplicate_periods_merged()
+        test_enhanced_analysis_service()
+
+        print("\n✅ All repository tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Repository test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
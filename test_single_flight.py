@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for in-flight request coalescing
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai.matcher import analyze_match
+from resume_matcher_ai.single_flight import SingleFlight
+from sqlite_test_utils import make_sqlite_manager
+
+MOCK_RESPONSE = '''
+{
+    "compatibility_score": 77,
+    "matching_skills": ["Python"],
+    "missing_skills": ["Go"],
+    "skill_gaps": {"Critical": ["Go"], "Important": [], "Nice-to-have": []},
+    "suggestions": ["Add Go experience"]
+}
+'''
+
+JD_DATA = {'raw_text': 'Python and Go developer', 'technical_skills': ['Python', 'Go'], 'soft_skills': []}
+
+def _run_threads(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def worker(i):
+        try:
+            results[i] = target(i)
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_analyses_share_one_call():
+    """Test that identical concurrent analyses trigger one API call"""
+    print("Testing thread coalescing...")
+
+    calls = []
+
+    def slow_api(prompt):
+        calls.append(prompt)
+        time.sleep(0.3)
+        return MOCK_RESPONSE
+
+    group = SingleFlight()
+    with patch('resume_matcher_ai.single_flight.get_single_flight', return_value=group), \
+         patch('resume_matcher_ai.matcher.call_perplexity_api', side_effect=slow_api), \
+         patch.dict(os.environ, {'ENABLE_ANALYSIS_CACHE': 'false'}):
+        results, errors = _run_threads(6, lambda i: analyze_match("Python developer resume", JD_DATA))
+
+    assert errors == [None] * 6
+    assert len(calls) == 1
+    assert all(r.score == 77 for r in results)
+    assert len({id(r) for r in results}) == 6
+    assert group.get_stats()['coalesced'] == 5
+    assert group.get_stats()['in_flight'] == 0
+    print("✓ Six concurrent requests made one API call")
+
+def test_errors_reach_every_waiter():
+    """Test that a failure is shared with waiters instead of retried by each"""
+    print("\nTesting error propagation...")
+
+    group = SingleFlight()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("upstream down")
+
+    results, errors = _run_threads(4, lambda i: group.do('key', failing))
+
+    assert len(calls) == 1
+    assert all(isinstance(e, RuntimeError) for e in errors)
+
+    # Once the flight has landed, the next call runs again
+    value, shared = group.do('key', lambda: 'fresh')
+    assert value == 'fresh' and shared is False
+    print("✓ Errors are shared and not cached")
+
+def test_cross_process_lock():
+    """Test that a second process waits on the lock row and reuses the stored result"""
+    print("\nTesting database lock coordination...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'single_flight_test.db')
+        store = {}
+        first = SingleFlight(distributed=True, poll_interval=0.05, db_manager=db)
+        second = SingleFlight(distributed=True, poll_interval=0.05, db_manager=db)
+        second_calls = []
+
+        def produce():
+            time.sleep(0.4)
+            store['key'] = 'result'
+            return 'result'
+
+        def duplicate():
+            second_calls.append(1)
+            return 'duplicate'
+
+        leader = threading.Thread(target=lambda: first.do('key', produce))
+        leader.start()
+        time.sleep(0.1)
+        value, shared = second.do('key', duplicate, lookup=lambda: store.get('key'))
+        leader.join()
+
+        assert value == 'result' and shared is True
+        assert second_calls == []
+        assert not db.execute_query("SELECT * FROM analysis_inflight")
+        print("✓ Lock row coalesces work across processes")
+
+        # A lock left behind by a crashed process is taken over
+        db.execute_command(
+            "INSERT INTO analysis_inflight (flight_key, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?)",
+            ('stale', 'dead-host:1:abcd', time.time() - 300, time.time() - 180)
+        )
+        value, shared = second.do('stale', lambda: 'recovered', lookup=lambda: None)
+        assert value == 'recovered' and shared is False
+        print("✓ Stale locks are reclaimed")
+
+def main():
+    """Run all single-flight tests"""
+    print("Running single-flight tests...\n")
+
+    try:
+        test_concurrent_analyses_share_one_call()
+        test_errors_reach_every_waiter()
+        test_cross_process_lock()
+
+        print("\n✅ All single-flight tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Single-flight test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
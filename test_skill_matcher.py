@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test script for the taxonomy skill matcher
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai.jd_parser import categorize_skills
+from resume_matcher_ai.protected_matcher import basic_keyword_analysis
+from resume_matcher_ai.skill_matcher import SkillMatcher, get_skill_matcher, load_skill_taxonomy
+
+TAXONOMY = {
+    'technical': ['java', 'javascript', '.net', 'c++', {'name': 'node.js', 'aliases': ['nodejs']}],
+    'soft': ['management', 'project management', {'name': 'problem-solving', 'aliases': ['problem solving']}]
+}
+
+def test_word_boundaries():
+    """Test that terms only match as whole words"""
+    print("Testing word boundaries...")
+
+    matcher = SkillMatcher(TAXONOMY)
+
+    assert matcher.find_skills("Senior JavaScript engineer") == ['javascript']
+    assert matcher.find_skills("Java, C++ and ASP.NET") == ['java', 'c++', '.net']
+    assert matcher.find_skills("javanese cuisine") == []
+    print("✓ Terms match on word boundaries only")
+
+def test_aliases_and_overlaps():
+    """Test that aliases map to canonical names and overlapping terms are all found"""
+    print("\nTesting aliases and overlapping terms...")
+
+    matcher = SkillMatcher(TAXONOMY)
+    text = "NodeJS services; strong problem solving and project management"
+    hits = matcher.find_all(text)
+
+    assert [hit.skill for hit in hits] == ['node.js', 'problem-solving', 'project management', 'management']
+    assert text[hits[0].start:hits[0].end] == "NodeJS"
+    assert matcher.find_skills(text, category='technical') == ['node.js']
+    print("✓ Aliases and nested terms are reported")
+
+def test_mentions():
+    """Test that the category check agrees with the automaton on short texts"""
+    print("\nTesting category checks...")
+
+    texts = ["Java", "javanese", "ASP.NET MVC", ".network", "c++x", "xc++", "Node.js, NodeJS",
+             "project   management", "problem\nsolving", "problem-solving skills", "managementx",
+             "İstanbul java", ""]
+    regex_matcher = SkillMatcher(TAXONOMY)
+    with patch.object(SkillMatcher, 'PHRASE_REGEX_MAX_TERMS', 0):
+        automaton_matcher = SkillMatcher(TAXONOMY)
+    assert regex_matcher._category_index is not None and automaton_matcher._category_index is None
+
+    for text in texts:
+        expected = {hit.category for hit in regex_matcher.iter_all(text)}
+        for matcher in (regex_matcher, automaton_matcher):
+            found = {category for category in ('technical', 'soft', 'other') if matcher.mentions(text, category)}
+            assert found == expected, (text, found, expected)
+    for matcher in (regex_matcher, automaton_matcher):
+        assert matcher.first_categories(["Java and management", "management", "none"],
+                                        ('technical', 'soft')) == ['technical', 'soft', None]
+    assert regex_matcher.mentions("C++ and .NET", 'technical')
+    assert not regex_matcher.mentions("javanese management", 'technical')
+    print("✓ Set and regex checks find the same terms as the automaton")
+
+def test_ambiguous_terms():
+    """Test that ambiguous names need a nearby skill of their category in prose"""
+    print("\nTesting ambiguous terms...")
+
+    matcher = SkillMatcher({
+        'technical': ['python', 'docker', {'name': 'go', 'aliases': ['golang'], 'ambiguous': True},
+                      {'name': 'rest', 'ambiguous': True}],
+        'soft': ['communication']
+    })
+
+    # Lists of skills keep every term
+    assert matcher.find_skills("Go") == ['go']
+    assert matcher.find_skills("Ready to go, communication matters", prose=True) == ['communication']
+    assert matcher.find_skills("Services in Python and Go behind REST APIs", prose=True) == ['python', 'go', 'rest']
+    # Aliases don't inherit the flag
+    assert matcher.find_skills("Golang for fun.", prose=True) == ['go']
+
+    filler = " and then some more words" * 3
+    assert matcher.find_skills("Docker" + filler + " we go", prose=True) == ['docker']
+    print("✓ Ambiguous names only count next to other skills")
+
+def test_load_taxonomy_file():
+    """Test loading and validating taxonomy files"""
+    print("\nTesting taxonomy loading...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'taxonomy.json')
+        with open(path, 'w') as f:
+            json.dump({'version': 1, 'categories': TAXONOMY}, f)
+        assert SkillMatcher(load_skill_taxonomy(path)).find_skills("java") == ['java']
+
+        with open(path, 'w') as f:
+            json.dump({'skills': ['java']}, f)
+        try:
+            load_skill_taxonomy(path)
+            assert False, "Expected an invalid taxonomy error"
+        except ValueError as e:
+            assert 'categories' in str(e)
+
+    assert 'python' in get_skill_matcher().skill_categories
+    print("✓ Taxonomy files load and are validated")
+
+def test_large_taxonomy():
+    """Test that matching time doesn't grow with the taxonomy"""
+    print("\nTesting a large taxonomy...")
+
+    text = ("We need Python, Kubernetes and strong communication skills for our data platform. " * 600)
+    small = SkillMatcher({'technical': ['python', 'kubernetes'], 'soft': ['communication']})
+    large = SkillMatcher({
+        'technical': ['python', 'kubernetes'] + [f'framework{i} toolkit' for i in range(20000)],
+        'soft': ['communication'] + [f'trait{i}' for i in range(10000)]
+    })
+
+    def timed(matcher):
+        start = time.perf_counter()
+        skills = matcher.find_skills(text)
+        return skills, time.perf_counter() - start
+
+    small_skills, small_time = timed(small)
+    large_skills, large_time = timed(large)
+
+    assert len(large) == 30003
+    assert small_skills == large_skills == ['python', 'kubernetes', 'communication']
+    assert large_time < small_time * 3 + 0.05
+    print(f"✓ 30K-skill taxonomy: {large_time * 1000:.1f}ms vs {small_time * 1000:.1f}ms for 3 skills")
+
+def test_callers_use_taxonomy():
+    """Test categorize_skills and basic_keyword_analysis on the bundled taxonomy"""
+    print("\nTesting taxonomy callers...")
+
+    # Short keywords like "r" and "go" no longer match inside other words
+    result = categorize_skills(["Python", "Hardworking", "teamwork", "Postgres"])
+    assert result == {'technical': ['Python', 'Postgres'], 'soft': ['Hardworking', 'teamwork']}
+
+    jd_data = {'raw_text': "Java developer with SQL, AWS and Kubernetes. Excellent communication."}
+    result = basic_keyword_analysis("JavaScript and SQL engineer, great communication", jd_data)
+    assert [m['skill'] for m in result.matching_skills] == ['sql', 'communication']
+    assert result.skill_gaps['Critical'] == ['java', 'aws', 'kubernetes']
+    assert result.score == 30
+
+    # Everyday words that are also skill names aren't reported from ordinary prose
+    prose = ("We go the extra mile for customers. Express your ideas, take a rest when you need "
+             "less stress, and enjoy spring offsites. R&D staff are swift to help our chef.")
+    result = basic_keyword_analysis(prose, {'raw_text': prose})
+    assert [m['skill'] for m in result.matching_skills] == []
+    result = basic_keyword_analysis("Go and REST services on AWS", {'raw_text': "Go, REST APIs and AWS"})
+    assert [m['skill'] for m in result.matching_skills] == ['go', 'rest', 'aws']
+    print("✓ Callers match whole skills from the taxonomy")
+
+def main():
+    """Run all skill matcher tests"""
+    print("Running skill matcher tests...\n")
+
+    try:
+        test_word_boundaries()
+        test_aliases_and_overlaps()
+        test_mentions()
+        test_ambiguous_terms()
+        test_load_taxonomy_file()
+        test_large_taxonomy()
+        test_callers_use_taxonomy()
+
+        print("\n✅ All skill matcher tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Skill matcher test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQLite tuning profile
+"""
+import os
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.sqlite_profile import SQLiteProfile, connect_sqlite
+from sqlite_test_utils import make_sqlite_manager
+
+def test_profile_applied():
+    """Test that connections get the configured PRAGMAs"""
+    print("Testing SQLite profile settings...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        env = {'SQLITE_SYNCHRONOUS': 'full', 'SQLITE_BUSY_TIMEOUT_MS': '2500', 'SQLITE_CACHE_SIZE': '-4000'}
+        with patch.dict(os.environ, env):
+            profile = SQLiteProfile()
+
+        conn = connect_sqlite(os.path.join(tmp_dir, 'profile.db'), profile)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 2500
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -4000
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        conn.close()
+
+        with patch.dict(os.environ, {'SQLITE_JOURNAL_MODE': 'wall'}):
+            try:
+                SQLiteProfile()
+                assert False, "Expected an invalid journal mode error"
+            except ValueError as e:
+                assert 'SQLITE_JOURNAL_MODE' in str(e)
+    print("✓ PRAGMAs applied and validated")
+
+def test_concurrent_manager_writes():
+    """Test that concurrent writers through DatabaseManager don't hit lock errors"""
+    print("\nTesting concurrent writes...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'writers.db')
+        db.execute_command("CREATE TABLE IF NOT EXISTS saves (id INTEGER PRIMARY KEY, payload TEXT)")
+
+        errors = []
+        def save_many():
+            try:
+                for _ in range(50):
+                    db.execute_command("INSERT INTO saves (payload) VALUES (?)", ('x' * 2000,))
+                    db.execute_query("SELECT COUNT(*) AS n FROM saves")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=save_many) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert db.execute_query("SELECT COUNT(*) AS n FROM saves")[0]['n'] == 400
+        with db.get_connection() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        db.close_pool()
+    print("✓ 400 concurrent saves without lock errors")
+
+def main():
+    """Run all SQLite profile tests"""
+    print("Running SQLite profile tests...\n")
+
+    try:
+        test_profile_applied()
+        test_concurrent_manager_writes()
+
+        print("\n✅ All SQLite profile tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ SQLite profile test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for the SQL statement compiler and prepared statements
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import psycopg2
+
+from database.connection import DatabaseConfig
+from database.statements import compile_statement, forget_prepared, prepared_form
+from sqlite_test_utils import make_sqlite_manager
+
+class FakeConnection:
+    """Stands in for a PreparedStatementConnection"""
+    def __init__(self):
+        self.prepared_statements = set()
+        self.stale_statements = set()
+
+class FakeCursor:
+    """Records statements; statements starting with a prefix in fail raise error"""
+    def __init__(self, fail=(), error=psycopg2.ProgrammingError):
+        self.connection = FakeConnection()
+        self.executed = []
+        self.fail = fail
+        self.error = error
+
+    def execute(self, statement, params=None):
+        self.executed.append(statement)
+        if statement.startswith(tuple(self.fail)):
+            raise self.error(f"failed: {statement}")
+
+def test_placeholder_translation():
+    """Test placeholder and percent translation for each dialect"""
+    print("Testing placeholder translation...")
+
+    qmark = "SELECT * FROM users WHERE email = ? AND note = 'why?' AND name LIKE '%smith' -- ok?"
+    compiled = compile_statement(qmark, 'postgresql')
+    assert compiled.sql == ("SELECT * FROM users WHERE email = %s AND note = 'why?' "
+                            "AND name LIKE '%%smith' -- ok?")
+    assert compiled.placeholders == 1
+    assert compiled.prepare_sql == ("SELECT * FROM users WHERE email = $1 AND note = 'why?' "
+                                    "AND name LIKE '%smith' -- ok?")
+    assert compile_statement(qmark, 'sqlite').sql == qmark
+
+    # Callers written for psycopg2 already use %s and escape percent signs
+    pyformat = "UPDATE usage SET n = n %% 7 WHERE user_id = %s AND label = 'x?%%'"
+    assert compile_statement(pyformat, 'sqlite').sql == "UPDATE usage SET n = n % 7 WHERE user_id = ? AND label = 'x?%'"
+    assert compile_statement(pyformat, 'postgresql').sql == pyformat
+    assert compile_statement(pyformat, 'postgresql').prepare_sql == (
+        "UPDATE usage SET n = n % 7 WHERE user_id = $1 AND label = 'x?%'")
+
+    # Compiled once per statement text and dialect
+    assert compile_statement(qmark, 'postgresql') is compiled
+
+    # Only single DML statements are prepared
+    assert compile_statement("CREATE TABLE t (id INTEGER)", 'postgresql').prepare_sql is None
+    assert compile_statement("DELETE FROM t; DELETE FROM u", 'postgresql').prepare_sql is None
+    assert compile_statement("SELECT 1;", 'postgresql').prepare_sql == "SELECT 1"
+    assert compile_statement("SELECT ?", 'sqlite').prepare_sql is None
+    print("✓ Placeholders translated outside literals only")
+
+def test_prepared_statements():
+    """Test that hot statements are prepared once per connection"""
+    print("\nTesting prepared statements...")
+
+    compiled = compile_statement("SELECT * FROM subscriptions WHERE user_id = ? AND status = ?", 'postgresql')
+    cursor = FakeCursor()
+    assert prepared_form(cursor, compiled, threshold=3) is None
+    assert prepared_form(cursor, compiled, threshold=3) is None
+    assert cursor.executed == []
+
+    execute_sql = prepared_form(cursor, compiled, threshold=3)
+    assert execute_sql == f"EXECUTE {compiled.name} (%s, %s)"
+    assert f"PREPARE {compiled.name} AS SELECT * FROM subscriptions WHERE user_id = $1 AND status = $2" in cursor.executed
+    assert prepared_form(cursor, compiled, threshold=3) == execute_sql
+    assert len([s for s in cursor.executed if s.startswith('PREPARE')]) == 1
+
+    # A new connection prepares it again
+    other = FakeCursor()
+    assert prepared_form(other, compiled, threshold=3) == execute_sql
+    assert any(s.startswith('PREPARE') for s in other.executed)
+
+    # After a failed EXECUTE the statement is deallocated and prepared again
+    forget_prepared(cursor, compiled)
+    assert prepared_form(cursor, compiled, threshold=3) == execute_sql
+    assert cursor.executed[-6:-4] == ["SAVEPOINT prepare_statement", f"DEALLOCATE {compiled.name}"]
+
+    # Statements PostgreSQL can't prepare run unprepared from then on
+    unpreparable = compile_statement("SELECT ? IS NULL AS missing", 'postgresql')
+    failing = FakeCursor(fail=('PREPARE',))
+    assert prepared_form(failing, unpreparable, threshold=1) is None
+    assert "ROLLBACK TO SAVEPOINT prepare_statement" in failing.executed
+    assert unpreparable.prepare_sql is None
+    assert prepared_form(failing, unpreparable, threshold=1) is None
+    print("✓ Hot statements prepared once per connection")
+
+def test_failed_execute_forgets_only_stale_statements():
+    """Test that only errors about the prepared statement itself mark it stale"""
+    print("\nTesting failed EXECUTE handling...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'statements_stale_test.db')
+        db.close_pool()
+    db.config.db_type = 'postgresql'
+    db.config.prepared_statements = True
+    db.config.prepare_threshold = 1
+
+    cases = [
+        (psycopg2.errors.UniqueViolation, True),
+        (psycopg2.errors.InvalidSqlStatementName, False),
+        (psycopg2.errors.FeatureNotSupported, False),
+    ]
+    for error, still_prepared in cases:
+        query = f"UPDATE users SET email = ? WHERE id = ? -- {error.__name__}"
+        name = db._compile(query).name
+        cursor = FakeCursor(fail=['EXECUTE'], error=error)
+        try:
+            db._execute(cursor, query, ('a@example.com', 'user-1'))
+            assert False, f"{error.__name__} was swallowed"
+        except error:
+            pass
+        assert (name in cursor.connection.prepared_statements) == still_prepared, error.__name__
+        assert (name in cursor.connection.stale_statements) != still_prepared, error.__name__
+    print("✓ Constraint violations keep the statement prepared")
+
+def test_manager_accepts_both_styles():
+    """Test that DatabaseManager runs ? and %s statements on SQLite"""
+    print("\nTesting DatabaseManager placeholders...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = make_sqlite_manager(tmp_dir, 'statements_test.db')
+
+        db.execute_command("CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY, body TEXT)")
+        db.execute_command("INSERT INTO notes (id, body) VALUES (%s, %s)", (1, 'what?'))
+        db.execute_command("INSERT INTO notes (id, body) VALUES (?, '100%')", (2,))
+        assert db.execute_query("SELECT id FROM notes WHERE body = 'what?' AND id = ?", (1,)) == [{'id': 1}]
+        assert db.get_single_result("SELECT body FROM notes WHERE id = %s", (2,)) == {'body': '100%'}
+        db.close_pool()
+
+    config = DatabaseConfig()
+    config.database_url = 'postgresql://u:p@ep-example-pooler.us-east-1.aws.neon.tech/db'
+    assert config._uses_transaction_pooler()
+    config.database_url = 'postgresql://u:p@db.example.com:5432/db'
+    assert not config._uses_transaction_pooler()
+    print("✓ Both placeholder styles work on SQLite")
+
+def main():
+    """Run all statement compiler tests"""
+    print("Running statement compiler tests...\n")
+
+    try:
+        test_placeholder_translation()
+        test_prepared_statements()
+        test_failed_execute_forgets_only_stale_statements()
+        test_manager_accepts_both_styles()
+
+        print("\n✅ All statement compiler tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Statement compiler test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script for the append-only usage log
+"""
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from resume_matcher_ai import usage_log as usage_log_module
+from resume_matcher_ai.usage_log import UsageLog
+from resume_matcher_ai.utils import cleanup_old_usage_logs, get_usage_statistics, track_api_usage
+
+def _record(cost=0.001, success=True, days_ago=0):
+    return {
+        'timestamp': (datetime.now() - timedelta(days=days_ago)).isoformat(),
+        'tokens_used': int(cost * 1000000),
+        'estimated_cost': cost,
+        'processing_time': 2.0,
+        'success': success,
+        'error_message': None if success else 'failed'
+    }
+
+def _append_many(path, count):
+    usage_log = UsageLog(path, max_bytes=0)
+    for _ in range(count):
+        usage_log.append(_record())
+
+def test_concurrent_appends():
+    """Test that concurrent writers in several processes and threads lose no records"""
+    print("Testing concurrent appends...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'usage.jsonl')
+
+        processes = [multiprocessing.Process(target=_append_many, args=(path, 200)) for _ in range(3)]
+        threads = [threading.Thread(target=_append_many, args=(path, 200)) for _ in range(3)]
+        for worker in processes + threads:
+            worker.start()
+        for worker in processes + threads:
+            worker.join()
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 1200
+        assert all(json.loads(line)['success'] for line in lines)
+        print("✓ 1200 concurrent appends, none lost or interleaved")
+
+def test_prune_keeps_concurrent_appends():
+    """Test that records appended while another writer prunes are not dropped"""
+    print("\nTesting appends during prune...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'usage.jsonl')
+        pruner = UsageLog(path, max_bytes=0)
+        for _ in range(200):
+            pruner.append(_record(days_ago=60))
+
+        writer = threading.Thread(target=_append_many, args=(path, 500))
+        writer.start()
+        while writer.is_alive():
+            pruner.prune(datetime.now() - timedelta(days=30))
+        writer.join()
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 500
+        print("✓ Pruning loses no concurrent appends")
+
+def test_running_cost_window():
+    """Test that the 30-day cost is kept incrementally and sees other writers"""
+    print("\nTesting running cost window...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'usage.jsonl')
+        usage_log = UsageLog(path)
+        other_writer = UsageLog(path)
+
+        usage_log.append(_record(cost=5.0, days_ago=40))
+        usage_log.append(_record(cost=1.0, days_ago=10))
+        usage_log.append(_record(cost=3.0, success=False))
+        assert abs(usage_log.recent_cost() - 1.0) < 1e-9
+
+        other_writer.append(_record(cost=2.0))
+        with open(path, 'ab') as f:
+            f.write(b'{"timestamp": "2')  # A write still in progress
+        assert abs(usage_log.recent_cost() - 3.0) < 1e-9
+
+        # Later reads only parse what was appended since the last one
+        with patch.object(usage_log_module, '_parse_line', wraps=usage_log_module._parse_line) as parse:
+            usage_log.recent_cost()
+        assert parse.call_count == 0
+
+        # Records age out of the window
+        with patch('resume_matcher_ai.usage_log.datetime') as fake_datetime:
+            fake_datetime.now.return_value = datetime.now() + timedelta(days=25)
+            fake_datetime.fromisoformat = datetime.fromisoformat
+            assert abs(usage_log.recent_cost() - 2.0) < 1e-9
+        print("✓ Cost window updates incrementally")
+
+def test_rotation():
+    """Test that the log rotates by size and the cost window survives rotation"""
+    print("\nTesting rotation...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'usage.jsonl')
+        usage_log = UsageLog(path, max_bytes=1000, backup_count=2)
+
+        # track_api_usage reads the running total after every append
+        for i in range(30):
+            usage_log.append(_record(cost=0.5))
+            usage_log.recent_cost()
+        assert os.path.exists(path + '.1') and os.path.exists(path + '.2')
+        assert not os.path.exists(path + '.3')
+
+        kept = list(usage_log.iter_records())
+        assert len(kept) < 30
+        # The running total still counts records that have since been rotated out
+        assert abs(usage_log.recent_cost() - 15.0) < 1e-9
+        assert abs(UsageLog(path, backup_count=2).recent_cost() - 0.5 * len(kept)) < 1e-9
+
+        # A reader that falls several rotations behind catches up from the backups
+        path = os.path.join(tmp_dir, 'lagging.jsonl')
+        writer = UsageLog(path, max_bytes=1000, backup_count=5)
+        reader = UsageLog(path, max_bytes=1000, backup_count=5)
+        for i in range(4):
+            writer.append(_record(cost=0.5))
+        assert abs(reader.recent_cost() - 2.0) < 1e-9
+        for i in range(20):
+            writer.append(_record(cost=0.5))
+        assert os.path.exists(path + '.3')
+        assert abs(reader.recent_cost() - 12.0) < 1e-9
+        print(f"✓ Rotated into backups, {len(kept)} records kept on disk")
+
+def test_legacy_file_and_statistics():
+    """Test that a JSON array log is migrated once and feeds the usage helpers"""
+    print("\nTesting legacy log migration...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = os.path.join(tmp_dir, 'usage_log.json')
+        path = os.path.join(tmp_dir, 'usage_log.jsonl')
+        with open(legacy_path, 'w') as f:
+            json.dump([_record(cost=0.25), _record(cost=0.25, days_ago=100), _record(success=False)], f, indent=2)
+        # Written by a process that started before the legacy log was migrated
+        with open(path, 'w') as f:
+            f.write(json.dumps(_record(cost=0.5)) + '\n')
+
+        # An old USAGE_LOG_FILE setting still points at the .json file
+        with patch.dict(os.environ, {'USAGE_LOG_FILE': legacy_path, 'ENABLE_USAGE_TRACKING': 'true'}):
+            track_api_usage(1000, 1.5, True)
+            stats = get_usage_statistics(30)
+            assert stats['total_calls'] == 4
+            assert stats['successful_calls'] == 3
+            assert stats['failed_calls'] == 1
+
+            cleanup_old_usage_logs(days_to_keep=90)
+            assert get_usage_statistics(365)['total_calls'] == 4
+
+        assert not os.path.exists(legacy_path)
+        assert os.path.exists(legacy_path + '.migrated')
+        with open(path) as f:
+            costs = [json.loads(line)['estimated_cost'] for line in f]
+        # Legacy records come first, then the ones already in the new log
+        assert costs[:3] == [0.25, 0.001, 0.5]
+        assert len(costs) == 4
+        assert len(list(UsageLog(legacy_path).iter_records())) == 4
+        print("✓ Legacy log migrated to JSON Lines once")
+
+def main():
+    """Run all usage log tests"""
+    print("Running usage log tests...\n")
+
+    try:
+        test_concurrent_appends()
+        test_prune_keeps_concurrent_appends()
+        test_running_cost_window()
+        test_rotation()
+        test_legacy_file_and_statistics()
+
+        print("\n✅ All usage log tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Usage log test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Test script for the daily usage rollups behind billing period totals
+"""
+import os
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from billing.usage_tracker import RealTimeUsageMonitor
+from database.connection import DatabaseManager
+from database.migrate_usage_rollups import backfill_usage_rollups
+from database.repositories import UsageEventRepository
+from sqlite_test_utils import make_sqlite_manager
+
+USAGE_EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS usage_events (
+        id TEXT PRIMARY KEY, user_id TEXT, event_type VARCHAR(50) NOT NULL, quantity INTEGER DEFAULT 1,
+        cost_usd REAL DEFAULT 0.0, metadata TEXT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+DAY = datetime(2026, 3, 10)
+
+def _make_sqlite_manager(directory: str) -> DatabaseManager:
+    db = make_sqlite_manager(directory, 'usage_rollups_test.db')
+    db.execute_command(USAGE_EVENTS_TABLE)
+    return db
+
+def _raw_totals(db: DatabaseManager, user_id: str, start: datetime, end: datetime) -> dict:
+    """The GROUP BY over usage_events that the rollups replace"""
+    rows = db.execute_query("""
+        SELECT event_type, SUM(quantity) AS total_quantity, SUM(cost_usd) AS total_cost, COUNT(*) AS event_count
+        FROM usage_events WHERE user_id = ? AND timestamp >= ? AND timestamp <= ?
+        GROUP BY event_type
+    """, (user_id, start, end))
+    return {row['event_type']: (row['total_quantity'], round(row['total_cost'], 6), row['event_count'])
+            for row in rows}
+
+def _totals(events: UsageEventRepository, user_id: str, start: datetime, end: datetime) -> dict:
+    return {row['event_type']: (row['total_quantity'], round(row['total_cost'], 6), row['event_count'])
+            for row in events.period_totals(user_id, start, end)}
+
+def _record_events(events: UsageEventRepository):
+    """Events for two users every 5 hours over 10 days, some at midnight"""
+    for i in range(48):
+        at = DAY + timedelta(hours=5 * i)
+        for user_id in ('user-1', 'user-2'):
+            event_type = 'analysis' if i % 3 else 'api_call'
+            events.record(str(uuid.uuid4()), user_id, event_type, i % 4 + 1, 0.25 * (i % 5), '{}', at)
+
+def test_period_totals_match_raw_events():
+    """Test that rollup totals equal the raw GROUP BY for any period"""
+    print("Testing period totals...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        events = UsageEventRepository(db)
+        _record_events(events)
+
+        rollups = db.execute_query("SELECT * FROM usage_daily_rollups WHERE user_id = 'user-1'")
+        assert len(rollups) == len({(r['day'], r['event_type']) for r in rollups}) <= 20
+
+        periods = [
+            (DAY, DAY + timedelta(days=10)),                                       # Whole days
+            (DAY + timedelta(hours=7), DAY + timedelta(days=6, hours=13)),         # Partial days at both ends
+            (DAY + timedelta(hours=5), DAY + timedelta(days=2)),                   # Ends on a midnight event
+            (DAY + timedelta(hours=3), DAY + timedelta(hours=20)),                 # Within one day
+            (DAY + timedelta(hours=23), DAY + timedelta(days=1, hours=1)),         # Across one midnight
+            (DAY - timedelta(days=30), DAY - timedelta(days=1)),                   # Nothing
+        ]
+        for start, end in periods:
+            assert _totals(events, 'user-1', start, end) == _raw_totals(db, 'user-1', start, end), (start, end)
+        db.close_pool()
+    print("✓ Rollups plus partial days give the same totals as the raw events")
+
+def test_backfill():
+    """Test filling rollups for events stored before the table existed"""
+    print("\nTesting backfill...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        for i in range(30):
+            db.execute_command("INSERT INTO usage_events (id, user_id, event_type, quantity, cost_usd, timestamp) "
+                               "VALUES (?, ?, ?, ?, ?, ?)",
+                               (f'e{i}', f'user-{i % 3}', 'analysis', 2, 0.5, DAY + timedelta(hours=7 * i)))
+        db.execute_command("INSERT INTO usage_events (id, user_id, event_type, timestamp) "
+                           "VALUES ('anonymous', NULL, 'analysis', ?)", (DAY,))
+
+        # Creating the table rolls up the existing events
+        events = UsageEventRepository(db)
+        events.ensure_table()
+        start, end = DAY, DAY + timedelta(days=9, hours=11)
+        assert _totals(events, 'user-0', start, end) == _raw_totals(db, 'user-0', start, end)
+
+        # Events written behind the repository's back are picked up by a rebuild
+        db.execute_command("UPDATE usage_events SET quantity = 5 WHERE id = 'e27'")
+        assert _totals(events, 'user-0', start, end) != _raw_totals(db, 'user-0', start, end)
+        stats = backfill_usage_rollups(db, since=DAY + timedelta(days=7))
+        assert stats['events'] == 6 and stats['rollups'] > 0
+        assert _totals(events, 'user-0', start, end) == _raw_totals(db, 'user-0', start, end)
+
+        # Re-running rebuilds rather than double counts
+        stats = backfill_usage_rollups(db)
+        rows = stats['rollups']
+        assert stats['events'] == 30  # Not the anonymous one
+        assert rows == db.get_single_result("SELECT COUNT(*) AS n FROM usage_daily_rollups")['n']
+        assert _totals(events, 'user-1', start, end) == _raw_totals(db, 'user-1', start, end)
+        db.close_pool()
+    print("✓ Backfill rebuilds rollups from the raw events")
+
+def test_track_usage_event():
+    """Test that tracked events reach the rollups and current usage"""
+    print("\nTesting _track_usage_event...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = _make_sqlite_manager(tmp_dir)
+        monitor = RealTimeUsageMonitor()
+        monitor.db = db
+        monitor._track_usage_event('user-1', 'analysis', 3, 0.75, {'session_id': 's1'})
+        monitor._track_usage_event('user-1', 'analysis', 2, 0.25, {'session_id': 's2'})
+
+        row = db.get_single_result("SELECT * FROM usage_daily_rollups WHERE user_id = 'user-1'")
+        assert (row['quantity'], row['cost_usd'], row['event_count']) == (5, 1.0, 2)
+        assert db.get_single_result("SELECT COUNT(*) AS n FROM usage_events")['n'] == 2
+
+        now = datetime.utcnow()
+        totals = monitor.events.period_totals('user-1', now - timedelta(days=3), now + timedelta(days=3))
+        assert totals == [{'event_type': 'analysis', 'total_quantity': 5, 'total_cost': 1.0, 'event_count': 2}]
+        db.close_pool()
+    print("✓ Events and rollups written together")
+
+def main():
+    """Run all usage rollup tests"""
+    print("Running usage rollup tests...\n")
+
+    try:
+        test_period_totals_match_raw_events()
+        test_backfill()
+        test_track_usage_event()
+
+        print("\n✅ All usage rollup tests passed!")
+
+    except Exception as e:
+        print(f"\n❌ Usage rollup test failed: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
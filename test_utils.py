@@ -9,8 +9,14 @@ from unittest.mock import Mock, patch
 # Add the resume_matcher_ai directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'resume_matcher_ai'))
 
+import time
+import requests
+
+from resume_matcher_ai import utils
 from resume_matcher_ai.utils import (
     validate_api_key,
+    invalidate_api_key_validation,
+    clear_api_key_validation_cache,
     load_config,
     format_prompt,
     handle_rate_limits,
@@ -30,7 +36,7 @@ def test_validate_api_key():
     print("✓ Invalid key rejection works")
     
     # Test valid format but mock the API call
-    with patch('resume_matcher_ai.utils.requests.post') as mock_post:
+    with patch('resume_matcher_ai.http_client.requests.Session.post') as mock_post:
         # Mock successful validation
         mock_response = Mock()
         mock_response.status_code = 200
@@ -44,6 +50,75 @@ def test_validate_api_key():
         assert not validate_api_key("pplx-invalid-key-for-testing-purposes-12345")
         print("✓ API validation works")
 
+def test_api_key_validation_cache():
+    """Test that API key probes are cached, refreshed and invalidated"""
+    print("\nTesting API key validation cache...")
+    
+    key = "pplx-cached-key-for-testing-purposes-12345"
+    fingerprint = utils.key_fingerprint(key)
+    clear_api_key_validation_cache()
+    
+    with patch('resume_matcher_ai.http_client.requests.Session.post') as mock_post:
+        mock_post.return_value = Mock(status_code=200)
+        
+        assert validate_api_key(key)
+        assert validate_api_key(key)
+        assert mock_post.call_count == 1
+        print("✓ Repeat validations are served from the cache")
+        
+        assert validate_api_key(key, use_cache=False)
+        assert mock_post.call_count == 2
+        
+        # Near expiry: the cached answer is returned and a refresh runs in the background
+        utils._key_validation_cache[fingerprint] = (True, time.time() - 3000)
+        assert validate_api_key(key)
+        deadline = time.time() + 2
+        while mock_post.call_count < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        assert mock_post.call_count == 3
+        while utils._key_validation_cache[fingerprint][1] < time.time() - 60 and time.time() < deadline:
+            time.sleep(0.01)
+        assert time.time() - utils._key_validation_cache[fingerprint][1] < 60
+        print("✓ Entries are refreshed in the background")
+        
+        invalidate_api_key_validation(key)
+        mock_post.return_value = Mock(status_code=401)
+        assert not validate_api_key(key)
+        assert not validate_api_key(key)
+        assert mock_post.call_count == 4
+        print("✓ Invalidated keys are re-probed and rejections cached")
+        
+        clear_api_key_validation_cache()
+        mock_post.side_effect = requests.exceptions.ConnectionError("offline")
+        assert validate_api_key(key)
+        assert fingerprint not in utils._key_validation_cache
+        print("✓ Inconclusive probes are not cached")
+
+def test_unauthorized_call_invalidates_key():
+    """Test that a 401 from a real API call drops the cached validation"""
+    print("\nTesting 401 invalidation...")
+    
+    from resume_matcher_ai.matcher import call_perplexity_api
+    
+    key = "pplx-revoked-key-for-testing-purposes-12345"
+    clear_api_key_validation_cache()
+    
+    with patch.dict(os.environ, {'PERPLEXITY_API_KEY': key, 'ENABLE_USAGE_TRACKING': 'false'}), \
+         patch('resume_matcher_ai.http_client.requests.Session.post') as mock_post:
+        mock_post.return_value = Mock(status_code=200)
+        assert validate_api_key(key)
+        assert utils.key_fingerprint(key) in utils._key_validation_cache
+        
+        mock_post.return_value = Mock(status_code=401, text='Unauthorized')
+        try:
+            call_perplexity_api("test prompt")
+            assert False, "Expected an authentication error"
+        except Exception as e:
+            assert "401" in str(e)
+    
+    assert utils.key_fingerprint(key) not in utils._key_validation_cache
+    print("✓ Unauthorized responses invalidate the cached result")
+
 def test_load_config():
     """Test configuration loading"""
     print("\nTesting configuration loading...")
@@ -173,6 +248,8 @@ def main():
     
     try:
         test_validate_api_key()
+        test_api_key_validation_cache()
+        test_unauthorized_call_invalidates_key()
         test_load_config()
         test_format_prompt()
         test_handle_rate_limits()
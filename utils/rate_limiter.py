@@ -0,0 +1,165 @@
+"""
+In-process rate limiting utilities
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter"""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        if rate_per_second <= 0:
+            raise ValueError(f"rate_per_second must be positive, got {rate_per_second}")
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.rate_per_second = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate_per_second)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available or timeout expires"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait_time = (tokens - self._tokens) / self.rate_per_second
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait_time = min(wait_time, remaining)
+
+            time.sleep(wait_time)
+
+    @property
+    def available_tokens(self) -> float:
+        """Current number of tokens in the bucket"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+class SlidingWindowCounter:
+    """
+    Thread-safe sliding-window counters for many keys
+
+    Each key keeps the totals of the current and previous fixed windows; the
+    count over the last window_seconds is estimated by weighting the previous
+    total by how much of it still overlaps the sliding window. Reads and
+    writes are O(1) and memory is two numbers per key, with the least
+    recently used keys dropped beyond max_keys.
+    """
+
+    def __init__(self, window_seconds: float, max_keys: int = 100000):
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._windows: 'OrderedDict[Hashable, list]' = OrderedDict()  # key -> [window_start, current, previous]
+        self._lock = threading.Lock()
+
+    def window_start(self, now: float) -> float:
+        """Start of the fixed window containing now"""
+        return now - now % self.window_seconds
+
+    def _roll(self, window: list, now: float) -> None:
+        start = self.window_start(now)
+        if start <= window[0]:
+            return
+        # One window on the current total becomes the previous one; further on both are empty
+        window[2] = window[1] if start - window[0] == self.window_seconds else 0
+        window[0], window[1] = start, 0
+
+    def _estimate(self, window: list, now: float) -> float:
+        overlap = min(1.0, max(0.0, 1 - (now - window[0]) / self.window_seconds))
+        return window[1] + window[2] * overlap
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._windows
+
+    def count(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Estimated total added for key over the last window_seconds"""
+        now = time.time() if now is None else now
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                return 0
+            self._windows.move_to_end(key)
+            self._roll(window, now)
+            return self._estimate(window, now)
+
+    def add(self, key: Hashable, quantity: float = 1, now: Optional[float] = None) -> float:
+        """Add quantity to key's current window; returns the new estimate"""
+        now = time.time() if now is None else now
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._insert(key, [self.window_start(now), 0, 0])
+            else:
+                self._windows.move_to_end(key)
+                self._roll(window, now)
+            window[1] += quantity
+            return self._estimate(window, now)
+
+    def seed(self, key: Hashable, current: float, previous: float, now: Optional[float] = None) -> None:
+        """Set key's totals for the current and previous windows, e.g. from stored history"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._windows.pop(key, None)
+            self._insert(key, [self.window_start(now), current, previous])
+
+    def _insert(self, key: Hashable, window: list) -> list:
+        self._windows[key] = window
+        while len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+        return window
+
+    def clear(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+    def __len__(self) -> int:
+        return len(self._windows)
+
+_rate_limiters: Dict[str, TokenBucket] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(key: str, requests_per_minute: float, burst: Optional[float] = None) -> TokenBucket:
+    """Get the shared limiter for a key, creating it on first use"""
+    if requests_per_minute <= 0:
+        raise ValueError(
+            f"requests_per_minute must be positive, got {requests_per_minute} "
+            "(check PERPLEXITY_REQUESTS_PER_MINUTE)"
+        )
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucket(
+                rate_per_second=requests_per_minute / 60.0,
+                capacity=burst if burst is not None else max(1.0, requests_per_minute / 6.0)
+            )
+            _rate_limiters[key] = limiter
+        return limiter